@@ -0,0 +1,42 @@
+"""Index documentation hierarchy paths for prefix (subtree) lookups.
+
+Revision ID: document_control_261016_hierarchy_path_prefix
+Revises: document_control_261016_hierarchy_versions
+Create Date: 2026-10-16
+
+Subtree moves and descendant reads filter ``path LIKE '<prefix>/%'``. The
+existing ``(tenant_id, path)`` index uses the database collation, which
+PostgreSQL cannot use for ``LIKE`` prefixes outside the C locale;
+``varchar_pattern_ops`` can, so descendant scans become index range scans.
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "document_control_261016_hierarchy_path_prefix"
+down_revision = "document_control_261016_hierarchy_versions"
+branch_labels = None
+depends_on = None
+
+
+_INDEX = "ix_documentation_nodes_tenant_path_prefix"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {_INDEX} "
+            "ON documentation_nodes (tenant_id, path varchar_pattern_ops)"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {_INDEX}")
@@ -0,0 +1,41 @@
+"""Track a change stamp per tenant documentation hierarchy.
+
+Revision ID: document_control_261016_hierarchy_versions
+Revises: document_control_261016_reader_search
+Create Date: 2026-10-16
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "document_control_261016_hierarchy_versions"
+down_revision: Union[str, Sequence[str], None] = "document_control_261016_reader_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _tables() -> set[str]:
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    tables = _tables()
+    if "amos" not in tables or "documentation_hierarchy_versions" in tables:
+        return
+    op.create_table(
+        "documentation_hierarchy_versions",
+        sa.Column("tenant_id", sa.String(length=36), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.ForeignKeyConstraint(["tenant_id"], ["amos.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id"),
+    )
+
+
+def downgrade() -> None:
+    if "documentation_hierarchy_versions" in _tables():
+        op.drop_table("documentation_hierarchy_versions")
@@ -0,0 +1,66 @@
+"""Checkpoint page-sharded PDF reference indexing.
+
+Revision ID: document_control_261016_index_shards
+Revises: rel_261016_ingestion_timings
+Create Date: 2026-10-16
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "document_control_261016_index_shards"
+down_revision: Union[str, Sequence[str], None] = "rel_261016_ingestion_timings"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _tables() -> set[str]:
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _columns(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    if table_name not in inspector.get_table_names():
+        return set()
+    return {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    columns = _columns("documentation_index_jobs")
+    if not columns:
+        return
+    if "pages_total" not in columns:
+        op.add_column("documentation_index_jobs", sa.Column("pages_total", sa.Integer(), nullable=True))
+    if "pages_indexed" not in columns:
+        op.add_column("documentation_index_jobs", sa.Column("pages_indexed", sa.Integer(), nullable=False, server_default="0"))
+    if "documentation_index_shards" not in _tables():
+        op.create_table(
+            "documentation_index_shards",
+            sa.Column("id", sa.String(length=36), nullable=False),
+            sa.Column("job_id", sa.String(length=36), nullable=False),
+            sa.Column("checkpoint_key", sa.String(length=64), nullable=False),
+            sa.Column("shard_index", sa.Integer(), nullable=False),
+            sa.Column("first_page", sa.Integer(), nullable=False),
+            sa.Column("last_page", sa.Integer(), nullable=False),
+            sa.Column("page_count", sa.Integer(), nullable=False),
+            sa.Column("searchable_text", sa.Boolean(), nullable=False, server_default=sa.false()),
+            sa.Column("occurrences_json", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default=sa.text("'[]'::jsonb")),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+            sa.ForeignKeyConstraint(["job_id"], ["documentation_index_jobs.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("job_id", "shard_index", name="uq_documentation_index_shard"),
+        )
+
+
+def downgrade() -> None:
+    if "documentation_index_shards" in _tables():
+        op.drop_table("documentation_index_shards")
+    columns = _columns("documentation_index_jobs")
+    for column in ("pages_indexed", "pages_total"):
+        if column in columns:
+            op.drop_column("documentation_index_jobs", column)
@@ -0,0 +1,71 @@
+"""Add the ranked reader search vector for manual sections and blocks.
+
+Revision ID: document_control_261016_reader_search
+Revises: document_control_261016_index_shards
+Create Date: 2026-10-16
+
+``manual_search_vector(text)`` is the 'simple' tsvector of the text plus one
+compacted term per part number (``AN960-10L`` also indexes ``an96010l``), so
+part numbers match with or without their separators. The GIN expression
+indexes are maintained by PostgreSQL as sections and blocks are ingested.
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "document_control_261016_reader_search"
+down_revision = "document_control_261016_index_shards"
+branch_labels = None
+depends_on = None
+
+
+_FUNCTIONS = (
+    """
+    CREATE OR REPLACE FUNCTION manual_part_number_terms(value text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT coalesce(string_agg(lower(translate(token[1], '-./', '')), ' '), '')
+        FROM regexp_matches(coalesce(value, ''), '([[:alnum:]]+(?:[-./][[:alnum:]]+)+)', 'g') AS token
+        WHERE token[1] ~ '[0-9]'
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION manual_search_vector(value text) RETURNS tsvector
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT to_tsvector('simple'::regconfig, coalesce(value, ''))
+            || to_tsvector('simple'::regconfig, manual_part_number_terms(value))
+    $$
+    """,
+)
+
+_INDEXES = (
+    ("ix_manual_blocks_reader_search", "manual_blocks", "manual_search_vector(text_plain)"),
+    ("ix_manual_sections_reader_search", "manual_sections", "manual_search_vector(heading)"),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    for statement in _FUNCTIONS:
+        op.execute(statement)
+    # Same policy as the controlled-document search indexes: build without
+    # blocking ingestion, outside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, table, expression in _INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} USING GIN ({expression})"
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        for name, _table, _expression in reversed(_INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute("DROP FUNCTION IF EXISTS manual_search_vector(text)")
+    op.execute("DROP FUNCTION IF EXISTS manual_part_number_terms(text)")
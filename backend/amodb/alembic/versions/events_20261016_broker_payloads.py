@@ -0,0 +1,34 @@
+"""Add overflow storage for cross-worker event broker notifications.
+
+Revision ID: events_261016_broker_payloads
+Revises: quality_260820_provider_gov
+Create Date: 2026-10-16
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "events_261016_broker_payloads"
+down_revision = "quality_260820_provider_gov"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Transient transport rows only: envelopes larger than a NOTIFY payload.
+    # No tenant column/RLS because rows are read by id by the broker listener
+    # and pruned within minutes; tenant filtering happens at SSE delivery.
+    op.create_table(
+        "event_broker_payloads",
+        sa.Column("id", sa.String(length=36), primary_key=True),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_event_broker_payloads_created_at", "event_broker_payloads", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_broker_payloads_created_at", table_name="event_broker_payloads")
+    op.drop_table("event_broker_payloads")
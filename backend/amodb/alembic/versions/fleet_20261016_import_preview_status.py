@@ -0,0 +1,51 @@
+"""Track the state of asynchronous import preview jobs.
+
+Revision ID: fleet_261016_import_preview_status
+Revises: maintenance_program_261016_due_computed_on
+Create Date: 2026-10-16
+
+Aircraft and component import previews are parsed by a worker pool and
+polled by the client. Sessions record whether the job is queued, running,
+ready or failed (with the error to report). Existing sessions were all
+staged synchronously and start as ``ready``.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "fleet_261016_import_preview_status"
+down_revision: Union[str, Sequence[str], None] = "maintenance_program_261016_due_computed_on"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "aircraft_import_preview_sessions"
+
+
+def _columns() -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    if TABLE not in inspector.get_table_names():
+        return set()
+    return {column["name"] for column in inspector.get_columns(TABLE)}
+
+
+def upgrade() -> None:
+    columns = _columns()
+    if not columns:
+        return
+    if "status" not in columns:
+        op.add_column(TABLE, sa.Column("status", sa.String(length=16), nullable=False, server_default="ready"))
+    if "error" not in columns:
+        op.add_column(TABLE, sa.Column("error", sa.JSON(), nullable=True))
+    if "completed_at" not in columns:
+        op.add_column(TABLE, sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    columns = _columns()
+    for name in ("completed_at", "error", "status"):
+        if name in columns:
+            op.drop_column(TABLE, name)
@@ -0,0 +1,97 @@
+"""Maintain a per-aircraft utilisation rollup for fleet planning.
+
+Revision ID: fleet_261016_usage_rollups
+Revises: document_control_261016_hierarchy_path_prefix
+Create Date: 2026-10-16
+
+``aircraft_usage_rollups`` holds each aircraft's latest usage totals and its
+7/30/90-day hours and cycles, refreshed by ``fleet.usage_rollup`` whenever
+usage is written. The table is backfilled here on PostgreSQL; elsewhere the
+read path computes rows that are missing.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "fleet_261016_usage_rollups"
+down_revision: Union[str, Sequence[str], None] = "document_control_261016_hierarchy_path_prefix"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _tables() -> set[str]:
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    tables = _tables()
+    if "aircraft_usage" not in tables or "aircraft_usage_rollups" in tables:
+        return
+    op.create_table(
+        "aircraft_usage_rollups",
+        sa.Column("aircraft_serial_number", sa.String(length=50), nullable=False),
+        sa.Column("amo_id", sa.String(length=36), nullable=False),
+        sa.Column("latest_usage_id", sa.Integer(), nullable=True),
+        sa.Column("latest_date", sa.Date(), nullable=True),
+        sa.Column("latest_techlog_no", sa.String(length=64), nullable=True),
+        sa.Column("latest_ttaf_after", sa.Float(), nullable=True),
+        sa.Column("latest_tca_after", sa.Float(), nullable=True),
+        sa.Column("window_end", sa.Date(), nullable=False),
+        sa.Column("hours_7d", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("cycles_7d", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("hours_30d", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("cycles_30d", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("hours_90d", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("cycles_90d", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.ForeignKeyConstraint(["aircraft_serial_number"], ["aircraft.serial_number"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["amo_id"], ["amos.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("aircraft_serial_number"),
+    )
+    op.create_index("ix_aircraft_usage_rollups_amo", "aircraft_usage_rollups", ["amo_id", "aircraft_serial_number"])
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        """
+        INSERT INTO aircraft_usage_rollups (
+            aircraft_serial_number, amo_id, latest_usage_id, latest_date, latest_techlog_no,
+            latest_ttaf_after, latest_tca_after, window_end,
+            hours_7d, cycles_7d, hours_30d, cycles_30d, hours_90d, cycles_90d
+        )
+        SELECT
+            latest.aircraft_serial_number, latest.amo_id, latest.id, latest.date, latest.techlog_no,
+            latest.ttaf_after, latest.tca_after, CURRENT_DATE,
+            COALESCE(windows.hours_7d, 0), COALESCE(windows.cycles_7d, 0),
+            COALESCE(windows.hours_30d, 0), COALESCE(windows.cycles_30d, 0),
+            COALESCE(windows.hours_90d, 0), COALESCE(windows.cycles_90d, 0)
+        FROM (
+            SELECT DISTINCT ON (aircraft_serial_number)
+                aircraft_serial_number, amo_id, id, date, techlog_no, ttaf_after, tca_after
+            FROM aircraft_usage
+            ORDER BY aircraft_serial_number, date DESC, techlog_no DESC
+        ) AS latest
+        LEFT JOIN (
+            SELECT
+                aircraft_serial_number,
+                SUM(block_hours) FILTER (WHERE date >= CURRENT_DATE - 6) AS hours_7d,
+                SUM(cycles) FILTER (WHERE date >= CURRENT_DATE - 6) AS cycles_7d,
+                SUM(block_hours) FILTER (WHERE date >= CURRENT_DATE - 29) AS hours_30d,
+                SUM(cycles) FILTER (WHERE date >= CURRENT_DATE - 29) AS cycles_30d,
+                SUM(block_hours) AS hours_90d,
+                SUM(cycles) AS cycles_90d
+            FROM aircraft_usage
+            WHERE date >= CURRENT_DATE - 89
+            GROUP BY aircraft_serial_number
+        ) AS windows ON windows.aircraft_serial_number = latest.aircraft_serial_number
+        """
+    )
+
+
+def downgrade() -> None:
+    if "aircraft_usage_rollups" in _tables():
+        op.drop_index("ix_aircraft_usage_rollups_amo", table_name="aircraft_usage_rollups")
+        op.drop_table("aircraft_usage_rollups")
@@ -0,0 +1,49 @@
+"""Record when import preview jobs start and when their process last saw them.
+
+Revision ID: fleet_261017_import_preview_heartbeat
+Revises: fleet_261016_import_preview_status
+Create Date: 2026-10-17
+
+A preview can wait behind other jobs for longer than any fixed age, so stalled
+previews are detected from a heartbeat stamped by the owning process instead
+of from ``created_at``. Existing sessions keep a NULL heartbeat and fall back
+to their creation time.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "fleet_261017_import_preview_heartbeat"
+down_revision: Union[str, Sequence[str], None] = "fleet_261016_import_preview_status"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "aircraft_import_preview_sessions"
+
+
+def _columns() -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    if TABLE not in inspector.get_table_names():
+        return set()
+    return {column["name"] for column in inspector.get_columns(TABLE)}
+
+
+def upgrade() -> None:
+    columns = _columns()
+    if not columns:
+        return
+    if "started_at" not in columns:
+        op.add_column(TABLE, sa.Column("started_at", sa.DateTime(timezone=True), nullable=True))
+    if "heartbeat_at" not in columns:
+        op.add_column(TABLE, sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    columns = _columns()
+    for name in ("heartbeat_at", "started_at"):
+        if name in columns:
+            op.drop_column(TABLE, name)
@@ -0,0 +1,40 @@
+"""Record the day each aircraft programme item's due state was evaluated.
+
+Revision ID: maintenance_program_261016_due_computed_on
+Revises: fleet_261016_usage_rollups
+Create Date: 2026-10-16
+
+Incremental due recomputes after a usage posting only revisit calendar-based
+items whose stored state was evaluated on an earlier day. Existing rows start
+with NULL and are picked up by the next recompute of their aircraft.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "maintenance_program_261016_due_computed_on"
+down_revision: Union[str, Sequence[str], None] = "fleet_261016_usage_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    if table not in inspector.get_table_names():
+        return set()
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    columns = _columns("aircraft_program_items")
+    if columns and "due_computed_on" not in columns:
+        op.add_column("aircraft_program_items", sa.Column("due_computed_on", sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    if "due_computed_on" in _columns("aircraft_program_items"):
+        op.drop_column("aircraft_program_items", "due_computed_on")
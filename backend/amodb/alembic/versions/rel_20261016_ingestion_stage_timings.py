@@ -0,0 +1,40 @@
+"""Record per-stage timings on reliability ingestion batches.
+
+Revision ID: rel_261016_ingestion_timings
+Revises: events_261016_broker_payloads
+Create Date: 2026-10-16
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+revision: str = "rel_261016_ingestion_timings"
+down_revision: Union[str, Sequence[str], None] = "events_261016_broker_payloads"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    if table_name not in inspector.get_table_names():
+        return set()
+    return {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    columns = _columns("reliability_ingestion_batches")
+    if columns and "stage_timings_json" not in columns:
+        op.add_column(
+            "reliability_ingestion_batches",
+            sa.Column("stage_timings_json", JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        )
+
+
+def downgrade() -> None:
+    if "stage_timings_json" in _columns("reliability_ingestion_batches"):
+        op.drop_column("reliability_ingestion_batches", "stage_timings_json")
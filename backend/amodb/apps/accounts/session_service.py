@@ -85,7 +85,7 @@ def create_session(
     db.query(models.PortalAuthSession).filter(
         models.PortalAuthSession.user_id == str(user.id),
         models.PortalAuthSession.expires_at < now - timedelta(days=SESSION_RETENTION_DAYS),
-    ).delete(synchronize_session=False)
+    ).execution_options(identity_cache_users=[str(user.id)]).delete(synchronize_session=False)
     session_id = str(uuid4())
     family_id = str(uuid4())
     raw = secrets.token_urlsafe(48)
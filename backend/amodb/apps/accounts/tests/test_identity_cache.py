@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+
+from amodb import identity_cache as identity_cache_module
+from amodb.apps.accounts import models as account_models
+from amodb.apps.rostering import models as rostering_models  # noqa: F401  (completes the mapper registry)
+from amodb.database import Base
+from amodb.identity_cache import identity_cache
+from amodb.security import create_access_token, get_current_active_user, get_current_user
+
+
+@pytest.fixture()
+def cached_db(monkeypatch):
+    monkeypatch.setenv("IDENTITY_CACHE_MODE", "local")
+    identity_cache.invalidate_all()
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            account_models.AMOAsset.__table__,
+            account_models.Department.__table__,
+            account_models.User.__table__,
+            account_models.AuthorisationType.__table__,
+            account_models.UserAuthorisation.__table__,
+            account_models.AccountSecurityEvent.__table__,
+            account_models.UserActiveContext.__table__,
+            account_models.PortalAuthSession.__table__,
+        ],
+    )
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+    yield SessionLocal, statements
+    identity_cache.invalidate_all()
+
+
+def _seed(SessionLocal, *, is_superuser: bool = False) -> tuple[str, str]:
+    db = SessionLocal()
+    amo = account_models.AMO(amo_code="AMO-A", name="AMO A", login_slug="amo-a")
+    db.add(amo)
+    db.flush()
+    user = account_models.User(
+        amo_id=amo.id,
+        email="planner@example.com",
+        staff_code="PLANNER",
+        first_name="Plan",
+        last_name="Ner",
+        full_name="Plan Ner",
+        hashed_password="hash",
+        role=account_models.AccountRole.SUPERUSER if is_superuser else account_models.AccountRole.AMO_ADMIN,
+        is_active=True,
+        is_superuser=is_superuser,
+        is_amo_admin=not is_superuser,
+    )
+    db.add(user)
+    db.flush()
+    db.add(
+        account_models.PortalAuthSession(
+            id="browser-1",
+            user_id=user.id,
+            amo_id=amo.id,
+            refresh_family_id="family-1",
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+    )
+    if is_superuser:
+        db.add(account_models.UserActiveContext(user_id=user.id, active_amo_id=amo.id))
+    db.commit()
+    user_id, amo_id = user.id, amo.id
+    db.close()
+    token = create_access_token(
+        data={"sub": user_id, "amo_id": amo_id, "auth_session_id": "browser-1", "auth_session_managed": True}
+    )
+    return token, amo_id
+
+
+def _authenticate(SessionLocal, token: str):
+    db = SessionLocal()
+    try:
+        user = get_current_active_user(current_user=get_current_user(token=token, db=db), db=db)
+        return user, getattr(user, "effective_amo_id", None)
+    finally:
+        db.close()
+
+
+def test_repeat_requests_skip_identity_queries(cached_db):
+    SessionLocal, statements = cached_db
+    token, amo_id = _seed(SessionLocal, is_superuser=True)
+
+    statements.clear()
+    _authenticate(SessionLocal, token)
+    cold = len(statements)
+    statements.clear()
+    user, effective_amo_id = _authenticate(SessionLocal, token)
+
+    assert cold >= 4
+    assert statements == []
+    assert effective_amo_id == amo_id
+    assert user.amo.id == amo_id
+    assert identity_cache.stats()["hits"] >= 1
+
+
+def test_session_revocation_commit_invalidates_cached_identity(cached_db):
+    SessionLocal, _ = cached_db
+    token, _ = _seed(SessionLocal)
+    _authenticate(SessionLocal, token)
+
+    db = SessionLocal()
+    auth_session = db.get(account_models.PortalAuthSession, "browser-1")
+    auth_session.revoked_at = datetime.now(timezone.utc)
+    db.commit()
+    db.close()
+
+    with pytest.raises(HTTPException) as exc:
+        _authenticate(SessionLocal, token)
+    assert exc.value.status_code == 401
+
+
+def test_rolled_back_change_keeps_entry_and_bulk_update_drops_everything(cached_db):
+    SessionLocal, _ = cached_db
+    token, _ = _seed(SessionLocal)
+    _authenticate(SessionLocal, token)
+
+    db = SessionLocal()
+    user = db.query(account_models.User).one()
+    user.is_active = False
+    db.flush()
+    db.rollback()
+    assert identity_cache.stats()["entries"] == 1
+
+    db.execute(update(account_models.User).values(is_active=False))
+    db.commit()
+    db.close()
+    assert identity_cache.stats()["entries"] == 0
+
+    with pytest.raises(HTTPException) as exc:
+        _authenticate(SessionLocal, token)
+    assert exc.value.status_code == 400
+
+
+def test_bulk_delete_scoped_to_users_keeps_other_identities(cached_db):
+    SessionLocal, _ = cached_db
+    token, _ = _seed(SessionLocal)
+    user, _ = _authenticate(SessionLocal, token)
+
+    db = SessionLocal()
+    for user_id in ("someone-else", str(user.id)):
+        db.query(account_models.PortalAuthSession).filter(
+            account_models.PortalAuthSession.user_id == user_id,
+            account_models.PortalAuthSession.expires_at < datetime.now(timezone.utc) - timedelta(days=30),
+        ).execution_options(identity_cache_users=[user_id]).delete(synchronize_session=False)
+        db.commit()
+        if user_id == "someone-else":
+            assert identity_cache.stats()["entries"] == 1
+    db.close()
+    assert identity_cache.stats()["entries"] == 0
+
+
+def test_fill_that_raced_an_invalidation_is_discarded(cached_db):
+    SessionLocal, _ = cached_db
+    token, _ = _seed(SessionLocal)
+
+    original_put = identity_cache.put
+
+    def racing_put(entry, *, generation):
+        identity_cache.invalidate(user_ids={entry.user_id})
+        original_put(entry, generation=generation)
+
+    identity_cache.put = racing_put
+    try:
+        _authenticate(SessionLocal, token)
+    finally:
+        del identity_cache.put
+    assert identity_cache.stats()["entries"] == 0
+    assert identity_cache.stats()["stale_fills"] >= 1
+
+
+def test_remote_invalidation_message_and_auto_mode_without_listener(cached_db, monkeypatch):
+    SessionLocal, _ = cached_db
+    token, _ = _seed(SessionLocal)
+    user, _ = _authenticate(SessionLocal, token)
+
+    identity_cache.apply_message('{"users":["%s"],"sessions":[]}' % user.id)
+    assert identity_cache.stats()["entries"] == 0
+
+    monkeypatch.setenv("IDENTITY_CACHE_MODE", "auto")
+    _authenticate(SessionLocal, token)
+    assert identity_cache_module.identity_cache.enabled() is False
+    assert identity_cache.stats()["entries"] == 0
+
+
+def test_listener_stays_off_behind_external_pooler_without_direct_url(cached_db, monkeypatch):
+    SessionLocal, _ = cached_db
+    token, _ = _seed(SessionLocal)
+    monkeypatch.setenv("IDENTITY_CACHE_MODE", "auto")
+    monkeypatch.setenv("DATABASE_URL", "postgresql+psycopg2://amo@pgbouncer:6432/amo")
+    monkeypatch.setenv("DB_EXTERNAL_POOLER", "1")
+    monkeypatch.delenv("EVENTS_BROKER_DATABASE_URL", raising=False)
+    monkeypatch.delenv("DATABASE_WRITE_URL", raising=False)
+
+    listener = identity_cache_module._InvalidationListener(identity_cache)
+    listener.start()
+    assert listener._thread is None
+
+    _authenticate(SessionLocal, token)
+    assert identity_cache.enabled() is False
+    assert identity_cache.stats()["entries"] == 0
+
+    monkeypatch.setenv("EVENTS_BROKER_DATABASE_URL", "postgresql+psycopg2://amo@db:5432/amo")
+    assert identity_cache_module._listen_url() == "postgresql+psycopg2://amo@db:5432/amo"
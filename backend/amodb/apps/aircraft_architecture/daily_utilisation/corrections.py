@@ -10,7 +10,7 @@ from sqlalchemy.orm import Session
 from amodb.apps.accounts.models import User
 from amodb.apps.audit.models import AuditEvent
 from amodb.apps.fleet import models as fleet_models
-from amodb.apps.fleet import services as fleet_services
+from amodb.apps.maintenance_program import projection as due_projection
 from amodb.apps.reliability import models as reliability_models
 from amodb.apps.technical_records import models as technical_models
 from amodb.database import get_db
@@ -168,12 +168,12 @@ def _apply_downstream_projections(
             )
         )
 
-    fleet_services.update_maintenance_remaining(
+    due_projection.apply_usage_delta(
         db,
+        amo_id=plan.amo_id,
         aircraft_serial_number=original.aircraft_serial_number,
-        current_hours=float(airframe.after_hours),
-        current_cycles=float(airframe.after_cycles),
-        current_date=original.operation_date,
+        hours_delta=float(replacement.flight_hours - original.flight_hours),
+        cycles_delta=float(replacement.cycles - original.cycles),
     )
     return component_updates
 
@@ -10,7 +10,7 @@ from sqlalchemy.orm import Session
 from amodb.apps.accounts.models import User
 from amodb.apps.audit.models import AuditEvent
 from amodb.apps.fleet import models as fleet_models
-from amodb.apps.fleet import services as fleet_services
+from amodb.apps.maintenance_program import projection as due_projection
 from amodb.apps.reliability import models as reliability_models
 from amodb.apps.technical_records import models as technical_models
 from amodb.database import get_db
@@ -297,12 +297,12 @@ def post_entry(
             )
         )
 
-    fleet_services.update_maintenance_remaining(
+    due_projection.apply_usage_delta(
         db,
+        amo_id=amo_id,
         aircraft_serial_number=entry.aircraft_serial_number,
-        current_hours=float(airframe_exposure.after_hours),
-        current_cycles=float(airframe_exposure.after_cycles),
-        current_date=entry.operation_date,
+        hours_delta=float(entry.flight_hours),
+        cycles_delta=float(entry.cycles),
     )
     entry.status = "POSTED"
     entry.posted_by_user_id = user.id
@@ -1,7 +1,7 @@
 """Access-filtered, read-only hierarchy endpoints registered first."""
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from amodb.apps.accounts import models as account_models
@@ -10,7 +10,7 @@ from amodb.apps.manuals.router_legacy import _tenant_by_slug
 from amodb.database import get_db
 from amodb.security import get_current_active_user
 
-from .knowledge_tree_reader import read_only_hierarchy_payload, read_only_node_connections
+from .knowledge_tree_reader import read_only_hierarchy, read_only_node_connections
 from .workspace_service import is_control_user, resolve_tenant
 
 
@@ -18,22 +18,40 @@ workspace_tree_router = APIRouter(prefix="/workspace", tags=["Document Control K
 publication_tree_router = APIRouter(prefix="/manuals", tags=["Publications Knowledge Graph"])
 
 
-@workspace_tree_router.get("/t/{tenant_slug}/knowledge/tree")
-def get_access_filtered_knowledge_tree(
-    tenant_slug: str,
-    db: Session = Depends(get_db),
-    current_user: account_models.User = Depends(get_current_active_user),
+def _tree_response(
+    db: Session,
+    tenant: manual_models.Tenant,
+    current_user: account_models.User,
+    request: Request,
+    response: Response,
 ):
-    tenant = resolve_tenant(db, tenant_slug, current_user)
-    payload = read_only_hierarchy_payload(
+    payload, etag = read_only_hierarchy(
         db,
         manual_tenant=tenant,
         user=current_user,
     )
+    # Revalidate every time: the tag changes with the hierarchy change stamp,
+    # the caller's visibility and reference health.
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
     payload["capabilities"] = {"read": True, "control": is_control_user(current_user)}
     return payload
 
 
+@workspace_tree_router.get("/t/{tenant_slug}/knowledge/tree")
+def get_access_filtered_knowledge_tree(
+    tenant_slug: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: account_models.User = Depends(get_current_active_user),
+):
+    tenant = resolve_tenant(db, tenant_slug, current_user)
+    return _tree_response(db, tenant, current_user, request, response)
+
+
 @workspace_tree_router.get("/t/{tenant_slug}/knowledge/nodes/{node_id}/connections")
 def get_access_filtered_node_connections(
     tenant_slug: str,
@@ -56,19 +74,15 @@ def get_access_filtered_node_connections(
 @publication_tree_router.get("/t/{tenant_slug}/knowledge-tree")
 def get_access_filtered_publication_tree(
     tenant_slug: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: account_models.User = Depends(get_current_active_user),
 ):
     tenant: manual_models.Tenant = _tenant_by_slug(db, tenant_slug)
     if not getattr(current_user, "is_superuser", False) and str(current_user.amo_id) != str(tenant.amo_id):
         raise HTTPException(status_code=403, detail="The requested hierarchy is outside the active AMO")
-    payload = read_only_hierarchy_payload(
-        db,
-        manual_tenant=tenant,
-        user=current_user,
-    )
-    payload["capabilities"] = {"read": True, "control": is_control_user(current_user)}
-    return payload
+    return _tree_response(db, tenant, current_user, request, response)
 
 
 __all__ = ["publication_tree_router", "workspace_tree_router"]
@@ -0,0 +1,153 @@
+"""Keep the documentation hierarchy current from write events, not reads.
+
+Hierarchy GETs serialize persisted nodes only. This module makes that safe:
+
+* any ORM flush that adds or removes a manual, revision, hierarchy node or
+  execution profile, or changes one of their columns the serialized tree
+  reads (``_TREE_COLUMNS``), advances the tenant's
+  ``documentation_hierarchy_versions`` stamp in the same transaction, so
+  cached trees and ETags in every process go stale exactly on commit. Other
+  writes (revision status and OCR fields during ingest, document control
+  profiles) do not take the tenant's version row lock;
+* a flush that adds, changes or removes a manual or its document control
+  profile also queues the tenant for ``reconcile_documentation_hierarchy``,
+  which runs once per tenant just before the transaction commits.
+
+Reconciliation runs in a savepoint: if it fails, the triggering change still
+commits and the tree catches up on the next change or an explicit
+``POST /knowledge/reconcile``.
+
+Both hooks are PostgreSQL-only, like the version table itself. The runtime
+refuses other databases; under the SQLite test opt-in, writes neither stamp
+nor reconcile, and the hierarchy changes only through an explicit
+``reconcile_documentation_hierarchy`` call.
+"""
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import event, inspect as sa_inspect, select
+from sqlalchemy.orm import Session
+
+from amodb.apps.manuals import models as manual_models
+
+from . import domain_models
+from . import knowledge_models as km
+
+logger = logging.getLogger(__name__)
+
+_INFO_KEY = "doc_control.hierarchy_reconcile"
+
+# Tenant column per model: "amo" columns hold the AMO id the hierarchy is
+# keyed by; manuals hold the manual tenant id; revisions only their manual.
+_AMO_SCOPED = (km.DocumentationNode, km.DocumentationExecutionProfile, domain_models.DocumentControlProfile)
+_RECONCILE_TRIGGERS = (manual_models.Manual, domain_models.DocumentControlProfile)
+
+# Columns read by ``knowledge_service._serialize_hierarchy``; ``None`` means
+# every column. Revisions feed the tree through ``latest_revisions``.
+_TREE_COLUMNS: dict[type, frozenset[str] | None] = {
+    km.DocumentationNode: None,
+    km.DocumentationExecutionProfile: None,
+    manual_models.Manual: frozenset({"tenant_id", "manual_type", "status", "current_published_rev_id"}),
+    manual_models.ManualRevision: frozenset({"manual_id", "rev_number", "created_at", "source_type_enum"}),
+}
+
+
+def _feeds_tree(session: Session, instance) -> bool:
+    """Whether flushing ``instance`` can change its tenant's serialized tree."""
+    if type(instance) not in _TREE_COLUMNS:
+        return False
+    if instance in session.new or instance in session.deleted:
+        return True
+    state = sa_inspect(instance)
+    columns = _TREE_COLUMNS[type(instance)]
+    keys = columns if columns is not None else [attr.key for attr in state.mapper.column_attrs]
+    return any(state.attrs[key].history.has_changes() for key in keys)
+
+
+def _amo_ids_for_manual_tenants(connection, manual_tenant_ids: set[str]) -> dict[str, str]:
+    if not manual_tenant_ids:
+        return {}
+    rows = connection.execute(
+        select(manual_models.Tenant.id, manual_models.Tenant.amo_id).where(manual_models.Tenant.id.in_(manual_tenant_ids))
+    )
+    return {str(tenant_id): str(amo_id) for tenant_id, amo_id in rows}
+
+
+def _manual_tenants_for_manuals(connection, manual_ids: set[str]) -> dict[str, str]:
+    if not manual_ids:
+        return {}
+    rows = connection.execute(
+        select(manual_models.Manual.id, manual_models.Manual.tenant_id).where(manual_models.Manual.id.in_(manual_ids))
+    )
+    return {str(manual_id): str(tenant_id) for manual_id, tenant_id in rows}
+
+
+@event.listens_for(Session, "after_flush")
+def _stamp_hierarchy_changes(session: Session, _flush_context) -> None:
+    changed = [*session.new, *session.dirty, *session.deleted]
+    if not any(isinstance(instance, (*_AMO_SCOPED, manual_models.Manual, manual_models.ManualRevision)) for instance in changed):
+        return
+    connection = session.connection()
+    if connection.dialect.name != "postgresql":
+        return
+    amo_ids: set[str] = set()
+    manual_tenant_ids: set[str] = set()
+    revision_manual_ids: set[str] = set()
+    reconcile_amo_ids: set[str] = set()
+    reconcile_manual_tenant_ids: set[str] = set()
+    for instance in changed:
+        stamps = _feeds_tree(session, instance)
+        if isinstance(instance, manual_models.Manual):
+            if stamps:
+                manual_tenant_ids.add(str(instance.tenant_id))
+            reconcile_manual_tenant_ids.add(str(instance.tenant_id))
+        elif isinstance(instance, manual_models.ManualRevision):
+            if stamps:
+                revision_manual_ids.add(str(instance.manual_id))
+        elif isinstance(instance, _AMO_SCOPED):
+            if stamps:
+                amo_ids.add(str(instance.tenant_id))
+            if isinstance(instance, _RECONCILE_TRIGGERS):
+                reconcile_amo_ids.add(str(instance.tenant_id))
+    manual_tenant_ids.update(_manual_tenants_for_manuals(connection, revision_manual_ids).values())
+    amo_by_manual_tenant = _amo_ids_for_manual_tenants(connection, manual_tenant_ids | reconcile_manual_tenant_ids)
+    amo_ids.update(amo_by_manual_tenant[tenant_id] for tenant_id in manual_tenant_ids if tenant_id in amo_by_manual_tenant)
+
+    if amo_ids:
+        from .knowledge_service import bump_hierarchy_version
+
+        bump_hierarchy_version(connection, amo_ids)
+    pending = session.info.setdefault(_INFO_KEY, set())
+    pending.update(reconcile_amo_ids)
+    pending.update(amo_by_manual_tenant[tenant_id] for tenant_id in reconcile_manual_tenant_ids if tenant_id in amo_by_manual_tenant)
+
+
+@event.listens_for(Session, "before_commit")
+def _reconcile_changed_tenants(session: Session) -> None:
+    pending = session.info.get(_INFO_KEY)
+    if not pending:
+        return
+    from .knowledge_service import reconcile_documentation_hierarchy
+
+    # Reconciliation flushes node rows; those only stamp versions, so this
+    # loop drains rather than re-queueing itself.
+    while pending:
+        amo_id = pending.pop()
+        manual_tenant = session.query(manual_models.Tenant).filter(manual_models.Tenant.amo_id == amo_id).first()
+        if manual_tenant is None:
+            continue
+        try:
+            with session.begin_nested():
+                reconcile_documentation_hierarchy(session, manual_tenant=manual_tenant)
+        except Exception:
+            logger.warning("Documentation hierarchy reconcile failed for tenant %s", amo_id, exc_info=True)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_INFO_KEY, None)
+
+
+__all__ = []
@@ -1,62 +1,66 @@
 from __future__ import annotations
 
 import hashlib
-from collections.abc import Iterable
+import logging
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
 from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from amodb.apps.manuals import models as manual_models
-from amodb.database import WriteSessionLocal
+from amodb.database import WriteSessionLocal, close_session_safely
 
 from . import knowledge_models as km
 from .knowledge_service import (
-    CODE_CANDIDATE,
     INDEX_VERSION,
+    ReferenceResolution,
     _aliases_by_manual,
     _context,
-    _target_relationship,
-    _target_revision,
-    normalize_code,
+    _reference_occurrences,
     reconcile_documentation_hierarchy,
     serialize_index_job,
     utcnow,
 )
+from .reference_shards import extract_shards, plan_shards, shard_pages
 
+logger = logging.getLogger(__name__)
 
-def _source_type(revision: manual_models.ManualRevision) -> str:
-    return str(getattr(revision.source_type_enum, "value", revision.source_type_enum or "")).upper()
+UPSERT_BATCH_SIZE = 1000
+# Columns an upsert refreshes on an existing occurrence; identity, creation and
+# verification fields are left alone.
+REFRESHED_COLUMNS = (
+    "source_manual_id",
+    "source_section_id",
+    "source_block_id",
+    "source_page_number",
+    "source_char_start",
+    "source_char_end",
+    "source_bbox_json",
+    "source_quote",
+    "source_context",
+    "source_change_hash",
+    "raw_token",
+    "normalized_token",
+    "relationship_type",
+    "resolution_policy",
+    "target_manual_id",
+    "target_revision_id",
+    "target_section_id",
+    "status",
+    "confidence_percent",
+    "detection_method",
+    "candidates_json",
+    "last_checked_at",
+    "updated_at",
+)
 
 
-def _reference_occurrences(
-    text: str,
-    *,
-    alias_patterns,
-    normalized_map,
-    source_manual_id: str,
-) -> list[tuple[int, int, str, str, list[manual_models.Manual], str]]:
-    matched_spans: list[tuple[int, int]] = []
-    occurrences: list[tuple[int, int, str, str, list[manual_models.Manual], str]] = []
-    for pattern, _alias, normalized in alias_patterns:
-        targets = normalized_map.get(normalized, [])
-        for match in pattern.finditer(text):
-            if any(match.start() < end and match.end() > start for start, end in matched_spans):
-                continue
-            if len(targets) == 1 and targets[0].id == source_manual_id:
-                continue
-            matched_spans.append((match.start(), match.end()))
-            occurrences.append((match.start(), match.end(), match.group(1), normalized, targets, "TEXT_ALIAS"))
-    for match in CODE_CANDIDATE.finditer(text):
-        if any(match.start() < end and match.end() > start for start, end in matched_spans):
-            continue
-        normalized = normalize_code(match.group(1))
-        targets = normalized_map.get(normalized, [])
-        if len(targets) == 1 and targets[0].id == source_manual_id:
-            continue
-        matched_spans.append((match.start(), match.end()))
-        occurrences.append((match.start(), match.end(), match.group(1), normalized, targets, "CODE_CANDIDATE"))
-    return occurrences
+def _source_type(revision: manual_models.ManualRevision) -> str:
+    return str(getattr(revision.source_type_enum, "value", revision.source_type_enum or "")).upper()
 
 
 def _page_sections(sections: Iterable[manual_models.ManualSection]) -> dict[int, manual_models.ManualSection]:
@@ -72,28 +76,6 @@ def _page_sections(sections: Iterable[manual_models.ManualSection]) -> dict[int,
     return result
 
 
-def _page_bbox(page, raw_token: str) -> dict:
-    try:
-        rects = page.search_for(raw_token, quads=False)
-        if not rects:
-            compact = " ".join(raw_token.split())
-            rects = page.search_for(compact, quads=False) if compact != raw_token else []
-        if not rects:
-            return {}
-        rect = rects[0]
-        page_rect = page.rect
-        if not page_rect.width or not page_rect.height:
-            return {}
-        return {
-            "x": round(rect.x0 / page_rect.width, 6),
-            "y": round(rect.y0 / page_rect.height, 6),
-            "width": round(rect.width / page_rect.width, 6),
-            "height": round(rect.height / page_rect.height, 6),
-        }
-    except Exception:
-        return {}
-
-
 def _status_for(targets: list[manual_models.Manual], target_revision) -> tuple[str, int]:
     if len(targets) > 1:
         return "AMBIGUOUS", 55
@@ -109,6 +91,8 @@ def _write_occurrence(
     *,
     existing: dict[str, km.DocumentationReference],
     seen: set[str],
+    pending: list[dict],
+    resolution: ReferenceResolution,
     tenant_id: str,
     source_manual: manual_models.Manual,
     source_revision: manual_models.ManualRevision,
@@ -124,33 +108,69 @@ def _write_occurrence(
     targets: list[manual_models.Manual],
     detection_method: str,
     bbox: dict,
+    source_context: str | None = None,
 ) -> str | None:
+    """Resolve one occurrence and queue it for the bulk upsert.
+
+    ``existing`` only holds controller-verified rows; those stay ORM-managed so
+    their resolution can be preserved. Everything else is appended to
+    ``pending`` as a row for ``_upsert_references``. ``source_context`` is
+    passed instead of ``source_text`` when the context was cut by a PDF shard.
+    """
     occurrence_key = hashlib.sha256(
         f"{source_revision.id}:{source_page_number or 0}:{source_block_id or '-'}:{start}:{end}:{normalized}".encode()
     ).hexdigest()
     if occurrence_key in seen:
         return None
     seen.add(occurrence_key)
+    if source_context is None:
+        source_context = _context(source_text, start, end)
     target_manual = targets[0] if len(targets) == 1 else None
-    target_revision = _target_revision(db, target_manual) if target_manual else None
+    target_revision = resolution.target_revision(target_manual)
     status, confidence = _status_for(targets, target_revision)
     if detection_method == "CODE_CANDIDATE" and status == "AUTO_RESOLVED":
         confidence = 90
+    candidates = [
+        {"manual_id": candidate.id, "code": candidate.code, "title": candidate.title}
+        for candidate in targets[:10]
+    ]
     row = existing.get(occurrence_key)
-    if row and row.status == "OUTDATED" and row.verified_by_user_id:
-        status = "VERIFIED"
-        confidence = 100
     if not row:
-        row = km.DocumentationReference(
-            tenant_id=tenant_id,
-            source_manual_id=source_manual.id,
-            source_revision_id=source_revision.id,
-            occurrence_key=occurrence_key,
-            source_quote=raw_token,
-            raw_token=raw_token,
-            normalized_token=normalized,
+        now = utcnow()
+        pending.append(
+            {
+                "tenant_id": tenant_id,
+                "source_revision_id": source_revision.id,
+                "occurrence_key": occurrence_key,
+                "source_manual_id": source_manual.id,
+                "source_section_id": source_section_id,
+                "source_block_id": source_block_id,
+                "source_page_number": source_page_number,
+                "source_char_start": start,
+                "source_char_end": end,
+                "source_bbox_json": bbox,
+                "source_quote": raw_token,
+                "source_context": source_context,
+                "source_change_hash": source_change_hash,
+                "raw_token": raw_token,
+                "normalized_token": normalized,
+                "relationship_type": resolution.relationship(target_manual.id if target_manual else None),
+                "resolution_policy": "CURRENT_EFFECTIVE",
+                "target_manual_id": target_manual.id if target_manual else None,
+                "target_revision_id": target_revision.id if target_revision else None,
+                "target_section_id": None,
+                "status": status,
+                "confidence_percent": confidence,
+                "detection_method": detection_method,
+                "candidates_json": candidates,
+                "last_checked_at": now,
+                "updated_at": now,
+            }
         )
-        db.add(row)
+        return status
+    if row.status == "OUTDATED" and row.verified_by_user_id:
+        status = "VERIFIED"
+        confidence = 100
     row.source_section_id = source_section_id
     row.source_block_id = source_block_id
     row.source_page_number = source_page_number
@@ -158,37 +178,142 @@ def _write_occurrence(
     row.source_char_end = end
     row.source_bbox_json = bbox
     row.source_quote = raw_token
-    row.source_context = _context(source_text, start, end)
+    row.source_context = source_context
     row.source_change_hash = source_change_hash
     row.raw_token = raw_token
     row.normalized_token = normalized
-    row.relationship_type = _target_relationship(db, tenant_id, target_manual.id if target_manual else None)
+    row.relationship_type = resolution.relationship(target_manual.id if target_manual else None)
     row.resolution_policy = row.resolution_policy if row.status == "OUTDATED" and row.verified_by_user_id else "CURRENT_EFFECTIVE"
     row.target_manual_id = target_manual.id if target_manual else row.target_manual_id if row.verified_by_user_id else None
     row.target_revision_id = target_revision.id if target_revision else row.target_revision_id if row.verified_by_user_id else None
     row.status = status
     row.confidence_percent = confidence
     row.detection_method = detection_method
-    row.candidates_json = [
-        {"manual_id": candidate.id, "code": candidate.code, "title": candidate.title}
-        for candidate in targets[:10]
-    ]
+    row.candidates_json = candidates
     row.last_checked_at = utcnow()
     return status
 
 
+def _upsert_references(db: Session, rows: list[dict]) -> None:
+    """Insert or refresh occurrences keyed by ``(tenant_id, source_revision_id, occurrence_key)``."""
+    if not rows:
+        return
+    table = km.DocumentationReference.__table__
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.tenant_id, table.c.source_revision_id, table.c.occurrence_key],
+        set_={name: statement.excluded[name] for name in REFRESHED_COLUMNS},
+    )
+    for offset in range(0, len(rows), UPSERT_BATCH_SIZE):
+        db.execute(statement, rows[offset:offset + UPSERT_BATCH_SIZE])
+
+
+def _checkpoint_key(source_revision: manual_models.ManualRevision, matcher, pages_per_shard: int) -> str:
+    return hashlib.sha256(
+        f"{INDEX_VERSION}:{source_revision.source_sha256 or '-'}:{matcher.key}:{pages_per_shard}".encode()
+    ).hexdigest()
+
+
+class _ShardCheckpoints:
+    """Shard results for one job, committed as they complete.
+
+    The job row stays locked by the claiming transaction until every reference
+    is written, so checkpoints go through their own short write sessions:
+    they survive a crash or rollback and the next claim resumes from them.
+    """
+
+    def __init__(self, job_id: str, key: str) -> None:
+        self.job_id = job_id
+        self.key = key
+        self.enabled = True
+
+    def _write(self, apply) -> None:
+        if not self.enabled:
+            return
+        db = WriteSessionLocal()
+        try:
+            apply(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Checkpointing only shortens a retry; indexing carries on without it.
+            self.enabled = False
+            logger.warning("Disabled index shard checkpoints for job %s", self.job_id, exc_info=True)
+        finally:
+            close_session_safely(db)
+
+    def load(self, db: Session) -> dict[int, dict]:
+        shard = km.DocumentationIndexShard
+        self._write(
+            lambda session: session.query(shard)
+            .filter(shard.job_id == self.job_id, shard.checkpoint_key != self.key)
+            .delete(synchronize_session=False)
+        )
+        return {
+            row.shard_index: {"searchable_text": bool(row.searchable_text), "pages": list(row.occurrences_json or [])}
+            for row in db.query(shard).filter(shard.job_id == self.job_id, shard.checkpoint_key == self.key).all()
+        }
+
+    def save(self, shard_index: int, first_page: int, last_page: int, page_count: int, payload: dict) -> None:
+        self._write(
+            lambda session: session.add(
+                km.DocumentationIndexShard(
+                    job_id=self.job_id,
+                    checkpoint_key=self.key,
+                    shard_index=shard_index,
+                    first_page=first_page,
+                    last_page=last_page,
+                    page_count=page_count,
+                    searchable_text=payload["searchable_text"],
+                    occurrences_json=payload["pages"],
+                )
+            )
+        )
+
+
+def _merged_shards(
+    shards: list[tuple[int, int]],
+    completed: dict[int, dict],
+    extracted: Iterator[tuple[int, dict]],
+) -> Iterator[tuple[int, dict, bool]]:
+    """``(shard_index, payload, from_checkpoint)`` in page order.
+
+    ``extracted`` yields the shards missing from ``completed`` in order, so the
+    two streams interleave without buffering.
+    """
+    for shard_index in range(len(shards)):
+        if shard_index in completed:
+            yield shard_index, completed[shard_index], True
+            continue
+        extracted_index, payload = next(extracted)
+        if extracted_index != shard_index:
+            raise RuntimeError("Index shards were returned out of order")
+        yield shard_index, payload, False
+
+
 def _index_pdf(
     db: Session,
     *,
+    job: km.DocumentationIndexJob,
+    checkpoint: bool,
     source_manual: manual_models.Manual,
     source_revision: manual_models.ManualRevision,
     tenant_id: str,
     sections: list[manual_models.ManualSection],
-    alias_patterns,
+    matcher,
     normalized_map,
+    resolution: ReferenceResolution,
     existing: dict[str, km.DocumentationReference],
     seen: set[str],
+    pending: list[dict],
 ) -> tuple[dict[str, int], bool]:
+    """Index a PDF in page-range shards, extracted across the shard process pool.
+
+    Shards are merged strictly in page order, so occurrences, counts and
+    de-duplication match a serial walk. With ``checkpoint`` each finished shard
+    is committed and a retried job skips the shards it already has.
+    """
     path_value = str(source_revision.source_storage_path or "")
     path = Path(path_value).resolve() if path_value else None
     if not path or not path.exists() or path.suffix.lower() != ".pdf":
@@ -197,53 +322,69 @@ def _index_pdf(
         import fitz  # type: ignore
     except ImportError as exc:
         raise RuntimeError("PyMuPDF is required for exact PDF reference indexing") from exc
+    with fitz.open(path) as document:
+        page_count = document.page_count
+    pages_per_shard = shard_pages()
+    shards = plan_shards(page_count, pages_per_shard)
+    checkpoints = _ShardCheckpoints(job.id, _checkpoint_key(source_revision, matcher, pages_per_shard)) if checkpoint else None
+    completed = checkpoints.load(db) if checkpoints else {}
+    job.pages_total = page_count
+    job.pages_indexed = 0
+    extracted = extract_shards(
+        path,
+        [(shard_index, pages) for shard_index, pages in enumerate(shards) if shard_index not in completed],
+        matcher=matcher,
+        normalized_map=normalized_map,
+        source_manual_id=source_manual.id,
+    )
+
     counts = {"detected": 0, "resolved": 0, "unresolved": 0, "broken": 0}
     searchable_text = False
     page_section = _page_sections(sections)
-    with fitz.open(path) as document:
-        for page_index in range(document.page_count):
-            page_number = page_index + 1
-            page = document.load_page(page_index)
-            text = str(page.get_text("text") or "")
-            if not text.strip():
-                continue
-            searchable_text = True
-            section = page_section.get(page_number)
-            for start, end, raw_token, normalized, targets, method in _reference_occurrences(
-                text,
-                alias_patterns=alias_patterns,
-                normalized_map=normalized_map,
-                source_manual_id=source_manual.id,
-            ):
-                status = _write_occurrence(
-                    db,
-                    existing=existing,
-                    seen=seen,
-                    tenant_id=tenant_id,
-                    source_manual=source_manual,
-                    source_revision=source_revision,
-                    source_section_id=section.id if section else None,
-                    source_block_id=None,
-                    source_page_number=page_number,
-                    source_change_hash=source_revision.source_sha256,
-                    source_text=text,
-                    start=start,
-                    end=end,
-                    raw_token=raw_token,
-                    normalized=normalized,
-                    targets=targets,
-                    detection_method=method,
-                    bbox=_page_bbox(page, raw_token),
-                )
-                if not status:
-                    continue
-                counts["detected"] += 1
-                if status in {"AUTO_RESOLVED", "VERIFIED"}:
-                    counts["resolved"] += 1
-                elif status == "BROKEN":
-                    counts["broken"] += 1
-                else:
-                    counts["unresolved"] += 1
+    try:
+        for shard_index, payload, from_checkpoint in _merged_shards(shards, completed, extracted):
+            first_page, last_page = shards[shard_index]
+            if checkpoints and not from_checkpoint:
+                checkpoints.save(shard_index, first_page, last_page, page_count, payload)
+            searchable_text = searchable_text or payload["searchable_text"]
+            for page_number, occurrences in payload["pages"]:
+                section = page_section.get(page_number)
+                for start, end, raw_token, normalized, method, context, bbox in occurrences:
+                    status = _write_occurrence(
+                        db,
+                        existing=existing,
+                        seen=seen,
+                        pending=pending,
+                        resolution=resolution,
+                        tenant_id=tenant_id,
+                        source_manual=source_manual,
+                        source_revision=source_revision,
+                        source_section_id=section.id if section else None,
+                        source_block_id=None,
+                        source_page_number=page_number,
+                        source_change_hash=source_revision.source_sha256,
+                        source_text="",
+                        source_context=context,
+                        start=start,
+                        end=end,
+                        raw_token=raw_token,
+                        normalized=normalized,
+                        targets=normalized_map.get(normalized, []),
+                        detection_method=method,
+                        bbox=bbox,
+                    )
+                    if not status:
+                        continue
+                    counts["detected"] += 1
+                    if status in {"AUTO_RESOLVED", "VERIFIED"}:
+                        counts["resolved"] += 1
+                    elif status == "BROKEN":
+                        counts["broken"] += 1
+                    else:
+                        counts["unresolved"] += 1
+            job.pages_indexed = last_page
+    finally:
+        extracted.close()
     return counts, searchable_text
 
 
@@ -254,10 +395,12 @@ def _index_structured_blocks(
     source_revision: manual_models.ManualRevision,
     tenant_id: str,
     sections: list[manual_models.ManualSection],
-    alias_patterns,
+    matcher,
     normalized_map,
+    resolution: ReferenceResolution,
     existing: dict[str, km.DocumentationReference],
     seen: set[str],
+    pending: list[dict],
 ) -> dict[str, int]:
     section_map = {section.id: section for section in sections}
     blocks = (
@@ -275,7 +418,7 @@ def _index_structured_blocks(
         page_number = int((section.metadata_json or {}).get("page_start") or 0) or None if section else None
         for start, end, raw_token, normalized, targets, method in _reference_occurrences(
             text,
-            alias_patterns=alias_patterns,
+            matcher=matcher,
             normalized_map=normalized_map,
             source_manual_id=source_manual.id,
         ):
@@ -283,6 +426,8 @@ def _index_structured_blocks(
                 db,
                 existing=existing,
                 seen=seen,
+                pending=pending,
+                resolution=resolution,
                 tenant_id=tenant_id,
                 source_manual=source_manual,
                 source_revision=source_revision,
@@ -311,7 +456,13 @@ def _index_structured_blocks(
     return counts
 
 
-def index_revision_references(db: Session, *, revision_id: str) -> dict:
+def index_revision_references(db: Session, *, revision_id: str, checkpoint: bool = False) -> dict:
+    """Index one revision's references inside the caller's transaction.
+
+    ``checkpoint`` commits finished PDF shards separately so a retry resumes
+    from them; it needs the job row to be committed already, which is the case
+    for claimed background jobs.
+    """
     revision = db.query(manual_models.ManualRevision).filter(manual_models.ManualRevision.id == revision_id).first()
     if not revision:
         raise HTTPException(status_code=404, detail="Revision not found for reference indexing")
@@ -342,18 +493,31 @@ def index_revision_references(db: Session, *, revision_id: str) -> dict:
     db.flush()
 
     try:
-        normalized_map, alias_patterns = _aliases_by_manual(db, manual_tenant)
+        normalized_map, matcher = _aliases_by_manual(db, manual_tenant)
+        resolution = ReferenceResolution.load(db, manual_tenant)
+        reference = km.DocumentationReference
+        # Verified rows keep their controller resolution and are updated through
+        # the ORM; every other previous occurrence is refreshed by the upsert or
+        # deleted below if this run no longer finds it.
         existing = {
             row.occurrence_key: row
-            for row in db.query(km.DocumentationReference)
-            .filter(km.DocumentationReference.source_revision_id == revision.id)
+            for row in db.query(reference)
+            .filter(
+                reference.source_revision_id == revision.id,
+                or_(
+                    reference.status == "VERIFIED",
+                    and_(reference.status == "OUTDATED", reference.verified_by_user_id.isnot(None)),
+                ),
+            )
             .all()
         }
         for row in existing.values():
-            if row.status == "VERIFIED":
-                row.status = "OUTDATED"
-            else:
-                db.delete(row)
+            row.status = "OUTDATED"
+        previous = dict(
+            db.query(reference.occurrence_key, reference.id)
+            .filter(reference.source_revision_id == revision.id)
+            .all()
+        )
         db.flush()
         sections = (
             db.query(manual_models.ManualSection)
@@ -362,18 +526,23 @@ def index_revision_references(db: Session, *, revision_id: str) -> dict:
             .all()
         )
         seen: set[str] = set()
+        pending: list[dict] = []
         warning = None
         if _source_type(revision) == "PDF":
             counts, searchable_text = _index_pdf(
                 db,
+                job=job,
+                checkpoint=checkpoint,
                 source_manual=manual,
                 source_revision=revision,
                 tenant_id=tenant_id,
                 sections=sections,
-                alias_patterns=alias_patterns,
+                matcher=matcher,
                 normalized_map=normalized_map,
+                resolution=resolution,
                 existing=existing,
                 seen=seen,
+                pending=pending,
             )
             if not searchable_text:
                 warning = "The PDF contains no searchable text. Controlled OCR indexing is required before textual references can be detected."
@@ -384,14 +553,21 @@ def index_revision_references(db: Session, *, revision_id: str) -> dict:
                 source_revision=revision,
                 tenant_id=tenant_id,
                 sections=sections,
-                alias_patterns=alias_patterns,
+                matcher=matcher,
                 normalized_map=normalized_map,
+                resolution=resolution,
                 existing=existing,
                 seen=seen,
+                pending=pending,
             )
+        _upsert_references(db, pending)
+        stale = [row_id for key, row_id in previous.items() if key not in seen and key not in existing]
+        for offset in range(0, len(stale), UPSERT_BATCH_SIZE):
+            db.query(reference).filter(reference.id.in_(stale[offset:offset + UPSERT_BATCH_SIZE])).delete(synchronize_session=False)
         for row in existing.values():
             if row.status == "OUTDATED" and row.occurrence_key not in seen:
                 counts["unresolved"] += 1
+        db.query(km.DocumentationIndexShard).filter(km.DocumentationIndexShard.job_id == job.id).delete(synchronize_session=False)
         job.status = "COMPLETED_WITH_WARNINGS" if warning else "COMPLETED"
         job.detected_count = counts["detected"]
         job.resolved_count = counts["resolved"]
@@ -418,7 +594,9 @@ def index_revision_background(revision_id: str) -> None:
                 km.DocumentationIndexJob.revision_id == revision_id,
                 km.DocumentationIndexJob.status == "PENDING",
             )
-            .with_for_update(skip_locked=True)
+            # FOR NO KEY UPDATE, so shard checkpoints (which reference the job)
+            # can be committed from other sessions while the claim is held.
+            .with_for_update(skip_locked=True, key_share=True)
             .first()
         )
         if claim is None:
@@ -431,7 +609,7 @@ def index_revision_background(revision_id: str) -> None:
         # process exits, PostgreSQL restores PENDING automatically; another
         # worker can then claim the revision without overlapping a live indexer.
         db.flush()
-        index_revision_references(db, revision_id=revision_id)
+        index_revision_references(db, revision_id=revision_id, checkpoint=True)
         db.commit()
     except Exception as exc:
         db.rollback()
@@ -32,6 +32,7 @@ class DocumentationNode(Base):
         Index("ix_documentation_nodes_tenant_parent_order", "tenant_id", "parent_id", "order_index"),
         Index("ix_documentation_nodes_tenant_type", "tenant_id", "node_type"),
         Index("ix_documentation_nodes_tenant_path", "tenant_id", "path"),
+        Index("ix_documentation_nodes_tenant_path_prefix", "tenant_id", "path", postgresql_ops={"path": "varchar_pattern_ops"}),
     )
 
     id = Column(String(36), primary_key=True, default=_uuid)
@@ -155,12 +156,55 @@ class DocumentationIndexJob(Base):
     unresolved_count = Column(Integer, nullable=False, default=0)
     broken_count = Column(Integer, nullable=False, default=0)
     error_summary = Column(Text, nullable=True)
+    pages_total = Column(Integer, nullable=True)
+    pages_indexed = Column(Integer, nullable=False, default=0)
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
     updated_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow)
 
 
+class DocumentationIndexShard(Base):
+    """Checkpointed extraction result for one page range of a PDF index job.
+
+    Rows are committed as each shard finishes, outside the job's own
+    transaction, so an interrupted job resumes from them. They are only reused
+    while ``checkpoint_key`` (index version, source checksum, alias set and
+    shard size) matches and are removed with the job's reference writes.
+    """
+
+    __tablename__ = "documentation_index_shards"
+    __table_args__ = (
+        UniqueConstraint("job_id", "shard_index", name="uq_documentation_index_shard"),
+    )
+
+    id = Column(String(36), primary_key=True, default=_uuid)
+    job_id = Column(String(36), ForeignKey("documentation_index_jobs.id", ondelete="CASCADE"), nullable=False)
+    checkpoint_key = Column(String(64), nullable=False)
+    shard_index = Column(Integer, nullable=False)
+    first_page = Column(Integer, nullable=False)
+    last_page = Column(Integer, nullable=False)
+    page_count = Column(Integer, nullable=False)
+    searchable_text = Column(Boolean, nullable=False, default=False)
+    occurrences_json = Column(JSONB, nullable=False, default=list)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
+
+
+class DocumentationHierarchyVersion(Base):
+    """Change stamp for a tenant's serialized hierarchy.
+
+    Bumped in the same transaction as any node, manual, revision or profile
+    change, so every API process can key its cached tree (and the tree's ETag)
+    on it without reconciling or re-serializing on read.
+    """
+
+    __tablename__ = "documentation_hierarchy_versions"
+
+    tenant_id = Column(String(36), ForeignKey("amos.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow)
+
+
 class DocumentationRecord(Base):
     """Immutable output created from an executable controlled template."""
 
@@ -6,6 +6,7 @@ from __future__ import annotations
 
 from . import knowledge_hardening as _knowledge_hardening  # noqa: F401
 from . import knowledge_hierarchy_identity as _knowledge_hierarchy_identity  # noqa: F401
+from . import knowledge_hierarchy_sync as _knowledge_hierarchy_sync  # noqa: F401
 from . import knowledge_path_integrity as _knowledge_path_integrity  # noqa: F401
 from . import knowledge_signature_guard as _knowledge_signature_guard  # noqa: F401
 from . import knowledge_artifact_transactions as _knowledge_artifact_transactions  # noqa: F401
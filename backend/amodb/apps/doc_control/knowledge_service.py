@@ -5,24 +5,30 @@ import json
 import os
 import re
 import uuid
+from bisect import bisect_right
 from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 from typing import Iterable
 
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import String, func, literal, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, object_session
 
+from amodb import tenant_cache
 from amodb.apps.accounts import models as account_models
 from amodb.apps.manuals import models as manual_models
 from amodb.database import WriteSessionLocal
 
 from . import domain_models
 from . import knowledge_models as km
+from .reference_matcher import AcceptedSpans, ReferenceMatcher, reference_matcher
 from .workspace_service import can_read_manual, get_profile
 
 
 INDEX_VERSION = 1
+_HIERARCHY_CACHE = tenant_cache.namespace("doc_control.hierarchy", ttl_seconds=900, max_entries=256)
 RECORD_ROOT = Path(os.getenv("DOCUMENT_RECORD_DIR", "uploads/documentation-records")).resolve()
 CODE_CANDIDATE = re.compile(r"(?<![A-Za-z0-9])([A-Z]{2,10}(?:[\s./_-]*\d{1,6})(?:[\s./_-]+[A-Z0-9]{1,10})?)(?![A-Za-z0-9])")
 
@@ -187,7 +193,7 @@ def _ensure_node(
         row.node_type = node_type
         if row.parent_id != (parent.id if parent else None):
             row.parent_id = parent.id if parent else None
-            row.path, row.depth = _node_path(parent, row.id, row.code)
+            update_subtree_paths(db, row, parent)
         if metadata:
             row.metadata_json = {**dict(row.metadata_json or {}), **metadata}
     return row
@@ -363,46 +369,137 @@ def validate_hierarchy_move(
         raise HTTPException(status_code=409, detail="Controlled content nodes must be linked to a document register record")
 
 
-def update_subtree_paths(db: Session, node: km.DocumentationNode, parent: km.DocumentationNode | None) -> None:
+def lock_hierarchy(db: Session, tenant_id: str) -> None:
+    """Serialize structural changes to one tenant's hierarchy until commit."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(
+        text("SELECT pg_advisory_xact_lock(hashtextextended(:lock_key, 0))"),
+        {"lock_key": f"doc-control-hierarchy:{tenant_id}"},
+    )
+
+
+def update_subtree_paths(db: Session, node: km.DocumentationNode, parent: km.DocumentationNode | None) -> int:
+    """Re-root ``node`` under ``parent``; descendants move in one UPDATE.
+
+    Returns the number of descendant rows rewritten.
+    """
     old_path = node.path
     new_path, depth = _node_path(parent, node.id, node.code)
     depth_delta = depth - int(node.depth or 0)
+    if new_path == old_path and not depth_delta:
+        return 0
+    lock_hierarchy(db, str(node.tenant_id))
+    old_prefix = f"{old_path.rstrip('/')}/"
+    new_prefix = f"{new_path.rstrip('/')}/"
+    path_column = km.DocumentationNode.path
+    moved = db.execute(
+        update(km.DocumentationNode)
+        .where(
+            km.DocumentationNode.tenant_id == node.tenant_id,
+            path_column.startswith(old_prefix, autoescape=True),
+        )
+        .values(
+            path=literal(new_prefix, String) + func.substr(path_column, len(old_prefix) + 1, type_=String),
+            depth=km.DocumentationNode.depth + depth_delta,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
     node.path = new_path
     node.depth = depth
-    descendants = (
-        db.query(km.DocumentationNode)
-        .filter(km.DocumentationNode.tenant_id == node.tenant_id, km.DocumentationNode.path.like(f"{old_path.rstrip('/')}%"), km.DocumentationNode.id != node.id)
+    # Descendants already in the session now hold stale coordinates; reload
+    # them on next access rather than trusting the identity map.
+    for instance in list(db.identity_map.values()):
+        if isinstance(instance, km.DocumentationNode) and instance is not node and str(instance.__dict__.get("path") or "").startswith(old_prefix):
+            db.expire(instance, ["path", "depth", "updated_at"])
+    bump_hierarchy_version(db.connection(), [str(node.tenant_id)])
+    return int(moved or 0)
+
+
+def latest_revisions(db: Session, manual_ids: Iterable[str]) -> dict[str, manual_models.ManualRevision]:
+    """Newest revision per manual, in one query."""
+    ids = sorted({str(manual_id) for manual_id in manual_ids if manual_id})
+    if not ids:
+        return {}
+    query = db.query(manual_models.ManualRevision).filter(manual_models.ManualRevision.manual_id.in_(ids))
+    ordering = (
+        manual_models.ManualRevision.manual_id.asc(),
+        manual_models.ManualRevision.created_at.desc(),
+        manual_models.ManualRevision.id.desc(),
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.distinct(manual_models.ManualRevision.manual_id)
+    latest: dict[str, manual_models.ManualRevision] = {}
+    for revision in query.order_by(*ordering).all():
+        latest.setdefault(str(revision.manual_id), revision)
+    return latest
+
+
+def reference_health(db: Session, tenant_id: str) -> dict[str, int]:
+    return {
+        str(status): int(count)
+        for status, count in db.query(km.DocumentationReference.status, func.count(km.DocumentationReference.id))
+        .filter(km.DocumentationReference.tenant_id == tenant_id)
+        .group_by(km.DocumentationReference.status)
         .all()
+    }
+
+
+def hierarchy_version(db: Session, tenant_id: str) -> int | None:
+    """The tenant's hierarchy change stamp, or ``None`` where it is not maintained."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    version = (
+        db.query(km.DocumentationHierarchyVersion.version)
+        .filter(km.DocumentationHierarchyVersion.tenant_id == tenant_id)
+        .scalar()
+    )
+    return int(version or 0)
+
+
+def bump_hierarchy_version(connection, tenant_ids: Iterable[str]) -> None:
+    """Advance the change stamp for ``tenant_ids`` inside the caller's transaction.
+
+    Writers that bypass the ORM unit of work (bulk updates, raw SQL) call this
+    themselves; ORM changes are stamped by ``knowledge_hierarchy_sync``.
+    """
+    rows = [{"tenant_id": str(tenant_id), "version": 1, "updated_at": datetime.utcnow()} for tenant_id in sorted(set(tenant_ids)) if tenant_id]
+    if not rows or connection.dialect.name != "postgresql":
+        return
+    table = km.DocumentationHierarchyVersion.__table__
+    statement = pg_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.tenant_id],
+        set_={"version": table.c.version + 1, "updated_at": statement.excluded.updated_at},
     )
-    for child in descendants:
-        child.path = f"{new_path}{child.path[len(old_path):]}"
-        child.depth = max(0, int(child.depth or 0) + depth_delta)
+    connection.execute(statement, rows)
 
 
-def hierarchy_payload(
-    db: Session,
-    *,
-    manual_tenant: manual_models.Tenant,
-    actor_id: str | None = None,
-) -> dict:
-    nodes = reconcile_documentation_hierarchy(db, manual_tenant=manual_tenant, actor_id=actor_id)
-    manual_ids = [node.manual_id for node in nodes if node.manual_id]
+def _serialize_hierarchy(db: Session, manual_tenant: manual_models.Tenant) -> dict:
+    tenant_id = str(manual_tenant.amo_id)
+    nodes = (
+        db.query(km.DocumentationNode)
+        .filter(km.DocumentationNode.tenant_id == tenant_id, km.DocumentationNode.status == "ACTIVE")
+        .order_by(km.DocumentationNode.depth.asc(), km.DocumentationNode.order_index.asc(), km.DocumentationNode.title.asc())
+        .all()
+    )
+    manual_ids = {str(node.manual_id) for node in nodes if node.manual_id}
     manuals = {
-        row.id: row
-        for row in db.query(manual_models.Manual).filter(manual_models.Manual.id.in_(manual_ids or ["-"])).all()
+        str(row.id): row
+        for row in db.query(manual_models.Manual)
+        .filter(manual_models.Manual.tenant_id == manual_tenant.id, manual_models.Manual.id.in_(manual_ids or {"-"}))
+        .all()
     }
     profiles = {
-        row.manual_id: row
-        for row in db.query(km.DocumentationExecutionProfile).filter(km.DocumentationExecutionProfile.tenant_id == manual_tenant.amo_id).all()
+        str(row.manual_id): row
+        for row in db.query(km.DocumentationExecutionProfile).filter(km.DocumentationExecutionProfile.tenant_id == tenant_id).all()
     }
-    counts = defaultdict(int)
-    for row in db.query(km.DocumentationReference.status).filter(km.DocumentationReference.tenant_id == manual_tenant.amo_id).all():
-        counts[str(row[0])] += 1
+    latest_by_manual = latest_revisions(db, manuals)
     items: list[dict] = []
     for node in nodes:
-        manual = manuals.get(node.manual_id)
-        execution = profiles.get(node.manual_id)
-        latest = _latest_revision(db, manual.id) if manual else None
+        manual = manuals.get(str(node.manual_id)) if node.manual_id else None
+        execution = profiles.get(str(node.manual_id)) if node.manual_id else None
+        latest = latest_by_manual.get(str(manual.id)) if manual else None
         items.append({
             "id": node.id,
             "parent_id": node.parent_id,
@@ -425,11 +522,50 @@ def hierarchy_payload(
             } if manual else None,
             "execution": serialize_execution_profile(execution) if execution else None,
         })
+    digest = hashlib.sha256(json.dumps(items, sort_keys=True, default=str).encode("utf-8")).hexdigest()
     return {
         "tenant_id": manual_tenant.amo_id,
         "root_id": next((node.id for node in nodes if node.node_type == "ROOT"), None),
         "items": items,
-        "reference_health": dict(counts),
+        "digest": digest[:32],
+    }
+
+
+def hierarchy_snapshot(db: Session, manual_tenant: manual_models.Tenant) -> dict:
+    """Serialized persisted hierarchy (no reconciliation), frozen.
+
+    On PostgreSQL the tree is cached per tenant and change stamp, so repeated
+    reads cost one primary-key lookup until the next hierarchy change.
+    """
+    tenant_id = str(manual_tenant.amo_id)
+    version = hierarchy_version(db, tenant_id)
+    if version is None:
+        return tenant_cache.freeze(_serialize_hierarchy(db, manual_tenant))
+    return _HIERARCHY_CACHE.get_or_load(
+        (str(manual_tenant.id), version),
+        lambda: _serialize_hierarchy(db, manual_tenant),
+        tenant_id=tenant_id,
+    )
+
+
+def hierarchy_payload(
+    db: Session,
+    *,
+    manual_tenant: manual_models.Tenant,
+    actor_id: str | None = None,
+) -> dict:
+    """Hierarchy as persisted, with live reference health.
+
+    Reconciliation runs when manuals, revisions or profiles change (see
+    ``knowledge_hierarchy_sync``) or on an explicit reconcile request, never
+    on read. ``actor_id`` is accepted for existing callers and unused.
+    """
+    snapshot = hierarchy_snapshot(db, manual_tenant)
+    return {
+        "tenant_id": snapshot["tenant_id"],
+        "root_id": snapshot["root_id"],
+        "items": snapshot["items"],
+        "reference_health": reference_health(db, str(manual_tenant.amo_id)),
     }
 
 
@@ -455,14 +591,14 @@ def serialize_execution_profile(row: km.DocumentationExecutionProfile | None) ->
     }
 
 
-def _aliases_by_manual(db: Session, manual_tenant: manual_models.Tenant) -> tuple[dict[str, list[manual_models.Manual]], list[tuple[re.Pattern[str], str, str]]]:
+def _aliases_by_manual(db: Session, manual_tenant: manual_models.Tenant) -> tuple[dict[str, list[manual_models.Manual]], ReferenceMatcher]:
     manuals = _query_manuals(db, manual_tenant)
     nodes = {
         row.manual_id: row
         for row in db.query(km.DocumentationNode).filter(km.DocumentationNode.tenant_id == manual_tenant.amo_id, km.DocumentationNode.manual_id.isnot(None)).all()
     }
     normalized_map: dict[str, list[manual_models.Manual]] = defaultdict(list)
-    patterns: list[tuple[re.Pattern[str], str, str]] = []
+    entries: list[tuple[str, str, str]] = []
     seen_patterns: set[tuple[str, str]] = set()
     for manual in manuals:
         node = nodes.get(manual.id)
@@ -478,64 +614,183 @@ def _aliases_by_manual(db: Session, manual_tenant: manual_models.Tenant) -> tupl
             if pattern_key in seen_patterns:
                 continue
             seen_patterns.add(pattern_key)
-            parts = re.split(r"([\s./_-]+)", alias)
-            expression = "".join(r"[\s./_-]+" if re.fullmatch(r"[\s./_-]+", part or "") else re.escape(part) for part in parts if part)
-            patterns.append((re.compile(rf"(?<![A-Za-z0-9])({expression})(?![A-Za-z0-9])", re.IGNORECASE), alias, normalized))
-    patterns.sort(key=lambda item: len(item[1]), reverse=True)
-    return normalized_map, patterns
+            entries.append((manual.id, alias, normalized))
+    return normalized_map, reference_matcher(str(manual_tenant.amo_id), entries)
 
 
-def _target_revision(db: Session, manual: manual_models.Manual) -> manual_models.ManualRevision | None:
-    if not manual.current_published_rev_id:
-        return None
-    return (
-        db.query(manual_models.ManualRevision)
-        .filter(
-            manual_models.ManualRevision.id == manual.current_published_rev_id,
-            manual_models.ManualRevision.manual_id == manual.id,
-            manual_models.ManualRevision.status_enum == manual_models.ManualRevisionStatus.PUBLISHED,
-        )
-        .first()
-    )
+def _reference_occurrences(
+    text: str,
+    *,
+    matcher: ReferenceMatcher,
+    normalized_map: dict[str, list[manual_models.Manual]],
+    source_manual_id: str,
+) -> list[tuple[int, int, str, str, list[manual_models.Manual], str]]:
+    """Alias matches (longest alias first) followed by bare code candidates.
+
+    Matches overlapping an accepted span and references a manual makes to
+    itself are skipped.
+    """
+    accepted = AcceptedSpans()
+    occurrences: list[tuple[int, int, str, str, list[manual_models.Manual], str]] = []
+    for pattern, _alias, normalized in matcher.candidates(text):
+        targets = normalized_map.get(normalized, [])
+        for match in pattern.finditer(text):
+            if accepted.overlaps(match.start(), match.end()):
+                continue
+            if len(targets) == 1 and targets[0].id == source_manual_id:
+                continue
+            accepted.add(match.start(), match.end())
+            occurrences.append((match.start(), match.end(), match.group(1), normalized, targets, "TEXT_ALIAS"))
+    for match in CODE_CANDIDATE.finditer(text):
+        if accepted.overlaps(match.start(), match.end()):
+            continue
+        normalized = normalize_code(match.group(1))
+        targets = normalized_map.get(normalized, [])
+        if len(targets) == 1 and targets[0].id == source_manual_id:
+            continue
+        accepted.add(match.start(), match.end())
+        occurrences.append((match.start(), match.end(), match.group(1), normalized, targets, "CODE_CANDIDATE"))
+    return occurrences
+
+
+RELATIONSHIP_BY_NODE_TYPE = {"FORM": "USES_FORM", "CHECKLIST": "USES_CHECKLIST", "REGISTER": "UPDATES_REGISTER"}
+
+
+class ReferenceResolution:
+    """Published target revisions and relationship types for one tenant, loaded once per index job.
+
+    Two queries cover every manual in the tenant, so resolving an occurrence
+    never touches the database.
+    """
+
+    __slots__ = ("revisions", "relationships")
+
+    def __init__(self, revisions: dict[str, manual_models.ManualRevision], relationships: dict[str, str]) -> None:
+        self.revisions = revisions
+        self.relationships = relationships
+
+    @classmethod
+    def load(cls, db: Session, manual_tenant: manual_models.Tenant) -> "ReferenceResolution":
+        revisions = {
+            revision.manual_id: revision
+            for revision in db.query(manual_models.ManualRevision)
+            .join(
+                manual_models.Manual,
+                (manual_models.Manual.id == manual_models.ManualRevision.manual_id)
+                & (manual_models.Manual.current_published_rev_id == manual_models.ManualRevision.id),
+            )
+            .filter(
+                manual_models.Manual.tenant_id == manual_tenant.id,
+                manual_models.ManualRevision.status_enum == manual_models.ManualRevisionStatus.PUBLISHED,
+            )
+            .all()
+        }
+        relationships: dict[str, str] = {}
+        for manual_id, node_type in (
+            db.query(km.DocumentationNode.manual_id, km.DocumentationNode.node_type)
+            .filter(km.DocumentationNode.tenant_id == manual_tenant.amo_id, km.DocumentationNode.manual_id.isnot(None))
+            .all()
+        ):
+            relationships.setdefault(manual_id, RELATIONSHIP_BY_NODE_TYPE.get(node_type, "REFERENCES"))
+        return cls(revisions, relationships)
 
+    def target_revision(self, manual: manual_models.Manual | None) -> manual_models.ManualRevision | None:
+        return self.revisions.get(manual.id) if manual and manual.current_published_rev_id else None
 
-def _target_relationship(db: Session, tenant_id: str, manual_id: str | None) -> str:
-    if not manual_id:
-        return "REFERENCES"
-    node = (
-        db.query(km.DocumentationNode)
-        .filter(km.DocumentationNode.tenant_id == tenant_id, km.DocumentationNode.manual_id == manual_id)
-        .first()
-    )
-    if not node:
-        return "REFERENCES"
-    return {"FORM": "USES_FORM", "CHECKLIST": "USES_CHECKLIST", "REGISTER": "UPDATES_REGISTER"}.get(node.node_type, "REFERENCES")
+    def relationship(self, manual_id: str | None) -> str:
+        return self.relationships.get(manual_id, "REFERENCES") if manual_id else "REFERENCES"
 
 
-def _context(text: str, start: int, end: int) -> str:
-    return text[max(0, start - 110):min(len(text), end + 160)].strip()
+class PageGeometry:
+    """Word boxes of one PDF page for locating many tokens without ``page.search_for``.
 
+    Words are joined with single spaces and lower-cased once; a token is found
+    with ``str.find`` and its box is the union of the matched words on the
+    first line, trimmed proportionally when the token covers part of a word.
+    Like ``search_for(...)[0]`` the first hit wins and line wraps keep only the
+    first line's rectangle.
+    """
 
-def _bbox_for_occurrence(document, page_number: int | None, raw_token: str) -> dict:
-    if not document or not page_number or page_number < 1 or page_number > document.page_count:
-        return {}
-    try:
-        page = document.load_page(page_number - 1)
-        rects = page.search_for(raw_token, quads=False)
-        if not rects:
+    __slots__ = ("_text", "_starts", "_words", "_width", "_height", "_boxes")
+
+    def __init__(self, words: Iterable[tuple], width: float, height: float) -> None:
+        parts: list[str] = []
+        self._starts: list[int] = []
+        self._words: list[tuple[int, float, float, float, float, tuple[int, int]]] = []
+        offset = 0
+        for x0, y0, x1, y1, word, block_no, line_no, *_rest in words:
+            lowered = str(word).lower()
+            if not lowered:
+                continue
+            if parts:
+                offset += 1
+            self._starts.append(offset)
+            self._words.append((len(lowered), float(x0), float(y0), float(x1), float(y1), (block_no, line_no)))
+            parts.append(lowered)
+            offset += len(lowered)
+        self._text = " ".join(parts)
+        self._width = float(width or 0)
+        self._height = float(height or 0)
+        self._boxes: dict[str, dict] = {}
+
+    @classmethod
+    def from_page(cls, page) -> "PageGeometry":
+        try:
+            return cls(page.get_text("words"), page.rect.width, page.rect.height)
+        except Exception:
+            return cls((), 0, 0)
+
+    def bbox(self, raw_token: str) -> dict:
+        needle = " ".join(str(raw_token or "").split()).lower()
+        if not needle or not self._width or not self._height:
             return {}
-        rect = rects[0]
-        page_rect = page.rect
-        if not page_rect.width or not page_rect.height:
+        if needle not in self._boxes:
+            self._boxes[needle] = self._locate(needle)
+        return dict(self._boxes[needle])
+
+    def _locate(self, needle: str) -> dict:
+        position = self._text.find(needle)
+        if position < 0:
             return {}
+        end = position + len(needle)
+        first = bisect_right(self._starts, position) - 1
+        line = self._words[first][5]
+        x0 = y0 = x1 = y1 = None
+        index = first
+        while index < len(self._words) and self._starts[index] < end and self._words[index][5] == line:
+            length, word_x0, word_y0, word_x1, word_y1, _line = self._words[index]
+            start = self._starts[index]
+            per_char = (word_x1 - word_x0) / length
+            left = word_x0 + per_char * max(position - start, 0)
+            right = word_x0 + per_char * min(end - start, length)
+            x0 = left if x0 is None else min(x0, left)
+            x1 = right if x1 is None else max(x1, right)
+            y0 = word_y0 if y0 is None else min(y0, word_y0)
+            y1 = word_y1 if y1 is None else max(y1, word_y1)
+            index += 1
         return {
-            "x": round(rect.x0 / page_rect.width, 6),
-            "y": round(rect.y0 / page_rect.height, 6),
-            "width": round(rect.width / page_rect.width, 6),
-            "height": round(rect.height / page_rect.height, 6),
+            "x": round(x0 / self._width, 6),
+            "y": round(y0 / self._height, 6),
+            "width": round((x1 - x0) / self._width, 6),
+            "height": round((y1 - y0) / self._height, 6),
         }
-    except Exception:
+
+
+def _context(text: str, start: int, end: int) -> str:
+    return text[max(0, start - 110):min(len(text), end + 160)].strip()
+
+
+def _bbox_for_occurrence(document, page_number: int | None, raw_token: str, pages: dict[int, PageGeometry]) -> dict:
+    if not document or not page_number or page_number < 1 or page_number > document.page_count:
         return {}
+    geometry = pages.get(page_number)
+    if geometry is None:
+        try:
+            page = document.load_page(page_number - 1)
+        except Exception:
+            return {}
+        geometry = pages[page_number] = PageGeometry.from_page(page)
+    return geometry.bbox(raw_token)
 
 
 def _source_pdf(revision: manual_models.ManualRevision):
@@ -579,7 +834,8 @@ def index_revision_references(db: Session, *, revision_id: str) -> dict:
     db.flush()
 
     try:
-        normalized_map, alias_patterns = _aliases_by_manual(db, manual_tenant)
+        normalized_map, matcher = _aliases_by_manual(db, manual_tenant)
+        resolution = ReferenceResolution.load(db, manual_tenant)
         execution_profiles = {
             row.manual_id: row
             for row in db.query(km.DocumentationExecutionProfile).filter(km.DocumentationExecutionProfile.tenant_id == tenant_id).all()
@@ -609,6 +865,7 @@ def index_revision_references(db: Session, *, revision_id: str) -> dict:
             .all()
         )
         pdf_document = _source_pdf(revision)
+        pdf_pages: dict[int, PageGeometry] = {}
         seen_occurrences: set[str] = set()
         detected = resolved = unresolved = broken = 0
 
@@ -618,33 +875,14 @@ def index_revision_references(db: Session, *, revision_id: str) -> dict:
                 continue
             section = section_map.get(block.section_id)
             page_number = int((section.metadata_json or {}).get("page_start") or 0) or None if section else None
-            matched_spans: list[tuple[int, int]] = []
-            occurrences: list[tuple[int, int, str, str, list[manual_models.Manual], str]] = []
-            for pattern, _alias, normalized in alias_patterns:
-                targets = normalized_map.get(normalized, [])
-                for match in pattern.finditer(text):
-                    if any(match.start() < end and match.end() > start for start, end in matched_spans):
-                        continue
-                    if len(targets) == 1 and targets[0].id == manual.id:
-                        continue
-                    matched_spans.append((match.start(), match.end()))
-                    occurrences.append((match.start(), match.end(), match.group(1), normalized, targets, "TEXT_ALIAS"))
-            for match in CODE_CANDIDATE.finditer(text):
-                if any(match.start() < end and match.end() > start for start, end in matched_spans):
-                    continue
-                normalized = normalize_code(match.group(1))
-                targets = normalized_map.get(normalized, [])
-                if len(targets) == 1 and targets[0].id == manual.id:
-                    continue
-                occurrences.append((match.start(), match.end(), match.group(1), normalized, targets, "CODE_CANDIDATE"))
-
+            occurrences = _reference_occurrences(text, matcher=matcher, normalized_map=normalized_map, source_manual_id=manual.id)
             for start, end, raw_token, normalized, targets, detection_method in occurrences:
                 occurrence_key = hashlib.sha256(f"{revision.id}:{block.id}:{page_number}:{start}:{end}:{normalized}".encode()).hexdigest()
                 if occurrence_key in seen_occurrences:
                     continue
                 seen_occurrences.add(occurrence_key)
                 target_manual = targets[0] if len(targets) == 1 else None
-                target_revision = _target_revision(db, target_manual) if target_manual else None
+                target_revision = resolution.target_revision(target_manual)
                 if len(targets) > 1:
                     status, confidence = "AMBIGUOUS", 55
                 elif target_manual and target_revision:
@@ -672,13 +910,13 @@ def index_revision_references(db: Session, *, revision_id: str) -> dict:
                 row.source_page_number = page_number
                 row.source_char_start = start
                 row.source_char_end = end
-                row.source_bbox_json = _bbox_for_occurrence(pdf_document, page_number, raw_token)
+                row.source_bbox_json = _bbox_for_occurrence(pdf_document, page_number, raw_token, pdf_pages)
                 row.source_quote = raw_token
                 row.source_context = _context(text, start, end)
                 row.source_change_hash = block.change_hash
                 row.raw_token = raw_token
                 row.normalized_token = normalized
-                row.relationship_type = _target_relationship(db, tenant_id, target_manual.id if target_manual else None)
+                row.relationship_type = resolution.relationship(target_manual.id if target_manual else None)
                 row.resolution_policy = "CURRENT_EFFECTIVE"
                 row.target_manual_id = target_manual.id if target_manual else None
                 row.target_revision_id = target_revision.id if target_revision else None
@@ -723,9 +961,24 @@ def index_revision_background(revision_id: str) -> None:
         db.close()
 
 
+def _index_job_progress(row: km.DocumentationIndexJob) -> tuple[int | None, int]:
+    """Pages total and indexed; a running job reports its committed shard checkpoints."""
+    db = object_session(row)
+    if row.status != "RUNNING" or db is None:
+        return row.pages_total, int(row.pages_indexed or 0)
+    shard = km.DocumentationIndexShard
+    page_count, pages_indexed = (
+        db.query(func.max(shard.page_count), func.sum(shard.last_page - shard.first_page + 1))
+        .filter(shard.job_id == row.id)
+        .one()
+    )
+    return page_count or row.pages_total, int(pages_indexed or row.pages_indexed or 0)
+
+
 def serialize_index_job(row: km.DocumentationIndexJob | None) -> dict | None:
     if not row:
         return None
+    pages_total, pages_indexed = _index_job_progress(row)
     return {
         "id": row.id,
         "manual_id": row.manual_id,
@@ -737,6 +990,8 @@ def serialize_index_job(row: km.DocumentationIndexJob | None) -> dict | None:
         "resolved_count": row.resolved_count,
         "unresolved_count": row.unresolved_count,
         "broken_count": row.broken_count,
+        "pages_total": pages_total,
+        "pages_indexed": pages_indexed,
         "error_summary": row.error_summary,
         "started_at": row.started_at.isoformat() if row.started_at else None,
         "completed_at": row.completed_at.isoformat() if row.completed_at else None,
@@ -9,8 +9,10 @@ from datetime import datetime, timedelta, timezone
 
 from amodb.database import WriteSessionLocal, close_session_safely
 
+from . import knowledge_hierarchy_sync as _knowledge_hierarchy_sync  # noqa: F401
 from . import knowledge_models as km
 from .knowledge_indexer import index_revision_background
+from .reference_shards import enable_process_pool, shutdown_pool
 
 
 def _utcnow() -> datetime:
@@ -75,12 +77,16 @@ def main() -> None:
     parser.add_argument("--poll-seconds", type=float, default=float(os.getenv("DOCUMENT_INDEX_WORKER_POLL_SECONDS", "2")))
     args = parser.parse_args()
     logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
-    while True:
-        result = run_once(limit=args.limit)
-        if args.once:
-            return
-        if not any(result.values()):
-            time.sleep(max(0.5, min(args.poll_seconds, 30.0)))
+    enable_process_pool()
+    try:
+        while True:
+            result = run_once(limit=args.limit)
+            if args.once:
+                return
+            if not any(result.values()):
+                time.sleep(max(0.5, min(args.poll_seconds, 30.0)))
+    finally:
+        shutdown_pool()
 
 
 if __name__ == "__main__":
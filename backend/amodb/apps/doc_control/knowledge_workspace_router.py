@@ -19,6 +19,7 @@ from .knowledge_service import (
     hierarchy_payload,
     index_revision_background,
     index_revision_references,
+    lock_hierarchy,
     normalize_code,
     reconcile_documentation_hierarchy,
     serialize_execution_profile,
@@ -26,6 +27,7 @@ from .knowledge_service import (
     update_subtree_paths,
     validate_hierarchy_move,
 )
+from .reference_matcher import invalidate_reference_matchers
 from .workspace_service import is_control_user, require_control_user, resolve_tenant
 
 
@@ -97,8 +99,7 @@ def get_knowledge_tree(
     current_user: account_models.User = Depends(get_current_active_user),
 ):
     tenant = resolve_tenant(db, tenant_slug, current_user)
-    payload = hierarchy_payload(db, manual_tenant=tenant, actor_id=current_user.id if is_control_user(current_user) else None)
-    db.commit()
+    payload = hierarchy_payload(db, manual_tenant=tenant)
     payload["capabilities"] = {"read": True, "control": is_control_user(current_user)}
     return payload
 
@@ -138,6 +139,9 @@ def update_knowledge_node(
 ):
     require_control_user(current_user)
     tenant = resolve_tenant(db, tenant_slug, current_user)
+    # Hold the tree lock from validation to commit so two concurrent moves
+    # cannot each pass the cycle check against the other's stale paths.
+    lock_hierarchy(db, str(tenant.amo_id))
     row = db.query(km.DocumentationNode).filter(
         km.DocumentationNode.id == node_id,
         km.DocumentationNode.tenant_id == tenant.amo_id,
@@ -181,6 +185,7 @@ def update_knowledge_node(
         diff={"before": previous, "after": {"parent_id": row.parent_id, "node_type": row.node_type, "code": row.code, "title": row.title, "path": row.path}},
     )
     db.commit()
+    invalidate_reference_matchers(str(tenant.amo_id))
     return hierarchy_payload(db, manual_tenant=tenant, actor_id=current_user.id)
 
 
@@ -2,21 +2,27 @@ from __future__ import annotations
 
 import argparse
 import hashlib
+import io
 import json
 import os
 import re
 import subprocess
 import sys
 import tempfile
+import threading
 import unicodedata
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any, Callable
 
+from . import pdfium_worker_pool
 
 MAX_PDF_BYTES = int(os.getenv("PDFIUM_MAX_INPUT_BYTES", str(100 * 1024 * 1024)))
 MAX_PDF_PAGES = int(os.getenv("PDFIUM_MAX_PAGES", "5000"))
 PROCESS_TIMEOUT_SECONDS = int(os.getenv("PDFIUM_PROCESS_TIMEOUT_SECONDS", "90"))
+# 0 runs every job in a fresh one-shot subprocess, as before the worker pool.
+WORKER_POOL_SIZE = max(0, min(int(os.getenv("PDFIUM_WORKER_POOL_SIZE", "2")), 16))
+WORKER_MAX_JOBS = max(1, int(os.getenv("PDFIUM_WORKER_MAX_JOBS", "50")))
 WORK_ROOT = Path(os.getenv("PDFIUM_WORK_DIR", "uploads/pdfium-work")).resolve()
 
 _PDF_NAME_ESCAPE = re.compile(r"#([0-9A-Fa-f]{2})")
@@ -92,13 +98,14 @@ def _sha256(content: bytes) -> str:
     return hashlib.sha256(content).hexdigest()
 
 
-def _validate_input(content: bytes) -> None:
+def _validate_input(content: bytes, *, max_bytes: int | None = None) -> None:
+    max_bytes = MAX_PDF_BYTES if max_bytes is None else max_bytes
     if not content or not content.startswith(b"%PDF"):
         raise PdfEngineError("PDF_INVALID", "A valid PDF working copy is required")
-    if len(content) > MAX_PDF_BYTES:
+    if len(content) > max_bytes:
         raise PdfEngineError(
             "PDF_TOO_LARGE",
-            f"PDF input exceeds the {MAX_PDF_BYTES // (1024 * 1024)} MB processing limit",
+            f"PDF input exceeds the {max_bytes // (1024 * 1024)} MB processing limit",
             status_code=413,
         )
 
@@ -673,6 +680,10 @@ def _read_worker_metadata(path: Path) -> dict[str, Any]:
         payload = json.loads(path.read_text(encoding="utf-8"))
     except Exception as exc:
         raise PdfEngineError("PDF_WORKER_FAILED", "PDFium did not return a valid processing result", status_code=500) from exc
+    return _worker_metadata(payload)
+
+
+def _worker_metadata(payload: Any) -> dict[str, Any]:
     if not isinstance(payload, dict):
         raise PdfEngineError("PDF_WORKER_FAILED", "PDFium returned an invalid processing result", status_code=500)
     if payload.get("error"):
@@ -685,8 +696,7 @@ def _read_worker_metadata(path: Path) -> dict[str, Any]:
     return payload
 
 
-def _run_worker(action: str, content: bytes) -> tuple[dict[str, Any], bytes | None]:
-    _validate_input(content)
+def _run_worker_once(action: str, content: bytes) -> tuple[dict[str, Any], bytes | None]:
     root = _safe_work_root()
     with tempfile.TemporaryDirectory(prefix="pdfium-", dir=root) as raw_dir:
         work_dir = Path(raw_dir).resolve()
@@ -734,6 +744,69 @@ def _run_worker(action: str, content: bytes) -> tuple[dict[str, Any], bytes | No
         return metadata, output
 
 
+_POOL: pdfium_worker_pool.SandboxWorkerPool | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def _worker_pool() -> pdfium_worker_pool.SandboxWorkerPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = pdfium_worker_pool.SandboxWorkerPool(
+                "amodb.apps.doc_control.pdfium_service",
+                size=WORKER_POOL_SIZE,
+                max_jobs=WORKER_MAX_JOBS,
+            )
+        return _POOL
+
+
+def start_worker_pool() -> None:
+    """Pre-start the PDFium workers so the first request does not pay for them."""
+    if WORKER_POOL_SIZE and os.getenv("PDFIUM_WORKER_PREWARM", "true").lower() in {"1", "true", "yes", "on"}:
+        threading.Thread(target=_worker_pool().warm, name="pdfium-pool-warm", daemon=True).start()
+
+
+def stop_worker_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.close()
+
+
+def worker_pool_stats() -> dict[str, Any]:
+    with _POOL_LOCK:
+        pool = _POOL
+    if pool is None:
+        return {"size": WORKER_POOL_SIZE, "live": 0, "idle": 0, "busy": 0, "waiting": 0}
+    return pool.stats()
+
+
+def _run_worker(action: str, content: bytes) -> tuple[dict[str, Any], bytes | None]:
+    _validate_input(content)
+    # Fail closed before any worker sees the document if the sandbox work
+    # directory is unavailable, as the one-shot path always has.
+    _safe_work_root()
+    if not WORKER_POOL_SIZE:
+        return _run_worker_once(action, content)
+    try:
+        payload, output = _worker_pool().run(
+            action,
+            content,
+            timeout=PROCESS_TIMEOUT_SECONDS,
+            limits={"max_bytes": MAX_PDF_BYTES, "max_pages": MAX_PDF_PAGES},
+        )
+    except pdfium_worker_pool.SandboxWorkerError as exc:
+        if exc.timed_out:
+            raise PdfEngineError(
+                "PDF_PROCESS_TIMEOUT",
+                f"PDF processing exceeded {PROCESS_TIMEOUT_SECONDS} seconds",
+                status_code=504,
+            ) from exc
+        raise PdfEngineError("PDF_WORKER_FAILED", str(exc), status_code=500) from exc
+    return _worker_metadata(payload), output or None
+
+
 def inspect_pdf_bytes(content: bytes) -> PdfInspection:
     metadata, _ = _run_worker("inspect", content)
     return PdfInspection(**metadata)
@@ -754,11 +827,25 @@ def _pdfium_engine_version(pdfium: Any) -> str:
 
 
 def _worker_process(action: str, source_path: Path, output_path: Path) -> dict[str, Any]:
+    metadata, output = _process_pdf(action, source_path.read_bytes())
+    if output is not None:
+        output_path.write_bytes(output)
+    return metadata
+
+
+def _process_pdf(
+    action: str,
+    content: bytes,
+    *,
+    max_bytes: int | None = None,
+    max_pages: int | None = None,
+) -> tuple[dict[str, Any], bytes | None]:
+    """Inspect or flatten ``content`` in this (worker) process; returns metadata and output bytes."""
     import pypdfium2 as pdfium
     import pypdfium2.raw as pdfium_c
 
-    content = source_path.read_bytes()
-    _validate_input(content)
+    max_pages = MAX_PDF_PAGES if max_pages is None else max_pages
+    _validate_input(content, max_bytes=max_bytes)
     has_actions, encrypted, template_fingerprint = _parsed_pdf_profile(content)
     source_sha256 = _sha256(content)
     if has_actions:
@@ -769,7 +856,7 @@ def _worker_process(action: str, source_path: Path, output_path: Path) -> dict[s
         )
 
     try:
-        document = pdfium.PdfDocument(source_path)
+        document = pdfium.PdfDocument(content)
     except Exception as exc:
         raise PdfEngineError("PDF_INVALID", "PDFium could not open this PDF") from exc
 
@@ -777,10 +864,10 @@ def _worker_process(action: str, source_path: Path, output_path: Path) -> dict[s
         page_count = len(document)
         if page_count < 1:
             raise PdfEngineError("PDF_EMPTY", "The PDF contains no pages")
-        if page_count > MAX_PDF_PAGES:
+        if page_count > max_pages:
             raise PdfEngineError(
                 "PDF_PAGE_LIMIT",
-                f"PDF contains {page_count} pages; the processing limit is {MAX_PDF_PAGES}",
+                f"PDF contains {page_count} pages; the processing limit is {max_pages}",
                 status_code=413,
             )
         form_type = int(document.get_formtype())
@@ -808,7 +895,7 @@ def _worker_process(action: str, source_path: Path, output_path: Path) -> dict[s
                 "can_flatten": not dynamic_xfa and not has_actions,
                 "unsupported_reason": unsupported_reason,
                 "template_fingerprint": template_fingerprint,
-            }
+            }, None
         if dynamic_xfa:
             raise PdfEngineError("PDF_DYNAMIC_XFA", unsupported_reason or "Dynamic XFA is unsupported", status_code=409)
         if form_type:
@@ -827,15 +914,16 @@ def _worker_process(action: str, source_path: Path, output_path: Path) -> dict[s
                 flattened_pages += 1
             else:
                 unchanged_pages += 1
-        document.save(output_path)
+        buffer = io.BytesIO()
+        document.save(buffer)
     finally:
         document.close()
 
-    output = output_path.read_bytes()
+    output = buffer.getvalue()
     if not output.startswith(b"%PDF"):
         raise PdfEngineError("PDF_FLATTEN_OUTPUT_INVALID", "PDFium produced an invalid flattened PDF")
     try:
-        with pdfium.PdfDocument(output_path) as reopened:
+        with pdfium.PdfDocument(output) as reopened:
             output_pages = len(reopened)
     except Exception as exc:
         raise PdfEngineError("PDF_FLATTEN_REOPEN_FAILED", "The flattened PDF could not be reopened") from exc
@@ -849,7 +937,13 @@ def _worker_process(action: str, source_path: Path, output_path: Path) -> dict[s
         "output_sha256": _sha256(output),
         "flattened_pages": flattened_pages,
         "unchanged_pages": unchanged_pages,
-    }
+    }, output
+
+
+def _error_payload(exc: Exception) -> dict[str, Any]:
+    if isinstance(exc, PdfEngineError):
+        return {"error": {"code": exc.code, "message": exc.message, "status_code": exc.status_code}}
+    return {"error": {"code": "PDF_WORKER_FAILED", "message": str(exc)[:1000], "status_code": 500}}
 
 
 def _worker_main(action: str, source: str, output: str, metadata: str) -> int:
@@ -858,18 +952,33 @@ def _worker_main(action: str, source: str, output: str, metadata: str) -> int:
         payload = _worker_process(action, Path(source).resolve(), Path(output).resolve())
         metadata_path.write_text(json.dumps(payload, sort_keys=True), encoding="utf-8")
         return 0
-    except PdfEngineError as exc:
-        metadata_path.write_text(
-            json.dumps({"error": {"code": exc.code, "message": exc.message, "status_code": exc.status_code}}),
-            encoding="utf-8",
-        )
-        return 2
     except Exception as exc:
-        metadata_path.write_text(
-            json.dumps({"error": {"code": "PDF_WORKER_FAILED", "message": str(exc)[:1000], "status_code": 500}}),
-            encoding="utf-8",
+        metadata_path.write_text(json.dumps(_error_payload(exc)), encoding="utf-8")
+        return 2 if isinstance(exc, PdfEngineError) else 3
+
+
+def _serve_job(header: dict[str, Any], content: bytes) -> tuple[dict[str, Any], bytes | None]:
+    action = str(header.get("action") or "")
+    if action not in {"inspect", "flatten"}:
+        return _error_payload(PdfEngineError("PDF_WORKER_FAILED", f"Unsupported PDF action {action!r}", status_code=500)), None
+    limits = header.get("limits") or {}
+    try:
+        return _process_pdf(
+            action,
+            content,
+            max_bytes=int(limits["max_bytes"]) if limits.get("max_bytes") else None,
+            max_pages=int(limits["max_pages"]) if limits.get("max_pages") else None,
         )
-        return 3
+    except Exception as exc:
+        return _error_payload(exc), None
+
+
+def _warm_worker() -> None:
+    try:
+        import pypdfium2  # noqa: F401
+        import pypdfium2.raw  # noqa: F401
+    except ImportError:
+        pass
 
 
 def _parse_args() -> argparse.Namespace:
@@ -883,6 +992,8 @@ def _parse_args() -> argparse.Namespace:
 
 
 if __name__ == "__main__":
+    if sys.argv[1:] == ["--serve"]:
+        raise SystemExit(pdfium_worker_pool.serve(_serve_job, warm=_warm_worker))
     args = _parse_args()
     if not args.worker:
         raise SystemExit(64)
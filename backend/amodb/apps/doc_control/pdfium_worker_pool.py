@@ -0,0 +1,35 @@
+"""PDF bindings for the sandboxed worker pool in ``amodb.worker_pool``.
+
+Each PDF inspect or flatten call used to start a fresh interpreter, import
+amodb and pypdfium2, and exchange the document through temp files. Workers in
+this pool are started once and handle jobs over framed stdin/stdout pipes;
+the request body carries the PDF bytes and the response body is the output
+PDF, if any. Workers run under ``PDFIUM_WORKER_MEMORY_MB`` and report errors
+as PDF worker failures.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Callable
+
+from amodb import worker_pool
+from amodb.worker_pool import SandboxWorker, SandboxWorkerError, read_frame, write_frame
+
+__all__ = ["SandboxWorker", "SandboxWorkerError", "SandboxWorkerPool", "read_frame", "serve", "write_frame"]
+
+NAME = "PDF"
+
+
+def serve(
+    handler: Callable[[dict[str, Any], bytes], tuple[dict[str, Any], bytes | None]],
+    *,
+    warm: Callable[[], None] | None = None,
+) -> int:
+    """Worker side of ``worker_pool.serve`` under the PDF worker memory limit."""
+    memory_mb = int(os.getenv("PDFIUM_WORKER_MEMORY_MB", "2048") or "0")
+    return worker_pool.serve(handler, warm=warm, memory_mb=memory_mb, name=NAME)
+
+
+class SandboxWorkerPool(worker_pool.SandboxWorkerPool):
+    def __init__(self, module: str, *, size: int, max_jobs: int) -> None:
+        super().__init__(module, size=size, max_jobs=max_jobs, name=NAME)
@@ -0,0 +1,171 @@
+"""Multi-pattern matching of manual aliases in indexed text.
+
+Reference indexing used to run one compiled regex per alias over every page or
+block, which is O(aliases x text) and dominated indexing for tenants with a
+few hundred manuals. ``ReferenceMatcher`` compiles the alias set once:
+
+* every alias keeps its original regex (separator runs become
+  ``[\\s./_-]+``, case-insensitive, alphanumeric word boundaries), so the
+  matches that are reported are exactly the ones the regex loop produced;
+* the separator-free parts of every alias are case-folded and loaded into
+  one Aho-Corasick automaton, so a single pass over the text tells which
+  aliases have all of their parts present. Only those regexes run, in the
+  original longest-alias-first order.
+
+``AcceptedSpans`` replaces the linear "does this overlap anything accepted so
+far" scan with a bisect over the sorted, disjoint accepted spans.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+import hashlib
+import re
+from typing import Iterable
+
+from amodb import tenant_cache
+
+SEPARATOR_RUN = re.compile(r"([\s./_-]+)")
+# ``re.IGNORECASE`` treats dotted and dotless I as ``i``; ``str.casefold`` does not.
+_FOLD_TABLE = str.maketrans({"İ": "i", "ı": "i"})
+
+_MATCHERS = tenant_cache.namespace("doc_control.reference_matchers", ttl_seconds=3600, max_entries=64, freeze_values=False)
+
+
+def fold(value: str) -> str:
+    return value.translate(_FOLD_TABLE).casefold()
+
+
+def alias_pattern(alias: str) -> re.Pattern[str]:
+    parts = SEPARATOR_RUN.split(alias)
+    expression = "".join(r"[\s./_-]+" if re.fullmatch(r"[\s./_-]+", part or "") else re.escape(part) for part in parts if part)
+    return re.compile(rf"(?<![A-Za-z0-9])({expression})(?![A-Za-z0-9])", re.IGNORECASE)
+
+
+def _anchors(alias: str) -> set[str]:
+    """Folded separator-free ASCII parts of ``alias``; every match contains all of them."""
+    return {fold(part) for part in SEPARATOR_RUN.split(alias) if part and not SEPARATOR_RUN.fullmatch(part) and part.isascii()}
+
+
+class ReferenceMatcher:
+    """Compiled alias set for one tenant; immutable once built and safe to share."""
+
+    __slots__ = ("aliases", "key", "patterns", "_goto", "_fail", "_out", "_anchor_patterns", "_required", "_unanchored")
+
+    def __init__(self, aliases: Iterable[tuple[str, str]], *, key: str = "") -> None:
+        """``aliases`` are ``(alias, normalized)`` pairs in manual order, already de-duplicated.
+
+        ``key`` identifies the alias set (see ``alias_set_key``); it lets
+        index shards running in other processes rebuild and reuse the matcher.
+        """
+        self.aliases: tuple[tuple[str, str], ...] = tuple(aliases)
+        self.key = key or hashlib.sha256(repr(self.aliases).encode()).hexdigest()
+        patterns = [(alias_pattern(alias), alias, normalized) for alias, normalized in self.aliases]
+        patterns.sort(key=lambda item: len(item[1]), reverse=True)
+        self.patterns: list[tuple[re.Pattern[str], str, str]] = patterns
+        self._goto: list[dict[str, int]] = [{}]
+        self._out: list[tuple[int, ...]] = [()]
+        self._anchor_patterns: list[list[int]] = []
+        self._required: list[int] = []
+        anchor_ids: dict[str, int] = {}
+        unanchored: list[int] = []
+        for index, (_pattern, alias, _normalized) in enumerate(patterns):
+            anchors = _anchors(alias)
+            self._required.append(len(anchors))
+            if not anchors:
+                unanchored.append(index)
+            for anchor in anchors:
+                anchor_id = anchor_ids.get(anchor)
+                if anchor_id is None:
+                    anchor_id = anchor_ids[anchor] = len(self._anchor_patterns)
+                    self._anchor_patterns.append([])
+                    self._insert(anchor, anchor_id)
+                self._anchor_patterns[anchor_id].append(index)
+        self._unanchored = tuple(unanchored)
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, following in self._goto[node].items():
+                queue.append(following)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[following] = self._goto[fallback].get(char, 0)
+                self._out[following] += self._out[self._fail[following]]
+
+    def _insert(self, anchor: str, anchor_id: int) -> None:
+        node = 0
+        for char in anchor:
+            following = self._goto[node].get(char)
+            if following is None:
+                following = self._goto[node][char] = len(self._goto)
+                self._goto.append({})
+                self._out.append(())
+            node = following
+        self._out[node] += (anchor_id,)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def candidates(self, text: str) -> list[tuple[re.Pattern[str], str, str]]:
+        """Patterns whose anchors all occur in ``text``, in longest-alias-first order."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[int] = set()
+        node = 0
+        for char in fold(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.update(out[node])
+        hits: dict[int, int] = dict.fromkeys(self._unanchored, 0)
+        for anchor_id in found:
+            for index in self._anchor_patterns[anchor_id]:
+                hits[index] = hits.get(index, 0) + 1
+        required = self._required
+        return [self.patterns[index] for index in sorted(hits) if hits[index] == required[index]]
+
+
+class AcceptedSpans:
+    """Disjoint ``[start, end)`` spans kept sorted for O(log n) overlap checks."""
+
+    __slots__ = ("_starts", "_ends")
+
+    def __init__(self) -> None:
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+
+    def overlaps(self, start: int, end: int) -> bool:
+        index = bisect_left(self._starts, end)
+        return index > 0 and self._ends[index - 1] > start
+
+    def add(self, start: int, end: int) -> None:
+        index = bisect_left(self._starts, start)
+        self._starts.insert(index, start)
+        self._ends.insert(index, end)
+
+
+def alias_set_key(entries: Iterable[tuple[str, str, str]]) -> str:
+    digest = hashlib.sha256()
+    for manual_id, alias, normalized in entries:
+        digest.update(f"{manual_id}\x1f{alias}\x1f{normalized}\x1e".encode())
+    return digest.hexdigest()
+
+
+def reference_matcher(tenant_id: str, entries: list[tuple[str, str, str]]) -> ReferenceMatcher:
+    """Cached matcher for ``(manual_id, alias, normalized)`` entries.
+
+    The key is a hash of the ordered alias set, so a renamed manual code or an
+    edited node alias produces a new matcher without explicit invalidation.
+    """
+    key = alias_set_key(entries)
+    return _MATCHERS.get_or_load(
+        key,
+        lambda: ReferenceMatcher(((alias, normalized) for _manual_id, alias, normalized in entries), key=key),
+        tenant_id=tenant_id,
+    )
+
+
+def invalidate_reference_matchers(tenant_id: str) -> None:
+    _MATCHERS.clear_tenant(tenant_id)
@@ -0,0 +1,213 @@
+"""Page-sharded text extraction and reference matching for PDF indexing.
+
+A PDF revision is split into contiguous page ranges (``plan_shards``). Each
+shard opens the document, extracts page text, runs the tenant's
+``ReferenceMatcher`` and returns plain, JSON-serialisable occurrences:
+
+    {"searchable_text": bool,
+     "pages": [[page_number, [[start, end, raw_token, normalized, method, context, bbox], ...]], ...]}
+
+Shards run on a bounded, long-lived ``spawn`` process pool and are yielded in
+shard order, so the indexer can merge and checkpoint them exactly as if the
+pages had been walked serially. Resolution against targets and all database
+writes stay in the calling process.
+
+Only processes that call ``enable_process_pool`` (the indexing worker, which
+also shuts the pool down) use it. API processes that index inline or on a
+background thread run shards serially, so web workers never hold idle
+interpreters.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+from pathlib import Path
+import threading
+from types import SimpleNamespace
+
+from .knowledge_service import PageGeometry, _context, _reference_occurrences
+from .reference_matcher import ReferenceMatcher
+
+
+def shard_pages() -> int:
+    return max(1, min(int(os.getenv("DOCUMENT_INDEX_SHARD_PAGES", "50")), 1000))
+
+
+_POOL_ENABLED = False
+
+
+def enable_process_pool() -> None:
+    """Let this process shard across ``index_processes()`` worker processes."""
+    global _POOL_ENABLED
+    _POOL_ENABLED = True
+
+
+def index_processes() -> int:
+    if not _POOL_ENABLED:
+        return 1
+    default = min(os.cpu_count() or 1, 8)
+    return max(1, min(int(os.getenv("DOCUMENT_INDEX_PROCESSES", str(default))), 32))
+
+
+def plan_shards(page_count: int, pages_per_shard: int | None = None) -> list[tuple[int, int]]:
+    """Inclusive 1-based ``(first_page, last_page)`` ranges covering the document."""
+    size = pages_per_shard or shard_pages()
+    return [(first, min(first + size - 1, page_count)) for first in range(1, page_count + 1, size)]
+
+
+def extract_pages(document, first_page: int, last_page: int, *, matcher, normalized_map, source_manual_id: str) -> dict:
+    searchable_text = False
+    pages: list[list] = []
+    for page_number in range(first_page, last_page + 1):
+        page = document.load_page(page_number - 1)
+        text = str(page.get_text("text") or "")
+        if not text.strip():
+            continue
+        searchable_text = True
+        geometry: PageGeometry | None = None
+        occurrences = []
+        for start, end, raw_token, normalized, _targets, method in _reference_occurrences(
+            text,
+            matcher=matcher,
+            normalized_map=normalized_map,
+            source_manual_id=source_manual_id,
+        ):
+            if geometry is None:
+                geometry = PageGeometry.from_page(page)
+            occurrences.append([start, end, raw_token, normalized, method, _context(text, start, end), geometry.bbox(raw_token)])
+        if occurrences:
+            pages.append([page_number, occurrences])
+    return {"searchable_text": searchable_text, "pages": pages}
+
+
+# Process-local matchers, so a worker compiles each alias set once.
+_WORKER_MATCHERS: OrderedDict[str, ReferenceMatcher] = OrderedDict()
+
+
+def _extract_shard(
+    path: str,
+    first_page: int,
+    last_page: int,
+    matcher_key: str,
+    aliases: tuple[tuple[str, str], ...],
+    normalized_ids: dict[str, list[str]],
+    source_manual_id: str,
+) -> dict:
+    """Pool entry point; arguments are plain values so they pickle cheaply."""
+    import fitz  # type: ignore
+
+    matcher = _WORKER_MATCHERS.get(matcher_key)
+    if matcher is None:
+        matcher = _WORKER_MATCHERS[matcher_key] = ReferenceMatcher(aliases, key=matcher_key)
+        while len(_WORKER_MATCHERS) > 4:
+            _WORKER_MATCHERS.popitem(last=False)
+    else:
+        _WORKER_MATCHERS.move_to_end(matcher_key)
+    # Only target ids are needed here: they decide self-references. Targets are
+    # resolved again from ``normalized`` by the indexer.
+    normalized_map = {normalized: [SimpleNamespace(id=target_id) for target_id in ids] for normalized, ids in normalized_ids.items()}
+    with fitz.open(path) as document:
+        return extract_pages(
+            document,
+            first_page,
+            last_page,
+            matcher=matcher,
+            normalized_map=normalized_map,
+            source_manual_id=source_manual_id,
+        )
+
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_SIZE = 0
+_POOL_LOCK = threading.Lock()
+
+
+def _pool(processes: int) -> ProcessPoolExecutor:
+    global _POOL, _POOL_SIZE
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_SIZE != processes:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+            _POOL_SIZE = processes
+        return _POOL
+
+
+def shutdown_pool() -> None:
+    global _POOL, _POOL_SIZE
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+        _POOL_SIZE = 0
+
+
+def extract_shards(
+    path: Path,
+    shards: list[tuple[int, tuple[int, int]]],
+    *,
+    matcher: ReferenceMatcher,
+    normalized_map: dict[str, list],
+    source_manual_id: str,
+    processes: int | None = None,
+) -> Iterator[tuple[int, dict]]:
+    """Yield ``(shard_index, payload)`` for ``(shard_index, (first, last))`` in order.
+
+    At most ``2 x processes`` shards are in flight, so results that are waiting
+    for an earlier shard stay bounded. A single shard or a single process runs
+    inline on one open document.
+    """
+    processes = index_processes() if processes is None else max(1, processes)
+    if processes == 1 or len(shards) <= 1:
+        import fitz  # type: ignore
+
+        with fitz.open(path) as document:
+            for shard_index, (first_page, last_page) in shards:
+                yield shard_index, extract_pages(
+                    document,
+                    first_page,
+                    last_page,
+                    matcher=matcher,
+                    normalized_map=normalized_map,
+                    source_manual_id=source_manual_id,
+                )
+        return
+
+    normalized_ids = {normalized: [target.id for target in targets] for normalized, targets in normalized_map.items()}
+    executor = _pool(processes)
+    window: list[tuple[int, Future]] = []
+    remaining = iter(shards)
+    try:
+        while True:
+            while len(window) < processes * 2:
+                item = next(remaining, None)
+                if item is None:
+                    break
+                shard_index, (first_page, last_page) = item
+                window.append((
+                    shard_index,
+                    executor.submit(
+                        _extract_shard,
+                        str(path),
+                        first_page,
+                        last_page,
+                        matcher.key,
+                        matcher.aliases,
+                        normalized_ids,
+                        source_manual_id,
+                    ),
+                ))
+            if not window:
+                return
+            shard_index, future = window.pop(0)
+            yield shard_index, future.result()
+    except BrokenProcessPool:
+        shutdown_pool()
+        raise
+    finally:
+        for _shard_index, future in window:
+            future.cancel()
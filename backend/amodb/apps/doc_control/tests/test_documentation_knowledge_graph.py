@@ -139,3 +139,66 @@ def test_node_connection_reader_is_access_filtered_and_record_scoped() -> None:
     assert "DocumentationRecord.submitted_by_user_id == user.id" in reader
     assert 'records_scope = "ALL" if is_control_user(user) else "OWN"' in reader
     assert "/knowledge/nodes/${encodeURIComponent(nodeId)}/connections" in service
+
+
+def test_only_serialized_columns_advance_the_hierarchy_version() -> None:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from amodb.apps.doc_control.knowledge_hierarchy_sync import _feeds_tree
+
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    manual_models.Base.metadata.create_all(
+        bind=engine,
+        tables=[manual_models.Tenant.__table__, manual_models.Manual.__table__, manual_models.ManualRevision.__table__],
+    )
+    with Session(engine) as db:
+        tenant = manual_models.Tenant(amo_id="amo-1", slug="amo-1", name="AMO 1")
+        db.add(tenant)
+        db.flush()
+        manual = manual_models.Manual(tenant_id=tenant.id, code="MOE", title="MOE", manual_type="MOE", owner_role="QM")
+        db.add(manual)
+        assert _feeds_tree(db, manual)
+        db.flush()
+        revision = manual_models.ManualRevision(manual_id=manual.id, rev_number="1")
+        db.add(revision)
+        db.commit()
+
+        revision.status_enum = manual_models.ManualRevisionStatus.DEPARTMENT_REVIEW
+        revision.source_page_count = 12
+        manual.title = "Exposition"
+        assert not _feeds_tree(db, revision)
+        assert not _feeds_tree(db, manual)
+        revision.rev_number = "2"
+        manual.status = "ARCHIVED"
+        assert _feeds_tree(db, revision)
+        assert _feeds_tree(db, manual)
+
+
+def test_non_postgres_writes_neither_stamp_nor_reconcile(monkeypatch) -> None:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from amodb.apps.doc_control import knowledge_hierarchy_sync, knowledge_service
+
+    calls: list[str] = []
+    monkeypatch.setattr(knowledge_service, "bump_hierarchy_version", lambda *_args: calls.append("stamp"))
+    monkeypatch.setattr(knowledge_service, "reconcile_documentation_hierarchy", lambda *_args, **_kwargs: calls.append("reconcile"))
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    manual_models.Base.metadata.create_all(
+        bind=engine,
+        tables=[manual_models.Tenant.__table__, manual_models.Manual.__table__],
+    )
+    with Session(engine) as db:
+        tenant = manual_models.Tenant(amo_id="amo-1", slug="amo-1", name="AMO 1")
+        db.add(tenant)
+        db.flush()
+        manual = manual_models.Manual(tenant_id=tenant.id, code="MOE", title="MOE", manual_type="MOE", owner_role="QM")
+        db.add(manual)
+        db.flush()
+        assert knowledge_hierarchy_sync._INFO_KEY not in db.info
+        manual.status = "ARCHIVED"
+        db.commit()
+
+    # Outside PostgreSQL the tree only changes through an explicit reconcile.
+    assert calls == []
@@ -7,7 +7,9 @@ from types import SimpleNamespace
 from amodb.apps.doc_control import domain_models
 from amodb.apps.doc_control import governance_models as gm
 from amodb.apps.doc_control import knowledge_models as km
+from amodb.apps.doc_control import knowledge_service
 from amodb.apps.doc_control.knowledge_tree_reader import (
+    read_only_hierarchy,
     read_only_hierarchy_payload,
     read_only_node_connections,
 )
@@ -77,6 +79,9 @@ class _ReadOnlyDb:
             return _FakeQuery(rows=self.records)
         raise AssertionError(f"Unexpected hierarchy query: {entity!r}")
 
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+
     def add(self, _row):
         raise AssertionError("Hierarchy reads must not add rows")
 
@@ -149,6 +154,72 @@ def test_reader_hierarchy_serializes_existing_state_without_reconciliation() ->
     assert payload["reference_health"] == {}
 
 
+def test_reader_hierarchy_etag_tracks_tree_and_visibility() -> None:
+    root = SimpleNamespace(
+        id="root",
+        parent_id=None,
+        node_type="ROOT",
+        code="DOC-ROOT",
+        title="Documented information",
+        path="/doc-root",
+        depth=0,
+        order_index=0,
+        manual_id=None,
+        status="ACTIVE",
+        metadata_json={},
+    )
+    document = SimpleNamespace(**{**vars(root), "id": "node-1", "parent_id": "root", "node_type": "MANUAL", "code": "QAM", "manual_id": "manual-1"})
+    manual = SimpleNamespace(id="manual-1", tenant_id="tenant-db", manual_type="MANUAL", status="ACTIVE", current_published_rev_id=None)
+    revision = SimpleNamespace(id="revision-1", manual_id="manual-1", rev_number="1", source_type_enum=None, created_at=None)
+    tenant = SimpleNamespace(id="tenant-db", amo_id="amo-1")
+    reader = SimpleNamespace(id="reader-1", role="USER", department=None, is_superuser=False, is_amo_admin=False)
+    db = _ReadOnlyDb(nodes=[root, document], manuals=[manual], revision=revision)
+
+    first, etag = read_only_hierarchy(db, manual_tenant=tenant, user=reader)
+    _again, same = read_only_hierarchy(db, manual_tenant=tenant, user=reader)
+    document.title = "Quality Manual (renamed)"
+    _renamed, renamed = read_only_hierarchy(db, manual_tenant=tenant, user=reader)
+
+    assert [item["id"] for item in first["items"]] == ["root", "node-1"]
+    assert etag == same and etag.startswith('W/"')
+    assert renamed != etag
+
+
+def test_latest_revisions_pick_the_newest_revision_per_manual(db_session) -> None:
+    from amodb.apps.accounts.models import AMO
+
+    amo = AMO(amo_code="AMO-TREE", name="Tree", login_slug="tree")
+    db_session.add(amo)
+    db_session.flush()
+    tenant = manual_models.Tenant(amo_id=amo.id, slug="tree", name="Tree", settings_json={})
+    db_session.add(tenant)
+    db_session.flush()
+    manuals = [
+        manual_models.Manual(tenant_id=tenant.id, code=code, title=code, manual_type="MANUAL", owner_role="Doc Control")
+        for code in ("QAM", "MOE", "TPM")
+    ]
+    db_session.add_all(manuals)
+    db_session.flush()
+    for manual, revisions in zip(manuals, (2, 3, 0)):
+        for number in range(1, revisions + 1):
+            db_session.add(
+                manual_models.ManualRevision(
+                    manual_id=manual.id,
+                    rev_number=str(number),
+                    created_at=datetime(2026, 1, number, tzinfo=timezone.utc),
+                )
+            )
+    db_session.commit()
+
+    latest = knowledge_service.latest_revisions(db_session, [manual.id for manual in manuals])
+
+    assert {manual_id: row.rev_number for manual_id, row in latest.items()} == {
+        manuals[0].id: "2",
+        manuals[1].id: "3",
+    }
+    assert knowledge_service.hierarchy_version(db_session, str(amo.id)) is None
+
+
 def test_node_connections_return_reader_lineage_and_submitters_own_records() -> None:
     root = SimpleNamespace(
         id="root",
@@ -329,7 +400,7 @@ def test_node_connections_return_reader_lineage_and_submitters_own_records() ->
 def test_hierarchy_get_routes_do_not_commit_or_reconcile() -> None:
     root = Path(__file__).resolve().parents[5]
     access_router = (root / "backend/amodb/apps/doc_control/knowledge_access_router.py").read_text(encoding="utf-8")
-    assert "read_only_hierarchy_payload" in access_router
+    assert "read_only_hierarchy(" in access_router
     assert "reconcile_documentation_hierarchy" not in access_router
     assert "db.commit()" not in access_router
 
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, select
+
+from amodb.apps.doc_control import knowledge_models as km
+from amodb.apps.doc_control.knowledge_service import update_subtree_paths
+
+TENANT = "00000000-0000-4000-8000-000000000001"
+
+
+class _TreeSession:
+    """Just enough Session for update_subtree_paths, backed by a bare SQLite tree table."""
+
+    def __init__(self, rows: list[dict]) -> None:
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        self.table = Table(
+            "documentation_nodes",
+            MetaData(),
+            Column("id", String, primary_key=True),
+            Column("tenant_id", String, nullable=False),
+            Column("path", String, nullable=False),
+            Column("depth", Integer, nullable=False),
+            Column("updated_at", DateTime),
+        )
+        self.table.metadata.create_all(self.engine)
+        self.conn = self.engine.connect()
+        self.conn.execute(self.table.insert(), rows)
+        self.identity_map: dict = {}
+        self.expired: list[tuple[object, list[str]]] = []
+        self.statements = 0
+
+    def get_bind(self):
+        return self.engine
+
+    def connection(self):
+        return self.conn
+
+    def execute(self, statement, params=None):
+        self.statements += 1
+        return self.conn.execute(statement, params or {})
+
+    def expire(self, instance, attribute_names) -> None:
+        self.expired.append((instance, list(attribute_names)))
+
+    def paths(self) -> dict[str, tuple[str, int]]:
+        return {row.id: (row.path, row.depth) for row in self.conn.execute(select(self.table))}
+
+
+def _row(node_id: str, path: str, depth: int, tenant_id: str = TENANT) -> dict:
+    return {"id": node_id, "tenant_id": tenant_id, "path": path, "depth": depth}
+
+
+def test_subtree_move_rewrites_descendants_in_one_statement() -> None:
+    db = _TreeSession(
+        [
+            _row("root", "/root~r0000000", 0),
+            _row("target", "/root~r0000000/qms~t0000000", 1),
+            _row("folder", "/root~r0000000/q_a~f0000000", 1),
+            _row("child", "/root~r0000000/q_a~f0000000/moe~c0000000", 2),
+            _row("leaf", "/root~r0000000/q_a~f0000000/moe~c0000000/form~l0000000", 3),
+            # LIKE would treat "_" as a wildcard and match this sibling's subtree.
+            _row("lookalike", "/root~r0000000/q-a~f0000000/x~x0000000", 2),
+            _row("other-tenant", "/root~r0000000/q_a~f0000000/moe~c0000000", 2, tenant_id="tenant-2"),
+        ]
+    )
+    folder = km.DocumentationNode(id="f0000000-0000", tenant_id=TENANT, code="Q_A", path="/root~r0000000/q_a~f0000000", depth=1)
+    parent = SimpleNamespace(path="/root~r0000000/qms~t0000000", depth=1)
+    cached_child = km.DocumentationNode(id="c0000000-0000", tenant_id=TENANT, code="MOE", path="/root~r0000000/q_a~f0000000/moe~c0000000", depth=2)
+    db.identity_map = {"folder": folder, "child": cached_child}
+
+    moved = update_subtree_paths(db, folder, parent)
+
+    assert moved == 2
+    assert db.statements == 1
+    assert (folder.path, folder.depth) == ("/root~r0000000/qms~t0000000/q_a~f0000000", 2)
+    paths = db.paths()
+    assert paths["child"] == ("/root~r0000000/qms~t0000000/q_a~f0000000/moe~c0000000", 3)
+    assert paths["leaf"] == ("/root~r0000000/qms~t0000000/q_a~f0000000/moe~c0000000/form~l0000000", 4)
+    assert paths["lookalike"] == ("/root~r0000000/q-a~f0000000/x~x0000000", 2)
+    assert paths["other-tenant"] == ("/root~r0000000/q_a~f0000000/moe~c0000000", 2)
+    assert db.expired == [(cached_child, ["path", "depth", "updated_at"])]
+
+
+def test_unchanged_coordinates_skip_the_subtree_update() -> None:
+    db = _TreeSession([_row("root", "/root~r0000000", 0)])
+    node = km.DocumentationNode(id="r0000000-0000", tenant_id=TENANT, code="ROOT", path="/root~r0000000", depth=0)
+
+    assert update_subtree_paths(db, node, None) == 0
+    assert db.statements == 0
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from amodb.apps.doc_control import pdfium_service as engine
+from amodb.apps.doc_control import pdfium_worker_pool
+
+MODULE = "amodb.apps.doc_control.pdfium_service"
+
+
+def test_frames_round_trip_header_and_body() -> None:
+    stream = io.BytesIO()
+    pdfium_worker_pool.write_frame(stream, {"action": "inspect"}, b"%PDF-1.7")
+    pdfium_worker_pool.write_frame(stream, {"error": None})
+    stream.seek(0)
+
+    assert pdfium_worker_pool.read_frame(stream) == ({"action": "inspect"}, b"%PDF-1.7")
+    assert pdfium_worker_pool.read_frame(stream) == ({"error": None}, b"")
+    assert pdfium_worker_pool.read_frame(stream) is None
+
+
+def test_pool_reuses_warm_workers_and_recycles_after_max_jobs() -> None:
+    pool = pdfium_worker_pool.SandboxWorkerPool(MODULE, size=1, max_jobs=2)
+    try:
+        pool.warm()
+        first = pool._idle[0].process.pid
+        # Unknown actions are answered by the worker without touching PDFium.
+        payload, body = pool.run("unknown", b"%PDF-1.7", timeout=30)
+        assert payload["error"]["code"] == "PDF_WORKER_FAILED"
+        assert body == b""
+        # A 5xx answer retires the worker; the replacement is a new process.
+        payload, _ = pool.run("unknown", b"%PDF-1.7", timeout=30)
+        assert pool._idle == [] or pool._idle[0].process.pid != first
+
+        stats = pool.stats()
+        assert stats["jobs"] == 2
+        assert stats["recycled"] == 2
+        assert stats["queue_wait_ms"]["samples"] == 2
+        assert set(stats["latency_ms"]) == {"unknown"}
+    finally:
+        pool.close()
+
+
+def test_pool_replaces_a_crashed_worker() -> None:
+    pool = pdfium_worker_pool.SandboxWorkerPool(MODULE, size=1, max_jobs=10)
+    try:
+        pool.warm()
+        pool._idle[0].process.kill()
+        pool._idle[0].process.wait()
+
+        payload, _ = pool.run("unknown", b"%PDF-1.7", timeout=30)
+
+        assert payload["error"]["code"] == "PDF_WORKER_FAILED"
+        assert pool.stats()["crashes"] == 1
+    finally:
+        pool.close()
+
+
+def test_pooled_engine_reports_worker_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(engine, "WORKER_POOL_SIZE", 1)
+    monkeypatch.setattr(engine, "_POOL", None)
+    try:
+        with pytest.raises(engine.PdfEngineError) as raised:
+            engine._run_worker("unknown", b"%PDF-1.7")
+        assert raised.value.code == "PDF_WORKER_FAILED"
+        with pytest.raises(engine.PdfEngineError) as raised:
+            engine.inspect_pdf_bytes(b"not a pdf")
+        assert raised.value.code == "PDF_INVALID"
+    finally:
+        engine.stop_worker_pool()
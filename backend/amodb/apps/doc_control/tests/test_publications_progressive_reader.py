@@ -73,6 +73,29 @@ def test_exact_pdf_stream_rejects_invalid_or_multiple_ranges(tmp_path: Path) ->
     assert caught.value.status_code == 416
 
 
+def test_exact_pdf_stream_serves_shared_storage_ranges(monkeypatch) -> None:
+    body = b"%PDF-1.7\n0123456789abcdef"
+    reads: list[tuple[str, int, int]] = []
+
+    def iter_range(uri, start, end, *, expected_sha256=None):
+        reads.append((uri, start, end))
+        yield body[start : end + 1]
+
+    monkeypatch.setattr(reader.storage, "object_size", lambda uri, *, expected_sha256=None: len(body))
+    monkeypatch.setattr(reader.storage, "iter_range", iter_range)
+
+    response = reader._stream_source(
+        "s3://bucket/manuals/approved.pdf",
+        _request("bytes=-6"),
+        filename="approved.pdf",
+        cache_key="checksum-3",
+    )
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes {len(body) - 6}-{len(body) - 1}/{len(body)}"
+    assert reads == [], "bytes are fetched only when the response body is sent"
+
+
 def test_approved_intake_requires_final_pdf_source(tmp_path: Path) -> None:
     docx = tmp_path / "manual.docx"
     docx.write_bytes(b"docx")
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from amodb.apps.doc_control import knowledge_hardening  # noqa: F401
+from amodb.apps.doc_control import knowledge_indexer
+from amodb.apps.doc_control.knowledge_service import PageGeometry, ReferenceResolution
+
+WORDS = [
+    # x0, y0, x1, y1, word, block, line, word number
+    (10.0, 10.0, 40.0, 20.0, "Refer", 0, 0, 0),
+    (45.0, 10.0, 65.0, 20.0, "to", 0, 0, 1),
+    (70.0, 10.0, 100.0, 20.0, "QAM", 0, 0, 2),
+    (105.0, 10.0, 125.0, 20.0, "51", 0, 0, 3),
+    (130.0, 10.0, 180.0, 20.0, "(MOE)", 0, 0, 4),
+    (185.0, 10.0, 235.0, 20.0, "Maintenance", 0, 0, 5),
+    (10.0, 30.0, 60.0, 40.0, "Organisation", 0, 1, 0),
+]
+
+
+def test_page_geometry_locates_tokens_from_word_boxes() -> None:
+    geometry = PageGeometry(WORDS, 200.0, 100.0)
+
+    assert geometry.bbox("qam\n51") == {"x": 0.35, "y": 0.1, "width": 0.275, "height": 0.1}
+    # Partial words are trimmed proportionally to the characters they cover.
+    assert geometry.bbox("MOE") == {"x": 0.7, "y": 0.1, "width": 0.15, "height": 0.1}
+    # A wrapped token keeps only its first line, like ``search_for(...)[0]``.
+    assert geometry.bbox("Maintenance Organisation") == {"x": 0.925, "y": 0.1, "width": 0.25, "height": 0.1}
+    assert geometry.bbox("QWI 9") == {}
+    assert PageGeometry((), 0, 0).bbox("QAM 51") == {}
+
+
+def _occurrence(**overrides) -> dict:
+    values = {
+        "existing": {},
+        "seen": set(),
+        "pending": [],
+        "resolution": ReferenceResolution(
+            {"manual-form": SimpleNamespace(id="revision-form")},
+            {"manual-form": "USES_FORM"},
+        ),
+        "tenant_id": "amo-1",
+        "source_manual": SimpleNamespace(id="manual-source"),
+        "source_revision": SimpleNamespace(id="revision-source"),
+        "source_section_id": "section-1",
+        "source_block_id": None,
+        "source_page_number": 3,
+        "source_change_hash": "sha",
+        "source_text": "Complete QAM 51 before release.",
+        "start": 9,
+        "end": 15,
+        "raw_token": "QAM 51",
+        "normalized": "QAM51",
+        "targets": [SimpleNamespace(id="manual-form", code="QAM 51", title="Release form", current_published_rev_id="revision-form")],
+        "detection_method": "TEXT_ALIAS",
+        "bbox": {"x": 0.1},
+    }
+    values.update(overrides)
+    return values
+
+
+def test_occurrences_are_resolved_in_memory_and_queued_for_upsert() -> None:
+    values = _occurrence()
+
+    # ``db`` is never touched: resolution comes from the per-job context.
+    assert knowledge_indexer._write_occurrence(None, **values) == "AUTO_RESOLVED"
+    assert knowledge_indexer._write_occurrence(None, **values) is None
+
+    (row,) = values["pending"]
+    assert row["target_manual_id"] == "manual-form"
+    assert row["target_revision_id"] == "revision-form"
+    assert row["relationship_type"] == "USES_FORM"
+    assert (row["status"], row["confidence_percent"]) == ("AUTO_RESOLVED", 100)
+    assert row["source_context"] == "Complete QAM 51 before release."
+    assert set(knowledge_indexer.REFRESHED_COLUMNS) <= set(row)
+
+
+def test_verified_occurrences_stay_orm_managed_and_keep_their_resolution() -> None:
+    values = _occurrence()
+    key = knowledge_hardening._occurrence_key(
+        source_revision=values["source_revision"],
+        source_page_number=3,
+        source_block_id=None,
+        start=9,
+        end=15,
+        normalized="QAM51",
+    )
+    verified = SimpleNamespace(
+        status="OUTDATED",
+        verified_by_user_id="controller-1",
+        verified_at=None,
+        relationship_type="REFERENCES",
+        resolution_policy="PINNED_REVISION",
+        target_manual_id="manual-pinned",
+        target_revision_id="revision-pinned",
+        target_section_id="section-pinned",
+    )
+    values["existing"] = {key: verified}
+
+    assert knowledge_indexer._write_occurrence(None, **values) == "VERIFIED"
+    assert values["pending"] == []
+    assert (verified.target_manual_id, verified.target_revision_id) == ("manual-pinned", "revision-pinned")
+    assert verified.resolution_policy == "PINNED_REVISION"
+    assert verified.source_bbox_json == {"x": 0.1}
+
+
+def test_references_are_upserted_in_batches_keyed_by_occurrence() -> None:
+    executed = []
+    db = SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")),
+        execute=lambda statement, rows: executed.append((statement, rows)),
+    )
+    rows = [{"occurrence_key": str(index)} for index in range(knowledge_indexer.UPSERT_BATCH_SIZE + 5)]
+
+    knowledge_indexer._upsert_references(db, rows)
+
+    assert [len(batch) for _statement, batch in executed] == [knowledge_indexer.UPSERT_BATCH_SIZE, 5]
+    sql = str(executed[0][0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (tenant_id, source_revision_id, occurrence_key) DO UPDATE" in sql
+    assert "verified_by_user_id = excluded" not in sql
+    assert "status = excluded.status" in sql
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import random
+import re
+from types import SimpleNamespace
+
+from amodb.apps.doc_control.knowledge_service import CODE_CANDIDATE, _reference_occurrences, normalize_code
+from amodb.apps.doc_control.reference_matcher import AcceptedSpans, ReferenceMatcher, alias_set_key, reference_matcher
+
+ALIASES = [
+    ("m-moe", "MOE"),
+    ("m-moe", "Maintenance Organisation Exposition"),
+    ("m-qam", "QAM 51"),
+    ("m-qam", "qam-051"),
+    ("m-eng", "ENG/FRM/004"),
+    ("m-amm", "AMM"),
+    ("m-amm", "AMM 05-10"),
+    ("m-cam", "CAME"),
+    ("m-ipc", "IPC"),
+    ("m-dot", "İLS-100"),
+    ("m-lead", "-SMS-7"),
+]
+
+
+def _corpus():
+    manuals = {manual_id: SimpleNamespace(id=manual_id) for manual_id, _alias in ALIASES}
+    normalized_map: dict[str, list] = {}
+    entries = []
+    for manual_id, alias in ALIASES:
+        normalized = normalize_code(alias)
+        targets = normalized_map.setdefault(normalized, [])
+        if manuals[manual_id] not in targets:
+            targets.append(manuals[manual_id])
+        entries.append((manual_id, alias, normalized))
+    return normalized_map, entries
+
+
+def _regex_loop(text, *, entries, normalized_map, source_manual_id):
+    """The per-alias regex scan the matcher replaced."""
+    patterns = []
+    for _manual_id, alias, normalized in entries:
+        parts = re.split(r"([\s./_-]+)", alias)
+        expression = "".join(r"[\s./_-]+" if re.fullmatch(r"[\s./_-]+", part or "") else re.escape(part) for part in parts if part)
+        patterns.append((re.compile(rf"(?<![A-Za-z0-9])({expression})(?![A-Za-z0-9])", re.IGNORECASE), alias, normalized))
+    patterns.sort(key=lambda item: len(item[1]), reverse=True)
+    spans: list[tuple[int, int]] = []
+    occurrences = []
+    for pattern, _alias, normalized in patterns:
+        targets = normalized_map.get(normalized, [])
+        for match in pattern.finditer(text):
+            if any(match.start() < end and match.end() > start for start, end in spans):
+                continue
+            if len(targets) == 1 and targets[0].id == source_manual_id:
+                continue
+            spans.append((match.start(), match.end()))
+            occurrences.append((match.start(), match.end(), match.group(1), normalized, targets, "TEXT_ALIAS"))
+    for match in CODE_CANDIDATE.finditer(text):
+        if any(match.start() < end and match.end() > start for start, end in spans):
+            continue
+        normalized = normalize_code(match.group(1))
+        targets = normalized_map.get(normalized, [])
+        if len(targets) == 1 and targets[0].id == source_manual_id:
+            continue
+        spans.append((match.start(), match.end()))
+        occurrences.append((match.start(), match.end(), match.group(1), normalized, targets, "CODE_CANDIDATE"))
+    return occurrences
+
+
+def test_matcher_reports_exactly_what_the_regex_loop_reported() -> None:
+    normalized_map, entries = _corpus()
+    matcher = ReferenceMatcher((alias, normalized) for _manual_id, alias, normalized in entries)
+    rng = random.Random(11)
+    words = [
+        "see", "the", "MOE", "moe", "Maintenance  organisation\texposition", "QAM 51", "QAM.51", "qam__051",
+        "ENG-FRM-004", "eng / frm / 004", "AMM", "AMM 05 10", "AMM-05-10X", "xAMM", "CAME", "came.", "IPC",
+        "ılS-100", "İLS 100", "ils-100", "SMS-7", "--SMS 7", "(MOE)", "QAM51", "K", "ſMOE", "MOEſ", "ENG", "FRM 12",
+    ]
+    separators = [" ", "", "-", ". ", "/", "\n", "_"]
+    for _ in range(400):
+        text = "".join(rng.choice(words) + rng.choice(separators) for _ in range(rng.randint(1, 30)))
+        for source_manual_id in ("m-moe", "m-amm", "m-other"):
+            expected = _regex_loop(text, entries=entries, normalized_map=normalized_map, source_manual_id=source_manual_id)
+            actual = _reference_occurrences(text, matcher=matcher, normalized_map=normalized_map, source_manual_id=source_manual_id)
+            assert actual == expected, text
+
+
+def test_matcher_narrows_candidates_to_aliases_present_in_the_text() -> None:
+    _normalized_map, entries = _corpus()
+    matcher = ReferenceMatcher((alias, normalized) for _manual_id, alias, normalized in entries)
+    aliases = [alias for _pattern, alias, _normalized in matcher.candidates("Refer to the maintenance ORGANISATION exposition and qam-051.")]
+    assert aliases == ["Maintenance Organisation Exposition", "qam-051", "QAM 51"]
+    assert matcher.candidates("Nothing to see here.") == []
+
+
+def test_accepted_spans_detect_overlaps_with_bisect() -> None:
+    spans = AcceptedSpans()
+    spans.add(10, 20)
+    spans.add(30, 40)
+    assert spans.overlaps(15, 16)
+    assert spans.overlaps(5, 11)
+    assert spans.overlaps(39, 50)
+    assert not spans.overlaps(20, 30)
+    assert not spans.overlaps(0, 10)
+    assert not spans.overlaps(40, 45)
+
+
+def test_matcher_cache_is_keyed_by_alias_set() -> None:
+    _normalized_map, entries = _corpus()
+    first = reference_matcher("tenant-matcher", entries)
+    assert reference_matcher("tenant-matcher", list(entries)) is first
+    renamed = [*entries[:-1], ("m-lead", "SMS-8", "SMS8")]
+    assert alias_set_key(renamed) != alias_set_key(entries)
+    assert reference_matcher("tenant-matcher", renamed) is not first
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from amodb.apps.doc_control import knowledge_indexer, reference_shards
+from amodb.apps.doc_control.reference_matcher import ReferenceMatcher
+
+
+class _Page:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.rect = SimpleNamespace(width=200.0, height=100.0)
+
+    def get_text(self, kind: str):
+        if kind == "words":
+            return [(10.0, 10.0, 40.0, 20.0, word, 0, 0, index) for index, word in enumerate(self.text.split())]
+        return self.text
+
+
+class _Document:
+    def __init__(self, texts: list[str]) -> None:
+        self.pages = [_Page(text) for text in texts]
+        self.page_count = len(texts)
+
+    def load_page(self, index: int) -> _Page:
+        return self.pages[index]
+
+
+def test_plan_shards_covers_every_page_once() -> None:
+    assert reference_shards.plan_shards(0, 50) == []
+    assert reference_shards.plan_shards(3, 50) == [(1, 3)]
+    shards = reference_shards.plan_shards(2000, 50)
+    assert len(shards) == 40
+    assert shards[0] == (1, 50) and shards[-1] == (1951, 2000)
+    assert reference_shards.plan_shards(101, 50)[-1] == (101, 101)
+
+
+def test_only_processes_that_enable_the_pool_shard_across_processes(monkeypatch) -> None:
+    monkeypatch.setenv("DOCUMENT_INDEX_PROCESSES", "4")
+    monkeypatch.setattr(reference_shards, "_POOL_ENABLED", False)
+    assert reference_shards.index_processes() == 1
+
+    reference_shards.enable_process_pool()
+    assert reference_shards.index_processes() == 4
+
+
+def test_extract_pages_returns_plain_occurrences_for_the_page_range() -> None:
+    document = _Document(["Refer to QAM 51 first.", "   ", "See MOE and QAM 51.", "QAM 51 is ignored"])
+    matcher = ReferenceMatcher([("QAM 51", "QAM51"), ("MOE", "MOE")])
+    normalized_map = {"QAM51": [SimpleNamespace(id="manual-form")], "MOE": [SimpleNamespace(id="manual-source")]}
+
+    payload = reference_shards.extract_pages(
+        document,
+        1,
+        3,
+        matcher=matcher,
+        normalized_map=normalized_map,
+        source_manual_id="manual-source",
+    )
+
+    assert payload["searchable_text"] is True
+    assert [page_number for page_number, _occurrences in payload["pages"]] == [1, 3]
+    (first,) = payload["pages"][0][1]
+    assert first[:5] == [9, 15, "QAM 51", "QAM51", "TEXT_ALIAS"]
+    assert first[5] == "Refer to QAM 51 first."
+    # Self-references to the source manual are dropped, as in the serial walk.
+    assert [occurrence[3] for occurrence in payload["pages"][1][1]] == ["QAM51"]
+
+
+def test_shards_merge_in_page_order_around_checkpoints() -> None:
+    shards = [(1, 10), (11, 20), (21, 30), (31, 35)]
+    completed = {0: {"pages": ["a"]}, 2: {"pages": ["c"]}}
+    extracted = iter([(1, {"pages": ["b"]}), (3, {"pages": ["d"]})])
+
+    merged = list(knowledge_indexer._merged_shards(shards, completed, extracted))
+
+    assert [(index, payload["pages"], cached) for index, payload, cached in merged] == [
+        (0, ["a"], True),
+        (1, ["b"], False),
+        (2, ["c"], True),
+        (3, ["d"], False),
+    ]
+
+
+def test_checkpoints_are_keyed_by_source_aliases_and_shard_size() -> None:
+    revision = SimpleNamespace(source_sha256="sha-1")
+    matcher = ReferenceMatcher([("QAM 51", "QAM51")])
+    key = knowledge_indexer._checkpoint_key(revision, matcher, 50)
+
+    assert key == knowledge_indexer._checkpoint_key(revision, ReferenceMatcher([("QAM 51", "QAM51")]), 50)
+    assert key != knowledge_indexer._checkpoint_key(revision, matcher, 25)
+    assert key != knowledge_indexer._checkpoint_key(SimpleNamespace(source_sha256="sha-2"), matcher, 50)
+    assert key != knowledge_indexer._checkpoint_key(revision, ReferenceMatcher([("MOE", "MOE")]), 50)
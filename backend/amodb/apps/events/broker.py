@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
+import os
 import queue
 import threading
 import time
 from collections import deque
 from dataclasses import dataclass
-from typing import Any, Deque, Dict, Iterable, Optional
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -20,8 +26,8 @@ class EventEnvelope:
     actor: Optional[Dict[str, Any]]
     metadata: Dict[str, Any]
 
-    def to_json(self) -> str:
-        payload = {
+    def to_dict(self) -> Dict[str, Any]:
+        return {
             "id": self.id,
             "type": self.type,
             "entityType": self.entityType,
@@ -31,35 +37,188 @@ class EventEnvelope:
             "actor": self.actor,
             "metadata": self.metadata,
         }
-        return json.dumps(payload, default=str)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), default=str)
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "EventEnvelope":
+        return cls(
+            id=str(payload["id"]),
+            type=str(payload.get("type") or ""),
+            entityType=str(payload.get("entityType") or ""),
+            entityId=str(payload.get("entityId") or ""),
+            action=str(payload.get("action") or ""),
+            timestamp=str(payload.get("timestamp") or ""),
+            actor=payload.get("actor"),
+            metadata=dict(payload.get("metadata") or {}),
+        )
+
+
+class AsyncSubscription:
+    """Event-loop-owned subscriber queue.
+
+    ``asyncio.Queue`` is not thread-safe, so publishers never touch it directly:
+    delivery is scheduled onto the owning loop with ``call_soon_threadsafe``. An
+    idle SSE client therefore costs one queue and no executor thread.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int = 400) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[EventEnvelope] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _put(self, event: EventEnvelope) -> None:
+        if self.queue.full():
+            # Same drop-oldest policy as the thread queues: a slow browser must
+            # not make publishers block or grow memory without bound.
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(event)
+
+    def deliver(self, event: EventEnvelope) -> bool:
+        """Schedule delivery from any thread. Returns False once the loop is gone."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            return False
+        return True
+
+    async def get(self, timeout: Optional[float] = None) -> EventEnvelope:
+        """Wait for the next event; raises ``asyncio.TimeoutError`` on timeout."""
+        if timeout is None:
+            return await self.queue.get()
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+Subscriber = Union["queue.Queue[EventEnvelope]", AsyncSubscription]
+SubscriptionKey = tuple[Optional[str], Optional[str]]
+_WILDCARD_KEY: SubscriptionKey = (None, None)
 
 
 class EventBroker:
+    """In-process fan-out backend.
+
+    Subscribers and the replay deque live in this process only. It is the
+    ``memory`` backend and also the local delivery stage of the cross-process
+    backends, which feed remotely published events back through ``publish``.
+
+    Subscriptions are indexed by tenant (and optionally entity type) so a
+    publish only touches the queues that can accept the event. Subscribing
+    without ``amo_id`` registers a wildcard consumer that receives everything.
+
+    Listeners are synchronous callbacks run on the publishing thread for local
+    and remotely delivered events alike; they must be cheap (cache
+    invalidation, counters) and never block.
+    """
+
+    backend_name = "memory"
+
     def __init__(self, replay_size: int = 2000) -> None:
-        self._subscribers: set[queue.Queue[EventEnvelope]] = set()
-        self._history: Deque[EventEnvelope] = deque(maxlen=replay_size)
+        self._registrations: Dict[Subscriber, tuple[SubscriptionKey, ...]] = {}
+        self._index: Dict[SubscriptionKey, set[Subscriber]] = {}
+        self._async_count = 0
+        self._history: Deque[tuple[int, EventEnvelope]] = deque(maxlen=replay_size)
+        self._history_positions: Dict[str, int] = {}
+        self._sequence = 0
         self._lock = threading.Lock()
+        self._published = 0
+        self._listeners: Dict[Optional[str], list[Callable[[EventEnvelope], None]]] = {}
 
-    def subscribe(self) -> queue.Queue[EventEnvelope]:
-        q: queue.Queue[EventEnvelope] = queue.Queue(maxsize=400)
+    @staticmethod
+    def _keys(amo_id: Optional[str], entity_types: Optional[Iterable[str]]) -> tuple[SubscriptionKey, ...]:
+        if amo_id is None:
+            return (_WILDCARD_KEY,)
+        types = sorted({str(value) for value in entity_types or () if value})
+        if not types:
+            return ((str(amo_id), None),)
+        return tuple((str(amo_id), entity_type) for entity_type in types)
+
+    def _register(self, subscriber: Subscriber, amo_id: Optional[str], entity_types: Optional[Iterable[str]]) -> None:
+        keys = self._keys(amo_id, entity_types)
         with self._lock:
-            self._subscribers.add(q)
+            self._registrations[subscriber] = keys
+            for key in keys:
+                self._index.setdefault(key, set()).add(subscriber)
+            if isinstance(subscriber, AsyncSubscription):
+                self._async_count += 1
+
+    def _unregister_locked(self, subscriber: Subscriber) -> None:
+        keys = self._registrations.pop(subscriber, None)
+        if keys is None:
+            return
+        for key in keys:
+            bucket = self._index.get(key)
+            if bucket is None:
+                continue
+            bucket.discard(subscriber)
+            if not bucket:
+                del self._index[key]
+        if isinstance(subscriber, AsyncSubscription):
+            self._async_count -= 1
+
+    def subscribe(
+        self,
+        *,
+        amo_id: Optional[str] = None,
+        entity_types: Optional[Iterable[str]] = None,
+    ) -> queue.Queue[EventEnvelope]:
+        q: queue.Queue[EventEnvelope] = queue.Queue(maxsize=400)
+        self._register(q, amo_id, entity_types)
         return q
 
-    def unsubscribe(self, q: queue.Queue[EventEnvelope]) -> None:
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._unregister_locked(subscriber)
+
+    def subscribe_async(
+        self,
+        *,
+        amo_id: Optional[str] = None,
+        entity_types: Optional[Iterable[str]] = None,
+        maxsize: int = 400,
+    ) -> AsyncSubscription:
+        """Subscribe from a coroutine; events are delivered on the running loop."""
+        subscription = AsyncSubscription(asyncio.get_running_loop(), maxsize=maxsize)
+        self._register(subscription, amo_id, entity_types)
+        return subscription
+
+    def unsubscribe_async(self, subscription: AsyncSubscription) -> None:
+        self.unsubscribe(subscription)
+
+    def add_listener(
+        self,
+        callback: Callable[[EventEnvelope], None],
+        *,
+        entity_types: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Call ``callback`` for every published event of ``entity_types`` (all if omitted)."""
+        keys = sorted({str(value) for value in entity_types or () if value}) or [None]
         with self._lock:
-            self._subscribers.discard(q)
+            for key in keys:
+                self._listeners.setdefault(key, []).append(callback)
+
+    def _notify_listeners(self, event: EventEnvelope) -> None:
+        with self._lock:
+            callbacks = [*self._listeners.get(None, ()), *self._listeners.get(str(event.entityType), ())]
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception:
+                logger.warning("Event listener %r failed", callback, exc_info=True)
 
     def replay_since(self, *, last_event_id: str, amo_id: Optional[str]) -> tuple[list[EventEnvelope], bool]:
         with self._lock:
-            history = list(self._history)
-        if not history:
-            return [], False
-        ids = [event.id for event in history]
-        if last_event_id not in ids:
-            return [], True
-        start_index = ids.index(last_event_id) + 1
-        replay = history[start_index:]
+            if not self._history:
+                return [], False
+            position = self._history_positions.get(last_event_id)
+            if position is None:
+                return [], True
+            offset = position - self._history[0][0] + 1
+            replay = [event for _, event in islice(self._history, offset, None)]
         if amo_id:
             replay = [
                 event
@@ -68,28 +227,124 @@ class EventBroker:
             ]
         return replay, False
 
+    def _targets_locked(self, event: EventEnvelope) -> set[Subscriber]:
+        targets = set(self._index.get(_WILDCARD_KEY, ()))
+        metadata = event.metadata if isinstance(event.metadata, dict) else {}
+        amo_id = metadata.get("amoId")
+        if amo_id:
+            tenant = str(amo_id)
+            targets.update(self._index.get((tenant, None), ()))
+            targets.update(self._index.get((tenant, str(event.entityType)), ()))
+        return targets
+
     def publish(self, event: EventEnvelope) -> None:
         with self._lock:
-            self._history.append(event)
-            subscribers: Iterable[queue.Queue[EventEnvelope]] = list(self._subscribers)
-        for q in subscribers:
+            if len(self._history) == self._history.maxlen:
+                _, evicted = self._history[0]
+                if self._history_positions.get(evicted.id) == self._history[0][0]:
+                    del self._history_positions[evicted.id]
+            self._sequence += 1
+            self._history.append((self._sequence, event))
+            self._history_positions[event.id] = self._sequence
+            self._published += 1
+            targets = self._targets_locked(event)
+        if self._listeners:
+            self._notify_listeners(event)
+        closed = []
+        for subscriber in targets:
+            if isinstance(subscriber, AsyncSubscription):
+                if not subscriber.deliver(event):
+                    closed.append(subscriber)
+                continue
             try:
-                q.put_nowait(event)
+                subscriber.put_nowait(event)
             except queue.Full:
                 try:
-                    _ = q.get_nowait()
-                    q.put_nowait(event)
+                    _ = subscriber.get_nowait()
+                    subscriber.put_nowait(event)
                 except queue.Empty:
                     pass
+        if closed:
+            with self._lock:
+                for subscriber in closed:
+                    self._unregister_locked(subscriber)
+
+    def start(self) -> None:
+        """Nothing to start for in-process delivery."""
+
+    def stop(self) -> None:
+        """Nothing to stop for in-process delivery."""
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend_name,
+                "subscribers": len(self._registrations),
+                "sse_connections": self._async_count,
+                "subscription_keys": len(self._index),
+                "history": len(self._history),
+                "published": self._published,
+            }
+
 
+def _env_bool(name: str, default: bool = False) -> bool:
+    raw = (os.getenv(name) or "").strip().lower()
+    if not raw:
+        return default
+    return raw in {"1", "true", "yes", "on"}
 
-broker = EventBroker()
+
+def configured_backend_name() -> str:
+    """Resolve EVENTS_BROKER_BACKEND (memory | postgres | auto).
+
+    ``auto`` selects PostgreSQL LISTEN/NOTIFY when the write database is
+    PostgreSQL and LISTEN can reach a real session: behind a transaction-mode
+    pooler it needs EVENTS_BROKER_DATABASE_URL pointing at a direct connection.
+    """
+    requested = (os.getenv("EVENTS_BROKER_BACKEND") or "auto").strip().lower()
+    if requested in {"memory", "postgres"}:
+        return requested
+    if requested != "auto":
+        logger.warning("Unknown EVENTS_BROKER_BACKEND=%r; using in-process delivery.", requested)
+        return "memory"
+    url = os.getenv("EVENTS_BROKER_DATABASE_URL") or os.getenv("DATABASE_WRITE_URL") or os.getenv("DATABASE_URL") or ""
+    if not url.startswith("postgresql"):
+        return "memory"
+    if _env_bool("DB_EXTERNAL_POOLER") and not os.getenv("EVENTS_BROKER_DATABASE_URL"):
+        return "memory"
+    return "postgres"
+
+
+def create_event_broker() -> EventBroker:
+    if configured_backend_name() == "postgres":
+        from .pg_broker import PostgresNotifyEventBroker
+
+        return PostgresNotifyEventBroker()
+    return EventBroker()
+
+
+broker = create_event_broker()
 
 
 def publish_event(event: EventEnvelope) -> None:
     broker.publish(event)
 
 
+def start_event_broker() -> None:
+    try:
+        broker.start()
+    except Exception:
+        logger.warning("Event broker failed to start; continuing with in-process delivery.", exc_info=True)
+
+
+def stop_event_broker() -> None:
+    broker.stop()
+
+
+def broker_stats() -> Dict[str, Any]:
+    return broker.stats()
+
+
 def format_sse(data: str, event: Optional[str] = None, event_id: Optional[str] = None) -> str:
     lines = []
     if event_id:
@@ -0,0 +1,325 @@
+"""Cross-process event fan-out over PostgreSQL LISTEN/NOTIFY.
+
+Every API worker keeps its own in-process subscribers and replay deque
+(inherited from :class:`EventBroker`). Locally published events are delivered
+to local subscribers immediately and handed to a sender thread that issues
+``pg_notify`` on a dedicated connection. A listener thread in every worker
+receives the notifications from the other workers/nodes and feeds them into the
+same local delivery path, so an SSE client sees an event regardless of which
+worker produced it.
+
+NOTIFY payloads are capped by PostgreSQL at 8000 bytes. Larger envelopes are
+stored in ``event_broker_payloads`` and only their row id travels over the
+channel. Rows are short-lived; listeners prune them on a fixed cadence.
+
+Delivery stays best-effort, exactly like the in-process broker: if the
+listener connection drops, reconnecting clients recover the gap from the
+persisted audit replay in the events router.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import select
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from .broker import EventBroker, EventEnvelope
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_PAYLOAD_LIMIT_BYTES = 7900
+OVERFLOW_TABLE = "event_broker_payloads"
+
+
+def _bounded_int(name: str, default: int, minimum: int, maximum: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)) or default)
+    except ValueError:
+        value = default
+    return max(minimum, min(maximum, value))
+
+
+def _dsn_from_env() -> str:
+    from sqlalchemy.engine import make_url
+
+    raw = os.getenv("EVENTS_BROKER_DATABASE_URL") or os.getenv("DATABASE_WRITE_URL") or os.getenv("DATABASE_URL") or ""
+    url = make_url(raw)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def _connect(dsn: str, *, role: str):
+    import psycopg2
+
+    conn = psycopg2.connect(
+        dsn,
+        connect_timeout=_bounded_int("EVENTS_BROKER_CONNECT_TIMEOUT_SEC", 5, 1, 60),
+        application_name=f"amo-portal-events-{role}"[:63],
+        keepalives=1,
+        keepalives_idle=30,
+        keepalives_interval=10,
+        keepalives_count=3,
+    )
+    conn.autocommit = True
+    return conn
+
+
+def _close_quietly(conn) -> None:
+    if conn is None:
+        return
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _percentile(values: list[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round((percentile / 100.0) * (len(ordered) - 1)))))
+    return round(ordered[index], 3)
+
+
+class PostgresNotifyEventBroker(EventBroker):
+    backend_name = "postgres"
+
+    def __init__(
+        self,
+        replay_size: int = 2000,
+        *,
+        channel: Optional[str] = None,
+        dsn_factory: Callable[[], str] = _dsn_from_env,
+        connect: Callable[..., Any] = _connect,
+    ) -> None:
+        super().__init__(replay_size=replay_size)
+        self.channel = (channel or os.getenv("EVENTS_BROKER_CHANNEL") or "amodb_events").strip()[:63]
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._dsn_factory = dsn_factory
+        self._connect = connect
+        self._outbox: queue.Queue[tuple[EventEnvelope, float]] = queue.Queue(
+            maxsize=_bounded_int("EVENTS_BROKER_OUTBOX_SIZE", 10000, 100, 1_000_000)
+        )
+        self._send_batch_size = _bounded_int("EVENTS_BROKER_SEND_BATCH", 200, 1, 5000)
+        self._overflow_retention_sec = _bounded_int("EVENTS_BROKER_OVERFLOW_RETENTION_SEC", 600, 60, 86400)
+        self._stop = threading.Event()
+        self._thread_lock = threading.Lock()
+        self._sender: Optional[threading.Thread] = None
+        self._listener: Optional[threading.Thread] = None
+        self._listener_connected = False
+        self._latencies_ms: Deque[float] = deque(maxlen=2048)
+        self._counters: Dict[str, int] = {
+            "notified": 0,
+            "overflow_payloads": 0,
+            "remote_delivered": 0,
+            "outbox_dropped": 0,
+            "send_failures": 0,
+            "listen_failures": 0,
+            "decode_failures": 0,
+        }
+
+    # -- local API -----------------------------------------------------------------
+
+    def publish(self, event: EventEnvelope) -> None:
+        super().publish(event)
+        self._ensure_sender()
+        try:
+            self._outbox.put_nowait((event, time.time()))
+        except queue.Full:
+            self._count("outbox_dropped")
+
+    def start(self) -> None:
+        """Start the listener (API processes serving /events) and sender threads."""
+        self._stop.clear()
+        self._ensure_sender()
+        with self._thread_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen_loop, name="events-broker-listener", daemon=True)
+                self._listener.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._thread_lock:
+            threads = [thread for thread in (self._sender, self._listener) if thread is not None]
+        for thread in threads:
+            thread.join(timeout=2.0)
+
+    def stats(self) -> Dict[str, Any]:
+        payload = super().stats()
+        with self._lock:
+            counters = dict(self._counters)
+            latencies = list(self._latencies_ms)
+        payload.update(counters)
+        payload.update(
+            {
+                "channel": self.channel,
+                "outbox_depth": self._outbox.qsize(),
+                "listener_connected": self._listener_connected,
+                "delivery_latency_ms": {
+                    "p50": _percentile(latencies, 50),
+                    "p99": _percentile(latencies, 99),
+                    "samples": len(latencies),
+                },
+            }
+        )
+        return payload
+
+    # -- wire format ---------------------------------------------------------------
+
+    def encode(self, event: EventEnvelope, published_at: float) -> tuple[str, Optional[str]]:
+        """Return ``(notify_payload, overflow_body)``.
+
+        ``overflow_body`` is set when the envelope does not fit in a NOTIFY; the
+        notification then carries a ``ref`` placeholder that the sender fills
+        in with the overflow row id.
+        """
+        body = json.dumps({"o": self.origin, "t": published_at, "e": event.to_dict()}, default=str, separators=(",", ":"))
+        if len(body.encode("utf-8")) <= NOTIFY_PAYLOAD_LIMIT_BYTES:
+            return body, None
+        return json.dumps({"o": self.origin, "t": published_at, "ref": None}, separators=(",", ":")), body
+
+    def handle_notification(self, payload: str, fetch_overflow: Callable[[str], Optional[str]]) -> bool:
+        """Deliver one remote notification locally. Returns True if delivered."""
+        try:
+            message = json.loads(payload)
+            if message.get("o") == self.origin:
+                return False
+            if message.get("ref"):
+                body = fetch_overflow(str(message["ref"]))
+                if body is None:
+                    self._count("decode_failures")
+                    return False
+                message = json.loads(body)
+            event = EventEnvelope.from_dict(message["e"])
+        except Exception:
+            self._count("decode_failures")
+            logger.debug("Discarding malformed event broker notification", exc_info=True)
+            return False
+        EventBroker.publish(self, event)
+        published_at = message.get("t")
+        with self._lock:
+            self._counters["remote_delivered"] += 1
+            if isinstance(published_at, (int, float)):
+                self._latencies_ms.append(max(0.0, (time.time() - float(published_at)) * 1000.0))
+        return True
+
+    # -- threads -------------------------------------------------------------------
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def _ensure_sender(self) -> None:
+        if self._sender is not None and self._sender.is_alive():
+            return
+        with self._thread_lock:
+            if self._sender is None or not self._sender.is_alive():
+                self._sender = threading.Thread(target=self._send_loop, name="events-broker-sender", daemon=True)
+                self._sender.start()
+
+    def _drain_outbox(self) -> list[tuple[EventEnvelope, float]]:
+        try:
+            batch = [self._outbox.get(timeout=1.0)]
+        except queue.Empty:
+            return []
+        while len(batch) < self._send_batch_size:
+            try:
+                batch.append(self._outbox.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _send_batch(self, conn, batch: list[tuple[EventEnvelope, float]]) -> None:
+        with conn.cursor() as cursor:
+            cursor.execute("BEGIN")
+            try:
+                for event, published_at in batch:
+                    payload, overflow_body = self.encode(event, published_at)
+                    if overflow_body is not None:
+                        ref = str(uuid.uuid4())
+                        cursor.execute(
+                            f"INSERT INTO {OVERFLOW_TABLE} (id, payload) VALUES (%s, %s)",
+                            (ref, overflow_body),
+                        )
+                        payload = json.dumps({"o": self.origin, "t": published_at, "ref": ref}, separators=(",", ":"))
+                        self._count("overflow_payloads")
+                    cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+                # Notifications are delivered at commit, after overflow rows are visible.
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+        self._count("notified", len(batch))
+
+    def _send_loop(self) -> None:
+        conn = None
+        backoff = 0.5
+        while not self._stop.is_set() or not self._outbox.empty():
+            batch = self._drain_outbox()
+            if not batch:
+                continue
+            try:
+                if conn is None or conn.closed:
+                    conn = self._connect(self._dsn_factory(), role="sender")
+                self._send_batch(conn, batch)
+                backoff = 0.5
+            except Exception:
+                self._count("send_failures", len(batch))
+                logger.warning("Event broker NOTIFY failed; %s event(s) stay local to this worker.", len(batch), exc_info=True)
+                _close_quietly(conn)
+                conn = None
+                if self._stop.wait(backoff):
+                    break
+                backoff = min(backoff * 2, 10.0)
+        _close_quietly(conn)
+
+    def _fetch_overflow(self, conn, ref: str) -> Optional[str]:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT payload FROM {OVERFLOW_TABLE} WHERE id = %s", (ref,))
+            row = cursor.fetchone()
+        return str(row[0]) if row else None
+
+    def _prune_overflow(self, conn) -> None:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {OVERFLOW_TABLE} WHERE created_at < now() - make_interval(secs => %s)",
+                (self._overflow_retention_sec,),
+            )
+
+    def _listen_loop(self) -> None:
+        backoff = 0.5
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._connect(self._dsn_factory(), role="listener")
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                self._listener_connected = True
+                backoff = 0.5
+                next_prune = time.monotonic()
+                while not self._stop.is_set():
+                    if time.monotonic() >= next_prune:
+                        self._prune_overflow(conn)
+                        next_prune = time.monotonic() + 60.0
+                    readable, _, _ = select.select([conn], [], [], 1.0)
+                    if not readable:
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notification = conn.notifies.pop(0)
+                        self.handle_notification(notification.payload, lambda ref: self._fetch_overflow(conn, ref))
+            except Exception:
+                self._count("listen_failures")
+                logger.warning("Event broker LISTEN connection lost; reconnecting.", exc_info=True)
+            finally:
+                self._listener_connected = False
+                _close_quietly(conn)
+            if self._stop.wait(backoff):
+                break
+            backoff = min(backoff * 2, 10.0)
@@ -3,7 +3,6 @@ from __future__ import annotations
 import asyncio
 import hashlib
 import json
-import queue
 from datetime import datetime, timedelta, timezone
 from typing import AsyncGenerator, Optional
 
@@ -16,7 +15,7 @@ from sqlalchemy.orm import Session
 
 from amodb.apps.accounts import models as account_models
 from amodb.apps.audit import models as audit_models
-from amodb.database import get_db
+from amodb.database import close_session_safely, get_db
 from amodb.security import JWT_ALGORITHM, SECRET_KEY, get_user_by_id
 from .broker import EventEnvelope, broker, format_sse, keepalive_message
 
@@ -24,6 +23,7 @@ router = APIRouter(prefix="/api", tags=["events"])
 
 REPLAY_RETENTION_DAYS = 7
 REPLAY_MAX_EVENTS = 500
+SSE_KEEPALIVE_SECONDS = 15
 
 
 class ActivityEventRead(BaseModel):
@@ -177,11 +177,14 @@ async def _event_generator(
     request: Request,
     user: account_models.User,
     db: Session,
+    entity_types: Optional[list[str]] = None,
 ) -> AsyncGenerator[str, None]:
-    q = broker.subscribe()
+    effective_amo_id = getattr(user, "effective_amo_id", None) or getattr(user, "amo_id", "")
+    # Tenant-keyed subscription: other tenants' events never wake this stream.
+    # An empty tenant id subscribes to a bucket nothing publishes into.
+    subscription = broker.subscribe_async(amo_id=str(effective_amo_id or ""), entity_types=entity_types)
     try:
         last_event_id = request.headers.get("last-event-id") or request.query_params.get("lastEventId")
-        effective_amo_id = getattr(user, "effective_amo_id", None) or getattr(user, "amo_id", "")
         if last_event_id:
             replay, requires_reset = _replay_events_since(
                 db,
@@ -195,29 +198,36 @@ async def _event_generator(
                 )
             else:
                 for event in replay:
+                    if entity_types and event.entityType not in entity_types:
+                        continue
                     yield format_sse(event.to_json(), event=event.type, event_id=event.id)
+        # The session is only needed for replay. Return its connection to the
+        # pool now; otherwise every open stream pins one for its lifetime.
+        close_session_safely(db)
         while True:
             if await request.is_disconnected():
                 break
             try:
-                event = await asyncio.to_thread(q.get, True, 15)
-                if not _event_matches_tenant(event, str(effective_amo_id)):
-                    continue
-                yield format_sse(event.to_json(), event=event.type, event_id=event.id)
-            except queue.Empty:
+                event = await subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
                 yield keepalive_message()
+                continue
+            if not _event_matches_tenant(event, str(effective_amo_id)):
+                continue
+            yield format_sse(event.to_json(), event=event.type, event_id=event.id)
     finally:
-        broker.unsubscribe(q)
+        broker.unsubscribe_async(subscription)
 
 
 @router.get("/events")
 async def stream_events(
     request: Request,
+    entityType: Optional[list[str]] = Query(default=None, description="Only stream these entity types"),
     db: Session = Depends(get_db),
     user: account_models.User = Depends(get_current_active_user_from_transport),
 ) -> StreamingResponse:
     return StreamingResponse(
-        _event_generator(request, user, db),
+        _event_generator(request, user, db, entity_types=entityType),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
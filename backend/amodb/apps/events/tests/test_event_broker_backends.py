@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import time
+
+from amodb.apps.events import broker as broker_module
+from amodb.apps.events.broker import EventBroker, EventEnvelope
+from amodb.apps.events.pg_broker import NOTIFY_PAYLOAD_LIMIT_BYTES, PostgresNotifyEventBroker
+
+
+def _envelope(event_id: str = "evt-1", *, amo_id: str = "tenant-a", note: str = "") -> EventEnvelope:
+    return EventEnvelope(
+        id=event_id,
+        type="qms.audit.updated",
+        entityType="qms.audit",
+        entityId="audit-1",
+        action="UPDATED",
+        timestamp="2026-10-16T00:00:00+00:00",
+        actor={"userId": "user-1"},
+        metadata={"amoId": amo_id, "note": note},
+    )
+
+
+class _FakeCursor:
+    def __init__(self, statements: list[tuple[str, tuple]]):
+        self.statements = statements
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def execute(self, sql: str, params: tuple = ()) -> None:
+        self.statements.append((sql, params))
+
+
+class _FakeConnection:
+    closed = False
+
+    def __init__(self):
+        self.statements: list[tuple[str, tuple]] = []
+
+    def cursor(self):
+        return _FakeCursor(self.statements)
+
+
+def _pg_broker() -> PostgresNotifyEventBroker:
+    return PostgresNotifyEventBroker(channel="amodb_events_test", dsn_factory=lambda: "postgresql://unused")
+
+
+def test_backend_selection_defaults_to_memory_for_non_postgres(monkeypatch):
+    monkeypatch.setenv("EVENTS_BROKER_BACKEND", "auto")
+    monkeypatch.setenv("DATABASE_WRITE_URL", "sqlite+pysqlite:///:memory:")
+    assert broker_module.configured_backend_name() == "memory"
+
+    monkeypatch.setenv("DATABASE_WRITE_URL", "postgresql+psycopg2://app@db/amodb")
+    monkeypatch.setenv("DB_EXTERNAL_POOLER", "1")
+    monkeypatch.delenv("EVENTS_BROKER_DATABASE_URL", raising=False)
+    assert broker_module.configured_backend_name() == "memory"
+
+    monkeypatch.setenv("EVENTS_BROKER_DATABASE_URL", "postgresql://app@db-direct/amodb")
+    assert broker_module.configured_backend_name() == "postgres"
+
+    monkeypatch.setenv("EVENTS_BROKER_BACKEND", "memory")
+    assert type(broker_module.create_event_broker()) is EventBroker
+
+
+def test_envelope_round_trips_through_dict():
+    event = _envelope()
+    assert EventEnvelope.from_dict(json.loads(event.to_json())) == event
+
+
+def test_remote_notification_reaches_local_subscribers_and_replay():
+    receiver = _pg_broker()
+    sender = _pg_broker()
+    q = receiver.subscribe()
+
+    payload, overflow = sender.encode(_envelope("evt-remote"), time.time())
+    assert overflow is None
+    assert receiver.handle_notification(payload, lambda _ref: None) is True
+
+    assert q.get_nowait().id == "evt-remote"
+    replay, reset = receiver.replay_since(last_event_id="evt-remote", amo_id="tenant-a")
+    assert (replay, reset) == ([], False)
+    stats = receiver.stats()
+    assert stats["remote_delivered"] == 1
+    assert stats["delivery_latency_ms"]["samples"] == 1
+
+
+def test_own_notifications_are_not_delivered_twice():
+    broker = _pg_broker()
+    q = broker.subscribe()
+    payload, _ = broker.encode(_envelope("evt-own"), time.time())
+
+    assert broker.handle_notification(payload, lambda _ref: None) is False
+    assert q.empty()
+
+
+def test_oversized_envelope_travels_through_overflow_row():
+    sender = _pg_broker()
+    receiver = _pg_broker()
+    big = _envelope("evt-big", note="x" * (NOTIFY_PAYLOAD_LIMIT_BYTES + 100))
+    conn = _FakeConnection()
+
+    sender._send_batch(conn, [(big, time.time())])
+
+    insert = next(params for sql, params in conn.statements if sql.startswith("INSERT INTO event_broker_payloads"))
+    notify = next(params for sql, params in conn.statements if "pg_notify" in sql)
+    assert notify[0] == "amodb_events_test"
+    assert len(notify[1].encode("utf-8")) < NOTIFY_PAYLOAD_LIMIT_BYTES
+    assert json.loads(notify[1])["ref"] == insert[0]
+    assert conn.statements[-1][0] == "COMMIT"
+
+    q = receiver.subscribe()
+    overflow_rows = {insert[0]: insert[1]}
+    assert receiver.handle_notification(notify[1], overflow_rows.get) is True
+    assert q.get_nowait().metadata["note"] == big.metadata["note"]
+    assert sender.stats()["overflow_payloads"] == 1
+
+
+def test_missing_overflow_row_is_discarded_without_raising():
+    receiver = _pg_broker()
+    payload = json.dumps({"o": "other-worker", "t": time.time(), "ref": "gone"})
+
+    assert receiver.handle_notification(payload, lambda _ref: None) is False
+    assert receiver.handle_notification("not-json", lambda _ref: None) is False
+    assert receiver.stats()["decode_failures"] == 2
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from amodb.apps.events.broker import EventBroker, EventEnvelope
+
+
+def _envelope(event_id: str, amo_id: str, entity_type: str = "tasks.task") -> EventEnvelope:
+    return EventEnvelope(
+        id=event_id,
+        type=f"{entity_type}.updated",
+        entityType=entity_type,
+        entityId="E-1",
+        action="UPDATED",
+        timestamp="2026-10-16T00:00:00+00:00",
+        actor=None,
+        metadata={"amoId": amo_id},
+    )
+
+
+def _drain(q) -> list[str]:
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait().id)
+    return items
+
+
+def test_publish_only_wakes_subscribers_of_the_event_tenant():
+    broker = EventBroker()
+    tenant_a = broker.subscribe(amo_id="tenant-a")
+    tenant_b = broker.subscribe(amo_id="tenant-b")
+    audits_only = broker.subscribe(amo_id="tenant-a", entity_types=["qms.audit"])
+    wildcard = broker.subscribe()
+
+    broker.publish(_envelope("evt-1", "tenant-a"))
+    broker.publish(_envelope("evt-2", "tenant-a", entity_type="qms.audit"))
+    broker.publish(_envelope("evt-3", "tenant-b"))
+
+    assert _drain(tenant_a) == ["evt-1", "evt-2"]
+    assert _drain(tenant_b) == ["evt-3"]
+    assert _drain(audits_only) == ["evt-2"]
+    assert _drain(wildcard) == ["evt-1", "evt-2", "evt-3"]
+
+
+def test_tenantless_events_reach_only_wildcard_subscribers():
+    broker = EventBroker()
+    blank_tenant = broker.subscribe(amo_id="")
+    wildcard = broker.subscribe()
+    broker.publish(
+        EventEnvelope(
+            id="evt-global",
+            type="x.y",
+            entityType="x",
+            entityId="1",
+            action="Y",
+            timestamp="2026-10-16T00:00:00+00:00",
+            actor=None,
+            metadata={},
+        )
+    )
+
+    assert _drain(blank_tenant) == []
+    assert _drain(wildcard) == ["evt-global"]
+
+
+def test_unsubscribe_removes_empty_index_buckets():
+    broker = EventBroker()
+    q = broker.subscribe(amo_id="tenant-a", entity_types=["a", "b"])
+    assert broker.stats()["subscription_keys"] == 2
+
+    broker.unsubscribe(q)
+    broker.unsubscribe(q)
+
+    assert broker.stats()["subscribers"] == 0
+    assert broker.stats()["subscription_keys"] == 0
+
+
+def test_replay_since_uses_positions_across_deque_eviction():
+    broker = EventBroker(replay_size=3)
+    for index in range(5):
+        broker.publish(_envelope(f"evt-{index}", "tenant-a" if index % 2 == 0 else "tenant-b"))
+
+    assert broker.replay_since(last_event_id="evt-1", amo_id=None) == ([], True)
+    replay, reset = broker.replay_since(last_event_id="evt-2", amo_id=None)
+    assert reset is False
+    assert [event.id for event in replay] == ["evt-3", "evt-4"]
+    replay, _ = broker.replay_since(last_event_id="evt-2", amo_id="tenant-a")
+    assert [event.id for event in replay] == ["evt-4"]
+    assert broker.replay_since(last_event_id="evt-4", amo_id=None) == ([], False)
+
+
+def test_republished_event_id_survives_eviction_of_its_older_copy():
+    broker = EventBroker(replay_size=2)
+    broker.publish(_envelope("evt-dup", "tenant-a"))
+    broker.publish(_envelope("evt-x", "tenant-a"))
+    broker.publish(_envelope("evt-dup", "tenant-a"))
+
+    replay, reset = broker.replay_since(last_event_id="evt-dup", amo_id=None)
+    assert (replay, reset) == ([], False)
+    replay, reset = broker.replay_since(last_event_id="evt-x", amo_id=None)
+    assert [event.id for event in replay] == ["evt-dup"]
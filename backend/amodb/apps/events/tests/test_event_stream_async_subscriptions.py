@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from amodb.apps.events import router as events_router
+from amodb.apps.events.broker import EventBroker, EventEnvelope
+
+
+class _StreamRequest:
+    headers: dict = {}
+    query_params: dict = {}
+
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+class _User:
+    def __init__(self, amo_id: str):
+        self.amo_id = amo_id
+        self.effective_amo_id = amo_id
+
+
+class _Session:
+    closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _envelope(event_id: str, amo_id: str) -> EventEnvelope:
+    return EventEnvelope(
+        id=event_id,
+        type="tasks.task.updated",
+        entityType="tasks.task",
+        entityId="T-1",
+        action="UPDATED",
+        timestamp="2026-10-16T00:00:00+00:00",
+        actor=None,
+        metadata={"amoId": amo_id},
+    )
+
+
+def test_idle_streams_do_not_consume_executor_threads(monkeypatch):
+    broker = EventBroker()
+    monkeypatch.setattr(events_router, "broker", broker)
+    clients = 1500
+
+    async def scenario():
+        sessions = [_Session() for _ in range(clients)]
+        streams = [
+            events_router._event_generator(_StreamRequest(), _User(f"tenant-{index % 2}"), sessions[index])
+            for index in range(clients)
+        ]
+        pending = [asyncio.create_task(stream.__anext__()) for stream in streams]
+        while broker.stats()["sse_connections"] < clients:
+            await asyncio.sleep(0.01)
+        threads_while_idle = threading.active_count()
+
+        # Publish from a foreign thread, as audit logging in sync endpoints does.
+        publisher = threading.Thread(target=broker.publish, args=(_envelope("evt-0", "tenant-0"),))
+        publisher.start()
+        publisher.join()
+        for _ in range(500):
+            if sum(task.done() for task in pending) >= clients // 2:
+                break
+            await asyncio.sleep(0.01)
+        done, still_waiting = await asyncio.wait(pending, timeout=0.05)
+        for task in still_waiting:
+            task.cancel()
+        await asyncio.gather(*still_waiting, return_exceptions=True)
+        for stream in streams:
+            await stream.aclose()
+        return threads_while_idle, done, still_waiting, sessions
+
+    threads_before = threading.active_count()
+    threads_while_idle, done, still_waiting, sessions = asyncio.run(scenario())
+
+    assert threads_while_idle <= threads_before + 1
+    assert len(done) == clients // 2
+    assert all("evt-0" in task.result() for task in done)
+    assert len(still_waiting) == clients // 2
+    assert all(session.closed for session in sessions), "stream must release its DB session after replay"
+    assert broker.stats()["sse_connections"] == 0
+
+
+def test_async_subscription_drops_oldest_when_client_is_slow():
+    broker = EventBroker()
+
+    async def scenario():
+        subscription = broker.subscribe_async(maxsize=2)
+        for index in range(3):
+            broker.publish(_envelope(f"evt-{index}", "tenant-a"))
+        await asyncio.sleep(0)
+        received = [(await subscription.get(timeout=1)).id for _ in range(2)]
+        broker.unsubscribe_async(subscription)
+        return received, subscription.dropped
+
+    received, dropped = asyncio.run(scenario())
+    assert received == ["evt-1", "evt-2"]
+    assert dropped == 1
+
+
+def test_subscription_on_closed_loop_is_pruned_on_publish():
+    broker = EventBroker()
+
+    async def subscribe():
+        return broker.subscribe_async()
+
+    asyncio.run(subscribe())
+    assert broker.stats()["sse_connections"] == 1
+    broker.publish(_envelope("evt-1", "tenant-a"))
+    assert broker.stats()["sse_connections"] == 0
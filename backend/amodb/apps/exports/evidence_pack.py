@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import enum
-import io
+import hashlib
 import json
 import os
+import tempfile
 import zipfile
+from dataclasses import dataclass
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Iterable, Optional
+from typing import IO, Any, Iterable, Iterator, Optional, Union
 from uuid import UUID
 
 from fastapi import HTTPException, status
@@ -15,11 +17,31 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 
+from amodb import storage
+
 from ..accounts import models as account_models
 from ..audit import services as audit_services
 
 MAX_EVIDENCE_PACK_BYTES = int(os.getenv("EVIDENCE_PACK_MAX_BYTES", str(50 * 1024 * 1024)))
+# Packs up to this size stay in memory; larger ones spill to a temp file.
+SPOOL_MEMORY_BYTES = int(os.getenv("EVIDENCE_PACK_SPOOL_MEMORY_BYTES", str(8 * 1024 * 1024)))
+CHUNK_BYTES = 1024 * 1024
 ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+# Already-compressed formats are stored rather than deflated again.
+STORED_SUFFIXES = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic", ".zip", ".gz", ".mp4", ".mov"}
+
+
+@dataclass(frozen=True)
+class StoredAttachment:
+    """An object-storage attachment, streamed only when the pack is written."""
+
+    uri: str
+    size_bytes: int
+
+
+# JSON entries are small and kept as bytes; attachments are read from disk
+# or object storage in chunks while the archive is written.
+PackEntry = tuple[str, Union[bytes, Path, StoredAttachment]]
 
 
 def _safe_filename(value: str, fallback: str) -> str:
@@ -75,25 +97,91 @@ def _sorted_events(events: Iterable[Any]) -> list[dict]:
     return sorted(normalized, key=_extract_event_timestamp)
 
 
-def _write_zip(entries: list[tuple[str, bytes]]) -> bytes:
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
-        for name, data in entries:
-            info = zipfile.ZipInfo(name, date_time=ZIP_TIMESTAMP)
-            info.compress_type = zipfile.ZIP_DEFLATED
-            archive.writestr(info, data)
-    buffer.seek(0)
-    return buffer.read()
+def _zip_info(name: str) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=ZIP_TIMESTAMP)
+    info.compress_type = zipfile.ZIP_STORED if Path(name).suffix.lower() in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+    return info
+
+
+def _attachment_chunks(content: Union[Path, StoredAttachment]) -> Iterator[bytes]:
+    if isinstance(content, StoredAttachment):
+        # Served from the object cache when present (an open cache file
+        # survives eviction) and from a background fill otherwise.
+        if content.size_bytes:
+            yield from storage.iter_range(content.uri, 0, content.size_bytes - 1)
+        return
+    with content.open("rb") as reader:
+        yield from iter(lambda: reader.read(CHUNK_BYTES), b"")
+
+
+def _write_entry(archive: zipfile.ZipFile, name: str, content: Union[bytes, Path, StoredAttachment]) -> dict[str, Any]:
+    digest = hashlib.sha256()
+    size = 0
+    with archive.open(_zip_info(name), "w", force_zip64=True) as writer:
+        if isinstance(content, (Path, StoredAttachment)):
+            for chunk in _attachment_chunks(content):
+                digest.update(chunk)
+                writer.write(chunk)
+                size += len(chunk)
+        else:
+            digest.update(content)
+            writer.write(content)
+            size = len(content)
+    return {"path": name, "sha256": digest.hexdigest(), "size_bytes": size}
+
+
+def _write_zip(entries: list[PackEntry], target: IO[bytes], *, manifest: dict[str, Any]) -> None:
+    """Write ``entries`` to ``target`` in order, then ``manifest.json`` with every entry's SHA-256 and size."""
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        files = [_write_entry(archive, name, content) for name, content in entries]
+        _write_entry(archive, "manifest.json", _to_json_bytes({**manifest, "files": files}))
+
+
+def _spooled_pack(entries: list[PackEntry], manifest: dict[str, Any]) -> tuple[IO[bytes], int]:
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES, suffix=".zip")
+    try:
+        _write_zip(entries, spool, manifest=manifest)
+        size = spool.tell()
+        spool.seek(0)
+        return spool, size
+    except Exception:
+        spool.close()
+        raise
+
 
+def _iter_spool(spool: IO[bytes]) -> Iterator[bytes]:
+    try:
+        for chunk in iter(lambda: spool.read(CHUNK_BYTES), b""):
+            yield chunk
+    finally:
+        spool.close()
 
-def _add_entry(entries: list[tuple[str, bytes]], name: str, payload: Any) -> int:
+
+def _add_entry(entries: list[PackEntry], name: str, payload: Any) -> int:
     data = _to_json_bytes(payload)
     entries.append((name, data))
     return len(data)
 
 
+def _resolve_attachment(path: Path) -> Optional[tuple[Union[Path, StoredAttachment], int]]:
+    """The attachment's pack entry content and size, or ``None`` when missing."""
+    ref = str(path)
+    if ref.startswith("s3:/"):
+        # Path() collapses "s3://" to "s3:/"; restore the URI. Only the size
+        # is looked up here so the limit check never downloads the object.
+        uri = f"s3://{ref[len('s3:/'):].lstrip('/')}"
+        try:
+            size = storage.object_size(uri)
+        except Exception:
+            return None
+        return StoredAttachment(uri, size), size
+    if not path.is_file():
+        return None
+    return path, path.stat().st_size
+
+
 def _load_attachment(
-    entries: list[tuple[str, bytes]],
+    entries: list[PackEntry],
     *,
     name: str,
     path: Path,
@@ -101,16 +189,16 @@ def _load_attachment(
     max_size: int,
     omitted: list[dict[str, Any]],
 ) -> int:
-    if not path.exists():
+    resolved = _resolve_attachment(path)
+    if resolved is None:
         omitted.append({"path": name, "reason": "missing"})
         return 0
-    size = path.stat().st_size
+    source, size = resolved
     if max_size and current_size + size > max_size:
         omitted.append({"path": name, "reason": "exceeds_limit", "size_bytes": size})
         return 0
-    data = path.read_bytes()
-    entries.append((name, data))
-    return len(data)
+    entries.append((name, source))
+    return size
 
 
 def _collect_timeline(db: Session, *, amo_id: str, entities: Iterable[tuple[str, str]]) -> list[dict]:
@@ -342,7 +430,7 @@ def build_evidence_pack(
     correlation_id: Optional[str],
     amo_id: str,
 ) -> StreamingResponse:
-    entries: list[tuple[str, bytes]] = []
+    entries: list[PackEntry] = []
     omitted_files: list[dict[str, Any]] = []
     current_size = 0
 
@@ -441,31 +529,32 @@ def build_evidence_pack(
     else:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported evidence pack type")
 
-    if omitted_files:
-        current_size += _add_entry(
-            entries,
-            "manifest.json",
-            {
-                "limit_bytes": MAX_EVIDENCE_PACK_BYTES,
-                "total_bytes": current_size,
-                "omitted": omitted_files,
-            },
-        )
-
-    audit_services.log_event(
-        db,
-        amo_id=amo_id,
-        actor_user_id=actor_user_id,
-        entity_type=entity_type,
-        entity_id=str(entity_id),
-        action="export_evidence_pack",
-        correlation_id=correlation_id,
-        metadata={"module": "exports"},
-        critical=True,
+    spool, pack_size = _spooled_pack(
+        entries,
+        {
+            "limit_bytes": MAX_EVIDENCE_PACK_BYTES,
+            "total_bytes": current_size,
+            "omitted": omitted_files,
+        },
     )
-    db.commit()
 
-    zip_bytes = _write_zip(entries)
+    try:
+        audit_services.log_event(
+            db,
+            amo_id=amo_id,
+            actor_user_id=actor_user_id,
+            entity_type=entity_type,
+            entity_id=str(entity_id),
+            action="export_evidence_pack",
+            correlation_id=correlation_id,
+            metadata={"module": "exports"},
+            critical=True,
+        )
+        db.commit()
+    except Exception:
+        spool.close()
+        raise
+
     if entity_type == "qms_audit":
         label = _safe_filename(str(summary.get("audit_ref") or summary.get("title") or entity_id), f"audit_{entity_id}")
         filename = f"{label}_evidence_pack.zip"
@@ -480,10 +569,10 @@ def build_evidence_pack(
         filename = f"{label}_evidence_pack.zip"
     else:
         filename = f"{entity_type}_{entity_id}_evidence_pack.zip"
-    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Content-Length": str(pack_size)}
 
     return StreamingResponse(
-        iter([zip_bytes]),
+        _iter_spool(spool),
         media_type="application/zip",
         headers=headers,
     )
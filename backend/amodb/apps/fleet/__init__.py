@@ -1,2 +1,3 @@
 # backend/amodb/apps/fleet/__init__.py
 from . import models  # noqa: F401
+from . import usage_rollup  # noqa: F401
@@ -0,0 +1,754 @@
+"""Aircraft and component import previews, prepared off the request event loop.
+
+Reading a spreadsheet (pandas/openpyxl), OCR of scanned tables and the
+LibreOffice formula recalculation all used to run inside the ``async``
+preview endpoints, so one large workbook stalled every other request on
+that worker. A preview is now a job:
+
+* ``submit`` records an ``AircraftImportPreviewSession`` in the ``queued``
+  state and hands the upload to a small thread pool; at most
+  ``MAX_PENDING_JOBS`` previews may be queued or running per process.
+* Each job parses the files in a long-lived worker process from an
+  ``amodb.worker_pool`` pool (``python -m amodb.jobs.fleet_import_worker
+  --serve``), which kills and replaces a worker whose job exceeds
+  ``PREVIEW_TIMEOUT_SECONDS``. The pool size caps concurrent parses and
+  LibreOffice recalculations; further jobs wait for a free worker.
+* Each worker keeps its own LibreOffice user profile, initialised when the
+  worker starts, so recalculations reuse a warm profile instead of building
+  one per upload, and never contend for the default profile. Every
+  recalculation is bounded by ``RECALC_TIMEOUT_SECONDS``.
+* The worker returns the table as JSON lines; the job thread maps, validates
+  and stages the rows through the caller's ``stage`` callback, then marks the
+  session ``ready`` (or ``failed`` with the HTTP status and detail to report).
+
+Endpoints wait briefly with ``settle`` and otherwise answer ``202`` so the
+client polls the session. Jobs live only in this process, which stamps
+``heartbeat_at`` on its queued and running sessions every
+``PREVIEW_HEARTBEAT_SECONDS``. A session whose heartbeat is older than
+``PREVIEW_STALL_SECONDS`` has lost its job and is failed with 504 by
+``fail_stalled`` rather than polled until it expires; a long wait for a free
+worker keeps beating and is left alone. Jobs move a session out of
+``running`` with a conditional UPDATE, so a session already failed as stalled
+is never turned back into ``ready``.
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+import importlib
+from io import BytesIO
+import json
+import logging
+import numbers
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Any, Callable, Iterator, Optional
+from uuid import uuid4
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from ...database import WriteSessionLocal
+from ... import worker_pool as sandbox
+from . import models, ocr as ocr_service
+
+logger = logging.getLogger(__name__)
+
+WORKER_NAME = "Import"
+WORKER_POOL_SIZE = max(1, min(int(os.getenv("FLEET_IMPORT_WORKERS", "2")), 16))
+WORKER_MAX_JOBS = max(1, int(os.getenv("FLEET_IMPORT_WORKER_MAX_JOBS", "100")))
+# 0 applies no address-space limit; LibreOffice inherits whatever is set here.
+WORKER_MEMORY_MB = max(0, int(os.getenv("FLEET_IMPORT_WORKER_MEMORY_MB", "0") or "0"))
+MAX_PENDING_JOBS = max(1, int(os.getenv("FLEET_IMPORT_MAX_PENDING", "20")))
+PREVIEW_TIMEOUT_SECONDS = int(os.getenv("FLEET_IMPORT_PREVIEW_TIMEOUT_SECONDS", "300"))
+RECALC_TIMEOUT_SECONDS = int(os.getenv("FLEET_IMPORT_RECALC_TIMEOUT_SECONDS", "120"))
+PREVIEW_WAIT_SECONDS = float(os.getenv("FLEET_IMPORT_PREVIEW_WAIT_SECONDS", "2"))
+PREVIEW_HEARTBEAT_SECONDS = max(1.0, float(os.getenv("FLEET_IMPORT_PREVIEW_HEARTBEAT_SECONDS", "30")))
+# A queued or running preview whose heartbeat is this old has lost its job
+# (shutdown, crash or redeploy). Never fewer than three missed heartbeats.
+PREVIEW_STALL_SECONDS = max(
+    3 * PREVIEW_HEARTBEAT_SECONDS,
+    float(os.getenv("FLEET_IMPORT_PREVIEW_STALL_SECONDS", "120")),
+)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+EXCEL_SUFFIXES = (".xlsx", ".xlsm", ".xls")
+
+
+class ImportPreviewError(Exception):
+    """A preview failure to report to the client with ``status_code``."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+
+def _pandas():
+    try:
+        import pandas as pd  # type: ignore
+    except ImportError:  # pragma: no cover
+        raise ImportPreviewError(
+            500,
+            "pandas is required for import. Install with 'pip install pandas openpyxl'.",
+        )
+    return pd
+
+
+def _plain(value: Any, *, missing: Any = float("nan")) -> Any:
+    """JSON-ready cell value; NaN/NaT become ``missing``, ``None`` stays ``None``."""
+    if value is None:
+        return None
+    pd = _pandas()
+    try:
+        if pd.isna(value):
+            return missing
+    except (TypeError, ValueError):
+        pass
+    if hasattr(value, "item") and callable(value.item):
+        try:
+            value = value.item()
+        except Exception:  # pragma: no cover - defensive
+            pass
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    return str(value)
+
+
+_LIBREOFFICE_PROFILE: Optional[Path] = None
+
+
+def _libreoffice_profile() -> Path:
+    """This worker's LibreOffice user profile, kept for the worker's lifetime."""
+    global _LIBREOFFICE_PROFILE
+    if _LIBREOFFICE_PROFILE is None:
+        _LIBREOFFICE_PROFILE = Path(tempfile.mkdtemp(prefix="amodb-soffice-"))
+        atexit.register(shutil.rmtree, _LIBREOFFICE_PROFILE, True)
+    return _LIBREOFFICE_PROFILE
+
+
+def _libreoffice_command(*args: str) -> list[str]:
+    executable = shutil.which("soffice")
+    if not executable:
+        raise RuntimeError("LibreOffice (soffice) is not installed.")
+    return [
+        executable,
+        f"-env:UserInstallation={_libreoffice_profile().as_uri()}",
+        "--headless",
+        "--norestore",
+        "--nolockcheck",
+        *args,
+    ]
+
+
+def recalculate_with_libreoffice(content: bytes, suffix: str) -> bytes:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_path = Path(tmpdir) / f"input{suffix}"
+        input_path.write_bytes(content)
+        command = _libreoffice_command("--convert-to", "xlsx", "--outdir", tmpdir, str(input_path))
+        try:
+            result = subprocess.run(
+                command,
+                capture_output=True,
+                text=True,
+                check=False,
+                timeout=RECALC_TIMEOUT_SECONDS,
+            )
+        except subprocess.TimeoutExpired as exc:
+            raise RuntimeError(
+                f"LibreOffice recalculation exceeded {RECALC_TIMEOUT_SECONDS} seconds."
+            ) from exc
+        if result.returncode != 0:
+            stderr = result.stderr.strip()
+            stdout = result.stdout.strip()
+            message = stderr or stdout or "Unknown LibreOffice error."
+            raise RuntimeError(f"LibreOffice recalculation failed: {message}")
+        output_path = Path(tmpdir) / f"{input_path.stem}.xlsx"
+        if not output_path.exists():
+            raise RuntimeError("LibreOffice did not produce a recalculated workbook.")
+        return output_path.read_bytes()
+
+
+def _read_frame(reader: Callable[[BytesIO], Any], content: bytes, filename: Optional[str]):
+    try:
+        return reader(BytesIO(content))
+    except ImportError as exc:
+        raise ImportPreviewError(500, str(exc)) from exc
+    except Exception as exc:
+        raise ImportPreviewError(
+            400, f"Uploaded file '{filename}' could not be read: {exc}"
+        ) from exc
+
+
+def _check_frame(df, filename: Optional[str], base_columns: Optional[list]) -> list:
+    if df.empty:
+        raise ImportPreviewError(400, f"Uploaded file '{filename}' contains no data.")
+    columns = list(df.columns)
+    if base_columns is not None and columns != base_columns:
+        raise ImportPreviewError(
+            400,
+            "All uploaded files must use identical column headers. "
+            f"File '{filename}' does not match the first file.",
+        )
+    return columns
+
+
+def _formula_discrepancies(pd, df, content: bytes, ext: str) -> tuple[list, dict]:
+    """Compare formula cells' cached values with a recalculated workbook."""
+    openpyxl_spec = importlib.util.find_spec("openpyxl")
+    if not openpyxl_spec:
+        raise ImportPreviewError(500, "openpyxl is required for Excel formula checks.")
+    openpyxl = importlib.import_module("openpyxl")
+    workbook = openpyxl.load_workbook(BytesIO(content), data_only=False)
+    sheet = workbook.active
+    recalc_df = None
+    evaluator = None
+
+    try:
+        recalc_df = pd.read_excel(BytesIO(recalculate_with_libreoffice(content, ext)))
+    except Exception:
+        xlcalculator_spec = importlib.util.find_spec("xlcalculator")
+        if xlcalculator_spec:
+            xlcalculator = importlib.import_module("xlcalculator")
+            compiler = xlcalculator.ModelCompiler()
+            with tempfile.TemporaryDirectory() as tmpdir:
+                input_path = Path(tmpdir) / f"input{ext}"
+                input_path.write_bytes(content)
+                model = compiler.read_and_parse_archive(str(input_path))
+            evaluator = xlcalculator.Evaluator(model)
+
+    def is_formula(cell: Any) -> bool:
+        if cell.data_type == "f":
+            return True
+        return isinstance(cell.value, str) and cell.value.startswith("=")
+
+    def get_recalculated_value(cell: Any) -> tuple[Any, str]:
+        if recalc_df is not None:
+            row_idx = cell.row - 2
+            col_idx = cell.column - 1
+            if row_idx < 0 or col_idx < 0:
+                return None, "high"
+            if row_idx >= len(recalc_df.index):
+                return None, "high"
+            if col_idx >= len(recalc_df.columns):
+                return None, "high"
+            return recalc_df.iat[row_idx, col_idx], "high"
+        if evaluator:
+            sheet_name = sheet.title.replace("'", "''")
+            reference = f"'{sheet_name}'!{cell.coordinate}"
+            try:
+                return evaluator.evaluate(reference), "medium"
+            except Exception:
+                return None, "low"
+        return None, "low"
+
+    discrepancies: list[dict] = []
+    proposals: dict[int, list] = {}
+    for row in sheet.iter_rows(min_row=2):
+        for cell in row:
+            if not is_formula(cell):
+                continue
+            row_number = cell.row
+            col_index = cell.column - 1
+            if col_index < 0 or col_index >= len(df.columns):
+                continue
+            if row_number - 2 >= len(df.index):
+                continue
+            column_name = str(df.columns[col_index])
+            a_value = df.iat[row_number - 2, col_index]
+            b_value, confidence = get_recalculated_value(cell)
+            if pd.isna(a_value) and pd.isna(b_value):
+                continue
+            if a_value == b_value:
+                continue
+            delta = None
+            if (
+                isinstance(a_value, numbers.Number)
+                and isinstance(b_value, numbers.Number)
+                and not (pd.isna(a_value) or pd.isna(b_value))
+            ):
+                delta = b_value - a_value
+            a_value, b_value = _plain(a_value, missing=None), _plain(b_value, missing=None)
+            discrepancies.append(
+                {
+                    "cell_address": cell.coordinate,
+                    "row_number": row_number,
+                    "column_name": column_name,
+                    "value_a": a_value,
+                    "value_b": b_value,
+                    "delta": _plain(delta, missing=None),
+                    "confidence": confidence,
+                }
+            )
+            proposals.setdefault(row_number, []).append(
+                {
+                    "cell_address": cell.coordinate,
+                    "column_name": column_name,
+                    "current_value": a_value,
+                    "proposed_value": b_value,
+                    "confidence": confidence,
+                }
+            )
+    return discrepancies, proposals
+
+
+def _table_payload(df, columns: list, **metadata: Any) -> tuple[dict[str, Any], bytes]:
+    body = "\n".join(
+        json.dumps([_plain(value) for value in values])
+        for values in df.itertuples(index=False, name=None)
+    )
+    return (
+        {"columns": [_plain(column, missing=None) for column in columns], "rows": len(df.index), **metadata},
+        body.encode("utf-8"),
+    )
+
+
+def parse_aircraft_uploads(files: list[tuple[Optional[str], bytes]]) -> tuple[dict[str, Any], bytes]:
+    pd = _pandas()
+    ocr_info: dict[str, Any] | None = None
+    dataframes: list[Any] = []
+    base_columns: list | None = None
+    formula_source: tuple[bytes, str] | None = None
+
+    for filename, content in files:
+        file_type = ocr_service.detect_file_type(content, filename)
+        ext = Path(filename or "").suffix.lower()
+        ocr_info = None
+
+        if file_type == "csv":
+            df = _read_frame(pd.read_csv, content, filename)
+        elif file_type == "excel" and ext in EXCEL_SUFFIXES:
+            df = _read_frame(pd.read_excel, content, filename)
+        elif file_type in ["pdf", "image"]:
+            try:
+                ocr_table = ocr_service.extract_table_from_bytes(content, file_type)
+            except ocr_service.OCRDependencyError as exc:  # pragma: no cover
+                raise ImportPreviewError(400, str(exc)) from exc
+            except ValueError as exc:
+                raise ImportPreviewError(400, str(exc)) from exc
+            df = pd.DataFrame(ocr_table.rows, columns=ocr_table.headers)
+            ocr_info = {
+                "confidence": ocr_table.confidence,
+                "samples": ocr_table.samples,
+                "text": ocr_table.text,
+                "file_type": file_type,
+            }
+        else:
+            raise ImportPreviewError(
+                400, "Unsupported file type. Upload CSV, XLSX, XLSM, XLS, PDF, or an image."
+            )
+
+        base_columns = _check_frame(df, filename, base_columns)
+        dataframes.append(df)
+        if len(files) == 1 and file_type == "excel" and ext in EXCEL_SUFFIXES and content:
+            formula_source = (content, ext)
+
+    df = pd.concat(dataframes, ignore_index=True)
+    discrepancies: list[dict] = []
+    proposals: dict[int, list] = {}
+    if formula_source is not None:
+        discrepancies, proposals = _formula_discrepancies(pd, df, *formula_source)
+
+    return _table_payload(
+        df,
+        base_columns or list(df.columns),
+        ocr_info=ocr_info,
+        formula_discrepancies=discrepancies,
+        row_formula_proposals=proposals,
+    )
+
+
+def parse_component_uploads(files: list[tuple[Optional[str], bytes]]) -> tuple[dict[str, Any], bytes]:
+    pd = _pandas()
+    dataframes: list[Any] = []
+    base_columns: list | None = None
+
+    for filename, content in files:
+        ext = Path(filename or "").suffix.lower()
+        if ext in [".csv", ".txt"]:
+            df = _read_frame(pd.read_csv, content, filename)
+        elif ext in EXCEL_SUFFIXES:
+            df = _read_frame(pd.read_excel, content, filename)
+        elif ext == ".pdf":
+            raise ImportPreviewError(
+                501,
+                "PDF ingestion for components not yet implemented. Use CSV/Excel for now.",
+            )
+        else:
+            raise ImportPreviewError(
+                400, f"Unsupported file type '{ext}'. Upload CSV, XLSX, XLSM or XLS."
+            )
+        base_columns = _check_frame(df, filename, base_columns)
+        dataframes.append(df)
+
+    df = pd.concat(dataframes, ignore_index=True)
+    return _table_payload(df, base_columns or list(df.columns))
+
+
+_PARSERS: dict[str, Callable[[list[tuple[Optional[str], bytes]]], tuple[dict[str, Any], bytes]]] = {
+    "aircraft": parse_aircraft_uploads,
+    "components": parse_component_uploads,
+}
+
+
+def _error_payload(status_code: int, detail: str) -> dict[str, Any]:
+    return {"error": {"status_code": status_code, "detail": detail}}
+
+
+def _serve_job(header: dict[str, Any], body: bytes) -> tuple[dict[str, Any], bytes | None]:
+    action = str(header.get("action") or "")
+    parse = _PARSERS.get(action)
+    if parse is None:
+        return _error_payload(500, f"Unsupported import action {action!r}"), None
+    try:
+        frame = sandbox.read_frame(BytesIO(body))
+        if frame is None:
+            return _error_payload(500, "Import preview request was truncated."), None
+        manifest, blob = frame
+        files: list[tuple[Optional[str], bytes]] = []
+        offset = 0
+        for entry in manifest.get("files") or []:
+            size = int(entry["size"])
+            files.append((entry.get("filename"), blob[offset:offset + size]))
+            offset += size
+        return parse(files)
+    except ImportPreviewError as exc:
+        return _error_payload(exc.status_code, exc.detail), None
+    except Exception:
+        logger.exception("Import preview worker failed")
+        return _error_payload(500, "Import preview failed."), None
+
+
+def _warm_worker() -> None:
+    try:
+        import openpyxl  # noqa: F401
+        import pandas  # noqa: F401
+    except ImportError:
+        pass
+    # The first start of a LibreOffice profile is by far its slowest; pay it
+    # now rather than in the first preview this worker serves.
+    try:
+        subprocess.run(
+            _libreoffice_command("--terminate_after_init"),
+            capture_output=True,
+            check=False,
+            timeout=RECALC_TIMEOUT_SECONDS,
+        )
+    except (RuntimeError, OSError, subprocess.TimeoutExpired):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# API side
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class ParsedImport:
+    columns: list
+    ocr_info: Optional[dict[str, Any]]
+    formula_discrepancies: list[dict[str, Any]]
+    row_formula_proposals: dict[int, list[dict[str, Any]]]
+    body: bytes
+
+    def records(self) -> Iterator[dict[str, Any]]:
+        """Uploaded rows, in file order, keyed by column header."""
+        for line in self.body.splitlines():
+            if line:
+                yield dict(zip(self.columns, json.loads(line)))
+
+
+Stage = Callable[[Session, models.AircraftImportPreviewSession, ParsedImport], None]
+
+_POOL: sandbox.SandboxWorkerPool | None = None
+_JOBS: ThreadPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+_PENDING = threading.BoundedSemaphore(MAX_PENDING_JOBS)
+# Previews queued or running in this process, with the session factory their
+# job writes through; the heartbeat thread keeps them from looking stalled.
+_LIVE: dict[str, Callable[[], Session]] = {}
+_LIVE_LOCK = threading.Lock()
+_HEARTBEAT: threading.Thread | None = None
+_HEARTBEAT_STOP = threading.Event()
+
+
+def _worker_pool() -> sandbox.SandboxWorkerPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = sandbox.SandboxWorkerPool(
+                "amodb.jobs.fleet_import_worker",
+                size=WORKER_POOL_SIZE,
+                max_jobs=WORKER_MAX_JOBS,
+                name=WORKER_NAME,
+            )
+        return _POOL
+
+
+def _job_executor() -> ThreadPoolExecutor:
+    global _JOBS
+    with _POOL_LOCK:
+        if _JOBS is None:
+            _JOBS = ThreadPoolExecutor(max_workers=WORKER_POOL_SIZE, thread_name_prefix="fleet-import-preview")
+        return _JOBS
+
+
+def _beat() -> None:
+    """Stamp ``heartbeat_at`` on every preview this process still owns."""
+    with _LIVE_LOCK:
+        owned: dict[Callable[[], Session], list[str]] = {}
+        for preview_id, session_factory in _LIVE.items():
+            owned.setdefault(session_factory, []).append(preview_id)
+    session = models.AircraftImportPreviewSession
+    for session_factory, preview_ids in owned.items():
+        db = session_factory()
+        try:
+            db.execute(
+                update(session)
+                .where(
+                    session.preview_id.in_(preview_ids),
+                    session.status.in_((STATUS_QUEUED, STATUS_RUNNING)),
+                )
+                .values(heartbeat_at=datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            logger.warning("Import preview heartbeat failed", exc_info=True)
+            db.rollback()
+        finally:
+            db.close()
+
+
+def _heartbeat_loop() -> None:
+    while not _HEARTBEAT_STOP.wait(PREVIEW_HEARTBEAT_SECONDS):
+        _beat()
+
+
+def _ensure_heartbeat() -> None:
+    global _HEARTBEAT
+    with _POOL_LOCK:
+        if _HEARTBEAT is None or not _HEARTBEAT.is_alive():
+            _HEARTBEAT_STOP.clear()
+            _HEARTBEAT = threading.Thread(target=_heartbeat_loop, name="fleet-import-heartbeat", daemon=True)
+            _HEARTBEAT.start()
+
+
+def start_worker_pool() -> None:
+    """Pre-start the import workers so the first preview does not pay for them."""
+    if os.getenv("FLEET_IMPORT_WORKER_PREWARM", "false").lower() in {"1", "true", "yes", "on"}:
+        threading.Thread(target=_worker_pool().warm, name="fleet-import-pool-warm", daemon=True).start()
+
+
+def stop_worker_pool() -> None:
+    global _POOL, _JOBS, _HEARTBEAT
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+        jobs, _JOBS = _JOBS, None
+        heartbeat, _HEARTBEAT = _HEARTBEAT, None
+    _HEARTBEAT_STOP.set()
+    if heartbeat is not None:
+        heartbeat.join(timeout=2.0)
+    if jobs is not None:
+        jobs.shutdown(wait=False, cancel_futures=True)
+    if pool is not None:
+        pool.close()
+
+
+def worker_pool_stats() -> dict[str, Any]:
+    with _POOL_LOCK:
+        pool = _POOL
+    if pool is None:
+        return {"size": WORKER_POOL_SIZE, "live": 0, "idle": 0, "busy": 0, "waiting": 0}
+    return pool.stats()
+
+
+def _parse(import_type: str, uploads: list[tuple[Optional[str], bytes]]) -> ParsedImport:
+    request = BytesIO()
+    sandbox.write_frame(
+        request,
+        {"files": [{"filename": filename, "size": len(content)} for filename, content in uploads]},
+        b"".join(content for _filename, content in uploads),
+    )
+    try:
+        header, body = _worker_pool().run(import_type, request.getvalue(), timeout=PREVIEW_TIMEOUT_SECONDS)
+    except sandbox.SandboxWorkerError as exc:
+        if exc.timed_out:
+            raise ImportPreviewError(
+                504, f"Import preview exceeded {PREVIEW_TIMEOUT_SECONDS} seconds."
+            ) from exc
+        raise ImportPreviewError(500, "The import worker stopped unexpectedly.") from exc
+    error = header.get("error")
+    if error:
+        raise ImportPreviewError(
+            int(error.get("status_code") or 500),
+            str(error.get("detail") or "Import preview failed."),
+        )
+    return ParsedImport(
+        columns=list(header.get("columns") or []),
+        ocr_info=header.get("ocr_info"),
+        formula_discrepancies=header.get("formula_discrepancies") or [],
+        row_formula_proposals={
+            int(row_number): proposals
+            for row_number, proposals in (header.get("row_formula_proposals") or {}).items()
+        },
+        body=body,
+    )
+
+
+def _run(
+    preview_id: str,
+    import_type: str,
+    uploads: list[tuple[Optional[str], bytes]],
+    stage: Stage,
+    session_factory: Callable[[], Session],
+) -> None:
+    session = models.AircraftImportPreviewSession
+    db = session_factory()
+    try:
+        if not _transition(db, preview_id, STATUS_QUEUED, status=STATUS_RUNNING, started_at=datetime.now(timezone.utc)):
+            db.rollback()
+            return
+        db.commit()
+        preview = db.get(session, preview_id)
+        error: Optional[dict[str, Any]] = None
+        try:
+            stage(db, preview, _parse(import_type, uploads))
+            db.flush()
+        except ImportPreviewError as exc:
+            db.rollback()
+            error = {"status_code": exc.status_code, "detail": exc.detail}
+        except Exception:
+            logger.exception("Import preview %s failed", preview_id)
+            db.rollback()
+            error = {"status_code": 500, "detail": "Import preview failed."}
+        outcome = {"status": STATUS_READY} if error is None else {"status": STATUS_FAILED, "error": error}
+        if _transition(db, preview_id, STATUS_RUNNING, completed_at=datetime.now(timezone.utc), **outcome):
+            db.commit()
+        else:
+            # Failed as stalled while this job ran: the client was already
+            # told to upload again, so drop the staged rows.
+            logger.warning("Import preview %s finished after it was failed as stalled", preview_id)
+            db.rollback()
+    finally:
+        db.close()
+        with _LIVE_LOCK:
+            _LIVE.pop(preview_id, None)
+        _PENDING.release()
+
+
+def _transition(db: Session, preview_id: str, expected: str, **values: Any) -> bool:
+    """Apply ``values`` only while the session is still ``expected``."""
+    session = models.AircraftImportPreviewSession
+    result = db.execute(
+        update(session)
+        .where(session.preview_id == preview_id, session.status == expected)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def submit(
+    db: Session,
+    import_type: str,
+    uploads: list[tuple[Optional[str], bytes]],
+    *,
+    stage: Stage,
+    context: Optional[dict[str, Any]] = None,
+    user_id: Optional[str] = None,
+    session_factory: Callable[[], Session] = WriteSessionLocal,
+) -> tuple[str, Future]:
+    """Queue a preview of ``uploads``; returns its id and the job's future.
+
+    Blocks on the database, so call it from a worker thread. Raises
+    ``ImportPreviewError`` (429) when ``MAX_PENDING_JOBS`` previews are
+    already queued or running in this process.
+    """
+    if not _PENDING.acquire(blocking=False):
+        raise ImportPreviewError(
+            429, "Too many import previews are being prepared. Try again shortly."
+        )
+    preview_id = str(uuid4())
+    try:
+        db.add(
+            models.AircraftImportPreviewSession(
+                preview_id=preview_id,
+                import_type=import_type,
+                status=STATUS_QUEUED,
+                total_rows=0,
+                context=context,
+                created_by_user_id=user_id,
+                heartbeat_at=datetime.now(timezone.utc),
+            )
+        )
+        db.commit()
+        with _LIVE_LOCK:
+            _LIVE[preview_id] = session_factory
+        _ensure_heartbeat()
+        job = _job_executor().submit(_run, preview_id, import_type, uploads, stage, session_factory)
+    except BaseException:
+        with _LIVE_LOCK:
+            _LIVE.pop(preview_id, None)
+        _PENDING.release()
+        raise
+    return preview_id, job
+
+
+def fail_stalled(db: Session, preview_id: Optional[str] = None) -> int:
+    """Mark previews whose job is gone as failed (504); returns how many.
+
+    A preview is stalled once its heartbeat (its creation time for sessions
+    written before heartbeats) is older than ``PREVIEW_STALL_SECONDS``.
+    Limited to ``preview_id`` when given. The caller commits.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=PREVIEW_STALL_SECONDS)
+    query = db.query(models.AircraftImportPreviewSession).filter(
+        models.AircraftImportPreviewSession.status.in_((STATUS_QUEUED, STATUS_RUNNING)),
+        func.coalesce(
+            models.AircraftImportPreviewSession.heartbeat_at,
+            models.AircraftImportPreviewSession.created_at,
+        )
+        < cutoff,
+    )
+    if preview_id is not None:
+        query = query.filter(models.AircraftImportPreviewSession.preview_id == preview_id)
+    return query.update(
+        {
+            models.AircraftImportPreviewSession.status: STATUS_FAILED,
+            models.AircraftImportPreviewSession.error: {
+                "status_code": 504,
+                "detail": "Import preview did not finish. Upload the files again.",
+            },
+            models.AircraftImportPreviewSession.completed_at: datetime.now(timezone.utc),
+        },
+        synchronize_session=False,
+    )
+
+
+async def settle(job: Future, timeout: Optional[float] = None) -> bool:
+    """Await ``job`` for up to ``timeout`` seconds without blocking the loop."""
+    done, _pending = await asyncio.wait(
+        {asyncio.wrap_future(job)},
+        timeout=PREVIEW_WAIT_SECONDS if timeout is None else timeout,
+    )
+    return bool(done)
+
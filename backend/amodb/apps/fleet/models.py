@@ -626,6 +626,55 @@ class AircraftUsage(Base):
         return f"<AircraftUsage id={self.id} aircraft={self.aircraft_serial_number} date={self.date} techlog={self.techlog_no}>"
 
 
+class AircraftUsageRollup(Base):
+    """
+    Per-aircraft utilisation rollup maintained from ``aircraft_usage`` writes.
+
+    Holds the latest ledger entry's totals and the hours/cycles logged in
+    the 7/30/90 days ending on ``window_end`` (entries dated on or after
+    ``window_end - (N - 1)``), so fleet planning reads one row per aircraft
+    instead of the whole usage history. Rows are refreshed in the flush that
+    posts, corrects or deletes usage; see ``fleet.usage_rollup``.
+    """
+
+    __tablename__ = "aircraft_usage_rollups"
+
+    __table_args__ = (
+        Index("ix_aircraft_usage_rollups_amo", "amo_id", "aircraft_serial_number"),
+    )
+
+    aircraft_serial_number = Column(
+        String(50),
+        ForeignKey("aircraft.serial_number", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    amo_id = Column(String(36), ForeignKey("amos.id", ondelete="CASCADE"), nullable=False)
+
+    latest_usage_id = Column(Integer, nullable=True)
+    latest_date = Column(Date, nullable=True)
+    latest_techlog_no = Column(String(64), nullable=True)
+    latest_ttaf_after = Column(Float, nullable=True)
+    latest_tca_after = Column(Float, nullable=True)
+
+    window_end = Column(Date, nullable=False)
+    hours_7d = Column(Float, nullable=False, default=0.0)
+    cycles_7d = Column(Float, nullable=False, default=0.0)
+    hours_30d = Column(Float, nullable=False, default=0.0)
+    cycles_30d = Column(Float, nullable=False, default=0.0)
+    hours_90d = Column(Float, nullable=False, default=0.0)
+    cycles_90d = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    def __repr__(self) -> str:
+        return f"<AircraftUsageRollup aircraft={self.aircraft_serial_number} latest={self.latest_date} window_end={self.window_end}>"
+
+
 # ---------------------------------------------------------------------------
 # Configuration history events (install/remove/swap)
 # ---------------------------------------------------------------------------
@@ -949,11 +998,19 @@ class AircraftImportPreviewSession(Base):
     ocr_info = Column(JSON, nullable=True)
     formula_discrepancies = Column(JSON, nullable=True)
     context = Column(JSON, nullable=True)
+    # queued -> running -> ready | failed; ``error`` holds the HTTP status and
+    # detail of a failed preview.
+    status = Column(String(16), nullable=False, default="ready", server_default="ready")
+    error = Column(JSON, nullable=True)
     created_at = Column(
         DateTime(timezone=True),
         nullable=False,
         default=lambda: datetime.now(timezone.utc),
     )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    # Stamped periodically by the process that owns the queued or running job.
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
     created_by_user_id = Column(
         String(36),
         ForeignKey("users.id", ondelete="SET NULL"),
@@ -8,7 +8,7 @@ import math
 import numbers
 import os
 from pathlib import Path
-import subprocess
+import re
 import tempfile
 import time
 from typing import List, Dict, Any, Optional
@@ -23,10 +23,12 @@ from fastapi import (
     UploadFile,
     File,
     Header,
+    Response,
 )
 from fastapi.responses import FileResponse
-from sqlalchemy import or_
+from sqlalchemy import or_, tuple_
 from sqlalchemy.orm import Session, selectinload
+from starlette.concurrency import run_in_threadpool
 
 from ...database import WriteSessionLocal, get_db
 from ...entitlements import require_module
@@ -35,12 +37,23 @@ from amodb.apps.accounts import services as account_services
 from amodb.apps.accounts import models as account_models
 from amodb.apps.audit import services as audit_services
 from amodb.apps.audit import schemas as audit_schemas
+from amodb.apps.maintenance_program import projection as due_projection
 from amodb.apps.reliability import models as reliability_models
 from amodb.apps.work import models as work_models
 from amodb.apps.work import schemas as work_schemas
 from amodb.apps.work import services as work_services
 from amodb.utils.identifiers import generate_uuid7
-from . import models, ocr as ocr_service, schemas, services
+from . import import_preview, models, schemas, services
+from .schemas import (
+    AIRCRAFT_SERIAL_PATTERN,
+    COMPONENT_SERIAL_PATTERN,
+    MAX_CALENDAR_MONTHS,
+    MAX_CYCLES,
+    MAX_HOURS,
+    MIN_VALID_DATE,
+    PART_NUMBER_PATTERN,
+    REGISTRATION_PATTERN,
+)
 
 # Roles allowed to manage aircraft, components, usage
 MANAGEMENT_ROLES = [
@@ -202,17 +215,20 @@ def _clamp_history_limit(limit: int) -> int:
 
 
 def _cleanup_expired_preview_sessions() -> None:
-    if PREVIEW_SESSION_TTL_HOURS <= 0:
-        return
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=PREVIEW_SESSION_TTL_HOURS)
     db = WriteSessionLocal()
     try:
-        deleted = (
-            db.query(models.AircraftImportPreviewSession)
-            .filter(models.AircraftImportPreviewSession.created_at < cutoff)
-            .delete(synchronize_session=False)
-        )
+        stalled = import_preview.fail_stalled(db)
+        deleted = 0
+        if PREVIEW_SESSION_TTL_HOURS > 0:
+            cutoff = datetime.now(timezone.utc) - timedelta(hours=PREVIEW_SESSION_TTL_HOURS)
+            deleted = (
+                db.query(models.AircraftImportPreviewSession)
+                .filter(models.AircraftImportPreviewSession.created_at < cutoff)
+                .delete(synchronize_session=False)
+            )
         db.commit()
+        if stalled:
+            logger.warning("Failed %s stalled import preview sessions", stalled)
         if deleted:
             logger.info(
                 "Deleted %s expired import preview sessions older than %s hours",
@@ -1559,6 +1575,20 @@ def create_usage_entry(
     _set_verification_status(usage, safety_confirmed)
 
     db.add(usage)
+    services.recalculate_usage_totals(
+        db,
+        serial_number,
+        usage.date,
+        usage.techlog_no,
+        amo_id=current_user.effective_amo_id,
+    )
+    due_projection.apply_usage_delta(
+        db,
+        amo_id=current_user.effective_amo_id,
+        aircraft_serial_number=serial_number,
+        hours_delta=float(usage.block_hours or 0.0),
+        cycles_delta=float(usage.cycles or 0.0),
+    )
     db.commit()
     db.refresh(usage)
     return usage
@@ -1640,6 +1670,14 @@ def update_usage_entry(
         amo_id=current_user.amo_id,
     )
 
+    # Moving an entry to another date can change which entry holds the
+    # aircraft's current totals, so it counts as a change of both.
+    moved = effective_date != usage.date
+    totals_changed = services.usage_totals_changed(usage, merged_data)
+    recalculate_from = min((usage.date, usage.techlog_no), (effective_date, merged_data["techlog_no"]))
+    hours_delta = float(merged_data["ttaf_after"] or 0.0) - float(usage.ttaf_after or 0.0)
+    cycles_delta = float(merged_data["tca_after"] or 0.0) - float(usage.tca_after or 0.0)
+
     for field, value in merged_data.items():
         setattr(usage, field, value)
 
@@ -1648,6 +1686,20 @@ def update_usage_entry(
         _set_verification_status(usage, True)
 
     db.add(usage)
+    if totals_changed:
+        services.recalculate_usage_totals(
+            db,
+            usage.aircraft_serial_number,
+            *recalculate_from,
+            amo_id=current_user.amo_id,
+        )
+    due_projection.apply_usage_delta(
+        db,
+        amo_id=current_user.amo_id,
+        aircraft_serial_number=usage.aircraft_serial_number,
+        hours_delta=hours_delta or float(moved),
+        cycles_delta=cycles_delta or float(moved),
+    )
     db.commit()
     db.refresh(usage)
     return usage
@@ -1676,6 +1728,20 @@ def delete_usage_entry(
         raise HTTPException(status_code=404, detail="Usage entry not found")
 
     db.delete(usage)
+    services.recalculate_usage_totals(
+        db,
+        usage.aircraft_serial_number,
+        usage.date,
+        usage.techlog_no,
+        amo_id=current_user.amo_id,
+    )
+    due_projection.apply_usage_delta(
+        db,
+        amo_id=current_user.amo_id,
+        aircraft_serial_number=usage.aircraft_serial_number,
+        hours_delta=-float(usage.block_hours or 0.0),
+        cycles_delta=-float(usage.cycles or 0.0),
+    )
     db.commit()
     return
 
@@ -1979,39 +2045,6 @@ def _coerce_import_value(value: Any) -> Any:
     return value
 
 
-def _recalculate_excel_with_libreoffice(
-    content: bytes, suffix: str
-) -> bytes:
-    with tempfile.TemporaryDirectory() as tmpdir:
-        input_path = Path(tmpdir) / f"input{suffix}"
-        input_path.write_bytes(content)
-        command = [
-            "soffice",
-            "--headless",
-            "--convert-to",
-            "xlsx",
-            "--outdir",
-            tmpdir,
-            str(input_path),
-        ]
-        result = subprocess.run(
-            command, capture_output=True, text=True, check=False
-        )
-        if result.returncode != 0:
-            stderr = result.stderr.strip()
-            stdout = result.stdout.strip()
-            message = stderr or stdout or "Unknown LibreOffice error."
-            raise RuntimeError(
-                f"LibreOffice recalculation failed: {message}"
-            )
-        output_path = Path(tmpdir) / f"{input_path.stem}.xlsx"
-        if not output_path.exists():
-            raise RuntimeError(
-                "LibreOffice did not produce a recalculated workbook."
-            )
-        return output_path.read_bytes()
-
-
 def _build_aircraft_payload(
     row: Dict[str, Any], colmap: Dict[str, str | None]
 ) -> Dict[str, Any]:
@@ -2595,232 +2628,152 @@ def delete_import_template(
 # ---------------------------------------------------------------------------
 
 
-@router.post(
-    "/import/preview",
-    tags=["aircraft"],
-    summary="Preview aircraft import with mapping and validation",
-    response_model=schemas.AircraftImportPreviewResponse,
-)
-async def preview_aircraft_import(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: account_models.User = Depends(
-        require_roles(*MANAGEMENT_ROLES)
-    ),
-):
-    """
-    Preview bulk import / update aircraft from CSV/Excel.
-
-    Returns normalised rows, column mapping, validation issues and summary counts
-    for new/update/invalid rows.
-    """
-    try:
-        import pandas as pd  # type: ignore
-    except ImportError:  # pragma: no cover
+def _require_import_dependencies() -> None:
+    if importlib.util.find_spec("pandas") is None:  # pragma: no cover
         raise HTTPException(
             status_code=500,
             detail="pandas is required for import. Install with 'pip install pandas openpyxl'.",
         )
 
+
+async def _read_import_uploads(
+    files: Optional[List[UploadFile]],
+    file: Optional[UploadFile],
+    *,
+    missing_detail: str,
+) -> List[tuple[Optional[str], bytes]]:
     uploads = files or ([file] if file else [])
     if not uploads:
-        raise HTTPException(
-            status_code=400,
-            detail="No files uploaded. Upload up to 10 CSV/Excel/PDF/image files.",
-        )
+        raise HTTPException(status_code=400, detail=missing_detail)
     if len(uploads) > 10:
         raise HTTPException(
             status_code=400,
             detail="Upload up to 10 files at a time.",
         )
+    return [(upload.filename, await upload.read()) for upload in uploads]
 
-    ocr_infos: List[Dict[str, Any]] = []
-    dataframes: List[Any] = []
-    base_columns: List[str] | None = None
-    single_file_type: str | None = None
-    single_ext: str | None = None
-    single_content: bytes | None = None
-
-    for upload in uploads:
-        content = await upload.read()
-        buffer = BytesIO(content)
-        file_type = ocr_service.detect_file_type(content, upload.filename)
-        ext = Path(upload.filename or "").suffix.lower()
-        ocr_info: Dict[str, Any] | None = None
-
-        if file_type == "csv":
-            df = pd.read_csv(buffer)
-        elif file_type == "excel" and ext in [".xlsx", ".xlsm", ".xls"]:
-            df = pd.read_excel(buffer)
-        elif file_type in ["pdf", "image"]:
-            try:
-                ocr_table = ocr_service.extract_table_from_bytes(content, file_type)
-            except ocr_service.OCRDependencyError as exc:  # pragma: no cover
-                raise HTTPException(status_code=400, detail=str(exc)) from exc
-            except ValueError as exc:
-                raise HTTPException(status_code=400, detail=str(exc)) from exc
-            df = pd.DataFrame(ocr_table.rows, columns=ocr_table.headers)
-            ocr_info = {
-                "confidence": ocr_table.confidence,
-                "samples": ocr_table.samples,
-                "text": ocr_table.text,
-                "file_type": file_type,
-            }
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    "Unsupported file type. Upload CSV, XLSX, XLSM, XLS, PDF, or an image."
-                ),
-            )
 
-        if df.empty:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Uploaded file '{upload.filename}' contains no data.",
-            )
+def _submit_import_preview(
+    db: Session,
+    import_type: str,
+    uploads: List[tuple[Optional[str], bytes]],
+    *,
+    stage: import_preview.Stage,
+    context: Optional[Dict[str, Any]],
+    current_user: account_models.User,
+):
+    try:
+        return import_preview.submit(
+            db,
+            import_type,
+            uploads,
+            stage=stage,
+            context={**(context or {}), "amo_id": current_user.amo_id},
+            user_id=current_user.id,
+        )
+    except import_preview.ImportPreviewError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
 
-        columns = list(df.columns)
-        if base_columns is None:
-            base_columns = columns
-        elif columns != base_columns:
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    "All uploaded files must use identical column headers. "
-                    f"File '{upload.filename}' does not match the first file."
-                ),
-            )
 
-        dataframes.append(df)
-        if ocr_info:
-            ocr_infos.append(ocr_info)
+def _get_import_preview_session(
+    db: Session,
+    preview_id: str,
+    import_type: str,
+    current_user: account_models.User,
+    serial_number: Optional[str] = None,
+) -> models.AircraftImportPreviewSession:
+    # The job updates the session from another session: always re-read it.
+    session = db.get(
+        models.AircraftImportPreviewSession, preview_id, populate_existing=True
+    )
+    # Only the user who uploaded the files, in the same AMO, may poll them.
+    if (
+        not session
+        or session.import_type != import_type
+        or session.created_by_user_id != current_user.id
+        or (session.context or {}).get("amo_id") != current_user.amo_id
+    ):
+        raise HTTPException(status_code=404, detail="Preview not found")
+    context_serial = (session.context or {}).get("serial_number")
+    if serial_number is not None and context_serial and context_serial != serial_number:
+        raise HTTPException(status_code=404, detail="Preview not found")
+    return session
 
-        if len(uploads) == 1:
-            single_file_type = file_type
-            single_ext = ext
-            single_content = content
 
-    df = pd.concat(dataframes, ignore_index=True)
-    colmap = _map_aircraft_columns(base_columns or list(df.columns))
-    if not colmap["serial_number"] or not colmap["registration"]:
+def _import_preview_state(
+    db: Session,
+    session: models.AircraftImportPreviewSession,
+    response: Response,
+    serialize_row,
+) -> Dict[str, Any]:
+    """
+    Preview body with the first page of staged rows once ready; 202 without
+    rows while the job is queued or running. A failed job, or one that has
+    stalled, is raised with the status and detail it recorded.
+    """
+    if session.status in (import_preview.STATUS_QUEUED, import_preview.STATUS_RUNNING):
+        if import_preview.fail_stalled(db, session.preview_id):
+            db.commit()
+            db.refresh(session)
+    if session.status == import_preview.STATUS_FAILED:
+        error = session.error or {}
         raise HTTPException(
-            status_code=400,
-            detail=(
-                "File must include at least aircraft serial/identifier (AIN) and "
-                "registration columns. Accepted examples: "
-                "AIN, serial_number, aircraft_id, registration, REG, AC REG."
-            ),
-        )
+            status_code=int(error.get("status_code") or 500),
+            detail=error.get("detail") or "Import preview failed.",
+        )
+    state: Dict[str, Any] = {
+        "preview_id": session.preview_id,
+        "status": session.status,
+        "total_rows": session.total_rows or 0,
+        "rows": [],
+        "column_mapping": session.column_mapping or {},
+        "summary": session.summary or {},
+    }
+    if session.status != import_preview.STATUS_READY:
+        response.status_code = status.HTTP_202_ACCEPTED
+        return state
+    rows = (
+        db.query(models.AircraftImportPreviewRow)
+        .filter(models.AircraftImportPreviewRow.preview_id == session.preview_id)
+        .order_by(models.AircraftImportPreviewRow.row_number.asc())
+        .limit(_clamp_preview_limit(DEFAULT_PREVIEW_PAGE_SIZE))
+        .all()
+    )
+    state["rows"] = [serialize_row(row) for row in rows]
+    return state
 
-    formula_discrepancies: List[Dict[str, Any]] = []
-    row_formula_proposals: Dict[int, List[Dict[str, Any]]] = {}
 
-    if (
-        len(uploads) == 1
-        and single_file_type == "excel"
-        and single_ext in [".xlsx", ".xlsm", ".xls"]
-        and single_content
-    ):
-        openpyxl_spec = importlib.util.find_spec("openpyxl")
-        if not openpyxl_spec:
-            raise HTTPException(
-                status_code=500,
-                detail="openpyxl is required for Excel formula checks.",
-            )
-        openpyxl = importlib.import_module("openpyxl")
-        workbook = openpyxl.load_workbook(
-            BytesIO(single_content), data_only=False
-        )
-        sheet = workbook.active
-        recalc_df = None
-        evaluator = None
+def _serialize_aircraft_preview_row(
+    row: models.AircraftImportPreviewRow,
+) -> Dict[str, Any]:
+    return {
+        "row_number": row.row_number,
+        "data": row.data,
+        "errors": row.errors or [],
+        "warnings": row.warnings or [],
+        "action": row.action,
+        "suggested_template": row.suggested_template,
+        "formula_proposals": row.formula_proposals or [],
+    }
 
-        try:
-            recalc_content = _recalculate_excel_with_libreoffice(
-                single_content, single_ext
-            )
-            recalc_df = pd.read_excel(BytesIO(recalc_content))
-        except Exception:
-            xlcalculator_spec = importlib.util.find_spec("xlcalculator")
-            if xlcalculator_spec:
-                xlcalculator = importlib.import_module("xlcalculator")
-                compiler = xlcalculator.ModelCompiler()
-                with tempfile.TemporaryDirectory() as tmpdir:
-                    input_path = Path(tmpdir) / f"input{single_ext}"
-                    input_path.write_bytes(single_content)
-                    model = compiler.read_and_parse_archive(str(input_path))
-                evaluator = xlcalculator.Evaluator(model)
-
-        def is_formula(cell: Any) -> bool:
-            if cell.data_type == "f":
-                return True
-            return isinstance(cell.value, str) and cell.value.startswith("=")
-
-        def get_recalculated_value(cell: Any) -> tuple[Any, str]:
-            if recalc_df is not None:
-                row_idx = cell.row - 2
-                col_idx = cell.column - 1
-                if row_idx < 0 or col_idx < 0:
-                    return None, "high"
-                if row_idx >= len(recalc_df.index):
-                    return None, "high"
-                if col_idx >= len(recalc_df.columns):
-                    return None, "high"
-                return recalc_df.iat[row_idx, col_idx], "high"
-            if evaluator:
-                sheet_name = sheet.title.replace("'", "''")
-                reference = f"'{sheet_name}'!{cell.coordinate}"
-                try:
-                    return evaluator.evaluate(reference), "medium"
-                except Exception:
-                    return None, "low"
-            return None, "low"
-
-        for row in sheet.iter_rows(min_row=2):
-            for cell in row:
-                if not is_formula(cell):
-                    continue
-                row_number = cell.row
-                col_index = cell.column - 1
-                if col_index < 0 or col_index >= len(df.columns):
-                    continue
-                if row_number - 2 >= len(df.index):
-                    continue
-                column_name = str(df.columns[col_index])
-                a_value = df.iat[row_number - 2, col_index]
-                b_value, confidence = get_recalculated_value(cell)
-                if pd.isna(a_value) and pd.isna(b_value):
-                    continue
-                if a_value == b_value:
-                    continue
-                delta = None
-                if (
-                    isinstance(a_value, numbers.Number)
-                    and isinstance(b_value, numbers.Number)
-                    and not (pd.isna(a_value) or pd.isna(b_value))
-                ):
-                    delta = b_value - a_value
-                discrepancy = {
-                    "cell_address": cell.coordinate,
-                    "row_number": row_number,
-                    "column_name": column_name,
-                    "value_a": a_value,
-                    "value_b": b_value,
-                    "delta": delta,
-                    "confidence": confidence,
-                }
-                formula_discrepancies.append(discrepancy)
-                row_formula_proposals.setdefault(row_number, []).append(
-                    {
-                        "cell_address": cell.coordinate,
-                        "column_name": column_name,
-                        "current_value": a_value,
-                        "proposed_value": b_value,
-                        "confidence": confidence,
-                    }
-                )
+
+def _stage_aircraft_preview(
+    db: Session,
+    session: models.AircraftImportPreviewSession,
+    parsed: import_preview.ParsedImport,
+) -> None:
+    """
+    Map, validate and stage parsed aircraft rows on the preview session.
+    Runs on an import job thread.
+    """
+    colmap = _map_aircraft_columns(parsed.columns)
+    if not colmap["serial_number"] or not colmap["registration"]:
+        raise import_preview.ImportPreviewError(
+            400,
+            "File must include at least aircraft serial/identifier (AIN) and "
+            "registration columns. Accepted examples: "
+            "AIN, serial_number, aircraft_id, registration, REG, AC REG.",
+        )
 
     rows: List[Dict[str, Any]] = []
     serials: List[str] = []
@@ -2831,9 +2784,9 @@ async def preview_aircraft_import(
         .all()
     )
 
-    for idx, row in df.iterrows():
-        row_idx = int(idx) + 2
-        payload = _build_aircraft_payload(row.to_dict(), colmap)
+    for idx, record in enumerate(parsed.records()):
+        row_idx = idx + 2
+        payload = _build_aircraft_payload(record, colmap)
         serial = payload.get("serial_number") or ""
         if serial:
             serials.append(serial)
@@ -2846,7 +2799,7 @@ async def preview_aircraft_import(
                 "suggested_template": _serialize_import_template(suggested)
                 if suggested
                 else None,
-                "formula_proposals": row_formula_proposals.get(row_idx, []),
+                "formula_proposals": parsed.row_formula_proposals.get(row_idx, []),
             }
         )
 
@@ -2888,22 +2841,14 @@ async def preview_aircraft_import(
         row["warnings"] = warnings
         row["action"] = action
 
-    preview_id = str(uuid4())
-    session = models.AircraftImportPreviewSession(
-        preview_id=preview_id,
-        import_type="aircraft",
-        total_rows=len(rows),
-        column_mapping=colmap,
-        summary={"new": new_count, "update": update_count, "invalid": invalid_count},
-        ocr_info=ocr_info,
-        formula_discrepancies=formula_discrepancies,
-        context=None,
-        created_by_user_id=current_user.id,
-    )
-    db.add(session)
+    session.total_rows = len(rows)
+    session.column_mapping = colmap
+    session.summary = {"new": new_count, "update": update_count, "invalid": invalid_count}
+    session.ocr_info = parsed.ocr_info
+    session.formula_discrepancies = parsed.formula_discrepancies
     preview_objects = [
         models.AircraftImportPreviewRow(
-            preview_id=preview_id,
+            preview_id=session.preview_id,
             row_number=row["row_number"],
             data=row["data"],
             errors=row["errors"],
@@ -2911,25 +2856,85 @@ async def preview_aircraft_import(
             action=row["action"],
             suggested_template=row.get("suggested_template"),
             formula_proposals=row.get("formula_proposals"),
-            metadata=None,
+            row_metadata=None,
         )
         for row in rows
     ]
     if preview_objects:
         db.bulk_save_objects(preview_objects)
-    db.commit()
 
-    preview_page_size = _clamp_preview_limit(DEFAULT_PREVIEW_PAGE_SIZE)
+
+def _aircraft_import_preview_state(
+    db: Session, preview_id: str, response: Response, current_user: account_models.User
+) -> Dict[str, Any]:
+    session = _get_import_preview_session(db, preview_id, "aircraft", current_user)
+    state = _import_preview_state(db, session, response, _serialize_aircraft_preview_row)
+    state["ocr"] = session.ocr_info
+    state["formula_discrepancies"] = session.formula_discrepancies
+    return state
+
+
+@router.post(
+    "/import/preview",
+    tags=["aircraft"],
+    summary="Preview aircraft import with mapping and validation",
+    response_model=schemas.AircraftImportPreviewResponse,
+)
+async def preview_aircraft_import(
+    background_tasks: BackgroundTasks,
+    response: Response,
+    files: Optional[List[UploadFile]] = File(None),
+    file: Optional[UploadFile] = File(None),
+    db: Session = Depends(get_db),
+    current_user: account_models.User = Depends(
+        require_roles(*MANAGEMENT_ROLES)
+    ),
+):
+    """
+    Preview bulk import / update aircraft from CSV/Excel.
+
+    The files are parsed by the import worker pool. Returns normalised rows,
+    column mapping, validation issues and summary counts for new/update/invalid
+    rows; a preview that is not ready after a short wait is returned with
+    status 202 and polled with GET /aircraft/import/preview/{preview_id}.
+    """
+    _require_import_dependencies()
+    uploads = await _read_import_uploads(
+        files,
+        file,
+        missing_detail="No files uploaded. Upload up to 10 CSV/Excel/PDF/image files.",
+    )
+    preview_id, job = await run_in_threadpool(
+        _submit_import_preview,
+        db,
+        "aircraft",
+        uploads,
+        stage=_stage_aircraft_preview,
+        context=None,
+        current_user=current_user,
+    )
     background_tasks.add_task(_cleanup_expired_preview_sessions)
-    return {
-        "preview_id": preview_id,
-        "total_rows": len(rows),
-        "rows": rows[:preview_page_size],
-        "column_mapping": colmap,
-        "summary": {"new": new_count, "update": update_count, "invalid": invalid_count},
-        "ocr": ocr_info,
-        "formula_discrepancies": formula_discrepancies,
-    }
+    await import_preview.settle(job)
+    return await run_in_threadpool(
+        _aircraft_import_preview_state, db, preview_id, response, current_user
+    )
+
+
+@router.get(
+    "/import/preview/{preview_id}",
+    tags=["aircraft"],
+    summary="Poll an aircraft import preview",
+    response_model=schemas.AircraftImportPreviewResponse,
+)
+def get_aircraft_import_preview(
+    preview_id: str,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: account_models.User = Depends(
+        require_roles(*MANAGEMENT_ROLES)
+    ),
+):
+    return _aircraft_import_preview_state(db, preview_id, response, current_user)
 
 
 @router.get(
@@ -2973,18 +2978,7 @@ def list_aircraft_import_preview_rows(
     return {
         "preview_id": preview_id,
         "total_rows": session.total_rows,
-        "rows": [
-            {
-                "row_number": row.row_number,
-                "data": row.data,
-                "errors": row.errors or [],
-                "warnings": row.warnings or [],
-                "action": row.action,
-                "suggested_template": row.suggested_template,
-                "formula_proposals": row.formula_proposals or [],
-            }
-            for row in rows
-        ],
+        "rows": [_serialize_aircraft_preview_row(row) for row in rows],
     }
 
 
@@ -3320,115 +3314,37 @@ def reapply_import_snapshot(
 # ---------------------------------------------------------------------------
 
 
-@router.post(
-    "/{serial_number}/components/import/preview",
-    tags=["aircraft"],
-    summary="Preview component import with normalization and dedupe hints",
-)
-async def preview_components_import(
-    serial_number: str,
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: account_models.User = Depends(
-        require_roles(*MANAGEMENT_ROLES)
-    ),
-):
-    """
-    Preview components for an aircraft before importing.
-
-    Returns normalized rows, validation errors/warnings, and dedupe hints
-    based on part/serial number pairs.
-    """
-    try:
-        import pandas as pd  # type: ignore
-    except ImportError:  # pragma: no cover
-        raise HTTPException(
-            status_code=500,
-            detail="pandas is required for import. Install with 'pip install pandas openpyxl'.",
-        )
-
-    ac = (
-        db.query(models.Aircraft)
-        .filter(
-            models.Aircraft.serial_number == serial_number,
-            models.Aircraft.amo_id == current_user.amo_id,
-        )
-        .first()
-    )
-    if not ac:
-        raise HTTPException(status_code=404, detail="Aircraft not found")
-
-    uploads = files or ([file] if file else [])
-    if not uploads:
-        raise HTTPException(
-            status_code=400,
-            detail="No files uploaded. Upload up to 10 CSV/Excel files.",
-        )
-    if len(uploads) > 10:
-        raise HTTPException(
-            status_code=400,
-            detail="Upload up to 10 files at a time.",
-        )
-
-    dataframes: List[Any] = []
-    base_columns: List[str] | None = None
-
-    for upload in uploads:
-        ext = Path(upload.filename or "").suffix.lower()
-        content = await upload.read()
-        buffer = BytesIO(content)
-
-        if ext in [".csv", ".txt"]:
-            df = pd.read_csv(buffer)
-        elif ext in [".xlsx", ".xlsm", ".xls"]:
-            df = pd.read_excel(buffer)
-        elif ext == ".pdf":
-            raise HTTPException(
-                status_code=501,
-                detail=(
-                    "PDF ingestion for components not yet implemented. "
-                    "Use CSV/Excel for now."
-                ),
-            )
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    f"Unsupported file type '{ext}'. Upload CSV, XLSX, XLSM or XLS."
-                ),
-            )
-
-        if df.empty:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Uploaded file '{upload.filename}' contains no data.",
-            )
-
-        columns = list(df.columns)
-        if base_columns is None:
-            base_columns = columns
-        elif columns != base_columns:
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    "All uploaded files must use identical column headers. "
-                    f"File '{upload.filename}' does not match the first file."
-                ),
-            )
-
-        dataframes.append(df)
+def _serialize_component_preview_row(
+    row: models.AircraftImportPreviewRow,
+) -> Dict[str, Any]:
+    metadata = row.row_metadata or {}
+    return {
+        "row_number": row.row_number,
+        "data": row.data,
+        "errors": row.errors or [],
+        "warnings": row.warnings or [],
+        "action": row.action,
+        "existing_component": metadata.get("existing_component"),
+        "dedupe_suggestions": metadata.get("dedupe_suggestions") or [],
+    }
 
-    df = pd.concat(dataframes, ignore_index=True)
 
-    colmap = _map_component_columns(base_columns or list(df.columns))
+def _stage_component_preview(
+    db: Session,
+    session: models.AircraftImportPreviewSession,
+    parsed: import_preview.ParsedImport,
+) -> None:
+    """
+    Normalise, validate and dedupe parsed component rows for the aircraft in
+    the session context. Runs on an import job thread.
+    """
+    serial_number = (session.context or {})["serial_number"]
+    colmap = _map_component_columns(parsed.columns)
     if not colmap["position"]:
-        raise HTTPException(
-            status_code=400,
-            detail=(
-                "Component file must have a 'position' column "
-                "(examples: position, pos)."
-            ),
+        raise import_preview.ImportPreviewError(
+            400,
+            "Component file must have a 'position' column "
+            "(examples: position, pos).",
         )
 
     existing_components = (
@@ -3454,9 +3370,9 @@ async def preview_components_import(
 
     raw_rows: List[Dict[str, Any]] = []
     pn_sn_pairs: set[tuple[str, str]] = set()
-    for idx, row in df.iterrows():
-        row_idx = int(idx) + 2  # approx Excel row number
-        payload = _build_component_payload(row.to_dict(), colmap)
+    for idx, record in enumerate(parsed.records()):
+        row_idx = idx + 2  # approx Excel row number
+        payload = _build_component_payload(record, colmap)
         part_number = (payload.get("part_number") or "").strip().upper()
         serial = (payload.get("serial_number") or "").strip().upper()
         if part_number and serial:
@@ -3570,26 +3486,18 @@ async def preview_components_import(
             }
         )
 
-    preview_id = str(uuid4())
-    session = models.AircraftImportPreviewSession(
-        preview_id=preview_id,
-        import_type="components",
-        total_rows=len(rows),
-        column_mapping=colmap,
-        summary={"new": new_count, "update": update_count, "invalid": invalid_count},
-        context={"serial_number": serial_number},
-        created_by_user_id=current_user.id,
-    )
-    db.add(session)
+    session.total_rows = len(rows)
+    session.column_mapping = colmap
+    session.summary = {"new": new_count, "update": update_count, "invalid": invalid_count}
     preview_objects = [
         models.AircraftImportPreviewRow(
-            preview_id=preview_id,
+            preview_id=session.preview_id,
             row_number=row["row_number"],
             data=row["data"],
             errors=row["errors"],
             warnings=row["warnings"],
             action=row["action"],
-            metadata={
+            row_metadata={
                 "existing_component": row.get("existing_component"),
                 "dedupe_suggestions": row.get("dedupe_suggestions"),
             },
@@ -3598,21 +3506,109 @@ async def preview_components_import(
     ]
     if preview_objects:
         db.bulk_save_objects(preview_objects)
-    db.commit()
 
-    preview_page_size = _clamp_preview_limit(DEFAULT_PREVIEW_PAGE_SIZE)
+
+def _component_import_preview_state(
+    db: Session,
+    serial_number: str,
+    preview_id: str,
+    response: Response,
+    current_user: account_models.User,
+) -> Dict[str, Any]:
+    session = _get_import_preview_session(
+        db, preview_id, "components", current_user, serial_number
+    )
+    return _import_preview_state(db, session, response, _serialize_component_preview_row)
+
+
+def _require_component_import_aircraft(
+    db: Session, serial_number: str, amo_id: str
+) -> None:
+    ac = (
+        db.query(models.Aircraft.serial_number)
+        .filter(
+            models.Aircraft.serial_number == serial_number,
+            models.Aircraft.amo_id == amo_id,
+        )
+        .first()
+    )
+    if not ac:
+        raise HTTPException(status_code=404, detail="Aircraft not found")
+
+
+@router.post(
+    "/{serial_number}/components/import/preview",
+    tags=["aircraft"],
+    summary="Preview component import with normalization and dedupe hints",
+)
+async def preview_components_import(
+    serial_number: str,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    files: Optional[List[UploadFile]] = File(None),
+    file: Optional[UploadFile] = File(None),
+    db: Session = Depends(get_db),
+    current_user: account_models.User = Depends(
+        require_roles(*MANAGEMENT_ROLES)
+    ),
+):
+    """
+    Preview components for an aircraft before importing.
+
+    The files are parsed by the import worker pool. Returns normalized rows,
+    validation errors/warnings, and dedupe hints based on part/serial number
+    pairs; a preview that is not ready after a short wait is returned with
+    status 202 and polled with
+    GET /aircraft/{serial_number}/components/import/preview/{preview_id}.
+    """
+    _require_import_dependencies()
+    await run_in_threadpool(
+        _require_component_import_aircraft, db, serial_number, current_user.amo_id
+    )
+    uploads = await _read_import_uploads(
+        files,
+        file,
+        missing_detail="No files uploaded. Upload up to 10 CSV/Excel files.",
+    )
+    preview_id, job = await run_in_threadpool(
+        _submit_import_preview,
+        db,
+        "components",
+        uploads,
+        stage=_stage_component_preview,
+        context={"serial_number": serial_number},
+        current_user=current_user,
+    )
     background_tasks.add_task(_cleanup_expired_preview_sessions)
-    return {
-        "preview_id": preview_id,
-        "total_rows": len(rows),
-        "rows": rows[:preview_page_size],
-        "column_mapping": colmap,
-        "summary": {
-            "new": new_count,
-            "update": update_count,
-            "invalid": invalid_count,
-        },
-    }
+    await import_preview.settle(job)
+    return await run_in_threadpool(
+        _component_import_preview_state,
+        db,
+        serial_number,
+        preview_id,
+        response,
+        current_user,
+    )
+
+
+@router.get(
+    "/{serial_number}/components/import/preview/{preview_id}",
+    tags=["aircraft"],
+    summary="Poll a component import preview",
+)
+def get_component_import_preview(
+    serial_number: str,
+    preview_id: str,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: account_models.User = Depends(
+        require_roles(*MANAGEMENT_ROLES)
+    ),
+):
+    _require_component_import_aircraft(db, serial_number, current_user.amo_id)
+    return _component_import_preview_state(
+        db, serial_number, preview_id, response, current_user
+    )
 
 
 @router.get(
@@ -3660,19 +3656,7 @@ def list_component_import_preview_rows(
     return {
         "preview_id": preview_id,
         "total_rows": session.total_rows,
-        "rows": [
-            {
-                "row_number": row.row_number,
-                "data": row.data,
-                "errors": row.errors or [],
-                "warnings": row.warnings or [],
-                "action": row.action,
-                "existing_component": (row.row_metadata or {}).get("existing_component"),
-                "dedupe_suggestions": (row.row_metadata or {}).get("dedupe_suggestions")
-                or [],
-            }
-            for row in rows
-        ],
+        "rows": [_serialize_component_preview_row(row) for row in rows],
     }
 
 
@@ -314,10 +314,12 @@ class AircraftImportPreviewRow(BaseModel):
 
 class AircraftImportPreviewResponse(BaseModel):
     preview_id: str
-    total_rows: int
-    rows: List[AircraftImportPreviewRow]
-    column_mapping: Dict[str, Optional[str]]
-    summary: Dict[str, int]
+    # "queued" and "running" previews carry no rows yet; poll until "ready".
+    status: str = "ready"
+    total_rows: int = 0
+    rows: List[AircraftImportPreviewRow] = Field(default_factory=list)
+    column_mapping: Dict[str, Optional[str]] = Field(default_factory=dict)
+    summary: Dict[str, int] = Field(default_factory=dict)
     ocr: Optional[Dict[str, Any]] = None
     formula_discrepancies: Optional[List[Dict[str, Any]]] = None
 
@@ -4,9 +4,11 @@ from datetime import date, datetime, time, timedelta, timezone
 from typing import Iterable, List, Optional
 from dataclasses import dataclass
 
+from sqlalchemy import and_, func, literal, or_, select, update
 from sqlalchemy.orm import Session
 
 from . import models
+from .usage_rollup import refresh_usage_rollups
 from ..audit import services as audit_services
 from ..audit import schemas as audit_schemas
 
@@ -402,6 +404,111 @@ def apply_usage_calculations(
             _increment_field(data, getattr(previous_usage, field), field, cycles)
 
 
+def _logged_after(entry_date: date, techlog_no: str):
+    return or_(
+        models.AircraftUsage.date > entry_date,
+        and_(models.AircraftUsage.date == entry_date, models.AircraftUsage.techlog_no > techlog_no),
+    )
+
+
+USAGE_TOTAL_INPUTS: tuple[str, ...] = (
+    "date",
+    "techlog_no",
+    "block_hours",
+    "cycles",
+    "ttaf_after",
+    "tca_after",
+    *HOURS_BASED_FIELDS,
+    *CYCLES_BASED_FIELDS,
+)
+
+
+def usage_totals_changed(usage: models.AircraftUsage, data: dict) -> bool:
+    """Whether ``data`` changes anything later entries' running totals depend on.
+
+    Edits that only touch remarks, station or maintenance remaining leave
+    later totals alone, so imported or hand-entered values survive them.
+    """
+    return any(field in data and data[field] != getattr(usage, field) for field in USAGE_TOTAL_INPUTS)
+
+
+def recalculate_usage_totals(
+    db: Session,
+    serial_number: str,
+    entry_date: date,
+    techlog_no: str,
+    *,
+    amo_id: str,
+) -> int:
+    """Recompute the running totals of every entry logged after ``(entry_date, techlog_no)``.
+
+    The last entry at or before that position is the anchor (or, if there is
+    none, the aircraft's first entry). Each later entry's totals become the
+    anchor's totals plus a running ``SUM() OVER`` of block hours or cycles,
+    written by one ``UPDATE``. As in ``apply_usage_calculations``, component
+    totals the anchor does not carry are left alone. Returns the number of
+    entries rewritten.
+    """
+
+    usage = models.AircraftUsage
+    scope = (usage.amo_id == amo_id, usage.aircraft_serial_number == serial_number)
+    hours_fields = ("ttaf_after", *HOURS_BASED_FIELDS)
+    cycles_fields = ("tca_after", *CYCLES_BASED_FIELDS)
+    anchor_columns = [usage.date, usage.techlog_no, *(getattr(usage, field) for field in hours_fields + cycles_fields)]
+
+    db.flush()
+    anchor = db.execute(
+        select(*anchor_columns)
+        .where(*scope, ~_logged_after(entry_date, techlog_no))
+        .order_by(usage.date.desc(), usage.techlog_no.desc())
+        .limit(1)
+    ).first()
+    if anchor is None:
+        anchor = db.execute(
+            select(*anchor_columns).where(*scope).order_by(usage.date.asc(), usage.techlog_no.asc()).limit(1)
+        ).first()
+        if anchor is None:
+            return 0
+
+    base = {"ttaf_after": anchor.ttaf_after or 0, "tca_after": anchor.tca_after or 0}
+    base.update(
+        {
+            field: getattr(anchor, field)
+            for field in HOURS_BASED_FIELDS + CYCLES_BASED_FIELDS
+            if getattr(anchor, field) is not None
+        }
+    )
+    table = usage.__table__
+    order = (usage.date, usage.techlog_no)
+    running = {
+        "hours": func.sum(usage.block_hours).over(order_by=order, rows=(None, 0)),
+        "cycles": func.sum(usage.cycles).over(order_by=order, rows=(None, 0)),
+    }
+    totals = (
+        select(
+            usage.id.label("usage_id"),
+            *(
+                (literal(value, table.c[field].type) + running["hours" if field in hours_fields else "cycles"]).label(field)
+                for field, value in base.items()
+            ),
+        )
+        .where(*scope, _logged_after(anchor.date, anchor.techlog_no))
+        .subquery()
+    )
+    result = db.execute(
+        update(table)
+        .where(table.c.id == totals.c.usage_id)
+        .values({field: totals.c[field] for field in base})
+    )
+    # The UPDATE bypasses the ORM: refresh the rollup and drop stale totals
+    # from entries already loaded in this session.
+    refresh_usage_rollups(db.connection(), amo_id=amo_id, serials=[serial_number])
+    for instance in list(db.identity_map.values()):
+        if isinstance(instance, usage) and instance.aircraft_serial_number == serial_number:
+            db.expire(instance, list(base))
+    return result.rowcount
+
+
 def update_maintenance_remaining(
     db: Session,
     serial_number: str,
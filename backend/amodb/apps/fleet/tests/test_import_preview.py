@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import gc
+from io import BytesIO
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("pandas")
+openpyxl = pytest.importorskip("openpyxl")
+
+from amodb.apps.accounts import models as account_models  # noqa: E402
+from amodb.apps.fleet import import_preview  # noqa: E402
+from amodb.apps.fleet import models as fleet_models  # noqa: E402
+from amodb.apps.fleet import router as fleet_router  # noqa: E402
+from amodb.database import Base  # noqa: E402
+
+LOAD_PREVIEWS = 8
+LOAD_ROWS = 1500
+USER_ID = "importer-1"
+
+
+@pytest.fixture()
+def preview_db(tmp_path):
+    # Jobs stage rows from their own threads and sessions, so share a file.
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'previews.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            fleet_models.Aircraft.__table__,
+            fleet_models.AircraftComponent.__table__,
+            fleet_models.AircraftImportTemplate.__table__,
+            fleet_models.AircraftImportPreviewSession.__table__,
+            fleet_models.AircraftImportPreviewRow.__table__,
+        ],
+    )
+    factory = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+    db = factory()
+    amo = account_models.AMO(amo_code="IMP-P", name="Import Preview", login_slug="imp-p")
+    db.add(amo)
+    db.flush()
+    db.add(fleet_models.Aircraft(serial_number="MSN-00003", registration="5Y-OLD", amo_id=amo.id))
+    db.commit()
+    try:
+        yield db, factory
+    finally:
+        db.close()
+        import_preview.stop_worker_pool()
+        engine.dispose()
+
+
+def _workbook(rows: int) -> bytes:
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["AIN", "Registration", "Make", "Model", "Total Hours", "Total Cycles"])
+    for index in range(rows):
+        sheet.append([f"MSN-{index:05d}", f"5Y-{index:04d}", "DHC", "DHC-8-400", 1000.5 + index, 800 + index])
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _amo_id(db) -> str:
+    return db.query(account_models.AMO.id).filter(account_models.AMO.amo_code == "IMP-P").scalar()
+
+
+def _importer(db, *, user_id: str = USER_ID, amo_id: str | None = None) -> account_models.User:
+    return account_models.User(id=user_id, amo_id=amo_id or _amo_id(db))
+
+
+def _submit(factory, import_type: str, uploads, *, context=None, **kwargs):
+    db = factory()
+    try:
+        return import_preview.submit(
+            db,
+            import_type,
+            uploads,
+            context={**(context or {}), "amo_id": _amo_id(db)},
+            user_id=USER_ID,
+            session_factory=factory,
+            **kwargs,
+        )
+    finally:
+        db.close()
+
+
+def test_aircraft_preview_is_parsed_by_the_worker_pool_and_staged(preview_db):
+    db, factory = preview_db
+
+    preview_id, job = _submit(
+        factory, "aircraft", [("fleet.xlsx", _workbook(5))], stage=fleet_router._stage_aircraft_preview
+    )
+    job.result(timeout=120)
+    response = Response()
+    state = fleet_router._aircraft_import_preview_state(db, preview_id, response, _importer(db))
+
+    assert response.status_code != 202
+    assert (state["status"], state["total_rows"], state["summary"]) == (
+        "ready",
+        5,
+        {"new": 4, "update": 1, "invalid": 0},
+    )
+    assert state["column_mapping"]["serial_number"] == "AIN"
+    first = state["rows"][0]
+    assert (first["row_number"], first["action"], first["data"]["serial_number"], first["data"]["total_hours"]) == (
+        2,
+        "new",
+        "MSN-00000",
+        1000.5,
+    )
+    assert state["rows"][3]["action"] == "update"
+
+
+def test_failed_preview_reports_the_worker_error(preview_db):
+    db, factory = preview_db
+
+    preview_id, job = _submit(
+        factory, "aircraft", [("empty.csv", b"AIN,Registration\n")], stage=fleet_router._stage_aircraft_preview
+    )
+    job.result(timeout=120)
+
+    with pytest.raises(HTTPException) as exc_info:
+        fleet_router._aircraft_import_preview_state(db, preview_id, Response(), _importer(db))
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Uploaded file 'empty.csv' contains no data."
+
+
+def test_component_preview_stores_dedupe_hints_with_each_row(preview_db):
+    db, factory = preview_db
+    upload = b"position,part_number,serial_number\nENG 1,PW150A,PCE-1\nENG 2,PW150A,PCE-1\n"
+
+    preview_id, job = _submit(
+        factory,
+        "components",
+        [("components.csv", upload)],
+        stage=fleet_router._stage_component_preview,
+        context={"serial_number": "MSN-00003"},
+    )
+    job.result(timeout=120)
+    state = fleet_router._component_import_preview_state(db, "MSN-00003", preview_id, Response(), _importer(db))
+
+    assert state["summary"] == {"new": 2, "update": 0, "invalid": 0}
+    assert state["rows"][1]["warnings"] == ["Duplicate part/serial pair found in upload."]
+    assert "ENG 1" in state["rows"][1]["dedupe_suggestions"][0]["positions"]
+    with pytest.raises(HTTPException):
+        fleet_router._component_import_preview_state(db, "MSN-99999", preview_id, Response(), _importer(db))
+
+
+def test_previews_are_polled_only_by_their_creator_in_their_amo(preview_db):
+    db, factory = preview_db
+    other_amo = account_models.AMO(amo_code="IMP-Q", name="Other Operator", login_slug="imp-q")
+    db.add(other_amo)
+    db.commit()
+
+    preview_id, job = _submit(
+        factory,
+        "components",
+        [("components.csv", b"position,part_number,serial_number\nENG 1,PW150A,PCE-1\n")],
+        stage=fleet_router._stage_component_preview,
+        context={"serial_number": "MSN-00003"},
+    )
+    job.result(timeout=120)
+
+    for caller in (_importer(db, user_id="importer-2"), _importer(db, amo_id=other_amo.id)):
+        with pytest.raises(HTTPException) as exc_info:
+            fleet_router._component_import_preview_state(db, "MSN-00003", preview_id, Response(), caller)
+        assert exc_info.value.status_code == 404
+    # The poll endpoint checks the aircraft belongs to the caller's AMO first.
+    with pytest.raises(HTTPException) as exc_info:
+        fleet_router.get_component_import_preview(
+            "MSN-00003", preview_id, Response(), db=db, current_user=_importer(db, amo_id=other_amo.id)
+        )
+    assert exc_info.value.detail == "Aircraft not found"
+    state = fleet_router.get_component_import_preview(
+        "MSN-00003", preview_id, Response(), db=db, current_user=_importer(db)
+    )
+    assert state["total_rows"] == 1
+
+
+def test_previews_whose_job_is_gone_fail_instead_of_polling_forever(preview_db, monkeypatch):
+    db, factory = preview_db
+    stalled_at = datetime.now(timezone.utc) - timedelta(seconds=import_preview.PREVIEW_STALL_SECONDS + 60)
+    for preview_id, status, created_at in (
+        ("stalled-running", import_preview.STATUS_RUNNING, stalled_at),
+        ("stalled-queued", import_preview.STATUS_QUEUED, stalled_at),
+        ("fresh-queued", import_preview.STATUS_QUEUED, datetime.now(timezone.utc)),
+    ):
+        db.add(
+            fleet_models.AircraftImportPreviewSession(
+                preview_id=preview_id,
+                import_type="aircraft",
+                status=status,
+                total_rows=0,
+                context={"amo_id": _amo_id(db)},
+                created_by_user_id=USER_ID,
+                created_at=created_at,
+            )
+        )
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc_info:
+        fleet_router._aircraft_import_preview_state(db, "stalled-running", Response(), _importer(db))
+    assert exc_info.value.status_code == 504
+    response = Response()
+    fleet_router._aircraft_import_preview_state(db, "fresh-queued", response, _importer(db))
+    assert response.status_code == 202
+    db.rollback()
+
+    monkeypatch.setattr(fleet_router, "WriteSessionLocal", factory)
+    fleet_router._cleanup_expired_preview_sessions()
+    statuses = {
+        preview.preview_id: preview.status
+        for preview in db.query(fleet_models.AircraftImportPreviewSession).all()
+    }
+    assert statuses == {"stalled-running": "failed", "stalled-queued": "failed", "fresh-queued": "queued"}
+
+
+def test_previews_queued_past_the_stall_window_keep_beating_and_stay_failed_once_failed(preview_db, monkeypatch):
+    db, factory = preview_db
+    monkeypatch.setattr(import_preview, "PREVIEW_HEARTBEAT_SECONDS", 0.1)
+    monkeypatch.setattr(import_preview, "PREVIEW_STALL_SECONDS", 0.5)
+    release = threading.Event()
+    parsed = import_preview.ParsedImport(
+        columns=[], ocr_info=None, formula_discrepancies=[], row_formula_proposals={}, body=b""
+    )
+
+    def slow_parse(_import_type, _uploads):
+        release.wait(timeout=30)
+        return parsed
+
+    def stage(_db, preview, _parsed):
+        preview.total_rows = 1
+
+    monkeypatch.setattr(import_preview, "_parse", slow_parse)
+    jobs = [
+        _submit(factory, "aircraft", [(f"fleet-{index}.csv", b"AIN\n")], stage=stage)
+        for index in range(import_preview.WORKER_POOL_SIZE + 1)
+    ]
+    time.sleep(1.5)
+
+    # The last job has waited behind busy workers for three stall windows.
+    queued_id = jobs[-1][0]
+    assert db.get(fleet_models.AircraftImportPreviewSession, queued_id).status == import_preview.STATUS_QUEUED
+    assert import_preview.fail_stalled(db) == 0
+    db.rollback()
+    response = Response()
+    fleet_router._aircraft_import_preview_state(db, queued_id, response, _importer(db))
+    assert response.status_code == 202
+
+    # A running job whose session was failed meanwhile must not revive it.
+    running_id = jobs[0][0]
+    db.query(fleet_models.AircraftImportPreviewSession).filter_by(preview_id=running_id).update(
+        {"status": import_preview.STATUS_FAILED, "error": {"status_code": 504, "detail": "gone"}},
+        synchronize_session=False,
+    )
+    db.commit()
+    release.set()
+    for _preview_id, job in jobs:
+        job.result(timeout=30)
+
+    db.expire_all()
+    sessions = {
+        preview.preview_id: preview
+        for preview in db.query(fleet_models.AircraftImportPreviewSession).all()
+    }
+    assert (sessions[running_id].status, sessions[running_id].error["status_code"]) == ("failed", 504)
+    assert sessions[running_id].total_rows == 0
+    assert sessions[queued_id].status == "ready"
+    assert sessions[queued_id].started_at is not None
+    assert import_preview._LIVE == {}
+
+
+def test_submit_refuses_work_beyond_the_pending_cap(preview_db):
+    _db, factory = preview_db
+    held = 0
+    while import_preview._PENDING.acquire(blocking=False):
+        held += 1
+    try:
+        with pytest.raises(import_preview.ImportPreviewError) as exc_info:
+            _submit(factory, "aircraft", [("fleet.csv", b"AIN,Registration\nMSN-1,5Y-A\n")], stage=fleet_router._stage_aircraft_preview)
+    finally:
+        for _ in range(held):
+            import_preview._PENDING.release()
+    assert held == import_preview.MAX_PENDING_JOBS
+    assert exc_info.value.status_code == 429
+
+
+def test_event_loop_stays_responsive_while_concurrent_previews_run(preview_db):
+    db, factory = preview_db
+    workbook = _workbook(LOAD_ROWS)
+
+    async def load() -> tuple[list[str], float]:
+        lags: list[float] = []
+        finished = asyncio.Event()
+
+        async def heartbeat() -> None:
+            while not finished.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - started - 0.01)
+
+        async def preview(index: int) -> str:
+            preview_id, job = await asyncio.to_thread(
+                _submit,
+                factory,
+                "aircraft",
+                [(f"fleet-{index}.xlsx", workbook)],
+                stage=fleet_router._stage_aircraft_preview,
+            )
+            while not await import_preview.settle(job, timeout=0.05):
+                pass
+            return preview_id
+
+        ticker = asyncio.create_task(heartbeat())
+        preview_ids = await asyncio.gather(*(preview(index) for index in range(LOAD_PREVIEWS)))
+        finished.set()
+        await ticker
+        return preview_ids, max(lags)
+
+    # Park the already-imported app graph outside the collector so a full
+    # collection over it does not show up as loop lag caused by the previews.
+    gc.collect()
+    gc.freeze()
+    try:
+        preview_ids, worst_lag = asyncio.run(load())
+    finally:
+        gc.unfreeze()
+
+    for preview_id in preview_ids:
+        state = fleet_router._aircraft_import_preview_state(db, preview_id, Response(), _importer(db))
+        assert (state["status"], state["total_rows"]) == ("ready", LOAD_ROWS)
+    stats = import_preview.worker_pool_stats()
+    assert stats["jobs"] == LOAD_PREVIEWS
+    assert stats["spawned"] <= import_preview.WORKER_POOL_SIZE
+    assert worst_lag < 0.25
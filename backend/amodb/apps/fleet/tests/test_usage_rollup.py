@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import re
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.fleet import models as fleet_models
+from amodb.apps.fleet.usage_rollup import load_usage_rollups
+from amodb.apps.maintenance_program import models as program_models
+from amodb.apps.maintenance_program import service as program_service
+from amodb.database import Base
+
+TODAY = date.today()
+USAGE_SCAN = re.compile(r"FROM aircraft_usage(?!_)")
+
+
+@pytest.fixture()
+def usage_db():
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            fleet_models.Aircraft.__table__,
+            fleet_models.AircraftUsage.__table__,
+            fleet_models.AircraftUsageRollup.__table__,
+            program_models.AmpProgramItem.__table__,
+            program_models.AmpAircraftProgramItem.__table__,
+        ],
+    )
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)()
+    amo = account_models.AMO(amo_code="FLT-R", name="Fleet Rollups", login_slug="flt-r")
+    db.add(amo)
+    db.flush()
+    for index, serial in enumerate(("AC-1", "AC-2"), start=1):
+        db.add(fleet_models.Aircraft(serial_number=serial, registration=f"5Y-RU{index}", amo_id=amo.id, total_hours=500.0))
+    db.commit()
+    yield db, amo.id, statements
+    db.close()
+
+
+def _usage(amo_id: str, serial: str, days_ago: int, hours: float, *, total: float) -> fleet_models.AircraftUsage:
+    return fleet_models.AircraftUsage(
+        amo_id=amo_id,
+        aircraft_serial_number=serial,
+        date=TODAY - timedelta(days=days_ago),
+        techlog_no=f"TL-{serial}-{days_ago}",
+        block_hours=hours,
+        cycles=1,
+        ttaf_after=total,
+        tca_after=float(int(total) // 2),
+    )
+
+
+def test_posting_correcting_and_deleting_usage_refresh_the_rollup(usage_db):
+    db, amo_id, _statements = usage_db
+    entries = [
+        _usage(amo_id, "AC-1", 100, 5.0, total=1000.0),
+        _usage(amo_id, "AC-1", 60, 4.0, total=1004.0),
+        _usage(amo_id, "AC-1", 20, 3.0, total=1007.0),
+        _usage(amo_id, "AC-1", 6, 2.0, total=1009.0),
+        _usage(amo_id, "AC-1", 0, 1.0, total=1010.0),
+    ]
+    db.add_all(entries)
+    db.commit()
+
+    rollup = db.get(fleet_models.AircraftUsageRollup, "AC-1")
+    assert (rollup.latest_date, rollup.latest_ttaf_after, rollup.window_end) == (TODAY, 1010.0, TODAY)
+    assert (rollup.hours_7d, rollup.hours_30d, rollup.hours_90d) == (3.0, 6.0, 10.0)
+    assert (rollup.cycles_7d, rollup.cycles_30d, rollup.cycles_90d) == (2.0, 3.0, 4.0)
+
+    entries[3].block_hours = 2.5
+    db.delete(entries[4])
+    db.commit()
+    db.expire_all()
+
+    rollup = db.get(fleet_models.AircraftUsageRollup, "AC-1")
+    assert (rollup.latest_date, rollup.latest_ttaf_after) == (TODAY - timedelta(days=6), 1009.0)
+    assert (rollup.hours_7d, rollup.hours_30d, rollup.hours_90d) == (2.5, 5.5, 9.5)
+    assert db.get(fleet_models.AircraftUsageRollup, "AC-2") is None
+
+
+def test_rollup_is_refreshed_only_for_the_tenant_holding_the_aircraft(usage_db):
+    db, amo_id, _statements = usage_db
+    other = account_models.AMO(amo_code="FLT-O", name="Other Operator", login_slug="flt-o")
+    db.add(other)
+    db.flush()
+    entry = _usage(amo_id, "AC-1", 1, 4.0, total=1004.0)
+    db.add(entry)
+    db.commit()
+
+    entry.amo_id = other.id
+    db.commit()
+    db.expire_all()
+
+    rollup = db.get(fleet_models.AircraftUsageRollup, "AC-1")
+    assert (rollup.amo_id, rollup.latest_usage_id, rollup.hours_7d) == (amo_id, None, 0.0)
+
+
+def test_stale_windows_are_recomputed_on_read_without_writing(usage_db):
+    db, amo_id, _statements = usage_db
+    db.add_all([_usage(amo_id, "AC-1", 10, 4.0, total=1004.0), _usage(amo_id, "AC-1", 3, 2.0, total=1006.0)])
+    db.commit()
+
+    later = TODAY + timedelta(days=2)
+    rollups = load_usage_rollups(db, amo_id=amo_id, serials=["AC-1", "AC-2"], as_of=later)
+
+    assert (rollups["AC-1"].window_end, rollups["AC-1"].hours_7d, rollups["AC-1"].hours_30d) == (later, 2.0, 6.0)
+    assert rollups["AC-1"].latest_ttaf_after == 1006.0
+    assert rollups["AC-2"].latest_date is None and rollups["AC-2"].hours_90d == 0.0
+    db.expire_all()
+    assert db.get(fleet_models.AircraftUsageRollup, "AC-1").window_end == TODAY
+
+
+def test_fleet_overview_reads_rollups_instead_of_usage_history(usage_db):
+    db, amo_id, statements = usage_db
+    db.add_all([_usage(amo_id, "AC-1", day, 7.0, total=1100.0 - day) for day in range(0, 400, 2)])
+    db.add(_usage(amo_id, "AC-2", 0, 3.5, total=800.0))
+    db.commit()
+    statements.clear()
+
+    overview = program_service.get_fleet_planning_overview(db, amo_id=amo_id)
+
+    assert not [sql for sql in statements if USAGE_SCAN.search(sql)]
+    by_serial = {row.aircraft_serial_number: row for row in overview.utilisation}
+    assert (by_serial["AC-1"].current_hours, by_serial["AC-1"].seven_day_daily_average_hours) == (1100.0, 4.0)
+    assert (by_serial["AC-2"].current_hours, by_serial["AC-2"].freshness_status) == (800.0, "CURRENT")
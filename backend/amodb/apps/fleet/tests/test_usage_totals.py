@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import noload, sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.fleet import models as fleet_models
+from amodb.apps.fleet import router as fleet_router
+from amodb.apps.fleet import schemas as fleet_schemas
+from amodb.apps.fleet import services
+from amodb.apps.maintenance_program import models as program_models
+from amodb.database import Base
+
+FIRST_DAY = date(2018, 1, 1)
+ENTRIES = 3000
+
+
+@pytest.fixture()
+def usage_db():
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            fleet_models.Aircraft.__table__,
+            fleet_models.AircraftUsage.__table__,
+            fleet_models.AircraftUsageRollup.__table__,
+            fleet_models.MaintenanceStatus.__table__,
+            program_models.AmpAircraftProgramItem.__table__,
+            program_models.AmpProgramItem.__table__,
+        ],
+    )
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)()
+    amo = account_models.AMO(amo_code="FLT-T", name="Usage Totals", login_slug="flt-t")
+    db.add(amo)
+    db.flush()
+    db.add(fleet_models.Aircraft(serial_number="AC-1", registration="5Y-TOT", amo_id=amo.id))
+    db.flush()
+    rows = []
+    ttaf, tca, ttesn = 5000.0, 2000.0, 1200.0
+    for day in range(ENTRIES):
+        hours = 1.0 + (day % 4) * 0.25
+        ttaf += hours
+        tca += 2
+        ttesn += hours
+        rows.append(
+            {
+                "amo_id": amo.id,
+                "aircraft_serial_number": "AC-1",
+                "date": FIRST_DAY + timedelta(days=day),
+                "techlog_no": f"TL-{day:05d}",
+                "block_hours": hours,
+                "cycles": 2.0,
+                "ttaf_after": ttaf,
+                "tca_after": tca,
+                "ttesn_after": ttesn,
+                "verification_status": "VERIFIED",
+            }
+        )
+    db.execute(fleet_models.AircraftUsage.__table__.insert(), rows)
+    db.commit()
+    yield db, amo.id, statements
+    db.close()
+
+
+def _totals(db) -> list[tuple]:
+    usage = fleet_models.AircraftUsage
+    return list(
+        db.execute(
+            select(usage.techlog_no, usage.ttaf_after, usage.tca_after, usage.ttesn_after, usage.pttsn_after).order_by(
+                usage.date, usage.techlog_no
+            )
+        )
+    )
+
+
+def _entry(db, techlog_no: str) -> fleet_models.AircraftUsage:
+    return (
+        db.query(fleet_models.AircraftUsage)
+        .options(noload("*"))
+        .filter(fleet_models.AircraftUsage.techlog_no == techlog_no)
+        .one()
+    )
+
+
+def test_back_dated_correction_shifts_every_later_total_in_one_update(usage_db):
+    db, amo_id, statements = usage_db
+    before = _totals(db)
+    entry = _entry(db, "TL-00100")
+    data = {"block_hours": entry.block_hours + Decimal("1.5"), "cycles": 3}
+    services.apply_usage_calculations(data, _entry(db, "TL-00099"))
+    for field, value in data.items():
+        setattr(entry, field, value)
+    statements.clear()
+
+    rewritten = services.recalculate_usage_totals(db, "AC-1", entry.date, entry.techlog_no, amo_id=amo_id)
+    db.commit()
+
+    assert rewritten == ENTRIES - 101
+    assert len([sql for sql in statements if sql.startswith("UPDATE aircraft_usage ")]) == 2
+    after = _totals(db)
+    assert after[:100] == before[:100]
+    shift = (Decimal("1.5"), 1, Decimal("1.5"))
+    assert after[100] == ("TL-00100", *(value + delta for value, delta in zip(before[100][1:4], shift)), None)
+    for old, new in zip(before[101:], after[101:]):
+        assert tuple(new[1:]) == (*(value + delta for value, delta in zip(old[1:4], shift)), None)
+    rollup = db.execute(select(fleet_models.AircraftUsageRollup.latest_ttaf_after)).scalar_one()
+    assert rollup == float(after[-1][1])
+
+
+def test_deleting_the_first_entry_keeps_the_next_one_as_anchor(usage_db):
+    db, amo_id, _statements = usage_db
+    before = _totals(db)
+    first = _entry(db, "TL-00000")
+    db.delete(first)
+
+    services.recalculate_usage_totals(db, "AC-1", first.date, first.techlog_no, amo_id=amo_id)
+    db.commit()
+
+    assert _totals(db) == before[1:]
+
+
+def test_remarks_only_edit_leaves_later_totals_untouched(usage_db):
+    db, amo_id, _statements = usage_db
+    hand_entered = _entry(db, "TL-00200")
+    hand_entered.ttaf_after = 9999.0
+    db.commit()
+    before = _totals(db)
+    entry = _entry(db, "TL-00100")
+
+    updated = fleet_router.update_usage_entry(
+        entry.id,
+        fleet_schemas.AircraftUsageUpdate(remarks="Reworded remark", last_seen_updated_at=entry.updated_at),
+        db=db,
+        current_user=account_models.User(id="planner-1", amo_id=amo_id),
+    )
+
+    assert updated.remarks == "Reworded remark"
+    assert _totals(db) == before
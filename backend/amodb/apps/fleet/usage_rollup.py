@@ -0,0 +1,190 @@
+"""Keep ``aircraft_usage_rollups`` current from usage writes.
+
+Any ORM flush that adds, corrects or deletes an ``AircraftUsage`` row
+recomputes the rollup of each affected aircraft in the same transaction:
+the latest entry comes from one indexed ``ORDER BY ... LIMIT 1`` per
+aircraft and the rolling sums from one grouped query over the last
+``max(ROLLUP_WINDOWS)`` days. Statements that bypass the ORM must call
+``refresh_usage_rollups`` themselves.
+
+Rolling sums are anchored to ``window_end``. A rollup whose aircraft has
+not logged usage today is still correct for its latest entry but its sums
+have drifted; ``load_usage_rollups`` recomputes the sums of such rows in
+one grouped query when they are read, without writing.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import case, delete, event, func, inspect as sa_inspect, insert, select
+from sqlalchemy.orm import Session
+
+from .models import Aircraft, AircraftUsage, AircraftUsageRollup
+
+ROLLUP_WINDOWS = (7, 30, 90)
+
+
+def _window_sums(connection, *, amo_id: str, serials: Iterable[str], as_of: date) -> Dict[str, Dict[str, float]]:
+    serials = list(serials)
+    if not serials:
+        return {}
+    columns = []
+    for days in ROLLUP_WINDOWS:
+        start = as_of - timedelta(days=days - 1)
+        columns.append(func.sum(case((AircraftUsage.date >= start, AircraftUsage.block_hours), else_=0.0)).label(f"hours_{days}d"))
+        columns.append(func.sum(case((AircraftUsage.date >= start, AircraftUsage.cycles), else_=0.0)).label(f"cycles_{days}d"))
+    rows = connection.execute(
+        select(AircraftUsage.aircraft_serial_number, *columns)
+        .where(
+            AircraftUsage.amo_id == amo_id,
+            AircraftUsage.aircraft_serial_number.in_(serials),
+            AircraftUsage.date >= as_of - timedelta(days=max(ROLLUP_WINDOWS) - 1),
+        )
+        .group_by(AircraftUsage.aircraft_serial_number)
+    ).mappings()
+    sums: Dict[str, Dict[str, float]] = {
+        serial: {f"{kind}_{days}d": 0.0 for days in ROLLUP_WINDOWS for kind in ("hours", "cycles")} for serial in serials
+    }
+    for row in rows:
+        sums[row["aircraft_serial_number"]].update(
+            {key: float(value or 0.0) for key, value in row.items() if key != "aircraft_serial_number"}
+        )
+    return sums
+
+
+def _latest_entry(connection, *, amo_id: str, serial_number: str) -> Dict[str, object]:
+    row = connection.execute(
+        select(
+            AircraftUsage.id,
+            AircraftUsage.date,
+            AircraftUsage.techlog_no,
+            AircraftUsage.ttaf_after,
+            AircraftUsage.tca_after,
+        )
+        .where(AircraftUsage.amo_id == amo_id, AircraftUsage.aircraft_serial_number == serial_number)
+        .order_by(AircraftUsage.date.desc(), AircraftUsage.techlog_no.desc())
+        .limit(1)
+    ).first()
+    return {
+        "latest_usage_id": row.id if row else None,
+        "latest_date": row.date if row else None,
+        "latest_techlog_no": row.techlog_no if row else None,
+        "latest_ttaf_after": row.ttaf_after if row else None,
+        "latest_tca_after": row.tca_after if row else None,
+    }
+
+
+def refresh_usage_rollups(connection, *, amo_id: str, serials: Iterable[str], as_of: Optional[date] = None) -> int:
+    """Recompute and store the rollups of ``serials``; returns the rows written.
+
+    Only aircraft currently held by ``amo_id`` are refreshed; serials that
+    belong to another tenant are ignored.
+    """
+
+    as_of = as_of or date.today()
+    existing = set(
+        connection.execute(
+            select(Aircraft.serial_number).where(
+                Aircraft.amo_id == amo_id,
+                Aircraft.serial_number.in_(set(serials)),
+            )
+        ).scalars()
+    )
+    if not existing:
+        return 0
+    sums = _window_sums(connection, amo_id=amo_id, serials=existing, as_of=as_of)
+    rows = [
+        {
+            "aircraft_serial_number": serial,
+            "amo_id": amo_id,
+            "window_end": as_of,
+            **_latest_entry(connection, amo_id=amo_id, serial_number=serial),
+            **sums[serial],
+        }
+        for serial in sorted(existing)
+    ]
+    # ``existing`` holds only this tenant's aircraft. Rollups are keyed by
+    # aircraft, so a row left under a previous owner is replaced as well.
+    connection.execute(delete(AircraftUsageRollup).where(AircraftUsageRollup.aircraft_serial_number.in_(existing)))
+    connection.execute(insert(AircraftUsageRollup), rows)
+    return len(rows)
+
+
+def load_usage_rollups(db: Session, *, amo_id: str, serials: Iterable[str], as_of: Optional[date] = None) -> Dict[str, AircraftUsageRollup]:
+    """Rollups for ``serials`` with sums valid for ``as_of``.
+
+    Stored rows anchored to ``as_of`` are returned as they are. Rows anchored
+    to an earlier day, and aircraft without a row, get transient rollups
+    computed from the usage ledger in bounded grouped queries.
+    """
+
+    as_of = as_of or date.today()
+    serials = list(serials)
+    if not serials:
+        return {}
+    rollups = {
+        row.aircraft_serial_number: row
+        for row in db.execute(
+            select(AircraftUsageRollup).where(
+                AircraftUsageRollup.amo_id == amo_id,
+                AircraftUsageRollup.aircraft_serial_number.in_(serials),
+            )
+        ).scalars()
+    }
+    stale = [serial for serial in serials if serial not in rollups or rollups[serial].window_end != as_of]
+    if not stale:
+        return rollups
+    connection = db.connection()
+    sums = _window_sums(connection, amo_id=amo_id, serials=stale, as_of=as_of)
+    for serial in stale:
+        stored = rollups.get(serial)
+        latest = (
+            {
+                "latest_usage_id": stored.latest_usage_id,
+                "latest_date": stored.latest_date,
+                "latest_techlog_no": stored.latest_techlog_no,
+                "latest_ttaf_after": stored.latest_ttaf_after,
+                "latest_tca_after": stored.latest_tca_after,
+            }
+            if stored is not None
+            else _latest_entry(connection, amo_id=amo_id, serial_number=serial)
+        )
+        rollups[serial] = AircraftUsageRollup(
+            aircraft_serial_number=serial,
+            amo_id=amo_id,
+            window_end=as_of,
+            **latest,
+            **sums[serial],
+        )
+    return rollups
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_changed_aircraft(session: Session, _flush_context) -> None:
+    serials: set = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(instance, AircraftUsage):
+            continue
+        state = sa_inspect(instance)
+        serials.update(
+            serial
+            for serial in (instance.aircraft_serial_number, *state.attrs.aircraft_serial_number.history.deleted)
+            if serial
+        )
+    if not serials:
+        return
+    # Refresh each aircraft once, for the tenant that holds it now; a usage
+    # row moved between tenants must not refresh the aircraft twice.
+    connection = session.connection()
+    changed: Dict[str, set] = defaultdict(set)
+    for serial, amo_id in connection.execute(
+        select(Aircraft.serial_number, Aircraft.amo_id).where(Aircraft.serial_number.in_(serials))
+    ):
+        changed[amo_id].add(serial)
+    for amo_id, owned in changed.items():
+        refresh_usage_rollups(connection, amo_id=amo_id, serials=owned)
+
+
+__all__ = ["ROLLUP_WINDOWS", "load_usage_rollups", "refresh_usage_rollups"]
@@ -0,0 +1,98 @@
+"""Batch due-state evaluation for aircraft programme items.
+
+``service._calculate_due_state`` evaluates one item at a time. This engine
+produces the same states for a whole fleet at once, through the same
+``service._due_state_for_terms`` rules:
+
+* ``load_due_items`` fetches aircraft programme items for any number of
+  aircraft in one query, with their programme item joined in and the
+  ``aircraft``/``component`` relationships (whose own eager loads pull in
+  usage history, work orders and documents) switched off;
+* ``compute_due_states`` resolves each programme item's intervals and
+  thresholds once, however many aircraft carry it, and evaluates every item
+  against its aircraft's counters in a single pass.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import ColumnElement, select
+from sqlalchemy.orm import Session, contains_eager, noload
+
+from . import service
+from .models import (
+    AircraftProgramStatusEnum,
+    AmpAircraftProgramItem as AircraftProgramItem,
+    AmpProgramItem as MaintenanceProgramItem,
+    ProgramItemStatusEnum,
+)
+from ..fleet.models import Aircraft
+
+
+def load_due_items(
+    db: Session,
+    *,
+    amo_id: str,
+    aircraft_serial_numbers: Iterable[str],
+    include_completed: bool = True,
+    active_only: bool = False,
+    criteria: Iterable[ColumnElement[bool]] = (),
+) -> List[AircraftProgramItem]:
+    """Programme items of the given aircraft with ``program_item`` loaded, ordered by aircraft then id.
+
+    ``criteria`` may filter on both ``AmpAircraftProgramItem`` and
+    ``AmpProgramItem`` columns. ``aircraft`` and ``component`` are not loaded
+    and read as ``None`` on the returned items.
+    """
+
+    serials = list(aircraft_serial_numbers)
+    if not serials:
+        return []
+    stmt = (
+        select(AircraftProgramItem)
+        .join(Aircraft, Aircraft.serial_number == AircraftProgramItem.aircraft_serial_number)
+        .outerjoin(MaintenanceProgramItem, MaintenanceProgramItem.id == AircraftProgramItem.program_item_id)
+        .options(
+            contains_eager(AircraftProgramItem.program_item),
+            noload(AircraftProgramItem.aircraft),
+            noload(AircraftProgramItem.component),
+        )
+        .where(Aircraft.amo_id == amo_id, AircraftProgramItem.aircraft_serial_number.in_(serials), *criteria)
+        .order_by(AircraftProgramItem.aircraft_serial_number, AircraftProgramItem.id)
+    )
+    if not include_completed:
+        stmt = stmt.where(AircraftProgramItem.status != AircraftProgramStatusEnum.COMPLETED)
+    if active_only:
+        stmt = stmt.where(MaintenanceProgramItem.status == ProgramItemStatusEnum.ACTIVE)
+    return list(db.execute(stmt).scalars().all())
+
+
+def compute_due_states(
+    items: Sequence[AircraftProgramItem],
+    *,
+    counters: Mapping[str, Tuple[float, float]],
+    today: date,
+) -> List[Optional[Dict[str, Any]]]:
+    """Due state of each item, in order.
+
+    ``counters`` maps aircraft serial number to its current (hours, cycles).
+    Items whose programme item is missing or not ACTIVE get ``None``.
+    """
+
+    terms_by_program: Dict[int, service.DueTerms] = {}
+    states: List[Optional[Dict[str, Any]]] = []
+    for api in items:
+        program_item = api.program_item
+        if program_item is None or program_item.status != ProgramItemStatusEnum.ACTIVE:
+            states.append(None)
+            continue
+        terms = terms_by_program.get(id(program_item))
+        if terms is None:
+            terms = terms_by_program[id(program_item)] = service._due_terms(program_item)
+        current_hours, current_cycles = counters[api.aircraft_serial_number]
+        states.append(service._due_state_for_terms(terms, api, current_hours, current_cycles, today))
+    return states
+
+
+__all__ = ["compute_due_states", "load_due_items"]
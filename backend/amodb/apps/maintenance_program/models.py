@@ -257,6 +257,9 @@ class AmpAircraftProgramItem(Base):
     remaining_cycles = Column(Float, nullable=True)
     remaining_days = Column(Integer, nullable=True)
 
+    # Day the stored next-due / remaining values were evaluated for
+    due_computed_on = Column(Date, nullable=True)
+
     status = Column(
         SQLEnum(
             AircraftProgramStatusEnum,
@@ -4,25 +4,46 @@ The legacy service originally reused the latest log date as the calendar
 calculation date. This module keeps the accepted counter source from the usage
 ledger while always evaluating calendar exposure against the actual current
 calendar date.
+
+``recompute_due_for_aircraft`` re-evaluates every item of an aircraft.
+``apply_usage_delta`` is the writer path after a usage change: it re-evaluates
+only the items the change can move and writes the rows that differ in one
+batch. Setting ``AMO_DUE_RECOMPUTE_VERIFY`` (or passing ``verify=True``)
+follows every incremental update with a full evaluation and repairs, and
+logs, any item the two disagree on.
 """
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import date, datetime, timezone
-from typing import List
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import and_, or_, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
-from . import service
+from . import due_engine, service
 from .models import (
     AircraftProgramStatusEnum,
     AmpAircraftProgramItem as AircraftProgramItem,
     AmpProgramItem as MaintenanceProgramItem,
-    ProgramItemStatusEnum,
 )
 from .schemas import AircraftProgramItemDueList, AircraftProgramItemRead, FleetPlanningOverview
-from ..fleet.models import Aircraft
+from ..fleet.models import Aircraft, AircraftUsageRollup
+
+logger = logging.getLogger(__name__)
+
+VERIFY_INCREMENTAL_DUE = os.getenv("AMO_DUE_RECOMPUTE_VERIFY", "false").lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class DueRecomputeResult:
+    evaluated: int
+    written: int
+    mismatched_item_ids: Tuple[int, ...] = ()
 
 
 def recompute_due_for_aircraft(
@@ -38,45 +59,158 @@ def recompute_due_for_aircraft(
         amo_id,
     )
     calculation_date = date.today()
-    stmt = (
-        select(AircraftProgramItem)
-        .join(Aircraft, Aircraft.serial_number == AircraftProgramItem.aircraft_serial_number)
-        .where(
-            AircraftProgramItem.aircraft_serial_number == aircraft_serial_number,
-            Aircraft.amo_id == amo_id,
-        )
+    items = due_engine.load_due_items(
+        db,
+        amo_id=amo_id,
+        aircraft_serial_numbers=[aircraft_serial_number],
+        include_completed=include_completed,
     )
-    if not include_completed:
-        stmt = stmt.where(AircraftProgramItem.status != AircraftProgramStatusEnum.COMPLETED)
-    items = list(db.execute(stmt).scalars().all())
     if not items:
         return []
 
-    program_ids = {item.program_item_id for item in items}
-    program_map = {
-        item.id: item
-        for item in db.execute(
-            select(MaintenanceProgramItem).where(MaintenanceProgramItem.id.in_(program_ids))
-        ).scalars().all()
-    }
-
-    for item in items:
-        program_item = program_map.get(item.program_item_id)
-        if not program_item or program_item.status != ProgramItemStatusEnum.ACTIVE:
+    states = due_engine.compute_due_states(
+        items,
+        counters={aircraft_serial_number: (current_hours, current_cycles)},
+        today=calculation_date,
+    )
+    for item, state in zip(items, states):
+        item.due_computed_on = calculation_date
+        if state is None:
             item.status = AircraftProgramStatusEnum.SUSPENDED
             continue
-        state = service._calculate_due_state(
-            program_item=program_item,
-            api=item,
-            current_hours=current_hours,
-            current_cycles=current_cycles,
-            today=calculation_date,
-        )
         service._persist_due_state(item, state)
     db.flush()
     return items
 
 
+def _current_counters(db: Session, *, amo_id: str, aircraft_serial_number: str) -> Tuple[float, float]:
+    # Same source as service._get_aircraft_utilisation, read from the usage
+    # rollup (refreshed on flush) instead of the ledger and the full aircraft.
+    latest = db.execute(
+        select(AircraftUsageRollup.latest_date, AircraftUsageRollup.latest_ttaf_after, AircraftUsageRollup.latest_tca_after).where(
+            AircraftUsageRollup.amo_id == amo_id,
+            AircraftUsageRollup.aircraft_serial_number == aircraft_serial_number,
+        )
+    ).first()
+    totals = db.execute(
+        select(Aircraft.total_hours, Aircraft.total_cycles).where(
+            Aircraft.amo_id == amo_id,
+            Aircraft.serial_number == aircraft_serial_number,
+        )
+    ).first()
+    total_hours, total_cycles = totals if totals is not None else (None, None)
+    if latest is not None and latest.latest_date is not None:
+        return (
+            float(latest.latest_ttaf_after if latest.latest_ttaf_after is not None else total_hours or 0.0),
+            float(latest.latest_tca_after if latest.latest_tca_after is not None else total_cycles or 0.0),
+        )
+    return float(total_hours or 0.0), float(total_cycles or 0.0)
+
+
+def _stored_columns(state: Optional[Dict[str, Any]], calculation_date: date) -> Dict[str, Any]:
+    columns = {"status": AircraftProgramStatusEnum.SUSPENDED} if state is None else service._due_state_columns(state)
+    columns["due_computed_on"] = calculation_date
+    return columns
+
+
+def _write_due_columns(db: Session, changes: Sequence[Tuple[AircraftProgramItem, Dict[str, Any]]]) -> None:
+    if not changes:
+        return
+    db.execute(update(AircraftProgramItem), [{"id": item.id, **columns} for item, columns in changes])
+    for item, columns in changes:
+        for key, value in columns.items():
+            set_committed_value(item, key, value)
+        db.expire(item, ["updated_at"])
+
+
+def apply_usage_delta(
+    db: Session,
+    *,
+    amo_id: str,
+    aircraft_serial_number: str,
+    hours_delta: float,
+    cycles_delta: float,
+    verify: Optional[bool] = None,
+) -> DueRecomputeResult:
+    """Update stored due state after an aircraft's hours or cycles changed.
+
+    Only items whose programme item has an hours (or cycles) interval or
+    threshold are re-evaluated for a non-zero hours (or cycles) delta, plus
+    calendar items last evaluated on an earlier day and items never
+    evaluated. Pending ORM changes are flushed first so the counters include
+    the usage being written.
+    """
+
+    db.flush()
+    calculation_date = date.today()
+    current_hours, current_cycles = _current_counters(db, amo_id=amo_id, aircraft_serial_number=aircraft_serial_number)
+    affected = [
+        AircraftProgramItem.due_computed_on.is_(None),
+        and_(
+            or_(MaintenanceProgramItem.interval_days.isnot(None), MaintenanceProgramItem.threshold_days.isnot(None)),
+            AircraftProgramItem.due_computed_on != calculation_date,
+        ),
+    ]
+    if hours_delta:
+        affected.append(
+            or_(MaintenanceProgramItem.interval_hours.isnot(None), MaintenanceProgramItem.threshold_hours.isnot(None))
+        )
+    if cycles_delta:
+        affected.append(
+            or_(MaintenanceProgramItem.interval_cycles.isnot(None), MaintenanceProgramItem.threshold_cycles.isnot(None))
+        )
+    counters = {aircraft_serial_number: (current_hours, current_cycles)}
+    items = due_engine.load_due_items(
+        db,
+        amo_id=amo_id,
+        aircraft_serial_numbers=[aircraft_serial_number],
+        include_completed=False,
+        criteria=[or_(*affected)],
+    )
+    states = due_engine.compute_due_states(items, counters=counters, today=calculation_date)
+    changes = []
+    for item, state in zip(items, states):
+        columns = _stored_columns(state, calculation_date)
+        if any(getattr(item, key) != value for key, value in columns.items()):
+            changes.append((item, columns))
+    _write_due_columns(db, changes)
+
+    if not (VERIFY_INCREMENTAL_DUE if verify is None else verify):
+        return DueRecomputeResult(evaluated=len(items), written=len(changes))
+
+    everything = due_engine.load_due_items(
+        db,
+        amo_id=amo_id,
+        aircraft_serial_numbers=[aircraft_serial_number],
+        include_completed=False,
+    )
+    expected = due_engine.compute_due_states(everything, counters=counters, today=calculation_date)
+    # Compare with what is in the database, not with the identity map.
+    table = AircraftProgramItem.__table__
+    stored = {
+        row.id: row
+        for row in db.execute(select(table).where(table.c.id.in_([item.id for item in everything])))
+    }
+    repairs = []
+    for item, state in zip(everything, expected):
+        columns = _stored_columns(state, calculation_date)
+        columns.pop("due_computed_on")
+        if any(getattr(stored[item.id], key) != value for key, value in columns.items()):
+            repairs.append((item, {**columns, "due_computed_on": calculation_date}))
+    if repairs:
+        logger.warning(
+            "Incremental due recompute for aircraft %s disagreed with a full recompute on items %s",
+            aircraft_serial_number,
+            [item.id for item, _columns in repairs],
+        )
+        _write_due_columns(db, repairs)
+    return DueRecomputeResult(
+        evaluated=len(items),
+        written=len(changes),
+        mismatched_item_ids=tuple(item.id for item, _columns in repairs),
+    )
+
+
 def get_due_list_for_aircraft(
     db: Session,
     *,
@@ -89,23 +223,21 @@ def get_due_list_for_aircraft(
         amo_id,
     )
     calculation_date = date.today()
-    items = service.list_aircraft_program_items_for_aircraft(
+    items = due_engine.load_due_items(
         db,
         amo_id=amo_id,
-        aircraft_serial_number=aircraft_serial_number,
+        aircraft_serial_numbers=[aircraft_serial_number],
+        active_only=True,
+    )
+    states = due_engine.compute_due_states(
+        items,
+        counters={aircraft_serial_number: (current_hours, current_cycles)},
+        today=calculation_date,
     )
     read_items: List[AircraftProgramItemRead] = []
-    for item in items:
-        program_item = item.program_item
-        if program_item is None or program_item.status != ProgramItemStatusEnum.ACTIVE:
+    for item, state in zip(items, states):
+        if state is None:
             continue
-        state = service._calculate_due_state(
-            program_item=program_item,
-            api=item,
-            current_hours=current_hours,
-            current_cycles=current_cycles,
-            today=calculation_date,
-        )
         read_items.append(
             AircraftProgramItemRead.model_validate(item).model_copy(
                 update={
@@ -6,11 +6,12 @@ from __future__ import annotations
 
 from collections import defaultdict
 from datetime import date, datetime, timedelta, timezone
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
 from sqlalchemy import and_, select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, noload
 
+from . import due_engine
 from .models import (
     AircraftProgramStatusEnum,
     AmpAircraftProgramItem as AircraftProgramItem,
@@ -26,6 +27,7 @@ from .schemas import (
     FleetUtilisationRead,
 )
 from ..fleet.models import Aircraft, AircraftComponent, AircraftUsage
+from ..fleet.usage_rollup import load_usage_rollups
 from ..work.models import (
     TaskCard,
     TaskCategoryEnum,
@@ -234,65 +236,80 @@ def update_aircraft_program_item(
     return api
 
 
-def _calendar_anchor(program_item: MaintenanceProgramItem, api: AircraftProgramItem) -> Tuple[Optional[date], str]:
-    if api.last_done_date is not None:
-        return api.last_done_date, "ACCOMPLISHMENT"
-    if program_item.threshold_days is not None:
-        created_at = api.created_at
-        if created_at is not None:
-            return created_at.date(), "DERIVED_INITIAL_BASELINE"
-    return None, "MISSING_BASELINE"
+class DueTerms(NamedTuple):
+    """A programme item's intervals and thresholds, converted once for evaluation."""
 
+    interval_hours: Any
+    interval_cycles: Any
+    interval_days: Optional[timedelta]
+    threshold_hours: Optional[float]
+    threshold_cycles: Optional[float]
+    threshold_days: Optional[timedelta]
 
-def _calculate_due_state(
-    *,
-    program_item: MaintenanceProgramItem,
+
+def _due_terms(program_item: MaintenanceProgramItem) -> DueTerms:
+    return DueTerms(
+        interval_hours=program_item.interval_hours,
+        interval_cycles=program_item.interval_cycles,
+        interval_days=None if program_item.interval_days is None else timedelta(days=int(program_item.interval_days)),
+        threshold_hours=None if program_item.threshold_hours is None else float(program_item.threshold_hours),
+        threshold_cycles=None if program_item.threshold_cycles is None else float(program_item.threshold_cycles),
+        threshold_days=None if program_item.threshold_days is None else timedelta(days=int(program_item.threshold_days)),
+    )
+
+
+def _due_state_for_terms(
+    terms: DueTerms,
     api: AircraftProgramItem,
     current_hours: float,
     current_cycles: float,
     today: date,
 ) -> Dict[str, Any]:
-    next_hours: Optional[float] = None
-    if program_item.interval_hours is not None and api.last_done_hours is not None:
-        next_hours = float(api.last_done_hours + program_item.interval_hours)
-    elif program_item.threshold_hours is not None:
-        next_hours = float(program_item.threshold_hours)
-
-    next_cycles: Optional[float] = None
-    if program_item.interval_cycles is not None and api.last_done_cycles is not None:
-        next_cycles = float(api.last_done_cycles + program_item.interval_cycles)
-    elif program_item.threshold_cycles is not None:
-        next_cycles = float(program_item.threshold_cycles)
+    """Due state of ``api`` under ``terms``; the one definition of the due rules."""
+    last_done_hours = api.last_done_hours
+    if terms.interval_hours is not None and last_done_hours is not None:
+        next_hours = float(last_done_hours + terms.interval_hours)
+    else:
+        next_hours = terms.threshold_hours
+
+    last_done_cycles = api.last_done_cycles
+    if terms.interval_cycles is not None and last_done_cycles is not None:
+        next_cycles = float(last_done_cycles + terms.interval_cycles)
+    else:
+        next_cycles = terms.threshold_cycles
 
+    last_done_date = api.last_done_date
     next_date: Optional[date] = None
     baseline_status = "BASELINED"
-    if program_item.interval_days is not None and api.last_done_date is not None:
-        next_date = api.last_done_date + timedelta(days=int(program_item.interval_days))
-    elif program_item.threshold_days is not None:
-        anchor, baseline_status = _calendar_anchor(program_item, api)
-        if anchor is not None:
-            next_date = anchor + timedelta(days=int(program_item.threshold_days))
-    elif program_item.interval_days is not None:
+    if terms.interval_days is not None and last_done_date is not None:
+        next_date = last_done_date + terms.interval_days
+    elif terms.threshold_days is not None:
+        if last_done_date is not None:
+            next_date = last_done_date + terms.threshold_days
+            baseline_status = "ACCOMPLISHMENT"
+        elif api.created_at is not None:
+            next_date = api.created_at.date() + terms.threshold_days
+            baseline_status = "DERIVED_INITIAL_BASELINE"
+        else:
+            baseline_status = "MISSING_BASELINE"
+    elif terms.interval_days is not None:
         baseline_status = "MISSING_BASELINE"
 
     remaining_hours = None if next_hours is None else next_hours - current_hours
     remaining_cycles = None if next_cycles is None else next_cycles - current_cycles
     remaining_days = None if next_date is None else float((next_date - today).days)
 
-    signed_remaining = (remaining_hours, remaining_cycles, remaining_days)
-    overdue = any(value is not None and value < 0 for value in signed_remaining)
-    due_soon = any(
-        value is not None and 0 <= value <= threshold
-        for value, threshold in (
-            (remaining_hours, DUE_SOON_HOURS),
-            (remaining_cycles, DUE_SOON_CYCLES),
-            (remaining_days, float(DUE_SOON_DAYS)),
-        )
-    )
-
-    if overdue:
+    if (
+        (remaining_hours is not None and remaining_hours < 0)
+        or (remaining_cycles is not None and remaining_cycles < 0)
+        or (remaining_days is not None and remaining_days < 0)
+    ):
         status = AircraftProgramStatusEnum.OVERDUE
-    elif due_soon:
+    elif (
+        (remaining_hours is not None and 0 <= remaining_hours <= DUE_SOON_HOURS)
+        or (remaining_cycles is not None and 0 <= remaining_cycles <= DUE_SOON_CYCLES)
+        or (remaining_days is not None and 0 <= remaining_days <= float(DUE_SOON_DAYS))
+    ):
         status = AircraftProgramStatusEnum.DUE_SOON
     else:
         status = AircraftProgramStatusEnum.PLANNED
@@ -320,16 +337,34 @@ def _calculate_due_state(
     }
 
 
-def _persist_due_state(api: AircraftProgramItem, state: Dict[str, Any]) -> None:
-    api.next_due_hours = state["next_due_hours"]
-    api.next_due_cycles = state["next_due_cycles"]
-    api.next_due_date = state["next_due_date"]
+def _calculate_due_state(
+    *,
+    program_item: MaintenanceProgramItem,
+    api: AircraftProgramItem,
+    current_hours: float,
+    current_cycles: float,
+    today: date,
+) -> Dict[str, Any]:
+    return _due_state_for_terms(_due_terms(program_item), api, current_hours, current_cycles, today)
+
+
+def _due_state_columns(state: Dict[str, Any]) -> Dict[str, Any]:
     # Existing database constraints require non-negative stored remaining values.
     # The signed values are calculated and returned by the read projections.
-    api.remaining_hours = None if state["remaining_hours"] is None else max(0.0, state["remaining_hours"])
-    api.remaining_cycles = None if state["remaining_cycles"] is None else max(0.0, state["remaining_cycles"])
-    api.remaining_days = None if state["remaining_days"] is None else max(0, int(state["remaining_days"]))
-    api.status = state["status"]
+    return {
+        "next_due_hours": state["next_due_hours"],
+        "next_due_cycles": state["next_due_cycles"],
+        "next_due_date": state["next_due_date"],
+        "remaining_hours": None if state["remaining_hours"] is None else max(0.0, state["remaining_hours"]),
+        "remaining_cycles": None if state["remaining_cycles"] is None else max(0.0, state["remaining_cycles"]),
+        "remaining_days": None if state["remaining_days"] is None else max(0, int(state["remaining_days"])),
+        "status": state["status"],
+    }
+
+
+def _persist_due_state(api: AircraftProgramItem, state: Dict[str, Any]) -> None:
+    for key, value in _due_state_columns(state).items():
+        setattr(api, key, value)
 
 
 def recompute_due_for_aircraft(
@@ -466,8 +501,11 @@ def get_fleet_planning_overview(
 ) -> FleetPlanningOverview:
     today = date.today()
     horizon_date = today + timedelta(days=horizon_days)
+    # Aircraft eagerly load their usage history, work orders and documents;
+    # the overview reads none of them.
     aircraft_rows = (
         db.query(Aircraft)
+        .options(noload("*"))
         .filter(Aircraft.amo_id == amo_id, Aircraft.is_active.is_(True))
         .order_by(Aircraft.registration.asc())
         .all()
@@ -475,38 +513,16 @@ def get_fleet_planning_overview(
     aircraft_by_sn = {aircraft.serial_number: aircraft for aircraft in aircraft_rows}
     serials = list(aircraft_by_sn)
 
-    usage_rows: List[AircraftUsage] = []
-    if serials:
-        usage_rows = (
-            db.query(AircraftUsage)
-            .filter(
-                AircraftUsage.amo_id == amo_id,
-                AircraftUsage.aircraft_serial_number.in_(serials),
-            )
-            .order_by(
-                AircraftUsage.aircraft_serial_number.asc(),
-                AircraftUsage.date.desc(),
-                AircraftUsage.techlog_no.desc(),
-            )
-            .all()
-        )
-
-    latest_usage: Dict[str, AircraftUsage] = {}
-    seven_day_hours: Dict[str, float] = defaultdict(float)
-    seven_day_cutoff = today - timedelta(days=6)
-    for usage in usage_rows:
-        latest_usage.setdefault(usage.aircraft_serial_number, usage)
-        if usage.date >= seven_day_cutoff:
-            seven_day_hours[usage.aircraft_serial_number] += float(usage.block_hours or 0.0)
+    rollups = load_usage_rollups(db, amo_id=amo_id, serials=serials, as_of=today)
 
     current_by_aircraft: Dict[str, Tuple[float, float, date]] = {}
     for serial_number, aircraft in aircraft_by_sn.items():
-        latest = latest_usage.get(serial_number)
-        if latest:
+        rollup = rollups.get(serial_number)
+        if rollup is not None and rollup.latest_date is not None:
             current_by_aircraft[serial_number] = (
-                float(latest.ttaf_after if latest.ttaf_after is not None else aircraft.total_hours or 0.0),
-                float(latest.tca_after if latest.tca_after is not None else aircraft.total_cycles or 0.0),
-                latest.date,
+                float(rollup.latest_ttaf_after if rollup.latest_ttaf_after is not None else aircraft.total_hours or 0.0),
+                float(rollup.latest_tca_after if rollup.latest_tca_after is not None else aircraft.total_cycles or 0.0),
+                rollup.latest_date,
             )
         else:
             current_by_aircraft[serial_number] = (
@@ -520,35 +536,24 @@ def get_fleet_planning_overview(
     next_due_candidates: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
     unbaselined = 0
 
-    if serials:
-        api_items = (
-            db.query(AircraftProgramItem)
-            .join(Aircraft, Aircraft.serial_number == AircraftProgramItem.aircraft_serial_number)
-            .join(MaintenanceProgramItem, MaintenanceProgramItem.id == AircraftProgramItem.program_item_id)
-            .filter(
-                Aircraft.amo_id == amo_id,
-                AircraftProgramItem.aircraft_serial_number.in_(serials),
-                MaintenanceProgramItem.status == ProgramItemStatusEnum.ACTIVE,
-            )
-            .order_by(AircraftProgramItem.aircraft_serial_number, AircraftProgramItem.id)
-            .all()
-        )
-    else:
-        api_items = []
+    api_items = due_engine.load_due_items(
+        db,
+        amo_id=amo_id,
+        aircraft_serial_numbers=serials,
+        active_only=True,
+    )
+    states = due_engine.compute_due_states(
+        api_items,
+        counters={serial: (hours, cycles) for serial, (hours, cycles, _log_date) in current_by_aircraft.items()},
+        today=today,
+    )
 
-    for api in api_items:
+    for api, state in zip(api_items, states):
         aircraft = aircraft_by_sn.get(api.aircraft_serial_number)
         program_item = api.program_item
-        if aircraft is None or program_item is None:
+        if aircraft is None or state is None:
             continue
         current_hours, current_cycles, last_log_date = current_by_aircraft[api.aircraft_serial_number]
-        state = _calculate_due_state(
-            program_item=program_item,
-            api=api,
-            current_hours=current_hours,
-            current_cycles=current_cycles,
-            today=today,
-        )
         if state["status"] == AircraftProgramStatusEnum.OVERDUE:
             due_counts[api.aircraft_serial_number]["overdue"] += 1
         elif state["status"] == AircraftProgramStatusEnum.DUE_SOON:
@@ -588,9 +593,9 @@ def get_fleet_planning_overview(
 
     utilisation: List[FleetUtilisationRead] = []
     for serial_number, aircraft in aircraft_by_sn.items():
-        latest = latest_usage.get(serial_number)
+        rollup = rollups.get(serial_number)
         current_hours, current_cycles, last_log_date = current_by_aircraft[serial_number]
-        if latest is None and aircraft.last_log_date is None:
+        if (rollup is None or rollup.latest_date is None) and aircraft.last_log_date is None:
             freshness_status = "MISSING"
             days_since_log = None
         else:
@@ -611,7 +616,7 @@ def get_fleet_planning_overview(
                 last_log_date=None if freshness_status == "MISSING" else last_log_date,
                 days_since_log=days_since_log,
                 freshness_status=freshness_status,
-                seven_day_daily_average_hours=round(seven_day_hours.get(serial_number, 0.0) / 7.0, 2),
+                seven_day_daily_average_hours=round((rollup.hours_7d if rollup is not None else 0.0) / 7.0, 2),
                 overdue_count=due_counts[serial_number]["overdue"],
                 due_soon_count=due_counts[serial_number]["due_soon"],
                 next_due_date=min(date_values) if date_values else None,
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import random
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.fleet import models as fleet_models
+from amodb.apps.maintenance_program import due_engine, service
+from amodb.apps.maintenance_program import models as program_models
+from amodb.apps.maintenance_program.models import AircraftProgramStatusEnum, ProgramItemStatusEnum
+from amodb.database import Base
+
+TODAY = date(2026, 10, 16)
+
+
+def _maybe(rng: random.Random, value):
+    return None if rng.random() < 0.4 else value
+
+
+def _counter(rng: random.Random, *, whole: bool = False):
+    choice = rng.random()
+    if choice < 0.1:
+        return 0 if whole else 0.0
+    if whole:
+        return rng.randint(1, 20_000)
+    return round(rng.uniform(0.0, 20_000.0), rng.choice((0, 1, 2)))
+
+
+def _random_program(rng: random.Random, program_id: int):
+    return SimpleNamespace(
+        id=program_id,
+        status=rng.choice((ProgramItemStatusEnum.ACTIVE,) * 4 + (ProgramItemStatusEnum.SUSPENDED,)),
+        interval_hours=_maybe(rng, _counter(rng)),
+        interval_cycles=_maybe(rng, _counter(rng)),
+        interval_days=_maybe(rng, rng.randint(0, 3_650)),
+        threshold_hours=_maybe(rng, _counter(rng)),
+        threshold_cycles=_maybe(rng, _counter(rng, whole=True)),
+        threshold_days=_maybe(rng, rng.randint(0, 3_650)),
+    )
+
+
+def _random_item(rng: random.Random, program, serial: str):
+    created = TODAY - timedelta(days=rng.randint(0, 4_000))
+    return SimpleNamespace(
+        aircraft_serial_number=serial,
+        program_item=None if rng.random() < 0.05 else program,
+        last_done_hours=_maybe(rng, _counter(rng)),
+        last_done_cycles=_maybe(rng, _counter(rng, whole=True)),
+        last_done_date=_maybe(rng, TODAY - timedelta(days=rng.randint(-30, 4_000))),
+        created_at=_maybe(rng, datetime(created.year, created.month, created.day, 6, tzinfo=timezone.utc)),
+    )
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_engine_matches_single_item_calculation(seed):
+    rng = random.Random(seed)
+    programs = [_random_program(rng, program_id) for program_id in range(12)]
+    serials = [f"AC-{index}" for index in range(6)]
+    counters = {serial: (_counter(rng), float(_counter(rng, whole=True))) for serial in serials}
+    items = [_random_item(rng, rng.choice(programs), rng.choice(serials)) for _ in range(150)]
+    # Land some items exactly on their due-soon and overdue boundaries.
+    for item in items[:20]:
+        if item.program_item is not None and item.program_item.threshold_hours is not None:
+            hours, cycles = counters[item.aircraft_serial_number]
+            item.program_item.threshold_hours = hours + rng.choice((0.0, service.DUE_SOON_HOURS))
+    today = TODAY + timedelta(days=rng.randint(-5, 5))
+
+    states = due_engine.compute_due_states(items, counters=counters, today=today)
+
+    assert len(states) == len(items)
+    for item, state in zip(items, states):
+        program = item.program_item
+        if program is None or program.status != ProgramItemStatusEnum.ACTIVE:
+            assert state is None
+            continue
+        hours, cycles = counters[item.aircraft_serial_number]
+        expected = service._calculate_due_state(
+            program_item=program,
+            api=item,
+            current_hours=hours,
+            current_cycles=cycles,
+            today=today,
+        )
+        assert state == expected
+
+
+@pytest.fixture()
+def program_db():
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            fleet_models.Aircraft.__table__,
+            fleet_models.AircraftUsage.__table__,
+            fleet_models.AircraftUsageRollup.__table__,
+            program_models.AmpProgramItem.__table__,
+            program_models.AmpAircraftProgramItem.__table__,
+        ],
+    )
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)()
+    amo = account_models.AMO(amo_code="DUE-E", name="Due Engine", login_slug="due-e")
+    db.add(amo)
+    db.flush()
+    db.add(fleet_models.Aircraft(serial_number="AC-1", registration="5Y-DUE", amo_id=amo.id, total_hours=1000.0, total_cycles=400.0))
+    active = program_models.AmpProgramItem(template_code="T", title="Active check", interval_hours=100.0)
+    retired = program_models.AmpProgramItem(
+        template_code="T",
+        title="Retired check",
+        threshold_days=10,
+        status=ProgramItemStatusEnum.RETIRED,
+    )
+    db.add_all([active, retired])
+    db.flush()
+    db.add_all(
+        [
+            program_models.AmpAircraftProgramItem(aircraft_serial_number="AC-1", program_item_id=active.id, last_done_hours=920.0),
+            program_models.AmpAircraftProgramItem(aircraft_serial_number="AC-1", program_item_id=retired.id),
+        ]
+    )
+    db.commit()
+    yield db, amo.id
+    db.close()
+
+
+def test_loaded_items_carry_their_program_item_and_skip_inactive_ones(program_db):
+    db, amo_id = program_db
+
+    items = due_engine.load_due_items(db, amo_id=amo_id, aircraft_serial_numbers=["AC-1", "AC-9"])
+    states = due_engine.compute_due_states(items, counters={"AC-1": (1000.0, 400.0)}, today=TODAY)
+
+    assert [item.program_item.title for item in items] == ["Active check", "Retired check"]
+    assert (states[0]["next_due_hours"], states[0]["remaining_hours"], states[0]["status"]) == (
+        1020.0,
+        20.0,
+        AircraftProgramStatusEnum.DUE_SOON,
+    )
+    assert states[1] is None
+    active = due_engine.load_due_items(db, amo_id=amo_id, aircraft_serial_numbers=["AC-1"], active_only=True)
+    assert [item.program_item.title for item in active] == ["Active check"]
+    assert due_engine.load_due_items(db, amo_id="other-amo", aircraft_serial_numbers=["AC-1"]) == []
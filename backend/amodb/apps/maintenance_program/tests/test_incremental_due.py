@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.orm import sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.fleet import models as fleet_models
+from amodb.apps.maintenance_program import models as program_models
+from amodb.apps.maintenance_program import projection
+from amodb.apps.maintenance_program.models import AircraftProgramStatusEnum, ProgramItemStatusEnum
+from amodb.database import Base
+
+TODAY = date.today()
+
+
+@pytest.fixture()
+def due_db():
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            fleet_models.Aircraft.__table__,
+            fleet_models.AircraftUsage.__table__,
+            fleet_models.AircraftUsageRollup.__table__,
+            program_models.AmpProgramItem.__table__,
+            program_models.AmpAircraftProgramItem.__table__,
+        ],
+    )
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)()
+    amo = account_models.AMO(amo_code="DUE-I", name="Incremental Due", login_slug="due-i")
+    db.add(amo)
+    db.flush()
+    db.add(fleet_models.Aircraft(serial_number="AC-1", registration="5Y-INC", amo_id=amo.id, total_hours=1000.0, total_cycles=400.0))
+    templates = {
+        "hours": program_models.AmpProgramItem(template_code="T", title="Hours", interval_hours=100.0),
+        "cycles": program_models.AmpProgramItem(template_code="T", title="Cycles", interval_cycles=500.0),
+        "calendar": program_models.AmpProgramItem(template_code="T", title="Calendar", interval_days=30),
+        "retired": program_models.AmpProgramItem(
+            template_code="T",
+            title="Retired",
+            interval_hours=50.0,
+            status=ProgramItemStatusEnum.RETIRED,
+        ),
+    }
+    db.add_all(templates.values())
+    db.flush()
+    items = {
+        "hours": program_models.AmpAircraftProgramItem(
+            aircraft_serial_number="AC-1", program_item_id=templates["hours"].id, last_done_hours=920.0
+        ),
+        "cycles": program_models.AmpAircraftProgramItem(
+            aircraft_serial_number="AC-1", program_item_id=templates["cycles"].id, last_done_cycles=100.0
+        ),
+        "calendar": program_models.AmpAircraftProgramItem(
+            aircraft_serial_number="AC-1", program_item_id=templates["calendar"].id, last_done_date=TODAY - timedelta(days=10)
+        ),
+        "retired": program_models.AmpAircraftProgramItem(
+            aircraft_serial_number="AC-1", program_item_id=templates["retired"].id, last_done_hours=900.0
+        ),
+    }
+    db.add_all(items.values())
+    db.commit()
+    yield db, amo.id, items, statements
+    db.close()
+
+
+def _log(db, amo_id: str, *, techlog_no: str, hours: float, cycles: float, total_hours: float, total_cycles: float) -> None:
+    db.add(
+        fleet_models.AircraftUsage(
+            amo_id=amo_id,
+            aircraft_serial_number="AC-1",
+            date=TODAY,
+            techlog_no=techlog_no,
+            block_hours=hours,
+            cycles=cycles,
+            ttaf_after=total_hours,
+            tca_after=total_cycles,
+        )
+    )
+
+
+def _stored(db, item_id: int, *columns: str) -> tuple:
+    table = program_models.AmpAircraftProgramItem.__table__
+    return tuple(db.execute(select(*(table.c[name] for name in columns)).where(table.c.id == item_id)).one())
+
+
+def test_first_delta_evaluates_everything_then_only_the_affected_basis(due_db):
+    db, amo_id, items, statements = due_db
+    _log(db, amo_id, techlog_no="TL-1", hours=5.0, cycles=2.0, total_hours=1005.0, total_cycles=402.0)
+
+    first = projection.apply_usage_delta(db, amo_id=amo_id, aircraft_serial_number="AC-1", hours_delta=5.0, cycles_delta=2.0)
+
+    assert (first.evaluated, first.written) == (4, 4)
+    assert (items["hours"].next_due_hours, items["hours"].remaining_hours, items["hours"].status) == (
+        1020.0,
+        15.0,
+        AircraftProgramStatusEnum.DUE_SOON,
+    )
+    assert (items["calendar"].remaining_days, items["calendar"].due_computed_on) == (20, TODAY)
+    assert items["retired"].status == AircraftProgramStatusEnum.SUSPENDED
+    db.commit()
+
+    _log(db, amo_id, techlog_no="TL-2", hours=30.0, cycles=0.0, total_hours=1035.0, total_cycles=402.0)
+    statements.clear()
+    second = projection.apply_usage_delta(
+        db,
+        amo_id=amo_id,
+        aircraft_serial_number="AC-1",
+        hours_delta=30.0,
+        cycles_delta=0.0,
+        verify=True,
+    )
+
+    # Only hours-based items are re-evaluated: the retired template still has
+    # an hours interval but its stored SUSPENDED state does not change.
+    assert (second.evaluated, second.written, second.mismatched_item_ids) == (2, 1, ())
+    assert (items["hours"].remaining_hours, items["hours"].status) == (0.0, AircraftProgramStatusEnum.OVERDUE)
+    assert len([sql for sql in statements if sql.startswith("UPDATE aircraft_program_items")]) == 1
+    db.commit()
+    assert _stored(db, items["hours"].id, "remaining_hours", "status") == (0.0, AircraftProgramStatusEnum.OVERDUE)
+
+
+def test_verification_mode_repairs_state_the_incremental_pass_skipped(due_db):
+    db, amo_id, items, _statements = due_db
+    _log(db, amo_id, techlog_no="TL-1", hours=5.0, cycles=2.0, total_hours=1005.0, total_cycles=402.0)
+    projection.apply_usage_delta(db, amo_id=amo_id, aircraft_serial_number="AC-1", hours_delta=5.0, cycles_delta=2.0)
+    db.commit()
+    cycles_id = items["cycles"].id
+    db.execute(
+        update(program_models.AmpAircraftProgramItem.__table__)
+        .where(program_models.AmpAircraftProgramItem.__table__.c.id == cycles_id)
+        .values(remaining_cycles=1.0)
+    )
+    db.commit()
+
+    _log(db, amo_id, techlog_no="TL-2", hours=1.0, cycles=0.0, total_hours=1006.0, total_cycles=402.0)
+    result = projection.apply_usage_delta(
+        db,
+        amo_id=amo_id,
+        aircraft_serial_number="AC-1",
+        hours_delta=1.0,
+        cycles_delta=0.0,
+        verify=True,
+    )
+
+    assert result.mismatched_item_ids == (cycles_id,)
+    db.commit()
+    assert _stored(db, cycles_id, "remaining_cycles") == (198.0,)
@@ -176,12 +176,7 @@ def publication_knowledge_tree(
     tenant = _tenant_by_slug(db, tenant_slug)
     if not getattr(current_user, "is_superuser", False) and str(current_user.amo_id) != str(tenant.amo_id):
         raise HTTPException(status_code=403, detail="The requested hierarchy is outside the active AMO")
-    payload = hierarchy_payload(
-        db,
-        manual_tenant=tenant,
-        actor_id=current_user.id if is_control_user(current_user) else None,
-    )
-    db.commit()
+    payload = hierarchy_payload(db, manual_tenant=tenant)
     payload["capabilities"] = {"read": True, "control": is_control_user(current_user)}
     return payload
 
@@ -4,12 +4,12 @@ import json
 import logging
 import os
 import tempfile
-import threading
 from dataclasses import asdict
 from pathlib import Path
 from typing import Any
 
-from amodb.apps.doc_control.pdfium_service import PdfEngineError, PdfInspection
+from amodb import tenant_cache
+from amodb.apps.doc_control.pdfium_service import PROCESS_TIMEOUT_SECONDS, PdfEngineError, PdfInspection
 from amodb.database import WriteSessionLocal
 
 from . import models
@@ -27,7 +27,24 @@ _INSPECTION_CACHE_ROOT = Path(
         str(_SAFE_READER_CACHE_ROOT / "capabilities"),
     )
 ).resolve()
-_CACHE_LOCK = threading.RLock()
+# Inspections are content-addressed, so entries never go stale; the LRU bound
+# and TTL only cap memory. Both namespaces single-flight concurrent misses per
+# checksum, so one slow PDF no longer holds up other revisions. Waiters allow
+# for a full PDFium round trip before computing on their own.
+_INSPECTIONS = tenant_cache.namespace(
+    "manuals.pdf_inspections",
+    ttl_seconds=3600,
+    max_entries=int(os.getenv("PDF_READER_CAPABILITY_MEMORY_ENTRIES", "512")),
+    freeze_values=False,
+    load_wait_seconds=PROCESS_TIMEOUT_SECONDS + 30,
+)
+_SAFE_READERS = tenant_cache.namespace(
+    "manuals.pdf_safe_readers",
+    ttl_seconds=300,
+    max_entries=512,
+    freeze_values=False,
+    load_wait_seconds=PROCESS_TIMEOUT_SECONDS + 30,
+)
 
 
 def _inspection_cache_path(source_sha256: str) -> Path:
@@ -117,6 +134,14 @@ def _write_cached_inspection(inspection: PdfInspection) -> None:
         temporary.unlink(missing_ok=True)
 
 
+def _load_inspection(revision: models.ManualRevision, source_sha256: str) -> PdfInspection:
+    inspection = _read_cached_inspection(revision, source_sha256)
+    if inspection is None:
+        inspection = _capability_inspection(revision)
+        _write_cached_inspection(inspection)
+    return inspection
+
+
 def cached_pdf_inspection(
     revision: models.ManualRevision,
     *,
@@ -125,15 +150,19 @@ def cached_pdf_inspection(
     """Return checksum-keyed inspection and materialize any safe derivative once."""
 
     source_sha256 = _validated_checksum(revision)
-    with _CACHE_LOCK:
-        inspection = _read_cached_inspection(revision, source_sha256)
-        if inspection is None:
-            inspection = _capability_inspection(revision)
-            _write_cached_inspection(inspection)
-
-        if prepare_safe_reader and inspection.has_javascript:
-            _safe_reader_cache_path(revision, inspection.source_sha256)
-        return inspection
+    # The recorded page count is part of the key because the on-disk entry is
+    # rejected when it disagrees with the revision.
+    recorded_pages = int(getattr(revision, "source_page_count", 0) or 0)
+    inspection = _INSPECTIONS.get_or_load(
+        (source_sha256, recorded_pages),
+        lambda: _load_inspection(revision, source_sha256),
+    )
+    if prepare_safe_reader and inspection.has_javascript:
+        _SAFE_READERS.get_or_load(
+            inspection.source_sha256,
+            lambda: _safe_reader_cache_path(revision, inspection.source_sha256),
+        )
+    return inspection
 
 
 def precompute_pdf_reader_assets(revision_id: str) -> None:
@@ -8,16 +8,18 @@ from typing import Iterator
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import func, or_
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from amodb import storage
 from amodb.apps.accounts import models as account_models
 from amodb.apps.doc_control import domain_models as dc_models
-from amodb.apps.doc_control.workspace_service import can_read_manual, get_profile
+from amodb.apps.doc_control.workspace_service import can_read_manual, get_profile, is_control_user
 from amodb.database import get_db
 from amodb.security import get_current_active_user
 
 from . import models
+from . import reader_search as reader_search_index
 from .router_legacy import _audit, _tenant_by_slug
 
 
@@ -71,6 +73,13 @@ def _etag(cache_key: str) -> str:
     return f'"{cache_key}"'
 
 
+def _tenant_for_user(db: Session, tenant_slug: str, current_user: account_models.User):
+    tenant = _tenant_by_slug(db, tenant_slug)
+    if not getattr(current_user, "is_superuser", False) and str(getattr(current_user, "amo_id", "")) != str(tenant.amo_id):
+        raise HTTPException(status_code=403, detail="The requested publication is outside the active AMO context")
+    return tenant
+
+
 def _load_publication(
     db: Session,
     *,
@@ -79,9 +88,7 @@ def _load_publication(
     revision_id: str,
     current_user: account_models.User,
 ):
-    tenant = _tenant_by_slug(db, tenant_slug)
-    if not getattr(current_user, "is_superuser", False) and str(getattr(current_user, "amo_id", "")) != str(tenant.amo_id):
-        raise HTTPException(status_code=403, detail="The requested publication is outside the active AMO context")
+    tenant = _tenant_for_user(db, tenant_slug, current_user)
     manual = (
         db.query(models.Manual)
         .filter(models.Manual.id == manual_id, models.Manual.tenant_id == tenant.id)
@@ -424,41 +431,65 @@ def reader_search(
         revision_id=revision_id,
         current_user=current_user,
     )
-    needle = f"%{q.strip()}%"
-    rows = (
-        db.query(models.ManualSection, models.ManualBlock)
-        .outerjoin(models.ManualBlock, models.ManualBlock.section_id == models.ManualSection.id)
-        .filter(
-            models.ManualSection.revision_id == revision.id,
-            or_(
-                models.ManualSection.heading.ilike(needle),
-                models.ManualBlock.text_plain.ilike(needle),
-            ),
-        )
-        .order_by(models.ManualSection.order_index.asc(), models.ManualBlock.order_index.asc())
-        .limit(limit * 4)
-        .all()
+    items = reader_search_index.search_sections(db, [revision.id], q, limit=limit)
+    for item in items:
+        item.pop("revision_id", None)
+    return {"query": q.strip(), "items": items, "total": len(items)}
+
+
+@router.get("/t/{tenant_slug}/library-search")
+def library_search(
+    tenant_slug: str,
+    q: str = Query(min_length=2, max_length=200),
+    scope: str = Query(default="current", pattern="^(current|all)$"),
+    limit: int = Query(default=80, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: account_models.User = Depends(get_current_active_user),
+):
+    """Search every readable manual in the tenant's library.
+
+    ``scope=current`` searches each manual's published revision; ``scope=all``
+    also searches superseded ones (and, for document control users, drafts).
+    """
+    tenant = _tenant_for_user(db, tenant_slug, current_user)
+    profiles = {
+        profile.manual_id: profile
+        for profile in db.query(dc_models.DocumentControlProfile).filter(dc_models.DocumentControlProfile.tenant_id == tenant.amo_id)
+    }
+    revisions = (
+        db.query(models.ManualRevision, models.Manual)
+        .join(models.Manual, models.Manual.id == models.ManualRevision.manual_id)
+        .filter(models.Manual.tenant_id == tenant.id)
     )
-    results: list[dict] = []
-    seen: set[str] = set()
-    for section, block in rows:
-        if section.id in seen:
-            continue
-        seen.add(section.id)
-        text = str(getattr(block, "text_plain", "") or "").strip()
-        results.append(
+    if scope == "current":
+        revisions = revisions.filter(
+            models.ManualRevision.id == models.Manual.current_published_rev_id,
+            models.ManualRevision.status_enum == models.ManualRevisionStatus.PUBLISHED,
+        )
+    elif not is_control_user(current_user):
+        revisions = revisions.filter(
+            models.ManualRevision.status_enum.in_(
+                [models.ManualRevisionStatus.PUBLISHED, models.ManualRevisionStatus.SUPERSEDED]
+            )
+        )
+    readable = {
+        revision.id: (revision, manual)
+        for revision, manual in revisions.all()
+        if can_read_manual(current_user, profiles.get(manual.id))
+    }
+    items = reader_search_index.search_sections(db, list(readable), q, limit=limit)
+    for item in items:
+        revision, manual = readable[item["revision_id"]]
+        item.update(
             {
-                "section_id": section.id,
-                "anchor_slug": section.anchor_slug,
-                "heading": section.heading,
-                "level": section.level,
-                "page_start": int((section.metadata_json or {}).get("page_start") or 0) or None,
-                "snippet": text[:260] if text else "Section heading match",
+                "manual_id": manual.id,
+                "manual_code": manual.code,
+                "manual_title": manual.title,
+                "rev_number": revision.rev_number,
+                "revision_status": _status_value(revision),
             }
         )
-        if len(results) >= limit:
-            break
-    return {"query": q.strip(), "items": results, "total": len(results)}
+    return {"query": q.strip(), "scope": scope, "items": items, "total": len(items)}
 
 
 @router.post("/t/{tenant_slug}/{manual_id}/rev/{revision_id}/reader-position")
@@ -532,8 +563,28 @@ def _iter_file(path: Path, start: int, end: int) -> Iterator[bytes]:
             yield chunk
 
 
-def _stream_source(path: Path, request: Request, *, filename: str, cache_key: str):
-    size = path.stat().st_size
+def _stream_source(
+    source: Path | str,
+    request: Request,
+    *,
+    filename: str,
+    cache_key: str,
+    expected_sha256: str | None = None,
+):
+    # ``source`` is a local file or a shared-storage URI; URIs are served
+    # through the storage cache, range by range, while it fills.
+    if isinstance(source, Path):
+        size = source.stat().st_size
+
+        def read(start: int, end: int) -> Iterator[bytes]:
+            return _iter_file(source, start, end)
+
+    else:
+        size = storage.object_size(source, expected_sha256=expected_sha256)
+
+        def read(start: int, end: int) -> Iterator[bytes]:
+            return storage.iter_range(source, start, end, expected_sha256=expected_sha256)
+
     etag = _etag(cache_key)
     common_headers = {
         "Accept-Ranges": "bytes",
@@ -568,13 +619,13 @@ def _stream_source(path: Path, request: Request, *, filename: str, cache_key: st
             "Content-Length": str(end - start + 1),
         }
         return StreamingResponse(
-            _iter_file(path, start, end),
+            read(start, end),
             status_code=206,
             media_type="application/pdf",
             headers=headers,
         )
     return StreamingResponse(
-        _iter_file(path, 0, max(0, size - 1)),
+        read(0, max(0, size - 1)),
         media_type="application/pdf",
         headers={**common_headers, "Content-Length": str(size)},
     )
@@ -599,14 +650,19 @@ def stream_publication_pdf(
     if _source_type(revision) != "PDF":
         raise HTTPException(status_code=409, detail="The exact-source stream is available only for PDF revisions")
     path = _source_path(revision)
+    source: Path | str | None = path
     if not path:
+        raw = str(getattr(revision, "source_storage_path", "") or "").strip()
+        source = raw if raw.startswith("s3://") else None
+    if not source:
         raise HTTPException(status_code=404, detail="The publication source file is unavailable")
     cache_key = _cache_key(revision, path)
     safe_code = re.sub(r"[^A-Za-z0-9._-]+", "_", manual.code or "publication")
     safe_revision = re.sub(r"[^A-Za-z0-9._-]+", "_", revision.rev_number or "current")
     return _stream_source(
-        path,
+        source,
         request,
         filename=f"{safe_code}_Rev_{safe_revision}.pdf",
         cache_key=cache_key,
+        expected_sha256=str(getattr(revision, "source_sha256", "") or "").strip().lower() or None,
     )
@@ -0,0 +1,257 @@
+"""Ranked search over manual sections and blocks for the publication reader.
+
+On PostgreSQL, headings and block text are matched through
+``manual_search_vector(...)``, whose GIN expression indexes are kept current
+by the database as revisions are ingested (migration
+``document_control_261016_reader_search``). Other dialects fall back to the
+substring match the reader has always used.
+
+Query syntax accepted from the search box:
+
+* plain words, each matched as a prefix (``hydr`` finds ``hydraulic``);
+* ``"quoted phrases"``, matched as adjacent words;
+* part numbers such as ``AN960-10L``, matched with or without separators.
+
+Snippets and highlight offsets are built here from the plain block text, so
+the client renders text plus ``[start, end]`` ranges and never HTML.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import re
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import Integer, String, case, cast, func, literal, literal_column, null, union_all
+from sqlalchemy.orm import Session
+
+from . import models
+
+HEADING_WEIGHT = 2.0
+MAX_TERMS = 12
+SNIPPET_CHARS = 260
+
+_PHRASE = re.compile(r'"([^"]*)"?')
+_WORD = re.compile(r"[^\W_]+")
+_PART_NUMBER = re.compile(r"[^\W_]+(?:[-./][^\W_]+)+")
+_PART_SEPARATORS = "-./"
+
+
+@dataclass(frozen=True)
+class SearchTerm:
+    words: tuple[str, ...]
+    prefix: bool
+
+    def tsquery(self) -> str:
+        lexemes = [f"'{word}'" for word in self.words]
+        if self.prefix:
+            lexemes[-1] += ":*"
+        return " <-> ".join(lexemes)
+
+    def pattern(self) -> str:
+        if len(self.words) == 1 and any(character.isdigit() for character in self.words[0]):
+            # Part numbers are indexed compacted; highlight them as printed.
+            body = "[-./]?".join(re.escape(character) for character in self.words[0])
+        else:
+            body = r"[\W_]+".join(re.escape(word) for word in self.words)
+        tail = r"[^\W_]*" if self.prefix else r"(?![^\W_])"
+        return rf"(?<![^\W_]){body}{tail}"
+
+
+def part_number_terms(text: str) -> list[str]:
+    """Compacted part-number terms, as ``manual_part_number_terms`` indexes them."""
+    return [
+        match.group(0).lower().translate(str.maketrans("", "", _PART_SEPARATORS))
+        for match in _PART_NUMBER.finditer(text or "")
+        if any(character.isdigit() for character in match.group(0))
+    ]
+
+
+def parse_query(q: str) -> list[SearchTerm]:
+    terms: list[SearchTerm] = []
+    for phrase in _PHRASE.findall(q or ""):
+        words = tuple(_WORD.findall(phrase.lower()))
+        if words:
+            terms.append(SearchTerm(words, prefix=False))
+    for token in _PHRASE.sub(" ", q or "").split():
+        token = token.lower().strip(_PART_SEPARATORS)
+        compacted = part_number_terms(token)
+        if compacted and _PART_NUMBER.fullmatch(token):
+            terms.append(SearchTerm((compacted[0],), prefix=True))
+            continue
+        terms.extend(SearchTerm((word,), prefix=True) for word in _WORD.findall(token))
+    unique: list[SearchTerm] = []
+    for term in terms:
+        if term not in unique:
+            unique.append(term)
+    return unique[:MAX_TERMS]
+
+
+def tsquery_text(terms: Sequence[SearchTerm]) -> str:
+    return " & ".join(term.tsquery() for term in terms)
+
+
+def highlight_pattern(terms: Sequence[SearchTerm]) -> re.Pattern[str] | None:
+    if not terms:
+        return None
+    return re.compile("|".join(term.pattern() for term in terms), re.IGNORECASE)
+
+
+def highlights(text: str, pattern: re.Pattern[str] | None) -> list[list[int]]:
+    if pattern is None:
+        return []
+    return [[match.start(), match.end()] for match in pattern.finditer(text or "") if match.end() > match.start()]
+
+
+def headline(text: str, pattern: re.Pattern[str] | None, *, width: int = SNIPPET_CHARS) -> tuple[str, list[list[int]]]:
+    """Best ``width``-character window of ``text`` and its highlight ranges.
+
+    Like ``ts_headline``, the window is the one holding the most matches; it
+    is widened to word boundaries and marked with ellipses when clipped.
+    """
+    text = " ".join(str(text or "").split())
+    spans = highlights(text, pattern)
+    if len(text) <= width:
+        return text, spans
+    start = 0
+    if spans:
+        lead = width // 6
+        candidates = spans[:200]
+
+        def covered(index: int) -> int:
+            window_end = candidates[index][0] - lead + width
+            return sum(1 for span in candidates[index:] if span[1] <= window_end)
+
+        best = max(range(len(candidates)), key=lambda index: (covered(index), -index))
+        start = max(0, candidates[best][0] - lead)
+    end = min(len(text), start + width)
+    start = max(0, end - width)
+    if start:
+        boundary = text.find(" ", start)
+        start = boundary + 1 if 0 <= boundary < start + 24 else start
+    if end < len(text):
+        boundary = text.rfind(" ", start, end)
+        end = boundary if boundary > end - 24 else end
+    prefix = "… " if start else ""
+    suffix = " …" if end < len(text) else ""
+    offset = len(prefix) - start
+    window = [[a + offset, b + offset] for a, b in spans if a >= start and b <= end]
+    return f"{prefix}{text[start:end]}{suffix}", window
+
+
+def _ranked_sections(db: Session, revision_ids: Sequence[str], terms: Sequence[SearchTerm], limit: int) -> list[tuple[Any, str | None, float]]:
+    language = literal_column("'simple'")
+    query = func.to_tsquery(language, tsquery_text(terms))
+    block_vector = func.manual_search_vector(models.ManualBlock.text_plain)
+    heading_vector = func.manual_search_vector(models.ManualSection.heading)
+    block_hits = (
+        db.query(
+            models.ManualBlock.section_id.label("section_id"),
+            models.ManualBlock.id.label("block_id"),
+            models.ManualBlock.order_index.label("block_order"),
+            func.ts_rank_cd(block_vector, query).label("rank"),
+        )
+        .join(models.ManualSection, models.ManualSection.id == models.ManualBlock.section_id)
+        .filter(models.ManualSection.revision_id.in_(revision_ids), block_vector.op("@@")(query))
+    )
+    heading_hits = db.query(
+        models.ManualSection.id.label("section_id"),
+        cast(null(), String(36)).label("block_id"),
+        cast(literal(-1), Integer).label("block_order"),
+        (func.ts_rank_cd(heading_vector, query) * HEADING_WEIGHT).label("rank"),
+    ).filter(models.ManualSection.revision_id.in_(revision_ids), heading_vector.op("@@")(query))
+    hits = union_all(block_hits.statement, heading_hits.statement).subquery()
+    is_heading = hits.c.block_id.is_(None)
+    by_section = {"partition_by": hits.c.section_id}
+    # One row per section: its best block, scored as heading rank + best block rank.
+    scored = db.query(
+        hits.c.section_id,
+        hits.c.block_id,
+        (
+            func.max(case((is_heading, hits.c.rank), else_=0.0)).over(**by_section)
+            + func.max(case((is_heading, 0.0), else_=hits.c.rank)).over(**by_section)
+        ).label("score"),
+        func.row_number()
+        .over(order_by=(is_heading.asc(), hits.c.rank.desc(), hits.c.block_order.asc()), **by_section)
+        .label("position"),
+    ).subquery()
+    return (
+        db.query(models.ManualSection, scored.c.block_id, scored.c.score)
+        .join(scored, scored.c.section_id == models.ManualSection.id)
+        .filter(scored.c.position == 1)
+        .order_by(scored.c.score.desc(), models.ManualSection.revision_id.asc(), models.ManualSection.order_index.asc())
+        .limit(limit)
+        .all()
+    )
+
+
+def _substring_sections(db: Session, revision_ids: Sequence[str], q: str, limit: int) -> list[tuple[Any, str | None, None]]:
+    # Search text is literal: % and _ typed by the reader are not wildcards.
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    needle = f"%{escaped}%"
+    rows = (
+        db.query(models.ManualSection, models.ManualBlock.id)
+        .outerjoin(models.ManualBlock, models.ManualBlock.section_id == models.ManualSection.id)
+        .filter(
+            models.ManualSection.revision_id.in_(revision_ids),
+            models.ManualSection.heading.ilike(needle, escape="\\")
+            | models.ManualBlock.text_plain.ilike(needle, escape="\\"),
+        )
+        .order_by(
+            models.ManualSection.revision_id.asc(),
+            models.ManualSection.order_index.asc(),
+            models.ManualBlock.order_index.asc(),
+        )
+        .limit(limit * 4)
+        .all()
+    )
+    output: list[tuple[Any, str | None, None]] = []
+    seen: set[str] = set()
+    for section, block_id in rows:
+        if section.id in seen:
+            continue
+        seen.add(section.id)
+        output.append((section, block_id, None))
+        if len(output) >= limit:
+            break
+    return output
+
+
+def _block_texts(db: Session, block_ids: Iterable[str]) -> dict[str, str]:
+    ids = sorted({block_id for block_id in block_ids if block_id})
+    if not ids:
+        return {}
+    return {block_id: text for block_id, text in db.query(models.ManualBlock.id, models.ManualBlock.text_plain).filter(models.ManualBlock.id.in_(ids))}
+
+
+def search_sections(db: Session, revision_ids: Sequence[str], q: str, *, limit: int) -> list[dict[str, Any]]:
+    """Best-matching sections across ``revision_ids``, most relevant first."""
+    q = (q or "").strip()
+    terms = parse_query(q)
+    if not revision_ids or not terms:
+        return []
+    if str(db.get_bind().dialect.name) == "postgresql":
+        rows = _ranked_sections(db, revision_ids, terms, limit)
+    else:
+        rows = _substring_sections(db, revision_ids, q, limit)
+    pattern = highlight_pattern(terms)
+    # Snippets are cut only for the page of results being returned.
+    texts = _block_texts(db, (block_id for _section, block_id, _score in rows))
+    results: list[dict[str, Any]] = []
+    for section, block_id, score in rows:
+        text = str(texts.get(block_id) or "").strip()
+        snippet, spans = headline(text, pattern) if text else ("Section heading match", [])
+        results.append(
+            {
+                "revision_id": section.revision_id,
+                "section_id": section.id,
+                "anchor_slug": section.anchor_slug,
+                "heading": section.heading,
+                "heading_highlights": highlights(section.heading, pattern),
+                "level": section.level,
+                "page_start": int((section.metadata_json or {}).get("page_start") or 0) or None,
+                "snippet": snippet,
+                "highlights": spans,
+                "score": round(float(score), 4) if score is not None else None,
+            }
+        )
+    return results
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
+
+from amodb.apps.doc_control.pdfium_service import PdfInspection
+from amodb.apps.manuals import pdf_reader_precompute as precompute
+
+
+def _inspection(source_sha256: str) -> PdfInspection:
+    return PdfInspection(
+        engine="PDFium",
+        engine_version="test",
+        source_sha256=source_sha256,
+        page_count=2,
+        form_type=1,
+        has_acroform=True,
+        has_javascript=False,
+        is_dynamic_xfa=False,
+        encrypted=False,
+        can_flatten=True,
+        unsupported_reason=None,
+        template_fingerprint={},
+    )
+
+
+@pytest.fixture()
+def inspections(monkeypatch: pytest.MonkeyPatch, tmp_path):
+    monkeypatch.setattr(precompute, "_INSPECTION_CACHE_ROOT", tmp_path)
+    precompute._INSPECTIONS.clear()
+    calls: list[str] = []
+    active = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def slow_inspection(revision):
+        with lock:
+            calls.append(revision.source_sha256)
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.2)
+        with lock:
+            active["now"] -= 1
+        return _inspection(revision.source_sha256)
+
+    monkeypatch.setattr(precompute, "_capability_inspection", slow_inspection)
+    yield calls, active
+    precompute._INSPECTIONS.clear()
+
+
+def _run_concurrently(revisions) -> list[PdfInspection]:
+    results: list[PdfInspection] = []
+    threads = [
+        threading.Thread(target=lambda revision=revision: results.append(precompute.cached_pdf_inspection(revision)))
+        for revision in revisions
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_callers_for_one_revision_share_one_inspection(inspections, tmp_path) -> None:
+    calls, _active = inspections
+    revision = SimpleNamespace(source_sha256="a" * 64, source_page_count=2)
+
+    results = _run_concurrently([revision] * 5)
+
+    assert calls == ["a" * 64]
+    assert {result.source_sha256 for result in results} == {"a" * 64}
+    cached = json.loads((tmp_path / f"{'a' * 64}.json").read_text(encoding="utf-8"))
+    assert cached["page_count"] == 2
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_unrelated_revisions_are_inspected_in_parallel(inspections) -> None:
+    calls, active = inspections
+    revisions = [SimpleNamespace(source_sha256=character * 64, source_page_count=0) for character in "bcd"]
+
+    _run_concurrently(revisions)
+
+    assert sorted(calls) == sorted(revision.source_sha256 for revision in revisions)
+    assert active["max"] == 3
+
+
+def test_memory_front_and_disk_cache_avoid_repeat_inspection(inspections, monkeypatch) -> None:
+    calls, _active = inspections
+    revision = SimpleNamespace(source_sha256="e" * 64, source_page_count=2)
+
+    first = precompute.cached_pdf_inspection(revision)
+    assert precompute.cached_pdf_inspection(revision) is first
+    precompute._INSPECTIONS.clear()
+    assert precompute.cached_pdf_inspection(revision) == first
+    assert calls == ["e" * 64]
+
+    # A disagreeing recorded page count bypasses both cache layers.
+    monkeypatch.setattr(precompute, "_capability_inspection", lambda revision: replace(_inspection(revision.source_sha256), page_count=3))
+    assert precompute.cached_pdf_inspection(SimpleNamespace(source_sha256="e" * 64, source_page_count=3)).page_count == 3
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import JSON, Column, MetaData, Table
+from sqlalchemy.dialects.postgresql import JSONB
+
+from amodb.apps.accounts.models import AMO, AccountRole, User
+from amodb.apps.doc_control import domain_models
+from amodb.apps.manuals import models
+from amodb.apps.manuals import publications_fast_reader_router as fast_reader
+from amodb.apps.manuals import reader_search
+
+
+def test_queries_become_prefix_phrase_and_part_number_terms() -> None:
+    terms = reader_search.parse_query('hydr "main landing gear" AN960-10L o-ring')
+
+    assert reader_search.tsquery_text(terms) == (
+        "'main' <-> 'landing' <-> 'gear' & 'hydr':* & 'an96010l':* & 'o':* & 'ring':*"
+    )
+    # Quotes and other punctuation never reach to_tsquery.
+    assert reader_search.tsquery_text(reader_search.parse_query("it's & | ! (x)")) == "'it':* & 's':* & 'x':*"
+    assert reader_search.parse_query("-- ..") == []
+
+
+def test_part_number_terms_match_the_indexed_form() -> None:
+    assert reader_search.part_number_terms("Fit AN960-10L and MS28775/228, not O-ring") == ["an96010l", "ms28775228"]
+
+
+def test_headline_windows_the_densest_matches_and_reports_offsets() -> None:
+    pattern = reader_search.highlight_pattern(reader_search.parse_query("an96010 hydr"))
+    text = "Preamble " * 60 + "Fit washer AN960-10L to the hydraulic pump. " + "Filler " * 60
+
+    snippet, spans = reader_search.headline(text, pattern)
+
+    assert snippet.startswith("… ") and snippet.endswith(" …")
+    assert len(snippet) <= reader_search.SNIPPET_CHARS + 4
+    assert [snippet[start:end] for start, end in spans] == ["AN960-10L", "hydraulic"]
+
+
+def _seed(db_session) -> list[str]:
+    amo = AMO(amo_code="AMO-SRCH", name="Search", login_slug="search")
+    db_session.add(amo)
+    db_session.commit()
+    tenant = models.Tenant(amo_id=amo.id, slug="search", name="Search", settings_json={})
+    db_session.add(tenant)
+    db_session.flush()
+    revision_ids = []
+    for code, heading, text in (
+        ("IPC", "Seals", "Washer AN960-10L replaces the old hydraulic seal."),
+        ("AMM", "Hydraulic seal removal", "Drain the reservoir first."),
+        ("MOE", "Scope", "Organisation exposition."),
+    ):
+        manual = models.Manual(tenant_id=tenant.id, code=code, title=f"{code} manual", manual_type=code, owner_role="Doc Control")
+        db_session.add(manual)
+        db_session.flush()
+        revision = models.ManualRevision(manual_id=manual.id, rev_number="1", effective_date=date.today(), status_enum=models.ManualRevisionStatus.PUBLISHED)
+        db_session.add(revision)
+        db_session.flush()
+        section = models.ManualSection(revision_id=revision.id, order_index=1, heading=heading, anchor_slug="s1", level=1, metadata_json={"page_start": 3})
+        db_session.add(section)
+        db_session.flush()
+        db_session.add(models.ManualBlock(section_id=section.id, order_index=1, block_type="paragraph", html_sanitized=text, text_plain=text, change_hash=code))
+        revision_ids.append(revision.id)
+    db_session.commit()
+    return revision_ids
+
+
+def test_search_spans_revisions_and_marks_block_and_heading_matches(db_session) -> None:
+    ipc, amm, moe = _seed(db_session)
+
+    items = reader_search.search_sections(db_session, [ipc, amm, moe], "hydraulic seal", limit=20)
+
+    assert [item["revision_id"] for item in items] == sorted([ipc, amm])
+    by_revision = {item["revision_id"]: item for item in items}
+    block_hit = by_revision[ipc]
+    assert [block_hit["snippet"][start:end] for start, end in block_hit["highlights"]] == ["hydraulic", "seal"]
+    assert block_hit["page_start"] == 3
+    heading_hit = by_revision[amm]
+    assert [heading_hit["heading"][start:end] for start, end in heading_hit["heading_highlights"]] == ["Hydraulic", "seal"]
+    assert reader_search.search_sections(db_session, [moe], "hydraulic", limit=20) == []
+
+
+def _create_profiles_table(db_session) -> None:
+    # The profile model is JSONB-backed; give SQLite a JSON copy of its table.
+    source = domain_models.DocumentControlProfile.__table__
+    columns = [
+        Column(column.name, JSON() if isinstance(column.type, JSONB) else column.type, primary_key=column.primary_key)
+        for column in source.columns
+    ]
+    Table(source.name, MetaData(), *columns).create(bind=db_session.get_bind())
+
+
+def _reader(amo: AMO, code: str, role: AccountRole) -> User:
+    return User(
+        amo=amo,
+        staff_code=code,
+        email=f"{code.lower()}@example.com",
+        first_name="Search",
+        last_name=code,
+        full_name=f"Search {code}",
+        role=role,
+        hashed_password="x",
+    )
+
+
+def _seed_library(db_session) -> dict[str, User]:
+    _create_profiles_table(db_session)
+    users: dict[str, User] = {}
+    for slug in ("search", "other"):
+        amo = AMO(amo_code=f"AMO-{slug.upper()}", name=slug, login_slug=slug)
+        users[f"{slug}-reader"] = _reader(amo, f"{slug[:3].upper()}1", AccountRole.TECHNICIAN)
+        users[f"{slug}-control"] = _reader(amo, f"{slug[:3].upper()}2", AccountRole.QUALITY_MANAGER)
+        db_session.add_all([amo, *users.values()])
+        db_session.flush()
+        tenant = models.Tenant(amo_id=amo.id, slug=slug, name=slug, settings_json={})
+        db_session.add(tenant)
+        db_session.flush()
+        for code, status, restricted in (
+            ("IPC", models.ManualRevisionStatus.PUBLISHED, False),
+            ("AMM", models.ManualRevisionStatus.DRAFT, False),
+            ("MOE", models.ManualRevisionStatus.PUBLISHED, True),
+        ):
+            manual = models.Manual(tenant_id=tenant.id, code=code, title=f"{slug} {code}", manual_type=code, owner_role="Doc Control")
+            db_session.add(manual)
+            db_session.flush()
+            revision = models.ManualRevision(manual_id=manual.id, rev_number="1", effective_date=date.today(), status_enum=status)
+            db_session.add(revision)
+            db_session.flush()
+            if status == models.ManualRevisionStatus.PUBLISHED:
+                manual.current_published_rev_id = revision.id
+            if restricted:
+                db_session.add(
+                    domain_models.DocumentControlProfile(
+                        tenant_id=amo.id, manual_id=manual.id, restricted_flag=True, access_scope_json={}, tags_json=[], metadata_json={}
+                    )
+                )
+            section = models.ManualSection(revision_id=revision.id, order_index=1, heading="Seals", anchor_slug="seals", level=1, metadata_json={})
+            db_session.add(section)
+            db_session.flush()
+            text = f"{slug} {code}: the hydraulic seal is replaced at each overhaul."
+            db_session.add(models.ManualBlock(section_id=section.id, order_index=1, block_type="paragraph", html_sanitized=text, text_plain=text, change_hash=code))
+    db_session.commit()
+    return users
+
+
+def _codes(db_session, user: User, q: str, scope: str, tenant_slug: str = "search") -> list[str]:
+    result = fast_reader.library_search(tenant_slug=tenant_slug, q=q, scope=scope, limit=20, db=db_session, current_user=user)
+    return sorted(item["manual_code"] for item in result["items"])
+
+
+def test_library_search_is_limited_to_the_callers_amo(db_session) -> None:
+    users = _seed_library(db_session)
+
+    result = fast_reader.library_search(
+        tenant_slug="search", q="hydraulic seal", scope="all", limit=20, db=db_session, current_user=users["search-control"]
+    )
+    assert sorted(item["manual_title"] for item in result["items"]) == ["search AMM", "search IPC", "search MOE"]
+    with pytest.raises(HTTPException) as exc_info:
+        _codes(db_session, users["other-control"], "hydraulic seal", "all")
+    assert exc_info.value.status_code == 403
+
+
+def test_library_search_skips_unpublished_and_restricted_manuals(db_session) -> None:
+    users = _seed_library(db_session)
+    reader = users["search-reader"]
+
+    assert _codes(db_session, reader, "hydraulic seal", "current") == ["IPC"]
+    # Every revision still means published or superseded for readers, and
+    # restricted manuals stay hidden unless their access scope names them.
+    assert _codes(db_session, reader, "hydraulic seal", "all") == ["IPC"]
+    assert _codes(db_session, users["search-control"], "hydraulic seal", "current") == ["IPC", "MOE"]
+
+
+def test_library_search_treats_hostile_queries_as_literal_text(db_session) -> None:
+    users = _seed_library(db_session)
+    control = users["search-control"]
+
+    for hostile in ("' OR 1=1 --", "hyd%seal", "____", "a') & !(b", '"unterminated'):
+        assert _codes(db_session, control, hostile, "all") == []
+    assert _codes(db_session, control, "hydraulic seal", "all") == ["AMM", "IPC", "MOE"]
@@ -33,7 +33,7 @@ _COMMANDS = [
     PlatformCommandDefinition("SEND_TEST_EMAIL", "Send or validate a bounded test email through configured SMTP.", "MEDIUM", False, True, False, True, 20, 0, False, False, ["smtp_password", "smtp_secret"]),
     PlatformCommandDefinition("RETRY_FAILED_WEBHOOKS", "Retry failed webhook deliveries where safe.", "MEDIUM", False, True, False, True, 30, 1, True, False, ["secret"]),
     PlatformCommandDefinition("ROTATE_TENANT_API_KEY", "Rotate a tenant API key where key model exists.", "HIGH", True, True, True, True, 15, 0, False, False, ["raw_key", "key_hash"]),
-    PlatformCommandDefinition("CLEAR_TENANT_CACHE", "Clear a tenant cache if a cache layer exists.", "LOW", True, True, False, True, 10, 0, True, False, []),
+    PlatformCommandDefinition("CLEAR_TENANT_CACHE", "Clear a tenant's cached read models in every API process.", "LOW", True, True, False, True, 10, 0, True, False, []),
     PlatformCommandDefinition("INFRA_RESET_GLOBAL_API_TOKENS", "Create a critical job to reset global platform API tokens.", "CRITICAL", False, True, True, True, 30, 0, False, False, ["raw_key", "token"]),
     PlatformCommandDefinition("INFRA_FAILOVER_DATABASE", "Request database failover. Returns unsupported unless real failover is configured.", "CRITICAL", False, True, True, True, 30, 0, False, False, ["password", "dsn", "secret"]),
 ]
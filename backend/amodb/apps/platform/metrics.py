@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import copy
 import json
 import logging
 import math
@@ -17,6 +16,8 @@ from sqlalchemy import case, func, text
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+from amodb import tenant_cache
+
 from . import models
 
 logger = logging.getLogger(__name__)
@@ -32,9 +33,7 @@ _PERSISTED_CACHE: dict[str, Any] = {
     "histograms": [],
 }
 
-_SUMMARY_CACHE_TTL_SECONDS = 15.0
-_SUMMARY_CACHE_LOCK = threading.Lock()
-_SUMMARY_CACHE: dict[int, tuple[float, dict[str, Any]]] = {}
+_SUMMARY_CACHE = tenant_cache.namespace("platform.live_summary", ttl_seconds=15.0, max_entries=64)
 
 _AUTO_FLUSH_LOCK = threading.Lock()
 _AUTO_FLUSH_IN_FLIGHT = False
@@ -205,8 +204,7 @@ def _histogram_percentile(
 
 
 def _invalidate_summary_cache() -> None:
-    with _SUMMARY_CACHE_LOCK:
-        _SUMMARY_CACHE.clear()
+    _SUMMARY_CACHE.clear()
 
 
 def _new_bucket_row() -> dict[str, Any]:
@@ -1224,15 +1222,7 @@ def _compute_live_summary(minutes: int) -> dict[str, Any]:
 
 def live_summary(minutes: int = 60) -> dict[str, Any]:
     window_minutes = max(5, min(int(minutes or 60), 1_440))
-    now = time.monotonic()
-    with _SUMMARY_CACHE_LOCK:
-        cached = _SUMMARY_CACHE.get(window_minutes)
-        if cached and now - cached[0] <= _SUMMARY_CACHE_TTL_SECONDS:
-            return copy.deepcopy(cached[1])
-    summary = _compute_live_summary(window_minutes)
-    with _SUMMARY_CACHE_LOCK:
-        _SUMMARY_CACHE[window_minutes] = (now, copy.deepcopy(summary))
-    return summary
+    return _SUMMARY_CACHE.get_or_load(window_minutes, lambda: _compute_live_summary(window_minutes))
 
 
 def _latency_upsert_expression(
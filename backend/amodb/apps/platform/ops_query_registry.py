@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import copy
 import json
 import math
 import os
@@ -11,6 +10,8 @@ from typing import Any
 from urllib.parse import urlencode
 from urllib.request import urlopen
 
+from amodb import tenant_cache
+
 
 @dataclass(frozen=True)
 class QuerySpec:
@@ -133,7 +134,7 @@ WINDOWS: dict[str, tuple[int, int]] = {
 }
 
 _CACHE_LOCK = threading.Lock()
-_CACHE: dict[str, tuple[float, dict[str, Any]]] = {}
+_CACHE = tenant_cache.namespace("platform.ops_queries", ttl_seconds=5.0, max_entries=512)
 _LAST_GOOD: dict[str, dict[str, Any]] = {}
 _QUERY_SEMAPHORE = threading.BoundedSemaphore(max(1, min(16, int(os.getenv("PLATFORM_OPS_QUERY_CONCURRENCY", "4") or "4"))))
 
@@ -142,24 +143,22 @@ def _query_url() -> str:
     return (os.getenv("OBSERVABILITY_QUERY_URL") or os.getenv("PLATFORM_OPS_PROMETHEUS_URL") or "").strip().rstrip("/")
 
 
-def _cache_get(key: str, ttl: float) -> dict[str, Any] | None:
-    now = time.monotonic()
-    with _CACHE_LOCK:
-        item = _CACHE.get(key)
-        if not item or now - item[0] > ttl:
-            return None
-        return copy.deepcopy(item[1])
+def _cache_get(key: str) -> dict[str, Any] | None:
+    cached = _CACHE.get(key)
+    if cached is None:
+        return None
+    return {**cached, "cache": "hit"}
 
 
-def _cache_success(key: str, payload: dict[str, Any]) -> None:
+def _cache_success(key: str, payload: dict[str, Any], ttl: float) -> None:
+    frozen = _CACHE.set(key, payload, ttl_seconds=ttl)
     with _CACHE_LOCK:
-        _CACHE[key] = (time.monotonic(), copy.deepcopy(payload))
-        _LAST_GOOD[key] = copy.deepcopy(payload)
+        _LAST_GOOD[key] = frozen
 
 
 def _stale_or_unavailable(key: str, *, error: Exception | str) -> dict[str, Any]:
     with _CACHE_LOCK:
-        last = copy.deepcopy(_LAST_GOOD.get(key))
+        last = tenant_cache.thaw(_LAST_GOOD.get(key))
     message = str(error)[:300]
     if last is None:
         return {"available": False, "stale": True, "error": message, "series": [], "source": "prometheus"}
@@ -227,9 +226,8 @@ def query_instant(name: str) -> dict[str, Any]:
     if spec is None:
         raise KeyError(f"Unknown observability query: {name}")
     cache_key = f"instant:{name}"
-    cached = _cache_get(cache_key, spec.cache_ttl_seconds)
+    cached = _cache_get(cache_key)
     if cached is not None:
-        cached["cache"] = "hit"
         return cached
     try:
         payload = _request("/api/v1/query", {"query": spec.expression}, timeout=spec.timeout_seconds)
@@ -246,7 +244,7 @@ def query_instant(name: str) -> dict[str, Any]:
             "cache": "miss",
             "series": _normalise_series(result, max_samples=spec.max_samples),
         }
-        _cache_success(cache_key, output)
+        _cache_success(cache_key, output, spec.cache_ttl_seconds)
         return output
     except Exception as exc:
         return _stale_or_unavailable(cache_key, error=exc)
@@ -266,9 +264,8 @@ def query_range(name: str, window: str, *, end_epoch: float | None = None) -> di
     start = end - lookback
     cache_bucket = int(end // max(1, step))
     cache_key = f"range:{name}:{window}:{cache_bucket}"
-    cached = _cache_get(cache_key, spec.cache_ttl_seconds)
+    cached = _cache_get(cache_key)
     if cached is not None:
-        cached["cache"] = "hit"
         return cached
     try:
         payload = _request(
@@ -291,7 +288,7 @@ def query_range(name: str, window: str, *, end_epoch: float | None = None) -> di
             "max_samples": spec.max_samples,
             "series": _normalise_series(result, max_samples=spec.max_samples),
         }
-        _cache_success(cache_key, output)
+        _cache_success(cache_key, output, spec.cache_ttl_seconds)
         return output
     except Exception as exc:
         return _stale_or_unavailable(cache_key, error=exc)
@@ -1,25 +1,37 @@
+"""Tenant usage meter hardening and the per-process API call aggregator.
+
+Request handling only increments an in-memory per-tenant counter. A daemon
+thread per API process owns every database write: each flush persists all
+pending tenants in one multi-row ``INSERT .. ON CONFLICT`` on PostgreSQL,
+backs off while the shared database circuit is open and restores the batch
+after a failed write, so counts are delayed rather than lost. The final flush
+runs during graceful shutdown.
+"""
 from __future__ import annotations
 
+import logging
 import os
 import threading
 import time
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Optional
 
 from fastapi import APIRouter
-from sqlalchemy import text
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from amodb.apps.accounts import models as account_models
 from amodb.apps.accounts import services as account_services
-from amodb.database import WriteSessionLocal, close_session_safely
+from amodb.database import WriteSessionLocal, close_session_safely, probe_database
+from amodb.database_resilience import database_circuit, is_database_disconnect
 from amodb.user_id import generate_user_id
 
 
+logger = logging.getLogger(__name__)
+
 _INSTALLED = False
 _ORIGINAL_RECORD_USAGE = account_services.record_usage
-_STOP_EVENT = threading.Event()
-_FLUSH_THREAD: threading.Thread | None = None
 
 
 def atomic_record_usage(
@@ -99,89 +111,242 @@ def atomic_record_usage(
     return meter
 
 
-def _install_atomic_function() -> None:
-    account_services.record_usage = atomic_record_usage
+def record_usage_batch(
+    db: Session,
+    *,
+    meter_key: str,
+    quantities: dict[str, int],
+    at: Optional[datetime] = None,
+) -> int:
+    """Add ``quantities`` (amo_id -> units) to one meter for many tenants.
 
+    PostgreSQL receives a single multi-row upsert, ordered by tenant so
+    concurrent flushes from several processes take row locks in the same
+    order. A license is only resolved for tenants whose meter does not already
+    carry one. Other dialects fall back to ``record_usage`` per tenant. The
+    caller commits. Returns the number of tenants written.
+    """
+
+    pending = {amo_id: int(quantity) for amo_id, quantity in quantities.items() if amo_id and quantity > 0}
+    if not pending:
+        return 0
+    if db.get_bind().dialect.name != "postgresql":
+        for amo_id in sorted(pending):
+            account_services.record_usage(
+                db,
+                amo_id=amo_id,
+                meter_key=meter_key,
+                quantity=pending[amo_id],
+                at=at,
+                commit=False,
+            )
+        return len(pending)
+
+    recorded_at = at or datetime.now(timezone.utc)
+    meter = account_models.UsageMeter
+    licensed = {
+        amo_id
+        for (amo_id,) in db.query(meter.amo_id).filter(
+            meter.meter_key == meter_key,
+            meter.amo_id.in_(list(pending)),
+            meter.license_id.isnot(None),
+        )
+    }
+    rows = []
+    for amo_id in sorted(pending):
+        license_id = None
+        if amo_id not in licensed:
+            current = account_services.get_current_subscription(db, amo_id=amo_id)
+            license_id = current.id if current else None
+        rows.append(
+            {
+                "id": generate_user_id(),
+                "amo_id": amo_id,
+                "license_id": license_id,
+                "meter_key": meter_key,
+                "used_units": pending[amo_id],
+                "last_recorded_at": recorded_at,
+                "created_at": recorded_at,
+                "updated_at": recorded_at,
+            }
+        )
+    table = meter.__table__
+    statement = pg_insert(table).values(rows)
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.amo_id, table.c.meter_key],
+        set_={
+            "used_units": table.c.used_units + excluded.used_units,
+            "license_id": func.coalesce(table.c.license_id, excluded.license_id),
+            "last_recorded_at": excluded.last_recorded_at,
+            "updated_at": excluded.updated_at,
+        },
+    )
+    db.execute(statement)
+    return len(rows)
 
-def install_usage_meter_hardening(router: APIRouter) -> None:
-    global _INSTALLED
-    if _INSTALLED:
-        return
-    _install_atomic_function()
 
-    @router.on_event("startup")
-    def start_usage_flush_thread() -> None:
-        global _FLUSH_THREAD
-        from amodb import main as application
-
-        # Keep request work to an in-memory increment. The daemon owns all
-        # periodic database flushes for this API process.
-        def enqueue_only(amo_id: str) -> None:
-            if not amo_id:
-                return
-            with application._api_usage_lock:
-                application._api_usage_pending[amo_id] = application._api_usage_pending.get(amo_id, 0) + 1
-
-        def flush_with_requeue() -> None:
-            """Persist one batch and restore it atomically after transient failure."""
-
-            with application._api_usage_lock:
-                if not application._api_usage_pending:
-                    return
-                payload_to_flush = dict(application._api_usage_pending)
-                application._api_usage_pending.clear()
-                application._api_usage_last_flush = time.monotonic()
-
-            db = WriteSessionLocal()
+class ApiUsageAggregator:
+    """Coalesce per-tenant API call counts and persist them off the request path."""
+
+    def __init__(
+        self,
+        *,
+        meter_key: str = account_services.METER_KEY_API_CALLS,
+        interval_seconds: float = 5.0,
+        batch_size: int = 100,
+        max_backoff_seconds: float = 60.0,
+        session_factory=WriteSessionLocal,
+    ) -> None:
+        self.meter_key = meter_key
+        self.interval_seconds = max(0.5, interval_seconds)
+        self.batch_size = max(1, batch_size)
+        self.max_backoff_seconds = max(self.interval_seconds, max_backoff_seconds)
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: dict[str, int] = {}
+        self._pending_units = 0
+        self._oldest_pending_at: float | None = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._failure_streak = 0
+        self._last_flush_at: float | None = None
+        self._last_flush_ms: float | None = None
+        self._counters = {"recorded": 0, "flushed_units": 0, "flushes": 0, "flush_failures": 0, "circuit_skips": 0}
+
+    def record(self, amo_id: str, quantity: int = 1) -> None:
+        if not amo_id or quantity <= 0:
+            return
+        with self._lock:
+            self._pending[amo_id] = self._pending.get(amo_id, 0) + quantity
+            self._pending_units += quantity
+            if self._oldest_pending_at is None:
+                self._oldest_pending_at = time.monotonic()
+            self._counters["recorded"] += quantity
+            full = self._pending_units >= self.batch_size
+        # While flushes are failing, let _run keep its backoff instead of
+        # retrying the database on every full batch.
+        if full and not self._failure_streak:
+            self._wake.set()
+
+    def _take(self) -> tuple[dict[str, int], float | None]:
+        with self._lock:
+            batch, oldest = self._pending, self._oldest_pending_at
+            self._pending, self._oldest_pending_at = {}, None
+            self._pending_units = 0
+            return batch, oldest
+
+    def _requeue(self, batch: dict[str, int], oldest: float | None) -> None:
+        with self._lock:
+            for amo_id, quantity in batch.items():
+                self._pending[amo_id] = self._pending.get(amo_id, 0) + quantity
+                self._pending_units += quantity
+            if oldest is not None and (self._oldest_pending_at is None or oldest < self._oldest_pending_at):
+                self._oldest_pending_at = oldest
+
+    def flush(self) -> bool:
+        """Persist everything pending. Returns False when the batch was requeued."""
+
+        with self._flush_lock:
+            batch, oldest = self._take()
+            if not batch:
+                return True
+            started = time.perf_counter()
+            db = self._session_factory()
             try:
-                for pending_amo_id, quantity in payload_to_flush.items():
-                    if quantity <= 0:
-                        continue
-                    account_services.record_usage(
-                        db,
-                        amo_id=pending_amo_id,
-                        meter_key=account_services.METER_KEY_API_CALLS,
-                        quantity=quantity,
-                        commit=False,
-                    )
+                record_usage_batch(db, meter_key=self.meter_key, quantities=batch)
                 db.commit()
-            except Exception:
+            except Exception as exc:
                 try:
                     db.rollback()
                 except Exception:
                     pass
-                with application._api_usage_lock:
-                    for pending_amo_id, quantity in payload_to_flush.items():
-                        application._api_usage_pending[pending_amo_id] = (
-                            application._api_usage_pending.get(pending_amo_id, 0) + quantity
-                        )
+                self._requeue(batch, oldest)
+                with self._lock:
+                    self._counters["flush_failures"] += 1
+                if is_database_disconnect(exc):
+                    database_circuit.mark_failure(exc)
+                else:
+                    logger.warning("API usage flush failed; %s tenant counts requeued.", len(batch), exc_info=True)
+                return False
             finally:
                 close_session_safely(db)
+            with self._lock:
+                self._counters["flushes"] += 1
+                self._counters["flushed_units"] += sum(batch.values())
+                self._last_flush_at = time.monotonic()
+                self._last_flush_ms = round((time.perf_counter() - started) * 1000.0, 3)
+            return True
 
-        application._queue_api_usage = enqueue_only
-        application._flush_api_usage_metrics = flush_with_requeue
-        _STOP_EVENT.clear()
-        interval = max(0.5, float(os.getenv("API_USAGE_FLUSH_INTERVAL_SEC", "5") or "5"))
+    def _next_delay(self) -> float:
+        if not self._failure_streak:
+            return self.interval_seconds
+        exponent = min(self._failure_streak - 1, 8)
+        return min(self.max_backoff_seconds, self.interval_seconds * (2**exponent))
 
-        def loop() -> None:
-            while not _STOP_EVENT.wait(interval):
-                application._flush_api_usage_metrics()
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self._next_delay())
+            self._wake.clear()
+            if self._stop.is_set() or not self.pending_units():
+                continue
+            if not database_circuit.allow_request() and not probe_database():
+                with self._lock:
+                    self._counters["circuit_skips"] += 1
+                self._failure_streak += 1
+                continue
+            self._failure_streak = 0 if self.flush() else self._failure_streak + 1
 
-        if _FLUSH_THREAD is None or not _FLUSH_THREAD.is_alive():
-            _FLUSH_THREAD = threading.Thread(
-                target=loop,
-                name="api-usage-flush",
-                daemon=True,
-            )
-            _FLUSH_THREAD.start()
+    def start(self) -> None:
+        self._stop.clear()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="api-usage-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the timer thread and make one final attempt to persist pending counts."""
+
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        if not self.flush():
+            logger.warning("API usage counts could not be persisted during shutdown: %s", self.stats()["pending_units"])
+
+    def pending_units(self) -> int:
+        with self._lock:
+            return self._pending_units
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "pending_units": self._pending_units,
+                "pending_tenants": len(self._pending),
+                "flush_lag_seconds": round(now - self._oldest_pending_at, 3) if self._oldest_pending_at is not None else 0.0,
+                "last_flush_age_seconds": round(now - self._last_flush_at, 3) if self._last_flush_at is not None else None,
+                "last_flush_ms": self._last_flush_ms,
+                "failure_streak": self._failure_streak,
+                **self._counters,
+            }
 
-    @router.on_event("shutdown")
-    def stop_usage_flush_thread() -> None:
-        from amodb import main as application
 
-        _STOP_EVENT.set()
-        if _FLUSH_THREAD and _FLUSH_THREAD.is_alive():
-            _FLUSH_THREAD.join(timeout=2.0)
-        application._flush_api_usage_metrics()
+api_usage_aggregator = ApiUsageAggregator(
+    interval_seconds=float(os.getenv("API_USAGE_FLUSH_INTERVAL_SEC", "5") or "5"),
+    batch_size=int(os.getenv("API_USAGE_FLUSH_BATCH_SIZE", "100") or "100"),
+    max_backoff_seconds=float(os.getenv("API_USAGE_FLUSH_MAX_BACKOFF_SEC", "60") or "60"),
+)
 
+
+def _install_atomic_function() -> None:
+    account_services.record_usage = atomic_record_usage
+
+
+def install_usage_meter_hardening(router: APIRouter) -> None:
+    global _INSTALLED
+    if _INSTALLED:
+        return
+    _install_atomic_function()
     _INSTALLED = True
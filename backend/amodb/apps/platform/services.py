@@ -11,6 +11,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from amodb.apps.accounts import models as account_models
+from amodb import tenant_cache
 from amodb.apps.accounts import services as account_services
 from amodb.user_id import generate_user_id
 
@@ -411,7 +412,9 @@ def _execute_command_action(db: Session, job: models.PlatformCommandJob, *, acto
             result = {"tenant_id": job.tenant_id, "read_only": requested_lock}
         elif job.command_name in {"TENANT_RECHECK_ENTITLEMENT", "TENANT_REFRESH_ACCESS_STATUS"}:
             result = account_services.get_billing_access_status(db, amo_id=str(job.tenant_id)).model_dump(mode="json")
-        elif job.command_name in {"ROTATE_TENANT_API_KEY", "CLEAR_TENANT_CACHE", "INFRA_FAILOVER_DATABASE"}:
+        elif job.command_name == "CLEAR_TENANT_CACHE":
+            result = tenant_cache.clear_tenant(str(job.tenant_id), db=db)
+        elif job.command_name in {"ROTATE_TENANT_API_KEY", "INFRA_FAILOVER_DATABASE"}:
             job.status = "UNSUPPORTED"; job.error_code = "UNSUPPORTED"; job.output_json = {"detail": "No safe runtime implementation exists in this codebase yet."}; job.finished_at = now_utc(); add_job_event(db, job, "UNSUPPORTED", "Command is safely unsupported."); return
         else:
             result = {"detail": "Command accepted. No additional action required."}
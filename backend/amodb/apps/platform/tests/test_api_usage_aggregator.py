@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.accounts import services as account_services
+from amodb.apps.platform import saas_usage
+from amodb.database import Base
+
+
+@pytest.fixture()
+def usage_db():
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            account_models.AMOAsset.__table__,
+            account_models.Department.__table__,
+            account_models.User.__table__,
+            account_models.AuthorisationType.__table__,
+            account_models.UserAuthorisation.__table__,
+            account_models.AccountSecurityEvent.__table__,
+            account_models.CatalogSKU.__table__,
+            account_models.TenantLicense.__table__,
+            account_models.LicenseEntitlement.__table__,
+            account_models.UsageMeter.__table__,
+        ],
+    )
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+    db = SessionLocal()
+    amos = [account_models.AMO(amo_code=f"AMO-{n}", name=f"AMO {n}", login_slug=f"amo-{n}") for n in range(3)]
+    db.add_all(amos)
+    db.commit()
+    amo_ids = [amo.id for amo in amos]
+    db.close()
+    return SessionLocal, amo_ids
+
+
+def _meter_units(SessionLocal) -> dict[str, int]:
+    db = SessionLocal()
+    try:
+        return {meter.amo_id: meter.used_units for meter in db.query(account_models.UsageMeter).all()}
+    finally:
+        db.close()
+
+
+def test_requests_only_increment_memory_until_the_flush(usage_db):
+    SessionLocal, amo_ids = usage_db
+    aggregator = saas_usage.ApiUsageAggregator(session_factory=SessionLocal)
+    for amo_id in (amo_ids[0], amo_ids[0], amo_ids[1], ""):
+        aggregator.record(amo_id)
+
+    assert _meter_units(SessionLocal) == {}
+    assert aggregator.stats()["pending_units"] == 3
+    assert aggregator.stats()["pending_tenants"] == 2
+
+    assert aggregator.flush() is True
+    assert _meter_units(SessionLocal) == {amo_ids[0]: 2, amo_ids[1]: 1}
+    assert aggregator.stats()["pending_units"] == 0
+    assert aggregator.stats()["flush_lag_seconds"] == 0.0
+
+
+def test_failed_flush_requeues_counts_and_stop_persists_them(usage_db, monkeypatch):
+    SessionLocal, amo_ids = usage_db
+    aggregator = saas_usage.ApiUsageAggregator(session_factory=SessionLocal)
+    aggregator.record(amo_ids[2], 5)
+
+    def failing_batch(*_args, **_kwargs):
+        raise RuntimeError("writer unavailable")
+
+    monkeypatch.setattr(saas_usage, "record_usage_batch", failing_batch)
+    assert aggregator.flush() is False
+    aggregator.record(amo_ids[2])
+    stats = aggregator.stats()
+    assert stats["pending_units"] == 6
+    assert stats["flush_failures"] == 1
+    assert stats["flush_lag_seconds"] >= 0.0
+
+    monkeypatch.undo()
+    aggregator.stop()
+    assert _meter_units(SessionLocal) == {amo_ids[2]: 6}
+
+
+def test_batch_threshold_wakes_the_flush_thread(usage_db):
+    SessionLocal, amo_ids = usage_db
+    aggregator = saas_usage.ApiUsageAggregator(session_factory=SessionLocal, interval_seconds=60.0, batch_size=3)
+    aggregator.start()
+    try:
+        for _ in range(3):
+            aggregator.record(amo_ids[0])
+        for _ in range(200):
+            if not aggregator.pending_units():
+                break
+            aggregator._stop.wait(0.01)
+    finally:
+        aggregator.stop()
+    assert _meter_units(SessionLocal) == {amo_ids[0]: 3}
+
+
+def test_full_batches_do_not_cut_short_the_failure_backoff(usage_db, monkeypatch):
+    SessionLocal, amo_ids = usage_db
+    attempts = []
+
+    def failing_batch(*_args, **_kwargs):
+        attempts.append(1)
+        raise RuntimeError("writer unavailable")
+
+    monkeypatch.setattr(saas_usage, "record_usage_batch", failing_batch)
+    aggregator = saas_usage.ApiUsageAggregator(session_factory=SessionLocal, interval_seconds=0.5, batch_size=3)
+    aggregator.start()
+    try:
+        aggregator.record(amo_ids[0], 3)
+        for _ in range(200):
+            if attempts:
+                break
+            aggregator._stop.wait(0.01)
+        for _ in range(30):
+            aggregator.record(amo_ids[0], 3)
+            aggregator._stop.wait(0.01)
+        attempts_while_failing = len(attempts)
+    finally:
+        aggregator._stop.set()
+        aggregator._wake.set()
+        aggregator._thread.join(timeout=2.0)
+    assert 1 <= attempts_while_failing <= 2
+    assert aggregator.pending_units() == 93
+
+
+def test_postgres_flush_is_one_multi_row_upsert(monkeypatch):
+    executed = []
+
+    class _Dialect:
+        name = "postgresql"
+
+    class _Bind:
+        dialect = _Dialect()
+
+    class _Query:
+        def filter(self, *_criteria):
+            return self
+
+        def __iter__(self):
+            return iter([("amo-licensed",)])
+
+    class _Session:
+        def get_bind(self):
+            return _Bind()
+
+        def query(self, *_entities):
+            return _Query()
+
+        def execute(self, statement):
+            executed.append(statement)
+
+    lookups = []
+    monkeypatch.setattr(
+        account_services,
+        "get_current_subscription",
+        lambda _db, *, amo_id: lookups.append(amo_id),
+    )
+
+    written = saas_usage.record_usage_batch(
+        _Session(),
+        meter_key=account_services.METER_KEY_API_CALLS,
+        quantities={"amo-b": 2, "amo-licensed": 4, "amo-a": 1, "amo-idle": 0},
+    )
+
+    assert written == 3
+    assert lookups == ["amo-a", "amo-b"]
+    assert len(executed) == 1
+    compiled = executed[0].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert sql.count("INSERT INTO usage_meters") == 1
+    assert "ON CONFLICT (amo_id, meter_key) DO UPDATE" in sql
+    assert "usage_meters.used_units + excluded.used_units" in sql
+    amo_params = [value for key, value in compiled.params.items() if key.startswith("amo_id")]
+    assert amo_params == ["amo-a", "amo-b", "amo-licensed"]
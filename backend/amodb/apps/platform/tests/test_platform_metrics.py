@@ -24,8 +24,7 @@ def _reset_metrics() -> None:
                 "histograms": [],
             }
         )
-    with metrics._SUMMARY_CACHE_LOCK:
-        metrics._SUMMARY_CACHE.clear()
+    metrics._invalidate_summary_cache()
 
 
 def _no_persisted_data(_minutes: int):
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 import io
 import os
+import sqlite3
+import threading
 import time
 from pathlib import Path
 
@@ -67,3 +70,140 @@ def test_ephemeral_cache_prunes_old_entries(monkeypatch, tmp_path: Path):
     assert not stale.exists()
     assert fresh.exists()
     assert staged.exists(), "active upload staging files must never be evicted"
+
+
+class _Body:
+    def __init__(self, data: bytes, release: threading.Event | None = None):
+        self.data = data
+        self.release = release
+
+    def iter_chunks(self, size: int):
+        if self.release is not None:
+            self.release.wait(5)
+        for start in range(0, len(self.data), size):
+            yield self.data[start : start + size]
+
+
+class _FakeS3:
+    def __init__(self, objects: dict[str, bytes], release: threading.Event | None = None):
+        self.objects = objects
+        self.release = release
+        self.calls: list[tuple[str, str | None]] = []
+
+    def get_object(self, *, Bucket, Key, Range=None):
+        self.calls.append((Key, Range))
+        data = self.objects[Key]
+        if Range:
+            first, last = Range.removeprefix("bytes=").split("-")
+            data = data[int(first) : int(last) + 1]
+            return {"ContentLength": len(data), "Body": _Body(data)}
+        return {"ContentLength": len(data), "Body": _Body(data, self.release)}
+
+    def head_object(self, *, Bucket, Key):
+        return {"ContentLength": len(self.objects[Key])}
+
+
+def _s3_cache(monkeypatch, tmp_path: Path, objects: dict[str, bytes], release=None) -> _FakeS3:
+    client = _FakeS3(objects, release)
+    monkeypatch.setattr(storage, "_client", lambda: client)
+    monkeypatch.setenv("AMO_STORAGE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("AMO_STORAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+    return client
+
+
+def test_content_addressed_cache_shares_one_download(monkeypatch, tmp_path: Path):
+    body = b"%PDF-1.7 shared manual"
+    checksum = hashlib.sha256(body).hexdigest()
+    client = _s3_cache(monkeypatch, tmp_path, {"a/manual.pdf": body, "b/copy.pdf": body})
+    before = storage.cache_stats()
+
+    first = storage.materialize("s3://bucket/a/manual.pdf", expected_sha256=checksum)
+    second = storage.materialize("s3://bucket/b/copy.pdf", expected_sha256=checksum.upper())
+
+    assert first == second and first.name == f"sha256-{checksum}.pdf"
+    assert first.read_bytes() == body
+    assert client.calls == [("a/manual.pdf", None)]
+    after = storage.cache_stats()
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 1
+
+
+def test_far_range_is_served_from_origin_while_the_fill_runs(monkeypatch, tmp_path: Path):
+    body = bytes(range(256)) * 64
+    release = threading.Event()
+    client = _s3_cache(monkeypatch, tmp_path, {"manual.pdf": body}, release)
+    monkeypatch.setenv("AMO_STORAGE_FILL_AHEAD_BYTES", "0")
+
+    assert storage.object_size("s3://bucket/manual.pdf") == len(body)
+    tail = b"".join(storage.iter_range("s3://bucket/manual.pdf", len(body) - 1024, len(body) - 1))
+    assert tail == body[-1024:]
+    assert ("manual.pdf", f"bytes={len(body) - 1024}-{len(body) - 1}") in client.calls
+
+    release.set()
+    assert storage.materialize("s3://bucket/manual.pdf").read_bytes() == body
+    assert [call for call in client.calls if call[1] is None] == [("manual.pdf", None)]
+    assert b"".join(storage.iter_range("s3://bucket/manual.pdf", 10, 19)) == body[10:20]
+
+
+def test_checksum_mismatch_leaves_no_cache_entry(monkeypatch, tmp_path: Path):
+    _s3_cache(monkeypatch, tmp_path, {"manual.pdf": b"tampered"})
+
+    with pytest.raises(IOError, match="checksum"):
+        storage.materialize("s3://bucket/manual.pdf", expected_sha256=hashlib.sha256(b"original").hexdigest())
+    assert [item.name for item in (tmp_path / "cache").iterdir() if not item.name.startswith(".amo-cache-index")] == []
+
+
+def test_cache_eviction_follows_the_lru_index(monkeypatch, tmp_path: Path):
+    objects = {f"doc-{index}.pdf": bytes([index]) * 1000 for index in range(3)}
+    _s3_cache(monkeypatch, tmp_path, objects)
+    monkeypatch.setenv("AMO_STORAGE_CACHE_MAX_BYTES", "2500")
+
+    paths = [storage.materialize(f"s3://bucket/doc-{index}.pdf") for index in range(2)]
+    time.sleep(0.01)
+    storage.materialize("s3://bucket/doc-0.pdf")
+    time.sleep(0.01)
+    third = storage.materialize("s3://bucket/doc-2.pdf")
+
+    assert paths[0].exists(), "recently read entries survive"
+    assert not paths[1].exists(), "the least recently used entry is evicted"
+    assert third.exists()
+
+
+def test_range_read_to_the_end_fails_when_the_fill_fails_verification(monkeypatch, tmp_path: Path):
+    _s3_cache(monkeypatch, tmp_path, {"manual.pdf": b"tampered-bytes"})
+
+    with pytest.raises(IOError, match="verification"):
+        b"".join(storage.iter_range("s3://bucket/manual.pdf", 0, 13, expected_sha256=hashlib.sha256(b"original").hexdigest()))
+
+
+def test_cache_hits_are_served_when_the_index_is_locked(monkeypatch, tmp_path: Path):
+    _s3_cache(monkeypatch, tmp_path, {"manual.pdf": b"%PDF-1.7 cached"})
+    cached = storage.materialize("s3://bucket/manual.pdf")
+
+    def locked(_root):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(storage, "_cache_index", locked)
+    monkeypatch.setenv("AMO_STORAGE_CACHE_TOUCH_FLUSH_SEC", "0")
+
+    assert storage.materialize("s3://bucket/manual.pdf") == cached
+    assert b"".join(storage.iter_range("s3://bucket/manual.pdf", 0, 3)) == b"%PDF"
+    assert storage.cleanup_cache(force=True) == {"removed": 0, "bytes_removed": 0}
+
+
+def test_cache_hits_update_the_index_in_batches(monkeypatch, tmp_path: Path):
+    _s3_cache(monkeypatch, tmp_path, {"manual.pdf": b"%PDF-1.7 cached"})
+    monkeypatch.setenv("AMO_STORAGE_CACHE_TOUCH_FLUSH_SEC", "3600")
+    storage._flush_cache_touches()
+    cached = storage.materialize("s3://bucket/manual.pdf")
+    index = sqlite3.connect(str(cached.parent / storage._INDEX_NAME))
+    recorded = index.execute("SELECT last_access FROM entries WHERE name = ?", (cached.name,)).fetchone()[0]
+
+    time.sleep(0.01)
+    for _ in range(5):
+        storage.materialize("s3://bucket/manual.pdf")
+    assert index.execute("SELECT last_access FROM entries WHERE name = ?", (cached.name,)).fetchone()[0] == recorded
+
+    storage.cleanup_cache(force=True)
+    assert index.execute("SELECT last_access FROM entries WHERE name = ?", (cached.name,)).fetchone()[0] > recorded
+    index.close()
@@ -1,11 +1,9 @@
 # backend/amodb/apps/quality/service.py
 from __future__ import annotations
 
-import copy
 import importlib.util
 import os
 import re
-import time
 import uuid
 from collections import defaultdict
 from datetime import date, datetime, timedelta, timezone
@@ -16,6 +14,9 @@ from sqlalchemy import func, or_
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from amodb import tenant_cache
+from amodb.apps.events.broker import EventEnvelope, broker as event_broker
+
 from . import models
 from .schema_compat import ensure_qms_audit_reference_schema
 from ..finance import models as finance_models
@@ -54,24 +55,45 @@ CAR_LEVEL_REMINDER_DAYS: dict[FindingLevel, int] = {
     FindingLevel.LEVEL_4: 30,
 }
 
-_PERF_CACHE_TTL_SEC = float(os.getenv("QMS_PERF_CACHE_TTL_SEC", "5"))
-_PERF_CACHE: dict[tuple[str, str, str], tuple[float, dict]] = {}
+_PERF_CACHE = tenant_cache.namespace(
+    "quality.perf",
+    ttl_seconds=float(os.getenv("QMS_PERF_CACHE_TTL_SEC", "5")),
+    max_entries=int(os.getenv("QMS_PERF_CACHE_MAX_ENTRIES", "4096") or "4096"),
+)
 
+# Domain events that change a dashboard or cockpit count. The broker delivers
+# them in every API process, so a status change is visible on the next read
+# instead of after the TTL. Listeners match the exact entity type, and the
+# checklist-execution, official-finding and document paths publish dotted
+# names, so both spellings are listed.
+PERF_CACHE_ENTITY_TYPES = (
+    "qms_audit",
+    "qms_finding",
+    "qms_cap",
+    "qms_car",
+    "car",
+    "quality_car",
+    "quality_car_extension_request",
+    "qms_document",
+    "qms_document_revision",
+    "qms_document_distribution",
+    "qms.audit",
+    "qms.finding",
+    "qms.car",
+    "qms.document",
+    "qms.document.revision",
+)
 
-def _get_perf_cache(key: tuple[str, str, str]) -> Optional[dict]:
-    cached = _PERF_CACHE.get(key)
-    if not cached:
-        return None
-    expires_at, payload = cached
-    if time.time() >= expires_at:
-        _PERF_CACHE.pop(key, None)
-        return None
-    return copy.deepcopy(payload)
 
+def _invalidate_perf_cache(event: EventEnvelope) -> None:
+    amo_id = (event.metadata or {}).get("amoId")
+    if amo_id:
+        _PERF_CACHE.clear_tenant(str(amo_id))
+    # Unscoped (all-tenant) dashboards include every tenant's rows.
+    _PERF_CACHE.clear_tenant(None)
 
-def _set_perf_cache(key: tuple[str, str, str], payload: dict) -> None:
-    _PERF_CACHE[key] = (time.time() + _PERF_CACHE_TTL_SEC, copy.deepcopy(payload))
 
+event_broker.add_listener(_invalidate_perf_cache, entity_types=PERF_CACHE_ENTITY_TYPES)
 
 
 def _truthy_env(name: str) -> bool:
@@ -139,88 +161,91 @@ def normalize_finding_level(severity, level: Optional[FindingLevel], finding_typ
 
 
 def get_dashboard(db: Session, domain: Optional[QMSDomain] = None, amo_id: Optional[str] = None) -> dict:
-    cache_key = ("dashboard", str(amo_id or ""), str(domain.value if domain else "ALL"))
-    cached = _get_perf_cache(cache_key)
-    if cached is not None:
-        return cached
+    return _PERF_CACHE.get_or_load(
+        ("dashboard", str(domain.value if domain else "ALL")),
+        lambda: _build_dashboard(db, domain=domain, amo_id=amo_id),
+        tenant_id=amo_id,
+    )
+
+
+def _build_dashboard(db: Session, domain: Optional[QMSDomain], amo_id: Optional[str]) -> dict:
     ensure_qms_audit_reference_schema(db)
-    # Documents
-    doc_q = db.query(models.QMSDocument)
+    # One aggregate statement per table: the per-status counts are conditional
+    # aggregates (COUNT(*) FILTER (WHERE ...)) over the same scoped rows.
+    Document = models.QMSDocument
+    doc_q = db.query(
+        func.count(Document.id),
+        func.count(Document.id).filter(Document.status == QMSDocStatus.ACTIVE),
+        func.count(Document.id).filter(Document.status == QMSDocStatus.DRAFT),
+        func.count(Document.id).filter(Document.status == QMSDocStatus.OBSOLETE),
+    )
     if domain:
-        doc_q = doc_q.filter(models.QMSDocument.domain == domain)
-
-    documents_total = doc_q.count()
-    documents_active = doc_q.filter(models.QMSDocument.status == QMSDocStatus.ACTIVE).count()
-    documents_draft = doc_q.filter(models.QMSDocument.status == QMSDocStatus.DRAFT).count()
-    documents_obsolete = doc_q.filter(models.QMSDocument.status == QMSDocStatus.OBSOLETE).count()
+        doc_q = doc_q.filter(Document.domain == domain)
+    documents_total, documents_active, documents_draft, documents_obsolete = doc_q.one()
 
     # Pending acknowledgements
-    dist_q = db.query(models.QMSDocumentDistribution).filter(
+    dist_q = db.query(func.count(models.QMSDocumentDistribution.id)).filter(
         models.QMSDocumentDistribution.requires_ack.is_(True),
         models.QMSDocumentDistribution.acked_at.is_(None),
     )
     if domain:
-        dist_q = dist_q.join(models.QMSDocument).filter(models.QMSDocument.domain == domain)
-    distributions_pending_ack = dist_q.count()
-
-    # Change requests
-    cr_q = db.query(models.QMSManualChangeRequest)
+        dist_q = dist_q.join(Document, Document.id == models.QMSDocumentDistribution.document_id).filter(Document.domain == domain)
+    distributions_pending_ack = dist_q.scalar()
+
+    ChangeRequest = models.QMSManualChangeRequest
+    cr_q = db.query(
+        func.count(ChangeRequest.id),
+        func.count(ChangeRequest.id).filter(
+            ChangeRequest.status.in_([QMSChangeRequestStatus.SUBMITTED, QMSChangeRequestStatus.UNDER_REVIEW])
+        ),
+    )
     if domain:
-        cr_q = cr_q.filter(models.QMSManualChangeRequest.domain == domain)
-    change_requests_total = cr_q.count()
-    change_requests_open = cr_q.filter(
-        or_(
-            models.QMSManualChangeRequest.status == QMSChangeRequestStatus.SUBMITTED,
-            models.QMSManualChangeRequest.status == QMSChangeRequestStatus.UNDER_REVIEW,
-        )
-    ).count()
-
-    # Audits
-    a_q = db.query(models.QMSAudit)
+        cr_q = cr_q.filter(ChangeRequest.domain == domain)
+    change_requests_total, change_requests_open = cr_q.one()
+
+    Audit = models.QMSAudit
+    a_q = db.query(
+        func.count(Audit.id),
+        func.count(Audit.id).filter(
+            Audit.status.in_([QMSAuditStatus.PLANNED, QMSAuditStatus.IN_PROGRESS, QMSAuditStatus.CAP_OPEN])
+        ),
+    )
     if amo_id:
-        a_q = a_q.filter(models.QMSAudit.amo_id == amo_id)
+        a_q = a_q.filter(Audit.amo_id == amo_id)
     if domain:
-        a_q = a_q.filter(models.QMSAudit.domain == domain)
-    audits_total = a_q.count()
-    audits_open = a_q.filter(
-        or_(
-            models.QMSAudit.status == QMSAuditStatus.PLANNED,
-            models.QMSAudit.status == QMSAuditStatus.IN_PROGRESS,
-            models.QMSAudit.status == QMSAuditStatus.CAP_OPEN,
-        )
-    ).count()
+        a_q = a_q.filter(Audit.domain == domain)
+    audits_total, audits_open = a_q.one()
 
-    # Findings (open = not closed)
-    f_q = db.query(models.QMSAuditFinding)
+    # Findings (open = not closed); overdue = target date passed and still open.
+    Finding = models.QMSAuditFinding
+    today = date.today()
+    f_q = db.query(
+        func.count(Finding.id),
+        func.count(Finding.id).filter(Finding.level == FindingLevel.LEVEL_1),
+        func.count(Finding.id).filter(Finding.level == FindingLevel.LEVEL_2),
+        func.count(Finding.id).filter(
+            Finding.level == FindingLevel.LEVEL_3,
+            Finding.finding_type != QMSFindingType.OBSERVATION,
+        ),
+        func.count(Finding.id).filter(
+            or_(Finding.level == FindingLevel.LEVEL_4, Finding.finding_type == QMSFindingType.OBSERVATION)
+        ),
+        func.count(Finding.id).filter(Finding.target_close_date.is_not(None), Finding.target_close_date < today),
+    ).filter(Finding.closed_at.is_(None))
     if domain or amo_id:
-        f_q = f_q.join(models.QMSAudit)
+        f_q = f_q.join(Audit, Audit.id == Finding.audit_id)
         if amo_id:
-            f_q = f_q.filter(models.QMSAudit.amo_id == amo_id)
+            f_q = f_q.filter(Audit.amo_id == amo_id)
         if domain:
-            f_q = f_q.filter(models.QMSAudit.domain == domain)
-
-    findings_open = f_q.filter(models.QMSAuditFinding.closed_at.is_(None))
-    findings_open_total = findings_open.count()
-    findings_open_level_1 = findings_open.filter(models.QMSAuditFinding.level == FindingLevel.LEVEL_1).count()
-    findings_open_level_2 = findings_open.filter(models.QMSAuditFinding.level == FindingLevel.LEVEL_2).count()
-    findings_open_level_3 = findings_open.filter(
-        models.QMSAuditFinding.level == FindingLevel.LEVEL_3,
-        models.QMSAuditFinding.finding_type != QMSFindingType.OBSERVATION,
-    ).count()
-    findings_open_level_4 = findings_open.filter(
-        or_(
-            models.QMSAuditFinding.level == FindingLevel.LEVEL_4,
-            models.QMSAuditFinding.finding_type == QMSFindingType.OBSERVATION,
-        )
-    ).count()
-
-    # Overdue (target date passed and still open)
-    today = date.today()
-    overdue_q = findings_open.filter(
-        models.QMSAuditFinding.target_close_date.is_not(None),
-        models.QMSAuditFinding.target_close_date < today,
-    )
-    findings_overdue_total = overdue_q.count()
+            f_q = f_q.filter(Audit.domain == domain)
+    (
+        findings_open_total,
+        findings_open_level_1,
+        findings_open_level_2,
+        findings_open_level_3,
+        findings_open_level_4,
+        findings_overdue_total,
+    ) = f_q.one()
 
     result = {
         "domain": domain,
@@ -240,7 +265,6 @@ def get_dashboard(db: Session, domain: Optional[QMSDomain] = None, amo_id: Optio
         "findings_open_level_4": findings_open_level_4,
         "findings_overdue_total": findings_overdue_total,
     }
-    _set_perf_cache(cache_key, result)
     return result
 
 
@@ -273,6 +297,16 @@ def _safe_count(query) -> int:
         return 0
 
 
+def _safe_counts(query) -> tuple[int, ...]:
+    """Run a single-row aggregate query; zeros for every column if it fails."""
+    try:
+        row = query.one()
+    except SQLAlchemyError:
+        _rollback_session(query.session)
+        return (0,) * len(query.column_descriptions)
+    return tuple(int(value or 0) for value in row)
+
+
 def _build_audit_closure_trend(db: Session, window_days: int = 90, bucket_days: int = 7) -> list[dict]:
     today = date.today()
     start = today - timedelta(days=window_days - 1)
@@ -464,10 +498,14 @@ def _select_next_due_audit(db: Session, amo_id: Optional[str], domain: Optional[
 
 
 def get_cockpit_snapshot(db: Session, domain: Optional[QMSDomain] = None, amo_id: Optional[str] = None, department_code: Optional[str] = None) -> dict:
-    cache_key = ("cockpit", str(amo_id or ""), str(domain.value if domain else "ALL"))
-    cached = _get_perf_cache(cache_key)
-    if cached is not None:
-        return cached
+    return _PERF_CACHE.get_or_load(
+        ("cockpit", str(domain.value if domain else "ALL"), department_code or ""),
+        lambda: _build_cockpit_snapshot(db, domain=domain, amo_id=amo_id, department_code=department_code),
+        tenant_id=amo_id,
+    )
+
+
+def _build_cockpit_snapshot(db: Session, domain: Optional[QMSDomain], amo_id: Optional[str], department_code: Optional[str]) -> dict:
     dashboard = get_dashboard(db, domain=domain, amo_id=amo_id)
     open_statuses = [CARStatus.OPEN, CARStatus.IN_PROGRESS, CARStatus.PENDING_VERIFICATION]
     cars_q = db.query(models.CorrectiveActionRequest).filter(models.CorrectiveActionRequest.status.in_(open_statuses))
@@ -491,10 +529,10 @@ def get_cockpit_snapshot(db: Session, domain: Optional[QMSDomain] = None, amo_id
         action_rows = []
 
     today = date.today()
-    cars_open_total = _safe_count(cars_q)
-    cars_overdue = _safe_count(cars_q.filter(
-        models.CorrectiveActionRequest.due_date.is_not(None),
-        models.CorrectiveActionRequest.due_date < today,
+    CAR = models.CorrectiveActionRequest
+    cars_open_total, cars_overdue = _safe_counts(cars_q.with_entities(
+        func.count(CAR.id),
+        func.count(CAR.id).filter(CAR.due_date.is_not(None), CAR.due_date < today),
     ))
 
     deferral_q = db.query(training_models.TrainingDeferralRequest)
@@ -516,20 +554,28 @@ def get_cockpit_snapshot(db: Session, domain: Optional[QMSDomain] = None, amo_id
     suppliers_q = db.query(finance_models.Vendor)
     if amo_id and hasattr(finance_models.Vendor, "amo_id"):
         suppliers_q = suppliers_q.filter(finance_models.Vendor.amo_id == amo_id)
-    suppliers_active = _safe_count(suppliers_q.filter(finance_models.Vendor.is_active.is_(True)))
-    suppliers_inactive = _safe_count(suppliers_q.filter(finance_models.Vendor.is_active.is_(False)))
+    suppliers_active, suppliers_inactive = _safe_counts(suppliers_q.with_entities(
+        func.count(finance_models.Vendor.id).filter(finance_models.Vendor.is_active.is_(True)),
+        func.count(finance_models.Vendor.id).filter(finance_models.Vendor.is_active.is_(False)),
+    ))
 
-    tasks_q = db.query(task_models.Task).filter(task_models.Task.status.in_([task_models.TaskStatus.OPEN, task_models.TaskStatus.IN_PROGRESS]))
+    Task = task_models.Task
+    tasks_q = db.query(
+        func.count(Task.id).filter(func.date(Task.due_at) == today),
+        func.count(Task.id).filter(Task.due_at.is_not(None), func.date(Task.due_at) < today),
+    ).filter(Task.status.in_([task_models.TaskStatus.OPEN, task_models.TaskStatus.IN_PROGRESS]))
     if amo_id:
-        tasks_q = tasks_q.filter(task_models.Task.amo_id == amo_id)
-    tasks_due_today = _safe_count(tasks_q.filter(func.date(task_models.Task.due_at) == today))
-    tasks_overdue = _safe_count(tasks_q.filter(task_models.Task.due_at.is_not(None), func.date(task_models.Task.due_at) < today))
+        tasks_q = tasks_q.filter(Task.amo_id == amo_id)
+    tasks_due_today, tasks_overdue = _safe_counts(tasks_q)
 
     events_hold_count = 0
     events_new_count = 0
     if amo_id:
-        events_hold_count = _safe_count(db.query(audit_models.AuditEvent).filter(audit_models.AuditEvent.amo_id == amo_id, audit_models.AuditEvent.action.ilike("%hold%")))
-        events_new_count = _safe_count(db.query(audit_models.AuditEvent).filter(audit_models.AuditEvent.amo_id == amo_id, audit_models.AuditEvent.occurred_at >= datetime.now(timezone.utc) - timedelta(days=1)))
+        AuditEvent = audit_models.AuditEvent
+        events_hold_count, events_new_count = _safe_counts(db.query(
+            func.count(AuditEvent.id).filter(AuditEvent.action.ilike("%hold%")),
+            func.count(AuditEvent.id).filter(AuditEvent.occurred_at >= datetime.now(timezone.utc) - timedelta(days=1)),
+        ).filter(AuditEvent.amo_id == amo_id))
 
     manpower = _build_manpower_snapshot(db, amo_id=amo_id, department_code=department_code)
 
@@ -539,8 +585,11 @@ def get_cockpit_snapshot(db: Session, domain: Optional[QMSDomain] = None, amo_id
         compliance_actions_q = compliance_actions_q.filter(tr_models.ComplianceAction.amo_id == amo_id)
         publication_matches_q = publication_matches_q.filter(tr_models.AirworthinessPublicationMatch.amo_id == amo_id)
 
-    compliance_exceptions_open = _safe_count(compliance_actions_q.filter(tr_models.ComplianceAction.status.in_(["Under Review", "Planned", "Scheduled", "In Work", "Awaiting Certification"])))
-    compliance_overdue = _safe_count(compliance_actions_q.filter(tr_models.ComplianceAction.due_date.is_not(None), tr_models.ComplianceAction.due_date < today, tr_models.ComplianceAction.status.notin_(["Complied", "Closed", "Cancelled"])))
+    ComplianceAction = tr_models.ComplianceAction
+    compliance_exceptions_open, compliance_overdue = _safe_counts(compliance_actions_q.with_entities(
+        func.count(ComplianceAction.id).filter(ComplianceAction.status.in_(["Under Review", "Planned", "Scheduled", "In Work", "Awaiting Certification"])),
+        func.count(ComplianceAction.id).filter(ComplianceAction.due_date.is_not(None), ComplianceAction.due_date < today, ComplianceAction.status.notin_(["Complied", "Closed", "Cancelled"])),
+    ))
     compliance_unplanned_applicable = _safe_count(publication_matches_q.filter(tr_models.AirworthinessPublicationMatch.classification.in_(["Applicable", "Potentially Applicable"]), tr_models.AirworthinessPublicationMatch.review_status.in_(["Matched", "Under Review"])))
 
     compliance_rows = []
@@ -611,9 +660,7 @@ def get_cockpit_snapshot(db: Session, domain: Optional[QMSDomain] = None, amo_id
         "next_due_audit": _select_next_due_audit(db, amo_id=amo_id, domain=domain),
     }
 
-    result = _apply_demo_seed(snapshot, db=db, amo_id=amo_id)
-    _set_perf_cache(cache_key, result)
-    return result
+    return _apply_demo_seed(snapshot, db=db, amo_id=amo_id)
 
 
 # -----------------------------
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.audit import services as audit_services
+from amodb.apps.audit import models as audit_models
+from amodb.apps.quality import models as quality_models
+from amodb.apps.quality import service as quality_service
+from amodb.apps.quality.enums import FindingLevel, QMSAuditStatus, QMSDocStatus, QMSDomain, QMSFindingType
+from amodb.database import Base
+
+
+@pytest.fixture()
+def qms_db():
+    quality_service._PERF_CACHE.clear()
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            account_models.AMOAsset.__table__,
+            account_models.Department.__table__,
+            account_models.User.__table__,
+            account_models.AuthorisationType.__table__,
+            account_models.UserAuthorisation.__table__,
+            account_models.AccountSecurityEvent.__table__,
+            audit_models.AuditEvent.__table__,
+            quality_models.QMSDocument.__table__,
+            quality_models.QMSDocumentDistribution.__table__,
+            quality_models.QMSManualChangeRequest.__table__,
+            quality_models.QMSAudit.__table__,
+            quality_models.QMSAuditFinding.__table__,
+            quality_models.QMSAuditReferenceCounter.__table__,
+        ],
+    )
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(_conn, _cursor, statement, *_args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+    db = SessionLocal()
+    amo = account_models.AMO(amo_code="QMS-A", name="QMS A", login_slug="qms-a")
+    db.add(amo)
+    db.commit()
+    yield db, amo.id, statements
+    db.close()
+    quality_service._PERF_CACHE.clear()
+
+
+def _seed(db, amo_id: str) -> None:
+    today = date.today()
+    for index, status in enumerate([QMSDocStatus.ACTIVE, QMSDocStatus.ACTIVE, QMSDocStatus.DRAFT, QMSDocStatus.OBSOLETE]):
+        db.add(
+            quality_models.QMSDocument(
+                amo_id=amo_id,
+                domain=QMSDomain.AMO,
+                doc_type=list(quality_models.QMSDocType)[0],
+                doc_code=f"DOC-{index}",
+                title=f"Document {index}",
+                status=status,
+            )
+        )
+    audits = [
+        quality_models.QMSAudit(amo_id=amo_id, domain=QMSDomain.AMO, audit_ref=f"QAR/MO/26/{n + 1:03d}", ref_sequence=n + 1, title=f"Audit {n}", status=status)
+        for n, status in enumerate([QMSAuditStatus.PLANNED, QMSAuditStatus.CAP_OPEN, QMSAuditStatus.CLOSED])
+    ]
+    db.add_all(audits)
+    db.flush()
+    findings = [
+        (FindingLevel.LEVEL_1, QMSFindingType.NON_CONFORMITY, today - timedelta(days=1), None),
+        (FindingLevel.LEVEL_2, QMSFindingType.NON_CONFORMITY, today + timedelta(days=5), None),
+        (FindingLevel.LEVEL_3, QMSFindingType.OBSERVATION, None, None),
+        (FindingLevel.LEVEL_3, QMSFindingType.NON_CONFORMITY, today - timedelta(days=3), None),
+        (FindingLevel.LEVEL_1, QMSFindingType.NON_CONFORMITY, today - timedelta(days=9), datetime.now(timezone.utc)),
+    ]
+    for level, finding_type, target, closed_at in findings:
+        db.add(
+            quality_models.QMSAuditFinding(
+                amo_id=amo_id,
+                audit_id=audits[0].id,
+                level=level,
+                finding_type=finding_type,
+                description="Finding",
+                target_close_date=target,
+                closed_at=closed_at,
+            )
+        )
+    db.commit()
+
+
+def test_dashboard_counts_come_from_a_handful_of_aggregate_queries(qms_db):
+    db, amo_id, statements = qms_db
+    _seed(db, amo_id)
+
+    statements.clear()
+    dashboard = quality_service.get_dashboard(db, amo_id=amo_id)
+    aggregate_queries = [sql for sql in statements if "count(" in sql.lower()]
+
+    assert len(aggregate_queries) == 5
+    assert dashboard["documents_total"] == 4
+    assert dashboard["documents_active"] == 2
+    assert dashboard["documents_draft"] == 1
+    assert dashboard["documents_obsolete"] == 1
+    assert dashboard["audits_total"] == 3
+    assert dashboard["audits_open"] == 2
+    assert dashboard["findings_open_total"] == 4
+    assert dashboard["findings_open_level_1"] == 1
+    assert dashboard["findings_open_level_2"] == 1
+    assert dashboard["findings_open_level_3"] == 1
+    assert dashboard["findings_open_level_4"] == 1
+    assert dashboard["findings_overdue_total"] == 2
+
+    statements.clear()
+    assert quality_service.get_dashboard(db, amo_id=amo_id) == dashboard
+    assert statements == []
+
+
+def test_status_change_event_invalidates_the_tenant_dashboard(qms_db):
+    db, amo_id, _ = qms_db
+    _seed(db, amo_id)
+    assert quality_service.get_dashboard(db, amo_id=amo_id)["audits_open"] == 2
+
+    audit = db.query(quality_models.QMSAudit).filter(quality_models.QMSAudit.status == QMSAuditStatus.PLANNED).one()
+    audit.status = QMSAuditStatus.CLOSED
+    audit_services.log_event(
+        db,
+        amo_id=amo_id,
+        actor_user_id=None,
+        entity_type="qms_audit",
+        entity_id=str(audit.id),
+        action="status_change",
+        after={"status": "CLOSED"},
+    )
+    db.commit()
+
+    assert quality_service.get_dashboard(db, amo_id=amo_id)["audits_open"] == 1
+
+
+def test_dotted_finding_event_invalidates_the_tenant_dashboard(qms_db):
+    db, amo_id, _ = qms_db
+    _seed(db, amo_id)
+    assert quality_service.get_dashboard(db, amo_id=amo_id)["findings_open_total"] == 4
+
+    audit = db.query(quality_models.QMSAudit).filter(quality_models.QMSAudit.status == QMSAuditStatus.PLANNED).one()
+    finding = quality_models.QMSAuditFinding(
+        amo_id=amo_id,
+        audit_id=audit.id,
+        level=FindingLevel.LEVEL_2,
+        finding_type=QMSFindingType.NON_CONFORMITY,
+        description="Raised from the checklist",
+    )
+    db.add(finding)
+    db.flush()
+    # The checklist-execution path publishes findings as "qms.finding".
+    audit_services.log_event(
+        db,
+        amo_id=amo_id,
+        actor_user_id=None,
+        entity_type="qms.finding",
+        entity_id=str(finding.id),
+        action="CREATED",
+        after={"status": "OPEN"},
+    )
+    db.commit()
+
+    assert quality_service.get_dashboard(db, amo_id=amo_id)["findings_open_total"] == 5
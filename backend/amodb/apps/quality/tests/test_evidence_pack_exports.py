@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import hashlib
 import io
 import anyio
 import importlib
+import json
 import zipfile
+from pathlib import Path
 
+import pytest
 from starlette.requests import Request
 
 from amodb.apps.accounts import models as account_models
@@ -175,3 +179,61 @@ def test_audit_evidence_pack_contains_summary_and_findings(db_session):
         .first()
     )
     assert event is not None
+
+
+def test_pack_streams_attachments_to_spool_with_manifest_hashes(monkeypatch, tmp_path):
+    monkeypatch.setattr(evidence_service, "SPOOL_MEMORY_BYTES", 64 * 1024)
+    photo = tmp_path / "photo.jpg"
+    photo.write_bytes(bytes(range(256)) * 4096)
+    report = tmp_path / "report.pdf"
+    report.write_bytes(b"%PDF-1.4 " + b"x" * 300_000)
+    entries: list = []
+    omitted: list = []
+    size = evidence_service._add_entry(entries, "summary.json", {"id": 1})
+    for name, path in (("attachments/photo.jpg", photo), ("attachments/report.pdf", report), ("attachments/gone.pdf", tmp_path / "gone.pdf")):
+        size += evidence_service._load_attachment(entries, name=name, path=path, current_size=size, max_size=0, omitted=omitted)
+    # Attachments are referenced, not read, until the archive is written.
+    assert entries[1] == ("attachments/photo.jpg", photo)
+
+    first, first_size = evidence_service._spooled_pack(entries, {"omitted": omitted})
+    second, _ = evidence_service._spooled_pack(entries, {"omitted": omitted})
+    assert first._rolled
+    body = b"".join(evidence_service._iter_spool(first))
+    assert len(body) == first_size
+    assert body == b"".join(evidence_service._iter_spool(second))
+
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.namelist() == ["summary.json", "attachments/photo.jpg", "attachments/report.pdf", "manifest.json"]
+        assert archive.getinfo("attachments/photo.jpg").compress_type == zipfile.ZIP_STORED
+        manifest = json.loads(archive.read("manifest.json"))
+        assert manifest["omitted"] == [{"path": "attachments/gone.pdf", "reason": "missing"}]
+        for entry in manifest["files"]:
+            data = archive.read(entry["path"])
+            assert entry["sha256"] == hashlib.sha256(data).hexdigest()
+            assert entry["size_bytes"] == len(data)
+
+
+def test_stored_attachments_are_sized_first_and_streamed_at_write_time(monkeypatch):
+    body = b"%PDF-1.4 " + b"s" * 200_000
+    streamed: list[tuple] = []
+    monkeypatch.setattr(evidence_service.storage, "object_size", lambda uri: len(body))
+    monkeypatch.setattr(evidence_service.storage, "materialize", lambda *_args, **_kwargs: pytest.fail("downloaded"))
+
+    def iter_range(uri, start, end):
+        streamed.append((uri, start, end))
+        yield body[start : end + 1]
+
+    monkeypatch.setattr(evidence_service.storage, "iter_range", iter_range)
+    entries: list = []
+    omitted: list = []
+    for name in ("attachments/big.pdf", "attachments/report.pdf"):
+        evidence_service._load_attachment(
+            entries, name=name, path=Path("s3://bucket/report.pdf"), current_size=0, max_size=100_000 if "big" in name else 0, omitted=omitted
+        )
+
+    assert omitted == [{"path": "attachments/big.pdf", "reason": "exceeds_limit", "size_bytes": len(body)}]
+    assert streamed == []
+    spool, _size = evidence_service._spooled_pack(entries, {"omitted": omitted})
+    with zipfile.ZipFile(io.BytesIO(b"".join(evidence_service._iter_spool(spool)))) as archive:
+        assert archive.read("attachments/report.pdf") == body
+    assert streamed == [("s3://bucket/report.pdf", 0, len(body) - 1)]
@@ -76,6 +76,7 @@ class ReliabilityIngestionBatch(Base):
     duplicate_count = Column(Integer, nullable=False, default=0)
     invalid_count = Column(Integer, nullable=False, default=0)
     metadata_json = Column(JSON_VALUE, nullable=False, default=dict)
+    stage_timings_json = Column(JSON_VALUE, nullable=False, default=dict)
     error_summary = Column(Text, nullable=True)
     received_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
     completed_at = Column(DateTime(timezone=True), nullable=True)
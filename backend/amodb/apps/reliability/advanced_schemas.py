@@ -77,6 +77,7 @@ class ReliabilityIngestionBatchRead(ORMModel):
     duplicate_count: int
     invalid_count: int
     metadata_json: Dict[str, Any]
+    stage_timings_json: Dict[str, Any] = Field(default_factory=dict)
     error_summary: Optional[str]
     received_at: datetime
     completed_at: Optional[datetime]
@@ -4,12 +4,15 @@ import hashlib
 import json
 import math
 import os
+from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta, timezone
 from decimal import Decimal, ROUND_HALF_UP
+from time import perf_counter
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, func, or_, text
+from sqlalchemy import String, and_, any_, bindparam, func, insert, inspect, or_, text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
@@ -425,8 +428,45 @@ def _record_external_id(payload: Dict[str, Any], payload_hash: str) -> str:
     return str(value).strip()[:255] if value else payload_hash[:32]
 
 
-def _create_data_issue(
+def _existing_ingestion_keys(
     db: Session,
+    *,
+    amo_id: str,
+    source_id: str,
+    external_ids: set[str],
+    payload_hashes: set[str],
+) -> Tuple[set[str], set[str]]:
+    """Return the external ids and payload hashes already ingested for ``source_id``."""
+    Record = domain.ReliabilityIngestionRecord
+    seen_external_ids: set[str] = set()
+    seen_hashes: set[str] = set()
+    if not external_ids and not payload_hashes:
+        return seen_external_ids, seen_hashes
+    base = db.query(Record.external_id, Record.payload_hash).filter(Record.amo_id == amo_id, Record.source_id == source_id)
+    if db.get_bind().dialect.name == "postgresql":
+        # Two array parameters regardless of batch size.
+        lookups = [
+            base.filter(
+                or_(
+                    Record.external_id == any_(bindparam("external_ids", sorted(external_ids), type_=ARRAY(String))),
+                    Record.payload_hash == any_(bindparam("payload_hashes", sorted(payload_hashes), type_=ARRAY(String))),
+                )
+            )
+        ]
+    else:
+        ids, hashes = sorted(external_ids), sorted(payload_hashes)
+        lookups = [
+            base.filter(or_(Record.external_id.in_(ids[offset : offset + 500]), Record.payload_hash.in_(hashes[offset : offset + 500])))
+            for offset in range(0, max(len(ids), len(hashes)), 500)
+        ]
+    for query in lookups:
+        for external_id, payload_hash in query:
+            seen_external_ids.add(external_id)
+            seen_hashes.add(payload_hash)
+    return seen_external_ids, seen_hashes
+
+
+def _data_issue_row(
     *,
     amo_id: str,
     source_id: Optional[str],
@@ -436,20 +476,107 @@ def _create_data_issue(
     severity: str,
     message: str,
     details: Dict[str, Any],
-) -> domain.ReliabilityDataQualityIssue:
-    issue = domain.ReliabilityDataQualityIssue(
-        amo_id=amo_id,
-        source_id=source_id,
-        batch_id=batch_id,
-        record_id=record_id,
-        issue_code=code,
-        severity=severity,
-        message=message,
-        details_json=details,
-    )
-    db.add(issue)
-    db.flush()
-    return issue
+) -> Dict[str, Any]:
+    return {
+        "amo_id": amo_id,
+        "source_id": source_id,
+        "batch_id": batch_id,
+        "record_id": record_id,
+        "issue_code": code,
+        "severity": severity,
+        "message": message,
+        "details_json": details,
+    }
+
+
+def _ingestion_event_type(record_payload: Dict[str, Any]) -> str:
+    return _normalise_event_type(
+        record_payload.get("event_type") or record_payload.get("occurrence_type") or record_payload.get("type")
+    ) or "OTHER"
+
+
+def _ingestion_event_row(
+    record_payload: Dict[str, Any],
+    *,
+    amo_id: str,
+    source: domain.ReliabilitySource,
+    batch_id: str,
+    record_id: str,
+    external_id: str,
+    payload_hash: str,
+    warnings: List[str],
+    actor_user_id: Optional[str],
+) -> Dict[str, Any]:
+    severity_value = str(record_payload.get("severity") or "MEDIUM").upper()
+    if severity_value not in {item.value for item in legacy.ReliabilitySeverityEnum}:
+        severity_value = "MEDIUM"
+    return {
+        "amo_id": amo_id,
+        "aircraft_serial_number": record_payload.get("aircraft_serial_number") or record_payload.get("aircraft_id"),
+        "engine_position": record_payload.get("engine_position"),
+        "component_id": record_payload.get("component_id"),
+        "work_order_id": record_payload.get("work_order_id"),
+        "task_card_id": record_payload.get("task_card_id"),
+        "event_type": legacy.ReliabilityEventTypeEnum(_ingestion_event_type(record_payload)),
+        "operator_event_id": (str(record_payload.get("operator_event_id"))[:36] if record_payload.get("operator_event_id") else None),
+        "severity": legacy.ReliabilitySeverityEnum(severity_value),
+        "ata_chapter": record_payload.get("ata_chapter"),
+        "reference_code": record_payload.get("reference_code") or record_payload.get("techlog_no"),
+        "source_system": source.code,
+        "description": record_payload.get("description") or record_payload.get("summary") or record_payload.get("title"),
+        "occurred_at": parse_datetime(
+            record_payload.get("occurred_at") or record_payload.get("event_time") or record_payload.get("date"),
+            default=utcnow(),
+        ),
+        "created_by_user_id": actor_user_id,
+        "source_record_id": external_id,
+        "source_payload_hash": payload_hash,
+        "validation_status": "WARNING" if warnings else "VALID",
+        "validation_errors": [{"level": "WARNING", "message": item} for item in warnings],
+        "operation_stage": record_payload.get("operation_stage"),
+        "flight_number": record_payload.get("flight_number"),
+        "origin_station": record_payload.get("origin") or record_payload.get("origin_station"),
+        "destination_station": record_payload.get("destination") or record_payload.get("destination_station"),
+        "delay_minutes": record_payload.get("delay_minutes"),
+        "mel_reference": record_payload.get("mel_reference"),
+        "cdl_reference": record_payload.get("cdl_reference"),
+        "deferral_expires_at": parse_datetime(record_payload.get("deferred_until") or record_payload.get("deferral_expires_at")),
+        "part_number": record_payload.get("part_number"),
+        "component_serial_number": record_payload.get("component_serial_number") or record_payload.get("serial_number"),
+        "confirmed_failure": record_payload.get("confirmed_failure"),
+        "repeat_key": record_payload.get("repeat_key"),
+        "provenance_json": {
+            "source_id": source.id,
+            "batch_id": batch_id,
+            "record_id": record_id,
+            "mapping_version": source.mapping_version,
+        },
+    }
+
+
+def _interruption_row(record_payload: Dict[str, Any], *, amo_id: str, event_id: int, event_type: str) -> Dict[str, Any]:
+    return {
+        "amo_id": amo_id,
+        "reliability_event_id": event_id,
+        "interruption_type": event_type,
+        "flight_number": record_payload.get("flight_number"),
+        "origin": record_payload.get("origin") or record_payload.get("origin_station"),
+        "destination": record_payload.get("destination") or record_payload.get("destination_station"),
+        "scheduled_departure_at": parse_datetime(record_payload.get("scheduled_departure_at")),
+        "actual_departure_at": parse_datetime(record_payload.get("actual_departure_at")),
+        "delay_minutes": record_payload.get("delay_minutes"),
+        "cancelled": bool(record_payload.get("cancelled") or event_type == "TECHNICAL_CANCELLATION"),
+        "return_to_gate": bool(record_payload.get("return_to_gate") or event_type == "RETURN_TO_GATE"),
+        "air_turnback": bool(record_payload.get("air_turnback") or event_type == "AIR_TURNBACK"),
+        "diversion": bool(record_payload.get("diversion") or event_type == "DIVERSION"),
+        "engine_shutdown": bool(record_payload.get("engine_shutdown") or event_type == "IN_FLIGHT_SHUTDOWN"),
+        "dispatch_impact": record_payload.get("dispatch_impact"),
+        "mel_reference": record_payload.get("mel_reference"),
+        "cdl_reference": record_payload.get("cdl_reference"),
+        "deferral_category": record_payload.get("deferral_category"),
+        "deferred_until": parse_datetime(record_payload.get("deferred_until")),
+        "notes": record_payload.get("interruption_notes"),
+    }
 
 
 def ingest_batch(
@@ -488,156 +615,139 @@ def ingest_batch(
     db.add(batch)
     db.flush()
 
-    created_event_ids: List[int] = []
-    duplicates: List[str] = []
-    rejected: List[Dict[str, Any]] = []
+    timings: Dict[str, float] = {}
+    started = perf_counter()
+    mark = started
 
+    def _stage(name: str) -> None:
+        nonlocal mark
+        now = perf_counter()
+        timings[f"{name}_ms"] = round((now - mark) * 1000.0, 3)
+        mark = now
+
+    prepared: List[Tuple[Dict[str, Any], str, str]] = []
     for raw in payload.records:
         record_payload = dict(raw)
         payload_hash = sha256_value(record_payload)
-        external_id = _record_external_id(record_payload, payload_hash)
-        duplicate = (
-            db.query(domain.ReliabilityIngestionRecord)
-            .filter(
-                domain.ReliabilityIngestionRecord.amo_id == amo_id,
-                domain.ReliabilityIngestionRecord.source_id == source.id,
-                or_(
-                    domain.ReliabilityIngestionRecord.external_id == external_id,
-                    domain.ReliabilityIngestionRecord.payload_hash == payload_hash,
-                ),
-            )
-            .first()
-        )
-        if duplicate:
+        prepared.append((record_payload, payload_hash, _record_external_id(record_payload, payload_hash)))
+    _stage("hash")
+
+    # One lookup for the whole batch; records repeated within the batch are
+    # duplicates of their first occurrence, exactly as with per-record flushes.
+    seen_external_ids, seen_hashes = _existing_ingestion_keys(
+        db,
+        amo_id=amo_id,
+        source_id=source.id,
+        external_ids={item[2] for item in prepared},
+        payload_hashes={item[1] for item in prepared},
+    )
+    duplicates: List[str] = []
+    accepted: List[Tuple[Dict[str, Any], str, str]] = []
+    for record_payload, payload_hash, external_id in prepared:
+        if external_id in seen_external_ids or payload_hash in seen_hashes:
             duplicates.append(external_id)
-            batch.duplicate_count += 1
             continue
-
+        seen_external_ids.add(external_id)
+        seen_hashes.add(payload_hash)
+        accepted.append((record_payload, payload_hash, external_id))
+    batch.duplicate_count = len(duplicates)
+    _stage("dedupe")
+
+    processed_at = utcnow()
+    record_rows: List[Dict[str, Any]] = []
+    event_rows: List[Dict[str, Any]] = []
+    event_records: List[Tuple[Dict[str, Any], Dict[str, Any], str, List[str]]] = []
+    issue_rows: List[Dict[str, Any]] = []
+    rejected: List[Dict[str, Any]] = []
+    for record_payload, payload_hash, external_id in accepted:
         errors, warnings = _validate_ingestion_record(record_payload)
-        ingestion_record = domain.ReliabilityIngestionRecord(
-            amo_id=amo_id,
-            source_id=source.id,
-            batch_id=batch.id,
-            external_id=external_id,
-            payload_hash=payload_hash,
-            payload_json=record_payload,
-            validation_status="INVALID" if errors else ("WARNING" if warnings else "VALID"),
-            validation_errors=[{"level": "ERROR", "message": item} for item in errors]
+        record_row = {
+            "id": generate_uuid7(),
+            "amo_id": amo_id,
+            "source_id": source.id,
+            "batch_id": batch.id,
+            "external_id": external_id,
+            "payload_hash": payload_hash,
+            "payload_json": record_payload,
+            "validation_status": "INVALID" if errors else ("WARNING" if warnings else "VALID"),
+            "validation_errors": [{"level": "ERROR", "message": item} for item in errors]
             + [{"level": "WARNING", "message": item} for item in warnings],
-        )
-        db.add(ingestion_record)
-        db.flush()
-
+            "normalized_event_id": None,
+            "processed_at": processed_at,
+        }
+        record_rows.append(record_row)
         if errors:
-            batch.invalid_count += 1
             rejected.append({"external_id": external_id, "errors": errors})
-            _create_data_issue(
-                db,
+            issue_rows.append(
+                _data_issue_row(
+                    amo_id=amo_id,
+                    source_id=source.id,
+                    batch_id=batch.id,
+                    record_id=record_row["id"],
+                    code="INGESTION_VALIDATION_FAILED",
+                    severity="HIGH",
+                    message="Reliability source record failed canonical validation.",
+                    details={"external_id": external_id, "errors": errors},
+                )
+            )
+            continue
+        event_rows.append(
+            _ingestion_event_row(
+                record_payload,
                 amo_id=amo_id,
-                source_id=source.id,
+                source=source,
                 batch_id=batch.id,
-                record_id=ingestion_record.id,
-                code="INGESTION_VALIDATION_FAILED",
-                severity="HIGH",
-                message="Reliability source record failed canonical validation.",
-                details={"external_id": external_id, "errors": errors},
+                record_id=record_row["id"],
+                external_id=external_id,
+                payload_hash=payload_hash,
+                warnings=warnings,
+                actor_user_id=actor_user_id,
             )
-            ingestion_record.processed_at = utcnow()
-            continue
-
-        event_type = _normalise_event_type(
-            record_payload.get("event_type") or record_payload.get("occurrence_type") or record_payload.get("type")
-        ) or "OTHER"
-        severity_value = str(record_payload.get("severity") or "MEDIUM").upper()
-        if severity_value not in {item.value for item in legacy.ReliabilitySeverityEnum}:
-            severity_value = "MEDIUM"
-        occurred_at = parse_datetime(
-            record_payload.get("occurred_at") or record_payload.get("event_time") or record_payload.get("date"),
-            default=utcnow(),
         )
-        event = legacy.ReliabilityEvent(
-            amo_id=amo_id,
-            aircraft_serial_number=record_payload.get("aircraft_serial_number") or record_payload.get("aircraft_id"),
-            engine_position=record_payload.get("engine_position"),
-            component_id=record_payload.get("component_id"),
-            work_order_id=record_payload.get("work_order_id"),
-            task_card_id=record_payload.get("task_card_id"),
-            event_type=legacy.ReliabilityEventTypeEnum(event_type),
-            operator_event_id=(str(record_payload.get("operator_event_id"))[:36] if record_payload.get("operator_event_id") else None),
-            severity=legacy.ReliabilitySeverityEnum(severity_value),
-            ata_chapter=record_payload.get("ata_chapter"),
-            reference_code=record_payload.get("reference_code") or record_payload.get("techlog_no"),
-            source_system=source.code,
-            description=record_payload.get("description") or record_payload.get("summary") or record_payload.get("title"),
-            occurred_at=occurred_at,
-            created_by_user_id=actor_user_id,
-            source_record_id=external_id,
-            source_payload_hash=payload_hash,
-            validation_status="WARNING" if warnings else "VALID",
-            validation_errors=[{"level": "WARNING", "message": item} for item in warnings],
-            operation_stage=record_payload.get("operation_stage"),
-            flight_number=record_payload.get("flight_number"),
-            origin_station=record_payload.get("origin") or record_payload.get("origin_station"),
-            destination_station=record_payload.get("destination") or record_payload.get("destination_station"),
-            delay_minutes=record_payload.get("delay_minutes"),
-            mel_reference=record_payload.get("mel_reference"),
-            cdl_reference=record_payload.get("cdl_reference"),
-            deferral_expires_at=parse_datetime(record_payload.get("deferred_until") or record_payload.get("deferral_expires_at")),
-            part_number=record_payload.get("part_number"),
-            component_serial_number=record_payload.get("component_serial_number") or record_payload.get("serial_number"),
-            confirmed_failure=record_payload.get("confirmed_failure"),
-            repeat_key=record_payload.get("repeat_key"),
-            provenance_json={
-                "source_id": source.id,
-                "batch_id": batch.id,
-                "record_id": ingestion_record.id,
-                "mapping_version": source.mapping_version,
-            },
+        event_records.append((record_payload, record_row, external_id, warnings))
+    batch.invalid_count = len(rejected)
+    batch.valid_count = len(event_rows)
+    _stage("validate")
+
+    # Events first (records reference them), then records, then the rows that
+    # reference records/events. Each is one executemany, which SQLAlchemy sends
+    # as multi-row INSERT ... VALUES pages.
+    created_event_ids: List[int] = []
+    if event_rows:
+        created_event_ids = list(
+            db.scalars(
+                insert(legacy.ReliabilityEvent).returning(legacy.ReliabilityEvent.id, sort_by_parameter_order=True),
+                event_rows,
+            )
         )
-        db.add(event)
-        db.flush()
-        ingestion_record.normalized_event_id = event.id
-        ingestion_record.processed_at = utcnow()
-        batch.valid_count += 1
-        created_event_ids.append(event.id)
-
+    interruption_rows: List[Dict[str, Any]] = []
+    for event_id, (record_payload, record_row, external_id, warnings) in zip(created_event_ids, event_records):
+        record_row["normalized_event_id"] = event_id
+        event_type = _ingestion_event_type(record_payload)
         if event_type in INTERRUPTION_EVENT_TYPES:
-            interruption = domain.ReliabilityOperationalInterruption(
-                amo_id=amo_id,
-                reliability_event_id=event.id,
-                interruption_type=event_type,
-                flight_number=record_payload.get("flight_number"),
-                origin=record_payload.get("origin") or record_payload.get("origin_station"),
-                destination=record_payload.get("destination") or record_payload.get("destination_station"),
-                scheduled_departure_at=parse_datetime(record_payload.get("scheduled_departure_at")),
-                actual_departure_at=parse_datetime(record_payload.get("actual_departure_at")),
-                delay_minutes=record_payload.get("delay_minutes"),
-                cancelled=bool(record_payload.get("cancelled") or event_type == "TECHNICAL_CANCELLATION"),
-                return_to_gate=bool(record_payload.get("return_to_gate") or event_type == "RETURN_TO_GATE"),
-                air_turnback=bool(record_payload.get("air_turnback") or event_type == "AIR_TURNBACK"),
-                diversion=bool(record_payload.get("diversion") or event_type == "DIVERSION"),
-                engine_shutdown=bool(record_payload.get("engine_shutdown") or event_type == "IN_FLIGHT_SHUTDOWN"),
-                dispatch_impact=record_payload.get("dispatch_impact"),
-                mel_reference=record_payload.get("mel_reference"),
-                cdl_reference=record_payload.get("cdl_reference"),
-                deferral_category=record_payload.get("deferral_category"),
-                deferred_until=parse_datetime(record_payload.get("deferred_until")),
-                notes=record_payload.get("interruption_notes"),
-            )
-            db.add(interruption)
-
+            interruption_rows.append(_interruption_row(record_payload, amo_id=amo_id, event_id=event_id, event_type=event_type))
         for warning in warnings:
-            _create_data_issue(
-                db,
-                amo_id=amo_id,
-                source_id=source.id,
-                batch_id=batch.id,
-                record_id=ingestion_record.id,
-                code="INGESTION_WARNING",
-                severity="MEDIUM",
-                message=warning,
-                details={"external_id": external_id, "event_id": event.id},
+            issue_rows.append(
+                _data_issue_row(
+                    amo_id=amo_id,
+                    source_id=source.id,
+                    batch_id=batch.id,
+                    record_id=record_row["id"],
+                    code="INGESTION_WARNING",
+                    severity="MEDIUM",
+                    message=warning,
+                    details={"external_id": external_id, "event_id": event_id},
+                )
             )
+    if record_rows:
+        db.execute(insert(domain.ReliabilityIngestionRecord), record_rows)
+    if interruption_rows:
+        db.execute(insert(domain.ReliabilityOperationalInterruption), interruption_rows)
+    if issue_rows:
+        db.execute(insert(domain.ReliabilityDataQualityIssue), issue_rows)
+    _stage("insert")
+    timings["total_ms"] = round((perf_counter() - started) * 1000.0, 3)
+    batch.stage_timings_json = timings
 
     batch.status = "PROCESSED" if batch.invalid_count == 0 else ("FAILED" if batch.valid_count == 0 else "PARTIAL")
     batch.completed_at = utcnow()
@@ -666,7 +776,9 @@ def ingest_batch(
         actor_user_id=actor_user_id,
     )
     db.commit()
-    db.refresh(batch)
+    # Column attributes only: the selectin ``records`` relationship would load
+    # every row that was just bulk-inserted.
+    db.refresh(batch, attribute_names=[attr.key for attr in inspect(domain.ReliabilityIngestionBatch).column_attrs])
     return schemas.ReliabilityIngestionResult(
         batch=schemas.ReliabilityIngestionBatchRead.model_validate(batch),
         created_event_ids=created_event_ids,
@@ -1667,72 +1779,137 @@ def _period_bounds(metric: domain.ReliabilityMetricDefinition, start: Optional[d
     return period_start, period_end
 
 
-def _scope_event_query(
-    db: Session,
-    *,
-    amo_id: str,
-    period_start: date,
-    period_end: date,
-    event_types: Sequence[str],
-    scope_type: str,
-    scope_id: str,
-):
-    start_dt = datetime.combine(period_start, time.min, tzinfo=timezone.utc)
-    end_dt = datetime.combine(period_end, time.max, tzinfo=timezone.utc)
-    query = db.query(legacy.ReliabilityEvent).filter(
-        legacy.ReliabilityEvent.amo_id == amo_id,
-        legacy.ReliabilityEvent.occurred_at >= start_dt,
-        legacy.ReliabilityEvent.occurred_at <= end_dt,
-    )
-    if event_types:
-        query = query.filter(legacy.ReliabilityEvent.event_type.in_([legacy.ReliabilityEventTypeEnum(item) for item in event_types]))
-    if scope_type == "AIRCRAFT":
-        query = query.filter(legacy.ReliabilityEvent.aircraft_serial_number == scope_id)
-    elif scope_type == "ATA":
-        query = query.filter(legacy.ReliabilityEvent.ata_chapter == scope_id)
-    elif scope_type == "COMPONENT":
-        query = query.filter(legacy.ReliabilityEvent.part_number == scope_id)
-    elif scope_type == "ENGINE":
-        query = query.filter(legacy.ReliabilityEvent.engine_position == scope_id)
-    return query
+SCOPE_EVENT_COLUMNS = {
+    "AIRCRAFT": legacy.ReliabilityEvent.aircraft_serial_number,
+    "ATA": legacy.ReliabilityEvent.ata_chapter,
+    "COMPONENT": legacy.ReliabilityEvent.part_number,
+    "ENGINE": legacy.ReliabilityEvent.engine_position,
+}
+
+
+@dataclass(frozen=True)
+class ScopeCounts:
+    """Numerator, exposure and component breakdown for one analytics scope."""
+
+    events: int = 0
+    exposure: Decimal = Decimal("0")
+    removals: int = 0
+    no_fault_found: int = 0
+
 
+def _event_type_filter(event_types: Sequence[str]):
+    return legacy.ReliabilityEvent.event_type.in_([legacy.ReliabilityEventTypeEnum(item) for item in event_types])
 
-def _exposure(
+
+def _grouped_values(query, column, scope_type: str, scope_ids: Sequence[str], group_scope_type: str) -> Dict[str, Tuple[Any, ...]]:
+    """Run ``query`` once, grouped by ``column`` when the scope is per-row.
+
+    Scopes that do not partition the source table (fleet, or exposure for a
+    non-aircraft scope) share the single ungrouped row.
+    """
+    if scope_type != group_scope_type or column is None:
+        row = tuple(query.one())
+        return {scope_id: row for scope_id in scope_ids}
+    rows = query.add_columns(column).filter(column.in_(list(scope_ids))).group_by(column).all()
+    return {str(row[-1]): tuple(row[:-1]) for row in rows}
+
+
+def _scope_counts(
     db: Session,
     *,
     amo_id: str,
     period_start: date,
     period_end: date,
-    denominator_type: str,
     scope_type: str,
-    scope_id: str,
-) -> Decimal:
-    usage = db.query(fleet_models.AircraftUsage).filter(
-        fleet_models.AircraftUsage.amo_id == amo_id,
-        fleet_models.AircraftUsage.date >= period_start,
-        fleet_models.AircraftUsage.date <= period_end,
-    )
-    if scope_type == "AIRCRAFT":
-        usage = usage.filter(fleet_models.AircraftUsage.aircraft_serial_number == scope_id)
-    if denominator_type == "FH":
-        value = usage.with_entities(func.coalesce(func.sum(fleet_models.AircraftUsage.block_hours), 0)).scalar()
-    elif denominator_type == "FC":
-        value = usage.with_entities(func.coalesce(func.sum(fleet_models.AircraftUsage.cycles), 0)).scalar()
-    elif denominator_type == "FLIGHTS":
-        value = usage.with_entities(func.count(fleet_models.AircraftUsage.id)).scalar()
-    elif denominator_type == "DAYS":
-        value = Decimal(str((period_end - period_start).days + 1))
-    elif denominator_type == "POPULATION":
-        aircraft = db.query(fleet_models.Aircraft).filter(
-            fleet_models.Aircraft.amo_id == amo_id,
-            fleet_models.Aircraft.is_active.is_(True),
+    scope_ids: Sequence[str],
+    event_types: Sequence[str],
+    denominator_type: str,
+    denominator_event_types: Optional[Sequence[str]] = None,
+    component_breakdown: bool = False,
+) -> Dict[str, ScopeCounts]:
+    """Compute numerator and exposure for every scope with one GROUP BY per table.
+
+    Event counts (including the event-based denominator and the component
+    removal/NFF breakdown) come from a single conditional aggregate over
+    reliability events; flight-hour, cycle, flight and population exposure
+    from a single aggregate over usage or aircraft. Scopes with no rows get
+    zero counts, exactly as a per-scope ``count()`` would.
+    """
+    scope_ids = list(dict.fromkeys(scope_ids))
+    if not scope_ids:
+        return {}
+    event = legacy.ReliabilityEvent
+    numerator_filter = _event_type_filter(event_types) if event_types else None
+    aggregates = [func.count(event.id).filter(numerator_filter) if numerator_filter is not None else func.count(event.id)]
+    if denominator_event_types is not None:
+        aggregates.append(
+            func.count(event.id).filter(_event_type_filter(denominator_event_types))
+            if denominator_event_types
+            else func.count(event.id)
         )
-        if scope_type == "AIRCRAFT":
-            aircraft = aircraft.filter(fleet_models.Aircraft.serial_number == scope_id)
-        value = aircraft.with_entities(func.count(fleet_models.Aircraft.serial_number)).scalar()
-    else:
-        value = Decimal("1")
-    return decimal_value(value)
+    if component_breakdown:
+        for breakdown_type in (legacy.ReliabilityEventTypeEnum.UNSCHEDULED_REMOVAL, legacy.ReliabilityEventTypeEnum.NO_FAULT_FOUND):
+            condition = event.event_type == breakdown_type
+            if numerator_filter is not None:
+                condition = and_(numerator_filter, condition)
+            aggregates.append(func.count(event.id).filter(condition))
+    event_query = db.query(*aggregates).filter(
+        event.amo_id == amo_id,
+        event.occurred_at >= datetime.combine(period_start, time.min, tzinfo=timezone.utc),
+        event.occurred_at <= datetime.combine(period_end, time.max, tzinfo=timezone.utc),
+    )
+    scope_column = SCOPE_EVENT_COLUMNS.get(scope_type)
+    event_rows = _grouped_values(event_query, scope_column, scope_type, scope_ids, scope_type)
+
+    exposure_rows: Dict[str, Tuple[Any, ...]] = {}
+    constant_exposure: Optional[Decimal] = None
+    if denominator_event_types is None:
+        usage = fleet_models.AircraftUsage
+        usage_aggregate = {
+            "FH": func.coalesce(func.sum(usage.block_hours), 0),
+            "FC": func.coalesce(func.sum(usage.cycles), 0),
+            "FLIGHTS": func.count(usage.id),
+        }.get(denominator_type)
+        if usage_aggregate is not None:
+            usage_query = db.query(usage_aggregate).filter(
+                usage.amo_id == amo_id,
+                usage.date >= period_start,
+                usage.date <= period_end,
+            )
+            exposure_rows = _grouped_values(usage_query, usage.aircraft_serial_number, scope_type, scope_ids, "AIRCRAFT")
+        elif denominator_type == "POPULATION":
+            aircraft = fleet_models.Aircraft
+            population_query = db.query(func.count(aircraft.serial_number)).filter(
+                aircraft.amo_id == amo_id,
+                aircraft.is_active.is_(True),
+            )
+            exposure_rows = _grouped_values(population_query, aircraft.serial_number, scope_type, scope_ids, "AIRCRAFT")
+        elif denominator_type == "DAYS":
+            constant_exposure = Decimal(str((period_end - period_start).days + 1))
+        else:
+            constant_exposure = Decimal("1")
+
+    counts: Dict[str, ScopeCounts] = {}
+    for scope_id in scope_ids:
+        values = event_rows.get(scope_id) or (0,) * len(aggregates)
+        position = 1
+        if denominator_event_types is not None:
+            exposure = Decimal(int(values[position] or 0))
+            position += 1
+        elif constant_exposure is not None:
+            exposure = constant_exposure
+        else:
+            exposure = decimal_value((exposure_rows.get(scope_id) or (0,))[0])
+        removals = nff = 0
+        if component_breakdown:
+            removals, nff = int(values[position] or 0), int(values[position + 1] or 0)
+        counts[scope_id] = ScopeCounts(
+            events=int(values[0] or 0),
+            exposure=exposure,
+            removals=removals,
+            no_fault_found=nff,
+        )
+    return counts
 
 
 def _metric_event_contract(
@@ -1787,6 +1964,15 @@ def _rate_with_confidence(
     return quantize(value), quantize(lower), quantize(upper)
 
 
+def _active_aircraft_count(db: Session, *, amo_id: str) -> int:
+    return (
+        db.query(func.count(fleet_models.Aircraft.serial_number))
+        .filter(fleet_models.Aircraft.amo_id == amo_id, fleet_models.Aircraft.is_active.is_(True))
+        .scalar()
+        or 0
+    )
+
+
 def _active_threshold(
     db: Session,
     *,
@@ -1844,6 +2030,8 @@ def execute_metric(
     scope_id: Optional[str],
     actor_user_id: Optional[str],
     scheduled: bool,
+    counts: Optional[ScopeCounts] = None,
+    active_aircraft: Optional[int] = None,
 ) -> domain.ReliabilityCalculationRun:
     resolved_scope_type = scope_type or metric.scope_type
     resolved_scope_id = scope_id or "FLEET"
@@ -1853,49 +2041,28 @@ def execute_metric(
         method=metric.method,
         configured_event_types=configured_event_types,
     )
-    query = _scope_event_query(
-        db,
-        amo_id=amo_id,
-        period_start=start,
-        period_end=end,
-        event_types=event_types,
-        scope_type=resolved_scope_type,
-        scope_id=resolved_scope_id,
-    )
-    events = query.count()
-    if denominator_event_types is None:
-        exposure = _exposure(
+    if counts is None:
+        counts = _scope_counts(
             db,
             amo_id=amo_id,
             period_start=start,
             period_end=end,
-            denominator_type=metric.denominator_type,
             scope_type=resolved_scope_type,
-            scope_id=resolved_scope_id,
-        )
-    else:
-        denominator_query = _scope_event_query(
-            db,
-            amo_id=amo_id,
-            period_start=start,
-            period_end=end,
-            event_types=denominator_event_types,
-            scope_type=resolved_scope_type,
-            scope_id=resolved_scope_id,
-        )
-        exposure = Decimal(denominator_query.count())
+            scope_ids=[resolved_scope_id],
+            event_types=event_types,
+            denominator_type=metric.denominator_type,
+            denominator_event_types=denominator_event_types,
+        )[resolved_scope_id]
+    events = counts.events
+    exposure = counts.exposure
     value, lower, upper = _rate_with_confidence(
         events=events,
         exposure=exposure,
         multiplier=decimal_value(metric.multiplier, Decimal("1")),
         method=metric.method,
     )
-    active_aircraft = (
-        db.query(func.count(fleet_models.Aircraft.serial_number))
-        .filter(fleet_models.Aircraft.amo_id == amo_id, fleet_models.Aircraft.is_active.is_(True))
-        .scalar()
-        or 0
-    )
+    if active_aircraft is None:
+        active_aircraft = _active_aircraft_count(db, amo_id=amo_id)
     threshold = _active_threshold(db, amo_id=amo_id, metric_id=metric.id, on_date=end)
     result_status, alert_severity = _evaluate_threshold(
         metric=metric,
@@ -2068,23 +2235,20 @@ def execute_metric_by_id(
     )
 
 
-def _metric_scopes(db: Session, *, amo_id: str, metric: domain.ReliabilityMetricDefinition) -> List[str]:
-    if metric.scope_type == "FLEET":
+def _scope_ids(db: Session, *, amo_id: str, scope_type: str) -> Optional[List[str]]:
+    """Every scope id for ``scope_type``, or ``None`` when the scope is unsupported."""
+    if scope_type == "FLEET":
         return ["FLEET"]
-    if metric.scope_type == "AIRCRAFT":
+    if scope_type == "AIRCRAFT":
         return [
             str(row[0])
             for row in db.query(fleet_models.Aircraft.serial_number)
             .filter(fleet_models.Aircraft.amo_id == amo_id, fleet_models.Aircraft.is_active.is_(True))
             .all()
         ]
-    column = {
-        "ATA": legacy.ReliabilityEvent.ata_chapter,
-        "COMPONENT": legacy.ReliabilityEvent.part_number,
-        "ENGINE": legacy.ReliabilityEvent.engine_position,
-    }.get(metric.scope_type)
+    column = SCOPE_EVENT_COLUMNS.get(scope_type)
     if column is None:
-        return ["FLEET"]
+        return None
     return [
         str(row[0])
         for row in db.query(column)
@@ -2094,6 +2258,11 @@ def _metric_scopes(db: Session, *, amo_id: str, metric: domain.ReliabilityMetric
     ]
 
 
+def _metric_scopes(db: Session, *, amo_id: str, metric: domain.ReliabilityMetricDefinition) -> List[str]:
+    scope_ids = _scope_ids(db, amo_id=amo_id, scope_type=metric.scope_type)
+    return ["FLEET"] if scope_ids is None else scope_ids
+
+
 def run_due_metrics(
     db: Session,
     *,
@@ -2109,19 +2278,43 @@ def run_due_metrics(
         query = query.filter(domain.ReliabilityMetricDefinition.amo_id == amo_id)
     metrics = query.limit(500).all()
     runs: List[domain.ReliabilityCalculationRun] = []
+    fleet_sizes: Dict[str, int] = {}
     for metric in metrics:
-        for scope_id in _metric_scopes(db, amo_id=metric.amo_id, metric=metric):
+        scope_ids = _metric_scopes(db, amo_id=metric.amo_id, metric=metric)
+        if not scope_ids:
+            continue
+        start, end = _period_bounds(metric, None, None)
+        event_types, denominator_event_types, _ = _metric_event_contract(
+            method=metric.method,
+            configured_event_types=[str(item) for item in (metric.numerator_event_types or [])],
+        )
+        counts = _scope_counts(
+            db,
+            amo_id=metric.amo_id,
+            period_start=start,
+            period_end=end,
+            scope_type=metric.scope_type,
+            scope_ids=scope_ids,
+            event_types=event_types,
+            denominator_type=metric.denominator_type,
+            denominator_event_types=denominator_event_types,
+        )
+        if metric.amo_id not in fleet_sizes:
+            fleet_sizes[metric.amo_id] = _active_aircraft_count(db, amo_id=metric.amo_id)
+        for scope_id in scope_ids:
             runs.append(
                 execute_metric(
                     db,
                     amo_id=metric.amo_id,
                     metric=metric,
-                    period_start=None,
-                    period_end=None,
+                    period_start=start,
+                    period_end=end,
                     scope_type=metric.scope_type,
                     scope_id=scope_id,
                     actor_user_id=actor_user_id,
                     scheduled=True,
+                    counts=counts[scope_id],
+                    active_aircraft=fleet_sizes[metric.amo_id],
                 )
             )
     return runs
@@ -2156,59 +2349,30 @@ def analytics(
 ) -> schemas.AnalyticsResponse:
     scope_type = scope_type.upper()
     event_types = [_normalise_event_type(item) or item.upper() for item in (event_types or [])]
-    if scope_type == "FLEET":
-        scope_ids = ["FLEET"]
-    elif scope_type == "AIRCRAFT":
-        scope_ids = [
-            str(row[0])
-            for row in db.query(fleet_models.Aircraft.serial_number)
-            .filter(fleet_models.Aircraft.amo_id == amo_id, fleet_models.Aircraft.is_active.is_(True))
-            .all()
-        ]
-    else:
-        column = {
-            "ATA": legacy.ReliabilityEvent.ata_chapter,
-            "COMPONENT": legacy.ReliabilityEvent.part_number,
-            "ENGINE": legacy.ReliabilityEvent.engine_position,
-        }.get(scope_type)
-        if column is None:
-            raise HTTPException(status_code=422, detail="Unsupported analytics scope.")
-        scope_ids = [
-            str(row[0])
-            for row in db.query(column)
-            .filter(legacy.ReliabilityEvent.amo_id == amo_id, column.isnot(None))
-            .distinct()
-            .all()
-        ]
+    scope_ids = _scope_ids(db, amo_id=amo_id, scope_type=scope_type)
+    if scope_ids is None:
+        raise HTTPException(status_code=422, detail="Unsupported analytics scope.")
+    counts = _scope_counts(
+        db,
+        amo_id=amo_id,
+        period_start=period_start,
+        period_end=period_end,
+        scope_type=scope_type,
+        scope_ids=scope_ids,
+        event_types=event_types,
+        denominator_type=denominator_type,
+        component_breakdown=scope_type == "COMPONENT",
+    )
+    fleet_size = _active_aircraft_count(db, amo_id=amo_id)
     rows: List[schemas.AnalyticsRow] = []
-    fleet_size = db.query(func.count(fleet_models.Aircraft.serial_number)).filter(
-        fleet_models.Aircraft.amo_id == amo_id, fleet_models.Aircraft.is_active.is_(True)
-    ).scalar() or 0
-    for scope_id in scope_ids:
-        query = _scope_event_query(
-            db,
-            amo_id=amo_id,
-            period_start=period_start,
-            period_end=period_end,
-            event_types=event_types,
-            scope_type=scope_type,
-            scope_id=scope_id,
-        )
-        events = query.count()
-        exposure = _exposure(
-            db,
-            amo_id=amo_id,
-            period_start=period_start,
-            period_end=period_end,
-            denominator_type=denominator_type,
-            scope_type=scope_type,
-            scope_id=scope_id,
-        )
+    for scope_id, scope_counts in counts.items():
+        events = scope_counts.events
+        exposure = scope_counts.exposure
         value, lower, upper = _rate_with_confidence(events=events, exposure=exposure, multiplier=multiplier, method="RATE")
         details: Dict[str, Any] = {}
         if scope_type == "COMPONENT":
-            removals = query.filter(legacy.ReliabilityEvent.event_type == legacy.ReliabilityEventTypeEnum.UNSCHEDULED_REMOVAL).count()
-            nff = query.filter(legacy.ReliabilityEvent.event_type == legacy.ReliabilityEventTypeEnum.NO_FAULT_FOUND).count()
+            removals = scope_counts.removals
+            nff = scope_counts.no_fault_found
             mtbur = exposure / Decimal(removals) if removals and exposure else None
             details = {
                 "unscheduled_removals": removals,
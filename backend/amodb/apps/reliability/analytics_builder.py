@@ -12,7 +12,6 @@ from .analytics_common import (
     _bucket_for_window,
     _comparison_period,
     _end,
-    _load_events,
     _load_utilisation,
     _resolve_aircraft_selection,
     _start,
@@ -23,6 +22,7 @@ from .analytics_component_extended import _oil_consumption_points, _removal_age_
 from .analytics_deferrals import _deferral_charts
 from .analytics_event_charts import _aircraft_performance, _ata_pareto, _event_mix, _route_delay, _station_delay, _time_series
 from .analytics_formulae import build_formula_catalog
+from .analytics_frame import _load_event_frame
 from .analytics_fracas import _fracas_action_charts, _fracas_charts
 from .analytics_health import _data_quality_points, _engine_metric_options, _engine_status_points, _filter_options, _source_health_points
 from .analytics_metrics import _summary_metrics
@@ -61,7 +61,7 @@ def build_dashboard(
     selected_severities = set(severities)
     selected_sources = set(source_systems)
 
-    current_events = _load_events(
+    current_events = _load_event_frame(
         db,
         amo_id=amo_id,
         period_start=period_start,
@@ -73,7 +73,7 @@ def build_dashboard(
         severities=selected_severities,
         source_systems=selected_sources,
     )
-    previous_events = _load_events(
+    previous_events = _load_event_frame(
         db,
         amo_id=amo_id,
         period_start=comparison_start,
@@ -238,9 +238,9 @@ def build_dashboard(
             "Engine metric discovery reached the 20,000-snapshot scan cap. "
             "Narrow the date or aircraft filters for complete metric options."
         )
-    if any(row.aircraft_serial_number is None for row in current_events):
+    if None in current_events.aircraft.labels:
         warnings.append("Some events are not allocated to an aircraft and appear under Fleet/Unallocated.")
-    if any(not row.ata_chapter for row in current_events):
+    if any(not value for value in current_events.ata.labels):
         warnings.append("Some events do not have an ATA chapter and appear under Unallocated ATA.")
 
     return DashboardResponse(
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from collections import Counter
 from datetime import date, datetime, time, timedelta, timezone
-from typing import Any, Iterable, Literal
+from typing import TYPE_CHECKING, Any, Iterable, Literal
 from urllib.parse import urlencode
 
 from fastapi import HTTPException, status
@@ -13,6 +14,9 @@ from amodb.apps.fleet import models as fleet_models
 
 from . import models
 
+if TYPE_CHECKING:
+    from .analytics_frame import EventFrame
+
 UTC = timezone.utc
 MAX_EVENT_SCAN = 50_000
 DISPATCH_EVENT_TYPES = {
@@ -190,7 +194,7 @@ def _event_matches(
     return True
 
 
-def _load_events(
+def _event_query(
     db: Session,
     *,
     amo_id: str,
@@ -202,7 +206,7 @@ def _load_events(
     event_types: set[str],
     severities: set[str],
     source_systems: set[str],
-) -> list[models.ReliabilityEvent]:
+):
     query = db.query(models.ReliabilityEvent).filter(
         models.ReliabilityEvent.amo_id == amo_id,
         models.ReliabilityEvent.occurred_at >= _start(period_start),
@@ -225,6 +229,34 @@ def _load_events(
                 models.ReliabilityEvent.destination_station.in_(sorted(stations)),
             )
         )
+    return query
+
+
+def _load_events(
+    db: Session,
+    *,
+    amo_id: str,
+    period_start: date,
+    period_end: date,
+    aircraft: set[str],
+    ata_chapters: set[str],
+    stations: set[str],
+    event_types: set[str],
+    severities: set[str],
+    source_systems: set[str],
+) -> list[models.ReliabilityEvent]:
+    query = _event_query(
+        db,
+        amo_id=amo_id,
+        period_start=period_start,
+        period_end=period_end,
+        aircraft=aircraft,
+        ata_chapters=ata_chapters,
+        stations=stations,
+        event_types=event_types,
+        severities=severities,
+        source_systems=source_systems,
+    )
     rows = query.order_by(models.ReliabilityEvent.occurred_at.asc()).limit(MAX_EVENT_SCAN + 1).all()
     if len(rows) > MAX_EVENT_SCAN:
         raise HTTPException(
@@ -252,23 +284,22 @@ def _load_utilisation(
     return query.order_by(models.AircraftUtilizationDaily.date.asc()).all()
 
 
-def _event_totals(events: Iterable[models.ReliabilityEvent]) -> dict[str, float]:
-    rows = list(events)
-    event_types = [_enum_value(row.event_type) for row in rows]
-    total_delay = sum(max(int(row.delay_minutes or 0), 0) for row in rows)
-    dispatch = sum(event_type in DISPATCH_EVENT_TYPES for event_type in event_types)
-    shop = sum(event_type in SHOP_EVENT_TYPES for event_type in event_types)
-    nff = sum(event_type == "NO_FAULT_FOUND" for event_type in event_types)
+def _event_totals(events: EventFrame) -> dict[str, float]:
+    type_counts: Counter[str] = Counter()
+    for (type_code,), count in events.type_counts().items():
+        type_counts[events.event_type.labels[type_code]] += count
+    dispatch = sum(count for event_type, count in type_counts.items() if event_type in DISPATCH_EVENT_TYPES)
+    shop = sum(count for event_type, count in type_counts.items() if event_type in SHOP_EVENT_TYPES)
     return {
-        "events": float(len(rows)),
+        "events": float(len(events)),
         "dispatch_events": float(dispatch),
-        "delays": float(sum(event_type in DELAY_EVENT_TYPES for event_type in event_types)),
-        "cancellations": float(sum(event_type in CANCELLATION_EVENT_TYPES for event_type in event_types)),
-        "repeat_defects": float(sum(event_type in REPEAT_EVENT_TYPES for event_type in event_types)),
-        "unscheduled_removals": float(sum(event_type in UNSCHEDULED_REMOVAL_TYPES for event_type in event_types)),
-        "delay_minutes": float(total_delay),
+        "delays": float(sum(type_counts[event_type] for event_type in DELAY_EVENT_TYPES)),
+        "cancellations": float(sum(type_counts[event_type] for event_type in CANCELLATION_EVENT_TYPES)),
+        "repeat_defects": float(sum(type_counts[event_type] for event_type in REPEAT_EVENT_TYPES)),
+        "unscheduled_removals": float(sum(type_counts[event_type] for event_type in UNSCHEDULED_REMOVAL_TYPES)),
+        "delay_minutes": float(sum(events.delay_minutes)),
         "shop_events": float(shop),
-        "nff": float(nff),
+        "nff": float(type_counts["NO_FAULT_FOUND"]),
     }
 
 
@@ -3,31 +3,36 @@ from __future__ import annotations
 from collections import Counter, defaultdict
 from datetime import datetime
 
-from . import advanced_models, models, operational_sources
+from . import advanced_models, operational_sources
 from .analytics_common import (
     CLOSED_ACTION_STATES, DELAY_EVENT_TYPES, DISPATCH_EVENT_TYPES, REPEAT_EVENT_TYPES,
     SHOP_EVENT_TYPES, UNSCHEDULED_REMOVAL_TYPES, OPEN_DEFERRAL_STATES, UTC,
-    _bucket_key, _delta, _enum_value, _metric_status, _ratio,
+    _bucket_key, _delta, _metric_status, _ratio,
     _safe_float, _event_totals, _utilisation_totals,
 )
+from .analytics_frame import EventFrame, _group_label
 from .analytics_types import ChartPoint, DashboardMetric
 
 def _component_reliability(
-    events: list[models.ReliabilityEvent],
+    events: EventFrame,
     total_flight_hours: float,
     total_flight_cycles: float,
 ) -> list[ChartPoint]:
     grouped: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
-    for event in events:
-        event_type = _enum_value(event.event_type)
+    part_labels = events.part_number.labels
+    type_labels = events.event_type.labels
+    confirmed = events.type_flags(events.confirmed_failure, events.part_number)
+    for group, count in events.type_counts(events.part_number).items():
+        part_code, type_code = group
+        event_type = type_labels[type_code]
         if event_type not in SHOP_EVENT_TYPES | {"UNSCHEDULED_REMOVAL", "SCHEDULED_REMOVAL"}:
             continue
-        key = event.part_number or "UNALLOCATED"
-        grouped[key]["shop_findings"] += int(event_type == "SHOP_FINDING")
-        grouped[key]["nff"] += int(event_type == "NO_FAULT_FOUND")
-        grouped[key]["unscheduled_removals"] += int(event_type == "UNSCHEDULED_REMOVAL")
-        grouped[key]["scheduled_removals"] += int(event_type == "SCHEDULED_REMOVAL")
-        grouped[key]["confirmed_failures"] += int(event.confirmed_failure is True)
+        key = _group_label(part_labels, part_code, "UNALLOCATED")
+        grouped[key]["shop_findings"] += count * int(event_type == "SHOP_FINDING")
+        grouped[key]["nff"] += count * int(event_type == "NO_FAULT_FOUND")
+        grouped[key]["unscheduled_removals"] += count * int(event_type == "UNSCHEDULED_REMOVAL")
+        grouped[key]["scheduled_removals"] += count * int(event_type == "SCHEDULED_REMOVAL")
+        grouped[key]["confirmed_failures"] += confirmed.get(group, 0)
     result: list[ChartPoint] = []
     for part_number, values in grouped.items():
         shop_total = values["shop_findings"] + values["nff"]
@@ -8,44 +8,48 @@ from . import advanced_models, models, operational_sources
 from .analytics_common import (
     CANCELLATION_EVENT_TYPES, CLOSED_ACTION_STATES, DELAY_EVENT_TYPES, DISPATCH_EVENT_TYPES, REPEAT_EVENT_TYPES,
     SHOP_EVENT_TYPES, UNSCHEDULED_REMOVAL_TYPES, OPEN_DEFERRAL_STATES, UTC,
-    _bucket_key, _delta, _enum_value, _metric_status, _normalise_date, _ratio,
+    _bucket_key, _delta, _metric_status, _ratio,
     _safe_float, _event_totals, _utilisation_totals,
 )
+from .analytics_frame import EventFrame, _group_label
 from .analytics_types import ChartPoint, DashboardMetric
 
 def _time_series(
-    events: list[models.ReliabilityEvent],
+    events: EventFrame,
     utilisation: list[models.AircraftUtilizationDaily],
     bucket: str,
 ) -> list[ChartPoint]:
     event_buckets: dict[str, dict[str, Any]] = {}
     labels: dict[str, str] = {}
-    for event in events:
-        occurred = _normalise_date(event.occurred_at)
-        if not occurred:
+    bucket_keys = {ordinal: _bucket_key(occurred, bucket) for ordinal, occurred in events.dates().items()}
+    type_labels = events.event_type.labels
+    for (ordinal, type_code), count in events.type_counts(events.occurred_on).items():
+        if not ordinal:
             continue
-        key, label = _bucket_key(occurred, bucket)
+        key, label = bucket_keys[ordinal]
         labels[key] = label
         row = event_buckets.setdefault(key, defaultdict(float))
-        event_type = _enum_value(event.event_type)
-        row["events"] += 1
-        row["delay_minutes"] += max(int(event.delay_minutes or 0), 0)
+        event_type = type_labels[type_code]
+        row["events"] += count
         if event_type in DISPATCH_EVENT_TYPES:
-            row["dispatch_events"] += 1
+            row["dispatch_events"] += count
         if event_type in DELAY_EVENT_TYPES:
-            row["delays"] += 1
+            row["delays"] += count
         if event_type in CANCELLATION_EVENT_TYPES:
-            row["cancellations"] += 1
+            row["cancellations"] += count
         if event_type in REPEAT_EVENT_TYPES:
-            row["repeat_defects"] += 1
+            row["repeat_defects"] += count
         if event_type in UNSCHEDULED_REMOVAL_TYPES:
-            row["unscheduled_removals"] += 1
+            row["unscheduled_removals"] += count
         if event_type == "SCHEDULED_REMOVAL":
-            row["scheduled_removals"] += 1
+            row["scheduled_removals"] += count
         if event_type == "SHOP_FINDING":
-            row["shop_findings"] += 1
+            row["shop_findings"] += count
         if event_type == "NO_FAULT_FOUND":
-            row["nff"] += 1
+            row["nff"] += count
+    for (ordinal, _type_code), minutes in events.type_delays(events.occurred_on).items():
+        if ordinal:
+            event_buckets[bucket_keys[ordinal][0]]["delay_minutes"] += minutes
 
     exposure_buckets: dict[str, dict[str, float]] = {}
     for row in utilisation:
@@ -88,11 +92,12 @@ def _time_series(
         )
     return points
 
-def _event_mix(events: list[models.ReliabilityEvent]) -> list[ChartPoint]:
-    counts = Counter(_enum_value(event.event_type) for event in events)
+def _event_mix(events: EventFrame) -> list[ChartPoint]:
+    type_labels = events.event_type.labels
+    counts = Counter({type_labels[type_code]: count for (type_code,), count in events.type_counts().items()})
     delays: dict[str, int] = defaultdict(int)
-    for event in events:
-        delays[_enum_value(event.event_type)] += max(int(event.delay_minutes or 0), 0)
+    for (type_code,), minutes in events.type_delays().items():
+        delays[type_labels[type_code]] += minutes
     return [
         ChartPoint(
             key=event_type,
@@ -103,14 +108,18 @@ def _event_mix(events: list[models.ReliabilityEvent]) -> list[ChartPoint]:
         for event_type, count in counts.most_common()
     ]
 
-def _ata_pareto(events: list[models.ReliabilityEvent]) -> list[ChartPoint]:
-    counts = Counter((event.ata_chapter or "UNALLOCATED") for event in events)
+def _ata_pareto(events: EventFrame) -> list[ChartPoint]:
+    ata_labels = events.ata.labels
+    type_labels = events.event_type.labels
+    counts: Counter[str] = Counter()
     delay_minutes: dict[str, int] = defaultdict(int)
     repeat_defects: dict[str, int] = defaultdict(int)
-    for event in events:
-        key = event.ata_chapter or "UNALLOCATED"
-        delay_minutes[key] += max(int(event.delay_minutes or 0), 0)
-        repeat_defects[key] += int(_enum_value(event.event_type) == "REPEAT_DEFECT")
+    for (ata_code, type_code), count in events.type_counts(events.ata).items():
+        key = _group_label(ata_labels, ata_code, "UNALLOCATED")
+        counts[key] += count
+        repeat_defects[key] += count if type_labels[type_code] == "REPEAT_DEFECT" else 0
+    for (ata_code, _type_code), minutes in events.type_delays(events.ata).items():
+        delay_minutes[_group_label(ata_labels, ata_code, "UNALLOCATED")] += minutes
     total = sum(counts.values()) or 1
     cumulative = 0
     result: list[ChartPoint] = []
@@ -132,18 +141,21 @@ def _ata_pareto(events: list[models.ReliabilityEvent]) -> list[ChartPoint]:
     return result
 
 def _aircraft_performance(
-    events: list[models.ReliabilityEvent],
+    events: EventFrame,
     utilisation: list[models.AircraftUtilizationDaily],
 ) -> list[ChartPoint]:
     grouped: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
-    for event in events:
-        key = event.aircraft_serial_number or "FLEET/UNALLOCATED"
-        event_type = _enum_value(event.event_type)
-        grouped[key]["events"] += 1
-        grouped[key]["delay_minutes"] += max(int(event.delay_minutes or 0), 0)
-        grouped[key]["dispatch_events"] += int(event_type in DISPATCH_EVENT_TYPES)
-        grouped[key]["repeat_defects"] += int(event_type == "REPEAT_DEFECT")
-        grouped[key]["unscheduled_removals"] += int(event_type == "UNSCHEDULED_REMOVAL")
+    aircraft_labels = events.aircraft.labels
+    type_labels = events.event_type.labels
+    for (aircraft_code, type_code), count in events.type_counts(events.aircraft).items():
+        key = _group_label(aircraft_labels, aircraft_code, "FLEET/UNALLOCATED")
+        event_type = type_labels[type_code]
+        grouped[key]["events"] += count
+        grouped[key]["dispatch_events"] += count * int(event_type in DISPATCH_EVENT_TYPES)
+        grouped[key]["repeat_defects"] += count * int(event_type == "REPEAT_DEFECT")
+        grouped[key]["unscheduled_removals"] += count * int(event_type == "UNSCHEDULED_REMOVAL")
+    for (aircraft_code, _type_code), minutes in events.type_delays(events.aircraft).items():
+        grouped[_group_label(aircraft_labels, aircraft_code, "FLEET/UNALLOCATED")]["delay_minutes"] += minutes
     for row in utilisation:
         grouped[row.aircraft_serial_number]["flight_hours"] += _safe_float(row.flight_hours)
         grouped[row.aircraft_serial_number]["flight_cycles"] += _safe_float(row.cycles)
@@ -172,15 +184,19 @@ def _aircraft_performance(
         )
     return sorted(result, key=lambda item: (item.metrics.get("event_rate_per_100_fh") or 0, item.metrics.get("events") or 0), reverse=True)
 
-def _station_delay(events: list[models.ReliabilityEvent]) -> list[ChartPoint]:
+def _station_delay(events: EventFrame) -> list[ChartPoint]:
     grouped: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
-    for event in events:
-        if _enum_value(event.event_type) not in DISPATCH_EVENT_TYPES:
+    station_labels = events.origin.labels
+    type_labels = events.event_type.labels
+    delays = events.type_delays(events.origin)
+    for (station_code, type_code), count in events.type_counts(events.origin).items():
+        event_type = type_labels[type_code]
+        if event_type not in DISPATCH_EVENT_TYPES:
             continue
-        station = event.origin_station or "UNALLOCATED"
-        grouped[station]["events"] += 1
-        grouped[station]["delay_minutes"] += max(int(event.delay_minutes or 0), 0)
-        grouped[station]["cancellations"] += int(_enum_value(event.event_type) == "TECHNICAL_CANCELLATION")
+        station = _group_label(station_labels, station_code, "UNALLOCATED")
+        grouped[station]["events"] += count
+        grouped[station]["delay_minutes"] += delays.get((station_code, type_code), 0)
+        grouped[station]["cancellations"] += count * int(event_type == "TECHNICAL_CANCELLATION")
     result = []
     for station, values in grouped.items():
         result.append(
@@ -198,18 +214,23 @@ def _station_delay(events: list[models.ReliabilityEvent]) -> list[ChartPoint]:
         )
     return sorted(result, key=lambda item: item.metrics.get("delay_minutes") or 0, reverse=True)[:20]
 
-def _route_delay(events: list[models.ReliabilityEvent]) -> list[ChartPoint]:
+def _route_delay(events: EventFrame) -> list[ChartPoint]:
     grouped: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
-    for event in events:
-        event_type = _enum_value(event.event_type)
+    origin_labels = events.origin.labels
+    destination_labels = events.destination.labels
+    type_labels = events.event_type.labels
+    delays = events.type_delays(events.origin, events.destination)
+    for group, count in events.type_counts(events.origin, events.destination).items():
+        origin_code, destination_code, type_code = group
+        event_type = type_labels[type_code]
         if event_type not in DISPATCH_EVENT_TYPES:
             continue
-        origin = event.origin_station or "UNALLOCATED"
-        destination = event.destination_station or "UNALLOCATED"
+        origin = _group_label(origin_labels, origin_code, "UNALLOCATED")
+        destination = _group_label(destination_labels, destination_code, "UNALLOCATED")
         key = f"{origin}|{destination}"
-        grouped[key]["events"] += 1
-        grouped[key]["delay_minutes"] += max(int(event.delay_minutes or 0), 0)
-        grouped[key]["cancellations"] += int(event_type == "TECHNICAL_CANCELLATION")
+        grouped[key]["events"] += count
+        grouped[key]["delay_minutes"] += delays.get(group, 0)
+        grouped[key]["cancellations"] += count * int(event_type == "TECHNICAL_CANCELLATION")
     points = []
     for key, values in grouped.items():
         origin, destination = key.split("|", 1)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from array import array
+from collections import Counter, defaultdict
+from datetime import date
+from itertools import compress
+from typing import Any, Iterable, Iterator
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from . import models
+from .analytics_common import _enum_value, _event_query, _normalise_date
+
+MAX_FRAME_EVENTS = 1_000_000
+FRAME_FETCH_SIZE = 20_000
+
+
+class Categorical:
+    """Dictionary-encoded column: one ``uint32`` code per row plus the distinct labels."""
+
+    __slots__ = ("codes", "labels", "_lookup")
+
+    def __init__(self) -> None:
+        self.codes = array("I")
+        self.labels: list[Any] = []
+        self._lookup: dict[Any, int] = {}
+
+    def append(self, value: Any) -> None:
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.labels)
+            self.labels.append(value)
+        self.codes.append(code)
+
+
+class EventFrame:
+    """Columnar projection of the reliability events a dashboard needs.
+
+    Rows keep query order (``occurred_at`` ascending) so first-seen ordering,
+    and therefore chart tie-breaks, match iteration over ORM rows. Grouping is
+    done with ``Counter(zip(...))`` over code columns, which runs in C and
+    leaves only the small per-group results to Python.
+    """
+
+    __slots__ = (
+        "occurred_on", "event_type", "aircraft", "ata", "origin", "destination",
+        "part_number", "severity", "source_system", "delay_minutes", "confirmed_failure",
+    )
+
+    def __init__(self) -> None:
+        self.occurred_on = array("i")
+        self.event_type = Categorical()
+        self.aircraft = Categorical()
+        self.ata = Categorical()
+        self.origin = Categorical()
+        self.destination = Categorical()
+        self.part_number = Categorical()
+        self.severity = Categorical()
+        self.source_system = Categorical()
+        self.delay_minutes = array("i")
+        self.confirmed_failure = array("b")
+
+    def __len__(self) -> int:
+        return len(self.occurred_on)
+
+    def append(
+        self,
+        occurred_at: Any,
+        event_type: Any,
+        aircraft_serial_number: str | None,
+        ata_chapter: str | None,
+        origin_station: str | None,
+        destination_station: str | None,
+        part_number: str | None,
+        severity: Any,
+        source_system: str | None,
+        delay_minutes: int | None,
+        confirmed_failure: bool | None,
+    ) -> None:
+        occurred = _normalise_date(occurred_at)
+        self.occurred_on.append(occurred.toordinal() if occurred else 0)
+        self.event_type.append(_enum_value(event_type))
+        self.aircraft.append(aircraft_serial_number)
+        self.ata.append(ata_chapter)
+        self.origin.append(origin_station)
+        self.destination.append(destination_station)
+        self.part_number.append(part_number)
+        self.severity.append(_enum_value(severity) or None)
+        self.source_system.append(source_system)
+        self.delay_minutes.append(max(int(delay_minutes or 0), 0))
+        self.confirmed_failure.append(1 if confirmed_failure is True else 0)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any]) -> "EventFrame":
+        frame = cls()
+        for row in rows:
+            frame.append(*(getattr(row, name) for name in EVENT_FRAME_FIELDS))
+        return frame
+
+    def _keys(self, columns: tuple[Categorical | array, ...]) -> Iterator[tuple[int, ...]]:
+        return zip(*(getattr(column, "codes", column) for column in columns), self.event_type.codes)
+
+    def type_counts(self, *columns: Categorical | array) -> Counter[tuple[int, ...]]:
+        """Row counts keyed by ``(column codes..., event type code)``."""
+        return Counter(self._keys(columns))
+
+    def type_delays(self, *columns: Categorical | array) -> dict[tuple[int, ...], int]:
+        """Delay-minute totals keyed like :meth:`type_counts`; only delayed rows are visited."""
+        totals: dict[tuple[int, ...], int] = defaultdict(int)
+        delayed = zip(compress(self._keys(columns), self.delay_minutes), compress(self.delay_minutes, self.delay_minutes))
+        for key, minutes in delayed:
+            totals[key] += minutes
+        return totals
+
+    def type_flags(self, flags: array, *columns: Categorical | array) -> Counter[tuple[int, ...]]:
+        """Counts of rows with a set ``flags`` entry, keyed like :meth:`type_counts`."""
+        return Counter(compress(self._keys(columns), flags))
+
+    def dates(self) -> dict[int, date]:
+        return {ordinal: date.fromordinal(ordinal) for ordinal in set(self.occurred_on) if ordinal}
+
+
+EVENT_FRAME_FIELDS = (
+    "occurred_at", "event_type", "aircraft_serial_number", "ata_chapter", "origin_station",
+    "destination_station", "part_number", "severity", "source_system", "delay_minutes", "confirmed_failure",
+)
+
+
+def _group_label(labels: list[Any], code: int, default: str) -> str:
+    return labels[code] or default
+
+
+def _load_event_frame(
+    db: Session,
+    *,
+    amo_id: str,
+    period_start: date,
+    period_end: date,
+    aircraft: set[str],
+    ata_chapters: set[str],
+    stations: set[str],
+    event_types: set[str],
+    severities: set[str],
+    source_systems: set[str],
+) -> EventFrame:
+    query = _event_query(
+        db,
+        amo_id=amo_id,
+        period_start=period_start,
+        period_end=period_end,
+        aircraft=aircraft,
+        ata_chapters=ata_chapters,
+        stations=stations,
+        event_types=event_types,
+        severities=severities,
+        source_systems=source_systems,
+    )
+    columns = [getattr(models.ReliabilityEvent, name) for name in EVENT_FRAME_FIELDS]
+    rows = (
+        query.with_entities(*columns)
+        .order_by(models.ReliabilityEvent.occurred_at.asc())
+        .limit(MAX_FRAME_EVENTS + 1)
+        .yield_per(FRAME_FETCH_SIZE)
+    )
+    frame = EventFrame()
+    append = frame.append
+    for row in rows:
+        append(*row)
+    if len(frame) > MAX_FRAME_EVENTS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"The selected window contains more than {MAX_FRAME_EVENTS:,} reliability events. Narrow the period or filters.",
+        )
+    return frame
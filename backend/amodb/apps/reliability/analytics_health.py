@@ -11,6 +11,7 @@ from amodb.apps.fleet import models as fleet_models
 
 from . import advanced_models, models, operational_sources
 from .analytics_common import CLOSED_ACTION_STATES, OPEN_DEFERRAL_STATES, UTC, _aircraft_type_label, _bucket_key, _enum_value, _ratio, _safe_float
+from .analytics_frame import EventFrame
 from .analytics_types import ChartPoint, DashboardFilterOptions
 
 def _engine_status_points(rows: list[models.EngineTrendStatus]) -> list[ChartPoint]:
@@ -87,19 +88,19 @@ def _engine_metric_options(snapshots: list[models.EngineFlightSnapshot]) -> list
 
 def _filter_options(
     *,
-    events: list[models.ReliabilityEvent],
+    events: EventFrame,
     aircraft_rows: list[fleet_models.Aircraft],
     engine_statuses: list[models.EngineTrendStatus],
     engine_metrics: list[str],
 ) -> DashboardFilterOptions:
     return DashboardFilterOptions(
-        aircraft=sorted({row.serial_number for row in aircraft_rows if row.serial_number} | {row.aircraft_serial_number for row in events if row.aircraft_serial_number} | {row.aircraft_serial_number for row in engine_statuses if row.aircraft_serial_number}),
+        aircraft=sorted({row.serial_number for row in aircraft_rows if row.serial_number} | {value for value in events.aircraft.labels if value} | {row.aircraft_serial_number for row in engine_statuses if row.aircraft_serial_number}),
         aircraft_types=sorted({_aircraft_type_label(row) for row in aircraft_rows}),
-        ata_chapters=sorted({row.ata_chapter for row in events if row.ata_chapter}),
-        stations=sorted({value for row in events for value in (row.origin_station, row.destination_station) if value}),
-        event_types=sorted({_enum_value(row.event_type) for row in events}),
-        severities=sorted({_enum_value(row.severity) for row in events if row.severity}),
-        source_systems=sorted({row.source_system for row in events if row.source_system}),
+        ata_chapters=sorted({value for value in events.ata.labels if value}),
+        stations=sorted({value for value in (*events.origin.labels, *events.destination.labels) if value}),
+        event_types=sorted(set(events.event_type.labels)),
+        severities=sorted({value for value in events.severity.labels if value}),
+        source_systems=sorted({value for value in events.source_system.labels if value}),
         engine_positions=sorted({row.engine_position for row in engine_statuses if row.engine_position}),
         engine_metrics=engine_metrics,
     )
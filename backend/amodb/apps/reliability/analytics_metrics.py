@@ -9,6 +9,7 @@ from .analytics_common import (
     _delta, _enum_value, _metric_status, _ratio,
     _event_totals, _utilisation_totals,
 )
+from .analytics_frame import EventFrame
 from .analytics_types import DashboardMetric
 
 
@@ -28,8 +29,8 @@ FORMULA_CODES = {
 
 def _summary_metrics(
     *,
-    current_events: list[models.ReliabilityEvent],
-    previous_events: list[models.ReliabilityEvent],
+    current_events: EventFrame,
+    previous_events: EventFrame,
     current_utilisation: list[models.AircraftUtilizationDaily],
     previous_utilisation: list[models.AircraftUtilizationDaily],
     deferrals: list[operational_sources.ReliabilityMelCdlDeferral],
@@ -450,7 +450,7 @@ class ReliabilityEvent(Base):
     part_number = Column(String(80), nullable=True, index=True)
     component_serial_number = Column(String(80), nullable=True, index=True)
     confirmed_failure = Column(Boolean, nullable=True)
-    repeat_key = Column(String(255), nullable=True, index=True)
+    repeat_key = Column(String(255), nullable=True)
 
     description = Column(Text, nullable=True)
     occurred_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, index=True)
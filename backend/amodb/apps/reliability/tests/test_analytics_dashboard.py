@@ -4,9 +4,11 @@ from types import SimpleNamespace
 from fastapi import APIRouter
 
 from amodb.apps.reliability import analytics_common
+from amodb.apps.reliability import analytics_component_charts
 from amodb.apps.reliability import analytics_dashboard
 from amodb.apps.reliability import analytics_deferrals
 from amodb.apps.reliability import analytics_event_charts
+from amodb.apps.reliability.analytics_frame import EventFrame
 
 
 UTC = timezone.utc
@@ -79,12 +81,12 @@ def test_ratio_withholds_value_without_exposure():
 
 
 def test_event_totals_preserve_operational_consequences():
-    totals = analytics_common._event_totals([
+    totals = analytics_common._event_totals(EventFrame.from_rows([
         event(),
         event(id=2, event_type="TECHNICAL_CANCELLATION", delay_minutes=None),
         event(id=3, event_type="REPEAT_DEFECT", delay_minutes=None),
         event(id=4, event_type="NO_FAULT_FOUND", delay_minutes=None),
-    ])
+    ]))
     assert totals["events"] == 4
     assert totals["dispatch_events"] == 2
     assert totals["delays"] == 1
@@ -95,7 +97,7 @@ def test_event_totals_preserve_operational_consequences():
 
 
 def test_time_series_calculates_rates_from_matching_exposure():
-    points = analytics_event_charts._time_series([event()], [utilisation()], "DAY")
+    points = analytics_event_charts._time_series(EventFrame.from_rows([event()]), [utilisation()], "DAY")
     assert len(points) == 1
     point = points[0]
     assert point.metrics["events"] == 1
@@ -105,6 +107,35 @@ def test_time_series_calculates_rates_from_matching_exposure():
     assert point.drilldown["dimension"] == "period"
 
 
+def test_frame_groupings_match_per_event_semantics():
+    frame = EventFrame.from_rows([
+        event(),
+        event(id=2, ata_chapter=None, origin_station=None, delay_minutes=45),
+        event(id=3, event_type="TECHNICAL_CANCELLATION", ata_chapter="", aircraft_serial_number=None, delay_minutes=-5),
+        event(id=4, event_type="UNSCHEDULED_REMOVAL", part_number="PN-1", confirmed_failure=True, origin_station="MBA"),
+        event(id=5, event_type="NO_FAULT_FOUND", part_number="PN-1", delay_minutes=None, severity=None),
+    ])
+
+    pareto = {point.key: point.metrics for point in analytics_event_charts._ata_pareto(frame)}
+    assert pareto["21"]["count"] == 3
+    assert pareto["UNALLOCATED"] == {"count": 2, "delay_minutes": 45, "repeat_defects": 0, "cumulative_pct": 100.0}
+    stations = {point.key: point.metrics for point in analytics_event_charts._station_delay(frame)}
+    assert stations["NBO"] == {"events": 2, "delay_minutes": 30, "average_delay_minutes": 15.0, "cancellations": 1}
+    assert stations["UNALLOCATED"]["delay_minutes"] == 45
+    assert "MBA" not in stations
+    routes = [point.key for point in analytics_event_charts._route_delay(frame)]
+    assert routes == ["UNALLOCATED|MBA", "NBO|MBA"]
+    aircraft = {point.key: point.metrics for point in analytics_event_charts._aircraft_performance(frame, [utilisation()])}
+    assert aircraft["AC-001"]["events"] == 4
+    assert aircraft["AC-001"]["delay_minutes"] == 105
+    assert aircraft["FLEET/UNALLOCATED"]["events"] == 1
+    components = analytics_component_charts._component_reliability(frame, 100, 50)
+    assert [(point.key, point.metrics["unscheduled_removals"], point.metrics["nff"], point.metrics["confirmed_failures"]) for point in components] == [("PN-1", 1, 1, 1)]
+    mix = [(point.key, point.metrics["count"]) for point in analytics_event_charts._event_mix(frame)]
+    assert mix == [("TECHNICAL_DELAY", 2), ("TECHNICAL_CANCELLATION", 1), ("UNSCHEDULED_REMOVAL", 1), ("NO_FAULT_FOUND", 1)]
+    assert frame.severity.labels == ["MEDIUM", None]
+
+
 def test_open_deferral_is_counted_and_expiry_is_bucketed():
     status, expiry, categories, extensions, repeats, closure = analytics_deferrals._deferral_charts(
         [deferral()], datetime.now(UTC)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.reliability import advanced_models as domain
+from amodb.apps.reliability import advanced_schemas as schemas
+from amodb.apps.reliability import advanced_services as services
+from amodb.apps.reliability import models as legacy
+from amodb.database import Base
+
+
+@pytest.fixture()
+def ingestion_db():
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            account_models.AMOAsset.__table__,
+            account_models.Department.__table__,
+            account_models.User.__table__,
+            account_models.AuthorisationType.__table__,
+            account_models.UserAuthorisation.__table__,
+            account_models.AccountSecurityEvent.__table__,
+            legacy.ReliabilityEvent.__table__,
+            domain.ReliabilitySource.__table__,
+            domain.ReliabilityIngestionBatch.__table__,
+            domain.ReliabilityIngestionRecord.__table__,
+            domain.ReliabilityDataQualityIssue.__table__,
+            domain.ReliabilityOperationalInterruption.__table__,
+            domain.ReliabilityAuditEvent.__table__,
+        ],
+    )
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+    db = SessionLocal()
+    amo = account_models.AMO(amo_code="REL-A", name="Reliability A", login_slug="rel-a")
+    db.add(amo)
+    db.flush()
+    source = domain.ReliabilitySource(amo_id=amo.id, code="OPS", name="Operations feed", source_type="FLIGHT_OPS")
+    db.add(source)
+    db.commit()
+    yield db, amo.id, source, statements
+    db.close()
+
+
+def _ingest(db, amo_id, source, records):
+    return services.ingest_batch(
+        db,
+        amo_id=amo_id,
+        source=source,
+        payload=schemas.ReliabilityBatchIngest(records=records),
+        actor_user_id=None,
+    )
+
+
+def _delay(number: int, **extra):
+    record = {
+        "external_id": f"OPS-{number}",
+        "event_type": "TECHNICAL_DELAY",
+        "occurred_at": "2026-08-05T12:00:00Z",
+        "flight_number": f"SLK{number}",
+        "delay_minutes": 20,
+    }
+    record.update(extra)
+    return record
+
+
+def test_bulk_ingest_keeps_statuses_duplicates_and_provenance(ingestion_db):
+    db, amo_id, source, _ = ingestion_db
+    records = [
+        _delay(1),
+        _delay(2, flight_number=None),
+        {"external_id": "BAD-1", "event_type": "NOT_A_TYPE"},
+        _delay(1, description="same external id later in the batch"),
+    ]
+
+    result = _ingest(db, amo_id, source, records)
+
+    batch = result.batch
+    assert (batch.valid_count, batch.invalid_count, batch.duplicate_count) == (2, 1, 1)
+    assert batch.status == "PARTIAL"
+    assert result.duplicate_external_ids == ["OPS-1"]
+    assert [row["external_id"] for row in result.rejected_records] == ["BAD-1"]
+    assert set(batch.stage_timings_json) == {"hash_ms", "dedupe_ms", "validate_ms", "insert_ms", "total_ms"}
+
+    rows = {row.external_id: row for row in db.query(domain.ReliabilityIngestionRecord)}
+    assert {key: row.validation_status for key, row in rows.items()} == {"OPS-1": "VALID", "OPS-2": "WARNING", "BAD-1": "INVALID"}
+    events = {event.id: event for event in db.query(legacy.ReliabilityEvent)}
+    assert sorted(events) == sorted(result.created_event_ids)
+    for key in ("OPS-1", "OPS-2"):
+        event_row = events[rows[key].normalized_event_id]
+        assert event_row.source_record_id == key
+        assert event_row.provenance_json["record_id"] == rows[key].id
+    assert db.query(domain.ReliabilityOperationalInterruption).count() == 2
+    issues = sorted(issue.issue_code for issue in db.query(domain.ReliabilityDataQualityIssue))
+    assert issues == ["INGESTION_VALIDATION_FAILED", "INGESTION_WARNING"]
+
+
+def test_replay_is_idempotent_and_duplicates_resolve_in_one_lookup(ingestion_db):
+    db, amo_id, source, statements = ingestion_db
+    first = _ingest(db, amo_id, source, [_delay(number) for number in range(50)])
+    assert first.batch.valid_count == 50
+
+    replay = _ingest(db, amo_id, source, [_delay(number) for number in range(50)])
+    assert replay.duplicate_external_ids == ["BATCH_ALREADY_PROCESSED"]
+
+    statements.clear()
+    overlap = _ingest(db, amo_id, source, [_delay(number) for number in range(40, 60)])
+    lookups = [sql for sql in statements if "FROM reliability_ingestion_records" in sql and sql.lstrip().startswith("SELECT")]
+    # Events need ordered RETURNING ids, which SQLite can only do row by row;
+    # client-keyed tables are always one multi-row statement.
+    record_inserts = [sql for sql in statements if sql.lstrip().startswith("INSERT INTO reliability_ingestion_records")]
+
+    assert overlap.batch.duplicate_count == 10
+    assert overlap.batch.valid_count == 10
+    assert len(lookups) == 1
+    assert len(record_inserts) == 1
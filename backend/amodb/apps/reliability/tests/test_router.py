@@ -47,6 +47,7 @@ def db_session():
             fleet_models.AircraftComponent.__table__,
             fleet_models.AircraftDocument.__table__,
             fleet_models.AircraftUsage.__table__,
+            fleet_models.AircraftUsageRollup.__table__,
             fleet_models.AircraftConfigurationEvent.__table__,
             fleet_models.DefectReport.__table__,
             fleet_models.MaintenanceProgramItem.__table__,
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.fleet import models as fleet_models
+from amodb.apps.reliability import advanced_models as domain
+from amodb.apps.reliability import advanced_services as services
+from amodb.apps.reliability import models as legacy
+from amodb.database import Base
+
+PERIOD = (date(2026, 9, 1), date(2026, 9, 30))
+EVENTS = [
+    # (aircraft, part number, event type, day)
+    ("AC-1", "PN-A", "UNSCHEDULED_REMOVAL", 2),
+    ("AC-1", "PN-A", "NO_FAULT_FOUND", 3),
+    ("AC-1", "PN-A", "UNSCHEDULED_REMOVAL", 4),
+    ("AC-2", "PN-B", "UNSCHEDULED_REMOVAL", 5),
+    ("AC-2", "PN-B", "TECHNICAL_DELAY", 6),
+    ("AC-2", "PN-C", "TECHNICAL_DELAY", 7),
+    ("AC-1", "PN-C", "UNSCHEDULED_REMOVAL", 8),
+]
+
+
+@pytest.fixture()
+def analytics_db():
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            account_models.AMOAsset.__table__,
+            account_models.Department.__table__,
+            account_models.User.__table__,
+            account_models.AuthorisationType.__table__,
+            account_models.UserAuthorisation.__table__,
+            account_models.AccountSecurityEvent.__table__,
+            fleet_models.Aircraft.__table__,
+            fleet_models.AircraftUsage.__table__,
+            fleet_models.AircraftUsageRollup.__table__,
+            legacy.ReliabilityEvent.__table__,
+            domain.ReliabilityProgramme.__table__,
+            domain.ReliabilityProgrammeVersion.__table__,
+            domain.ReliabilityMetricDefinition.__table__,
+            domain.ReliabilityThresholdVersion.__table__,
+            domain.ReliabilityCalculationRun.__table__,
+            domain.ReliabilityAuditEvent.__table__,
+        ],
+    )
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)()
+    amo = account_models.AMO(amo_code="REL-S", name="Reliability Scopes", login_slug="rel-s")
+    db.add(amo)
+    db.flush()
+    for index, serial in enumerate(("AC-1", "AC-2", "AC-3"), start=1):
+        db.add(fleet_models.Aircraft(serial_number=serial, registration=f"5Y-SC{index}", amo_id=amo.id))
+    db.flush()
+    for serial, hours in (("AC-1", 40.0), ("AC-2", 60.0)):
+        for day in (10, 20):
+            db.add(
+                fleet_models.AircraftUsage(
+                    amo_id=amo.id,
+                    aircraft_serial_number=serial,
+                    date=date(2026, 9, day),
+                    techlog_no=f"TL-{serial}-{day}",
+                    block_hours=hours / 2,
+                    cycles=5,
+                )
+            )
+    for serial, part_number, event_type, day in EVENTS:
+        db.add(
+            legacy.ReliabilityEvent(
+                amo_id=amo.id,
+                aircraft_serial_number=serial,
+                part_number=part_number,
+                event_type=legacy.ReliabilityEventTypeEnum(event_type),
+                occurred_at=datetime(2026, 9, day, 12, tzinfo=timezone.utc),
+            )
+        )
+    db.commit()
+    yield db, amo.id, statements
+    db.close()
+
+
+def _event_counts(statements: list[str]) -> list[str]:
+    return [sql for sql in statements if "FROM reliability_events" in sql and "count(" in sql.lower()]
+
+
+def test_component_analytics_groups_every_scope_into_one_event_query(analytics_db):
+    db, amo_id, statements = analytics_db
+    statements.clear()
+
+    response = services.analytics(
+        db,
+        amo_id=amo_id,
+        scope_type="COMPONENT",
+        period_start=PERIOD[0],
+        period_end=PERIOD[1],
+        denominator_type="FH",
+        event_types=["UNSCHEDULED_REMOVAL", "NO_FAULT_FOUND"],
+    )
+
+    assert len(_event_counts(statements)) == 1
+    rows = {row.scope_id: row for row in response.rows}
+    assert {key: row.events for key, row in rows.items()} == {"PN-A": 3, "PN-B": 1, "PN-C": 1}
+    assert all(row.exposure == Decimal("100.0") for row in rows.values())
+    assert rows["PN-A"].details["unscheduled_removals"] == 2
+    assert rows["PN-A"].details["no_fault_found"] == 1
+    assert rows["PN-A"].details["nff_percent"] == "50.00000000"
+    assert rows["PN-A"].rate == Decimal("3.00000000")
+    assert rows["PN-C"].details["unscheduled_removals"] == 1
+
+
+def test_aircraft_exposure_is_grouped_and_idle_aircraft_report_zero(analytics_db):
+    db, amo_id, statements = analytics_db
+    statements.clear()
+
+    response = services.analytics(
+        db,
+        amo_id=amo_id,
+        scope_type="AIRCRAFT",
+        period_start=PERIOD[0],
+        period_end=PERIOD[1],
+        denominator_type="FH",
+    )
+
+    usage_sums = [sql for sql in statements if "FROM aircraft_usage" in sql]
+    assert len(_event_counts(statements)) == 1
+    assert len(usage_sums) == 1
+    rows = {row.scope_id: row for row in response.rows}
+    assert (rows["AC-1"].events, rows["AC-1"].exposure) == (4, Decimal("40.0"))
+    assert (rows["AC-2"].events, rows["AC-2"].exposure) == (3, Decimal("60.0"))
+    assert (rows["AC-3"].events, rows["AC-3"].exposure, rows["AC-3"].status) == (0, Decimal("0"), "INSUFFICIENT_DATA")
+
+
+def test_scheduler_reuses_grouped_counts_for_every_scope(analytics_db):
+    db, amo_id, statements = analytics_db
+    metric = domain.ReliabilityMetricDefinition(
+        amo_id=amo_id,
+        programme_version_id="programme-1",
+        code="NFF",
+        name="No fault found rate",
+        scope_type="COMPONENT",
+        method="NFF_RATE",
+        numerator_event_types=["NO_FAULT_FOUND"],
+        denominator_type="FH",
+        window_days=3650,
+    )
+    db.add(metric)
+    db.commit()
+    statements.clear()
+
+    runs = services.run_due_metrics(db, amo_id=amo_id)
+
+    assert len(_event_counts(statements)) == 1
+    by_scope = {run.scope_id: run for run in runs}
+    assert set(by_scope) == {"PN-A", "PN-B", "PN-C"}
+    assert (by_scope["PN-A"].numerator, by_scope["PN-A"].denominator) == (Decimal("1"), Decimal("2"))
+    assert by_scope["PN-A"].value == Decimal("50.00000000")
+    assert (by_scope["PN-B"].numerator, by_scope["PN-B"].denominator) == (Decimal("0"), Decimal("1"))
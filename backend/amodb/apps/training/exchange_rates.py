@@ -4,20 +4,21 @@ from __future__ import annotations
 import json
 import os
 import re
-import threading
-import time
 import urllib.error
 import urllib.request
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation
 from typing import Any
 
+from amodb import tenant_cache
+
 
 DEFAULT_PROVIDER_URL = "https://open.er-api.com/v6/latest/{base}"
 PROVIDER_NAME = "ExchangeRate-API open access"
 ATTRIBUTION_URL = "https://www.exchangerate-api.com"
-_CACHE: dict[str, tuple[float, dict[str, Any]]] = {}
-_CACHE_LOCK = threading.Lock()
+# Provider payloads are global (not tenant data); concurrent misses for one base
+# currency share a single provider request.
+_CACHE = tenant_cache.namespace("training.exchange_rates", ttl_seconds=3600, max_entries=256)
 
 
 class ExchangeRateUnavailable(RuntimeError):
@@ -56,16 +57,10 @@ def get_exchange_rate_quote(base: str, quote: str) -> dict[str, Any]:
             "cached": True,
         }
 
-    cache_key = base_code
-    cached = None
-    served_from_cache = False
-    with _CACHE_LOCK:
-        entry = _CACHE.get(cache_key)
-        if entry and entry[0] > time.time():
-            cached = entry[1]
-            served_from_cache = True
+    fetched = []
 
-    if cached is None:
+    def _fetch() -> dict[str, Any]:
+        fetched.append(True)
         template = os.getenv("TRAINING_FX_PROVIDER_URL", DEFAULT_PROVIDER_URL)
         url = template.format(base=base_code)
         request = urllib.request.Request(url, headers={"Accept": "application/json", "User-Agent": "AMO-Training-OS/1.0"})
@@ -77,9 +72,10 @@ def get_exchange_rate_quote(base: str, quote: str) -> dict[str, Any]:
         if str(payload.get("result") or "success").lower() != "success" or not isinstance(payload.get("rates"), dict):
             detail = payload.get("error-type") or payload.get("error") or "invalid provider response"
             raise ExchangeRateUnavailable(f"The configured exchange-rate provider rejected the quote: {detail}")
-        cached = payload
-        with _CACHE_LOCK:
-            _CACHE[cache_key] = (time.time() + _cache_seconds(), payload)
+        return payload
+
+    cached = _CACHE.get_or_load(base_code, _fetch, ttl_seconds=_cache_seconds())
+    served_from_cache = not fetched
 
     raw_rate = cached.get("rates", {}).get(quote_code)
     try:
@@ -98,6 +98,17 @@ def connection_budget() -> ConnectionBudget:
             "rostering_automation": _number("ROSTER_AUTOMATION_PROCESS_COUNT", 0) * roster_pool,
         }
 
+    from amodb.apps.events.broker import configured_backend_name
+
+    if configured_backend_name() == "postgres":
+        # LISTEN/NOTIFY needs session-level connections outside any pooler:
+        # one listener and one sender per API process.
+        roles["event_broker"] = _number("PORTAL_API_PROCESS_COUNT", 1, minimum=1) * 2
+    invalidation_url = os.getenv("EVENTS_BROKER_DATABASE_URL") or os.getenv("DATABASE_WRITE_URL") or os.getenv("DATABASE_URL") or ""
+    if invalidation_url.startswith("postgresql"):
+        # Identity/tenant cache invalidation listener: one LISTEN session per API process.
+        roles["cache_invalidation"] = _number("PORTAL_API_PROCESS_COUNT", 1, minimum=1)
+
     return ConnectionBudget(maximum, admin, migration, usable, sum(roles.values()), external, roles)
 
 
@@ -0,0 +1,448 @@
+"""Per-process cache of authenticated identities keyed by auth session id.
+
+``security.get_current_user`` normally spends up to four writer queries per
+request (User, PortalAuthSession, UserActiveContext, AMO). This module keeps a
+bounded LRU of *already validated* identities for a short TTL so repeat
+requests from the same browser session can skip them.
+
+Revocation guarantees are preserved by invalidation rather than by TTL:
+
+- Every ORM flush that touches ``users``, ``portal_auth_sessions``,
+  ``user_active_context`` or ``amos`` emits ``pg_notify`` inside the same
+  transaction, so other processes learn about the change exactly when it
+  commits (and never for rolled-back work). Bulk ORM UPDATE/DELETE against
+  those tables invalidates everything, unless the statement names the users
+  whose rows it can touch with
+  ``execution_options(identity_cache_users=[...])``.
+- The committing process invalidates its own entries in ``after_commit``.
+- A listener thread per process applies remote invalidations. While it is not
+  connected the cache is bypassed and flushed, so a missed notification can
+  never serve a revoked session.
+
+Cached values are detached column snapshots that are merged into the request
+session with ``load=False``; request code still receives a normal persistent
+ORM instance and nothing it mutates leaks back into the cache.
+
+``IDENTITY_CACHE_MODE``: ``auto`` (default; enabled on PostgreSQL while the
+invalidation listener is connected), ``local`` (single process, in-process
+invalidation only; development and tests) or ``off``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import select
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "amodb_identity"
+_NOTIFY_LIMIT_BYTES = 7000
+_INFO_KEY = "_identity_cache_invalidations"
+
+
+def _bounded_int(name: str, default: int, minimum: int, maximum: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)) or default)
+    except ValueError:
+        value = default
+    return max(minimum, min(maximum, value))
+
+
+def _mode() -> str:
+    value = (os.getenv("IDENTITY_CACHE_MODE") or "auto").strip().lower()
+    return value if value in {"auto", "local", "off"} else "auto"
+
+
+def _listen_url() -> str:
+    """Database URL for LISTEN, mirroring the event broker's ``auto`` rule.
+
+    Behind a transaction-mode pooler LISTEN can succeed on a pooled backend
+    that never sees the NOTIFY, so the listener needs EVENTS_BROKER_DATABASE_URL
+    pointing at a direct connection; without it the cache stays bypassed.
+    """
+    direct = os.getenv("EVENTS_BROKER_DATABASE_URL") or ""
+    pooled = (os.getenv("DB_EXTERNAL_POOLER") or "").strip().lower() in {"1", "true", "yes", "on"}
+    if pooled and not direct:
+        return ""
+    url = direct or os.getenv("DATABASE_WRITE_URL") or os.getenv("DATABASE_URL") or ""
+    return url if url.startswith("postgresql") else ""
+
+
+def detached_snapshot(instance: Any) -> Any:
+    """Copy loaded column values into a clean, detached instance of the same class."""
+    mapper = inspect(instance).mapper
+    copy = mapper.class_manager.new_instance()
+    for attr in mapper.column_attrs:
+        set_committed_value(copy, attr.key, getattr(instance, attr.key))
+    make_transient_to_detached(copy)
+    return copy
+
+
+@dataclass
+class CachedIdentity:
+    auth_session_id: str
+    user_id: str
+    user: Any
+    session_row_exists: bool
+    session_user_id: Optional[str]
+    session_expires_at: Optional[datetime]
+    expires_at: float
+    context_loaded: bool = False
+    active_amo: Any = None
+    generation: int = field(default=0, repr=False)
+
+    def attach_user(self, db: Session) -> Any:
+        return db.merge(self.user, load=False)
+
+    def attach_active_amo(self, db: Session) -> Any:
+        if self.active_amo is None:
+            return None
+        return db.merge(self.active_amo, load=False)
+
+
+class IdentityCache:
+    def __init__(self, *, max_entries: int = 10000, ttl_seconds: float = 15.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedIdentity]" = OrderedDict()
+        self._by_user: dict[str, set[str]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._remote_healthy = False
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "stale_fills": 0, "evictions": 0, "invalidations": 0}
+
+    # -- availability ------------------------------------------------------------
+
+    def enabled(self) -> bool:
+        mode = _mode()
+        if mode == "off":
+            return False
+        if mode == "local":
+            return True
+        return self._remote_healthy
+
+    def set_remote_healthy(self, healthy: bool) -> None:
+        with self._lock:
+            changed = self._remote_healthy != healthy
+            self._remote_healthy = healthy
+        if changed:
+            # Anything cached before/while disconnected may have missed a
+            # revocation notice.
+            self.invalidate_all()
+
+    # -- read/fill ----------------------------------------------------------------
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, auth_session_id: str, *, user_id: str) -> Optional[CachedIdentity]:
+        if not self.enabled():
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(auth_session_id)
+            if entry is None or entry.expires_at <= now or entry.user_id != user_id:
+                if entry is not None:
+                    self._drop_locked(auth_session_id)
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(auth_session_id)
+            self._counters["hits"] += 1
+            return entry
+
+    def put(self, entry: CachedIdentity, *, generation: int) -> None:
+        """Store ``entry`` unless an invalidation happened since ``generation``."""
+        if not self.enabled():
+            return
+        entry.generation = generation
+        entry.expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if generation != self._generation:
+                self._counters["stale_fills"] += 1
+                return
+            self._drop_locked(entry.auth_session_id)
+            self._entries[entry.auth_session_id] = entry
+            self._by_user.setdefault(entry.user_id, set()).add(entry.auth_session_id)
+            self._counters["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._unlink_user_locked(evicted)
+                self._counters["evictions"] += 1
+
+    def store_context(self, entry: CachedIdentity, *, active_amo: Any, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation or self._entries.get(entry.auth_session_id) is not entry:
+                return
+            entry.active_amo = active_amo
+            entry.context_loaded = True
+
+    # -- invalidation -------------------------------------------------------------
+
+    def _unlink_user_locked(self, entry: CachedIdentity) -> None:
+        sessions = self._by_user.get(entry.user_id)
+        if sessions is not None:
+            sessions.discard(entry.auth_session_id)
+            if not sessions:
+                del self._by_user[entry.user_id]
+
+    def _drop_locked(self, auth_session_id: str) -> None:
+        entry = self._entries.pop(auth_session_id, None)
+        if entry is not None:
+            self._unlink_user_locked(entry)
+
+    def invalidate(self, *, user_ids: set[str] = frozenset(), session_ids: set[str] = frozenset()) -> None:
+        with self._lock:
+            self._generation += 1
+            self._counters["invalidations"] += 1
+            for user_id in user_ids:
+                for auth_session_id in list(self._by_user.get(user_id, ())):
+                    self._drop_locked(auth_session_id)
+            for auth_session_id in session_ids:
+                self._drop_locked(auth_session_id)
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._counters["invalidations"] += 1
+            self._entries.clear()
+            self._by_user.clear()
+
+    def apply_message(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            self.invalidate_all()
+            return
+        if message.get("all"):
+            self.invalidate_all()
+            return
+        self.invalidate(
+            user_ids={str(value) for value in message.get("users") or ()},
+            session_ids={str(value) for value in message.get("sessions") or ()},
+        )
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "mode": _mode(),
+                "enabled": self.enabled(),
+                "remote_listener_connected": self._remote_healthy,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else None,
+                **self._counters,
+            }
+
+
+identity_cache = IdentityCache(
+    max_entries=_bounded_int("IDENTITY_CACHE_MAX_ENTRIES", 10000, 100, 1_000_000),
+    ttl_seconds=float(_bounded_int("IDENTITY_CACHE_TTL_SEC", 15, 1, 300)),
+)
+
+
+# ---------------------------------------------------------------------------
+# Change capture (all processes that write, cache enabled or not)
+# ---------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=1)
+def _tracked_models() -> dict[type, str]:
+    from amodb.apps.accounts import models as account_models
+
+    return {
+        account_models.User: "user",
+        account_models.PortalAuthSession: "session",
+        account_models.UserActiveContext: "context",
+        account_models.AMO: "amo",
+    }
+
+
+def _pending(session: Session) -> dict[str, Any]:
+    return session.info.setdefault(_INFO_KEY, {"users": set(), "sessions": set(), "all": False})
+
+
+def _notify(session: Session, message: dict[str, Any]) -> None:
+    try:
+        connection = session.connection()
+        if connection.dialect.name != "postgresql":
+            return
+        payload = json.dumps(message, separators=(",", ":"))
+        if len(payload.encode("utf-8")) > _NOTIFY_LIMIT_BYTES:
+            payload = json.dumps({"all": True})
+        connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+    except Exception:
+        logger.warning("Identity cache invalidation notify failed", exc_info=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_flush(session: Session, _flush_context) -> None:
+    if _mode() == "off":
+        return
+    tracked = _tracked_models()
+    users: set[str] = set()
+    sessions: set[str] = set()
+    invalidate_all = False
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        kind = tracked.get(type(instance))
+        if kind is None:
+            continue
+        if kind == "user":
+            users.add(str(instance.id))
+        elif kind == "session":
+            sessions.add(str(instance.id))
+            users.add(str(instance.user_id))
+        elif kind == "context":
+            users.add(str(instance.user_id))
+        elif kind == "amo" and instance not in session.new:
+            invalidate_all = True
+    if not (users or sessions or invalidate_all):
+        return
+    pending = _pending(session)
+    pending["users"].update(users)
+    pending["sessions"].update(sessions)
+    pending["all"] = pending["all"] or invalidate_all
+    message = {"all": True} if invalidate_all else {"users": sorted(users), "sessions": sorted(sessions)}
+    _notify(session, message)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _capture_bulk(orm_execute_state) -> None:
+    if _mode() == "off" or not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    tracked = _tracked_models()
+    if not any(mapper.class_ in tracked for mapper in orm_execute_state.all_mappers):
+        return
+    pending = _pending(orm_execute_state.session)
+    scoped = orm_execute_state.execution_options.get("identity_cache_users")
+    if scoped is None:
+        pending["all"] = True
+        _notify(orm_execute_state.session, {"all": True})
+        return
+    users = {str(user_id) for user_id in scoped}
+    pending["users"].update(users)
+    _notify(orm_execute_state.session, {"users": sorted(users), "sessions": []})
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_local_invalidations(session: Session) -> None:
+    pending = session.info.pop(_INFO_KEY, None)
+    if not pending:
+        return
+    if pending["all"]:
+        identity_cache.invalidate_all()
+    else:
+        identity_cache.invalidate(user_ids=pending["users"], session_ids=pending["sessions"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_INFO_KEY, None)
+
+
+# ---------------------------------------------------------------------------
+# Remote invalidation listener
+# ---------------------------------------------------------------------------
+
+
+class _InvalidationListener:
+    """One LISTEN session per process shared by every cache invalidation channel."""
+
+    def __init__(self, cache: IdentityCache) -> None:
+        self._cache = cache
+        self._handlers: dict[str, Callable[[str], None]] = {CHANNEL: cache.apply_message}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, channel: str, handler: Callable[[str], None]) -> None:
+        self._handlers[channel] = handler
+
+    def start(self) -> None:
+        if _mode() != "auto" and len(self._handlers) == 1:
+            return
+        url = _listen_url()
+        if not url:
+            return
+        self._stop.clear()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, args=(url,), name="identity-cache-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self._cache.set_remote_healthy(False)
+
+    def _run(self, url: str) -> None:
+        import psycopg2
+        from sqlalchemy.engine import make_url
+
+        dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        backoff = 0.5
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(dsn, connect_timeout=5, application_name="amo-portal-identity-cache")
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    for channel in self._handlers:
+                        cursor.execute(f'LISTEN "{channel}"')
+                self._cache.set_remote_healthy(True)
+                backoff = 0.5
+                while not self._stop.is_set():
+                    readable, _, _ = select.select([conn], [], [], 1.0)
+                    if not readable:
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        handler = self._handlers.get(notify.channel)
+                        if handler is not None:
+                            handler(notify.payload)
+            except Exception:
+                logger.warning("Identity cache invalidation listener lost its connection; cache bypassed.", exc_info=True)
+            finally:
+                self._cache.set_remote_healthy(False)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            if self._stop.wait(backoff):
+                break
+            backoff = min(backoff * 2, 10.0)
+
+
+_listener = _InvalidationListener(identity_cache)
+
+
+def register_invalidation_channel(channel: str, handler: Callable[[str], None]) -> None:
+    """Have this process's listener deliver ``channel`` payloads to ``handler``.
+
+    Register at import time; channels added after the listener connected are
+    picked up on its next reconnect.
+    """
+    _listener.register(channel, handler)
+
+
+def start_identity_cache() -> None:
+    _listener.start()
+
+
+def stop_identity_cache() -> None:
+    _listener.stop()
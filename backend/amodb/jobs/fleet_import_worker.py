@@ -0,0 +1,27 @@
+"""Worker process for aircraft/component import previews.
+
+Started by ``amodb.apps.fleet.import_preview`` as ``python -m
+amodb.jobs.fleet_import_worker --serve``. It lives outside the fleet package
+so the application modules are imported in the same order as in the API
+(accounts before fleet) rather than through ``amodb.apps.fleet`` first.
+"""
+from __future__ import annotations
+
+import sys
+
+from amodb.apps.accounts import models as _account_models  # noqa: F401
+from amodb.apps.fleet import import_preview
+from amodb import worker_pool
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["--serve"]:
+        raise SystemExit(64)
+    raise SystemExit(
+        worker_pool.serve(
+            import_preview._serve_job,
+            warm=import_preview._warm_worker,
+            memory_mb=import_preview.WORKER_MEMORY_MB,
+            name=import_preview.WORKER_NAME,
+        )
+    )
@@ -5,14 +5,12 @@ import logging
 import asyncio
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
-from threading import Lock
-from typing import Callable, Dict, List
+from typing import Callable, List
 
 from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from jose import JWTError, jwt
 from alembic.config import Config
 from alembic.script import ScriptDirectory
 from sqlalchemy import text
@@ -29,7 +27,8 @@ from .database import (
 from .database_resilience import database_circuit
 from .db_capacity import connection_budget, validate_connection_budget
 from .query_metrics import begin_counting, end_counting, query_count
-from .security import JWT_ALGORITHM, SECRET_KEY
+from . import tenant_cache
+from .security import decode_access_token
 from .apps.accounts import models as accounts_models
 
 from .apps.accounts.router_public import router as accounts_public_router
@@ -38,6 +37,7 @@ from .apps.accounts.router_modules_admin import router as accounts_modules_route
 from .apps.accounts.router_amo_assets import router as accounts_amo_assets_router
 from .apps.accounts.router_onboarding import router as accounts_onboarding_router
 from .apps.fleet.router import router as fleet_router
+from .apps.fleet import import_preview as fleet_import_preview
 from .apps.aircraft_architecture.router import router as aircraft_architecture_router
 from .apps.work.router import router as work_router
 from .apps.crs.router import router as crs_router
@@ -55,9 +55,11 @@ from .apps.accounts.router_billing import router as billing_router
 from .apps.bootstrap.router import router as bootstrap_router
 from .apps.integrations.router import router as integrations_router
 from .apps.events.router import router as events_router
+from .apps.events.broker import start_event_broker, stop_event_broker
+from .identity_cache import start_identity_cache, stop_identity_cache
+from .apps.doc_control import pdfium_service
 from .apps.realtime.router import router as realtime_router
 from .apps.realtime.gateway import gateway as realtime_gateway
-from .apps.accounts import services as account_services
 from .apps.manuals.router import router as manuals_router
 from .apps.manuals.router_branding import router as manuals_branding_router
 from .apps.aerodoc_router import router as aerodoc_router
@@ -70,6 +72,7 @@ from .apps.quality.planner_schedule_router import (
 )
 from .apps.platform.router import router as platform_router
 from .apps.platform import metrics as platform_metrics
+from .apps.platform.saas_usage import api_usage_aggregator
 from .apps.foundations.router import router as foundations_router
 from .apps.rostering.router import router as rostering_router
 from .apps.resilience.router import router as resilience_router
@@ -132,88 +135,25 @@ max_request_body_bytes = int(os.getenv("MAX_REQUEST_BODY_BYTES", "0") or "0")
 platform_settings_cache_ttl = int(
     os.getenv("PLATFORM_SETTINGS_CACHE_TTL_SEC", "30") or "30"
 )
-_platform_settings_cache: dict[str, object] = {"at": 0.0, "data": None}
-
-_api_usage_lock = Lock()
-_api_usage_pending: Dict[str, int] = {}
-_api_usage_last_flush = 0.0
-_api_usage_flush_interval_sec = float(os.getenv("API_USAGE_FLUSH_INTERVAL_SEC", "5") or "5")
-_api_usage_flush_batch_size = int(os.getenv("API_USAGE_FLUSH_BATCH_SIZE", "100") or "100")
+# Settings are not tenant data; objects are shared detached ORM rows, so they
+# are cached as-is rather than frozen.
+_platform_settings_cache = tenant_cache.namespace(
+    "platform.settings",
+    ttl_seconds=max(1, platform_settings_cache_ttl),
+    max_entries=1,
+    freeze_values=False,
+)
+_platform_settings_last: accounts_models.PlatformSettings | None = None
+_UNCACHED = object()
 
 
 def _queue_api_usage(amo_id: str) -> None:
-    global _api_usage_last_flush
-    if not amo_id:
-        return
-
-    payload_to_flush: Dict[str, int] | None = None
-    now = time.monotonic()
-    with _api_usage_lock:
-        _api_usage_pending[amo_id] = _api_usage_pending.get(amo_id, 0) + 1
-        total_pending = sum(_api_usage_pending.values())
-        due_by_time = (now - _api_usage_last_flush) >= _api_usage_flush_interval_sec
-        due_by_size = total_pending >= _api_usage_flush_batch_size
-        if not due_by_time and not due_by_size:
-            return
-        payload_to_flush = dict(_api_usage_pending)
-        _api_usage_pending.clear()
-        _api_usage_last_flush = now
-
-    if not payload_to_flush:
-        return
-
-    db = WriteSessionLocal()
-    try:
-        for pending_amo_id, quantity in payload_to_flush.items():
-            if quantity <= 0:
-                continue
-            account_services.record_usage(
-                db,
-                amo_id=pending_amo_id,
-                meter_key=account_services.METER_KEY_API_CALLS,
-                quantity=quantity,
-            )
-        db.commit()
-    except Exception:
-        try:
-            db.rollback()
-        except Exception:
-            pass
-        with _api_usage_lock:
-            for pending_amo_id, quantity in payload_to_flush.items():
-                _api_usage_pending[pending_amo_id] = _api_usage_pending.get(pending_amo_id, 0) + quantity
-    finally:
-        close_session_safely(db)
+    # In-memory increment only; the per-process aggregator thread persists it.
+    api_usage_aggregator.record(amo_id)
 
 
 def _flush_api_usage_metrics() -> None:
-    global _api_usage_last_flush
-    with _api_usage_lock:
-        if not _api_usage_pending:
-            return
-        payload_to_flush = dict(_api_usage_pending)
-        _api_usage_pending.clear()
-        _api_usage_last_flush = time.monotonic()
-
-    db = WriteSessionLocal()
-    try:
-        for pending_amo_id, quantity in payload_to_flush.items():
-            if quantity <= 0:
-                continue
-            account_services.record_usage(
-                db,
-                amo_id=pending_amo_id,
-                meter_key=account_services.METER_KEY_API_CALLS,
-                quantity=quantity,
-            )
-        db.commit()
-    except Exception:
-        try:
-            db.rollback()
-        except Exception:
-            pass
-    finally:
-        close_session_safely(db)
+    api_usage_aggregator.flush()
 
 
 def _load_platform_performance_settings() -> None:
@@ -225,8 +165,7 @@ def _load_platform_performance_settings() -> None:
         settings = db.query(accounts_models.PlatformSettings).first()
         if not settings:
             return
-        _platform_settings_cache["data"] = settings
-        _platform_settings_cache["at"] = time.monotonic()
+        _remember_platform_settings(settings)
         if settings.gzip_minimum_size is not None:
             default_gzip_minimum_size = int(settings.gzip_minimum_size)
         if settings.gzip_compresslevel is not None:
@@ -239,28 +178,39 @@ def _load_platform_performance_settings() -> None:
         close_session_safely(db)
 
 
-def _get_platform_settings_cached() -> accounts_models.PlatformSettings | None:
-    if platform_settings_cache_ttl <= 0:
-        return _platform_settings_cache.get("data")  # type: ignore[return-value]
-    now = time.monotonic()
-    cached_at = float(_platform_settings_cache.get("at") or 0.0)
-    cached_data = _platform_settings_cache.get("data")
-    if cached_data and now - cached_at <= platform_settings_cache_ttl:
-        return cached_data  # type: ignore[return-value]
-    if not database_circuit.allow_request():
-        # Request-size enforcement must not bypass the global circuit and open
-        # a fresh PostgreSQL connection for every request during an outage.
-        return cached_data  # type: ignore[return-value]
+def _remember_platform_settings(
+    settings: accounts_models.PlatformSettings | None,
+) -> accounts_models.PlatformSettings | None:
+    global _platform_settings_last
+    _platform_settings_last = settings
+    return _platform_settings_cache.set("settings", settings)
+
+
+def _query_platform_settings() -> accounts_models.PlatformSettings | None:
+    global _platform_settings_last
     db = WriteSessionLocal()
     try:
-        cached_data = db.query(accounts_models.PlatformSettings).first()
+        settings = db.query(accounts_models.PlatformSettings).first()
     except Exception:
-        cached_data = None
+        settings = None
     finally:
         close_session_safely(db)
-    _platform_settings_cache["data"] = cached_data
-    _platform_settings_cache["at"] = now
-    return cached_data  # type: ignore[return-value]
+    _platform_settings_last = settings
+    return settings
+
+
+def _get_platform_settings_cached() -> accounts_models.PlatformSettings | None:
+    if platform_settings_cache_ttl <= 0:
+        return _platform_settings_last
+    cached = _platform_settings_cache.get("settings", default=_UNCACHED)
+    if cached is not _UNCACHED:
+        return cached  # type: ignore[return-value]
+    if not database_circuit.allow_request():
+        # Request-size enforcement must not bypass the global circuit and open
+        # a fresh PostgreSQL connection for every request during an outage.
+        return _platform_settings_last
+    # One request refreshes the row per expiry; concurrent requests wait for it.
+    return _platform_settings_cache.get_or_load("settings", _query_platform_settings)
 
 
 _load_platform_performance_settings()
@@ -296,6 +246,11 @@ def _schema_preflight() -> None:
     app.state.connection_budget = validate_connection_budget().payload()
     _enforce_schema_head_sync_if_configured()
     realtime_gateway.connect()
+    start_event_broker()
+    start_identity_cache()
+    api_usage_aggregator.start()
+    pdfium_service.start_worker_pool()
+    fleet_import_preview.start_worker_pool()
     if os.getenv("PORTAL_EMBEDDED_SCHEDULED_WORKER", "false").lower() in {"1", "true", "yes", "on"}:
         reliability_scheduler.start_reliability_scheduler()
         start_quality_planner_scheduler()
@@ -332,9 +287,13 @@ def _flush_usage_metrics_on_shutdown() -> None:
     _run_shutdown_step("quality-planner-scheduler", stop_quality_planner_scheduler, timeout_seconds)
     _run_shutdown_step("reliability-scheduler", reliability_scheduler.stop_reliability_scheduler, timeout_seconds)
     _run_shutdown_step("realtime-disconnect", realtime_gateway.disconnect, timeout_seconds)
+    _run_shutdown_step("event-broker", stop_event_broker, timeout_seconds)
+    _run_shutdown_step("identity-cache", stop_identity_cache, timeout_seconds)
+    _run_shutdown_step("pdfium-worker-pool", pdfium_service.stop_worker_pool, timeout_seconds)
+    _run_shutdown_step("fleet-import-worker-pool", fleet_import_preview.stop_worker_pool, timeout_seconds)
 
-    if os.getenv("API_USAGE_FLUSH_ON_SHUTDOWN", "false").lower() in {"1", "true", "yes", "on"}:
-        _run_shutdown_step("api-usage-flush", _flush_api_usage_metrics, timeout_seconds)
+    # Always attempted: the aggregator holds counts no other process knows about.
+    _run_shutdown_step("api-usage-flush", api_usage_aggregator.stop, timeout_seconds)
 
     _run_shutdown_step("sqlalchemy-dispose", dispose_engines, timeout_seconds)
 
@@ -369,7 +328,7 @@ def _tenant_from_token_for_metrics(request: Request) -> str | None:
     if scheme.lower() != "bearer" or not token:
         return None
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        payload = decode_access_token(token)
         amo_id = payload.get("amo_id")
         return str(amo_id) if amo_id else None
     except Exception:
@@ -341,6 +341,125 @@ def _configure_metrics(*, resource, endpoint: str, engines: tuple[object, ...]):
         meter.create_observable_gauge("amo.api.p95_latency_ms", callbacks=[lambda _options: api_observations("p95_latency_ms")], unit="ms")
         meter.create_observable_gauge("amo.api.p99_latency_ms", callbacks=[lambda _options: api_observations("p99_latency_ms")], unit="ms")
 
+        def event_broker_observations(field: str):
+            try:
+                from amodb.apps.events.broker import broker_stats
+
+                stats = broker_stats()
+            except Exception:
+                return []
+            backend = {"events.backend": str(stats.get("backend") or "memory")}
+            if field == "delivery_latency_ms":
+                latency = stats.get("delivery_latency_ms") or {}
+                return [
+                    Observation(float(latency[quantile]), {**backend, "quantile": quantile})
+                    for quantile in ("p50", "p99")
+                    if latency.get(quantile) is not None
+                ]
+            return [Observation(float(stats.get(field) or 0), backend)]
+
+        meter.create_observable_gauge("amo.events.broker.subscribers", callbacks=[lambda _options: event_broker_observations("subscribers")], unit="{subscriber}")
+        meter.create_observable_gauge("amo.events.sse.connections", callbacks=[lambda _options: event_broker_observations("sse_connections")], unit="{connection}")
+        meter.create_observable_gauge("amo.events.broker.outbox_depth", callbacks=[lambda _options: event_broker_observations("outbox_depth")], unit="{event}")
+        meter.create_observable_gauge("amo.events.broker.delivery_latency_ms", callbacks=[lambda _options: event_broker_observations("delivery_latency_ms")], unit="ms")
+        meter.create_observable_counter("amo.events.broker.remote_delivered.total", callbacks=[lambda _options: event_broker_observations("remote_delivered")], unit="{event}")
+        meter.create_observable_counter("amo.events.broker.send_failures.total", callbacks=[lambda _options: event_broker_observations("send_failures")], unit="{event}")
+
+        def identity_cache_observations(field: str):
+            try:
+                from amodb.identity_cache import identity_cache
+
+                stats = identity_cache.stats()
+            except Exception:
+                return []
+            return [Observation(float(stats.get(field) or 0), {"identity_cache.mode": str(stats.get("mode") or "off")})]
+
+        meter.create_observable_gauge("amo.auth.identity_cache.entries", callbacks=[lambda _options: identity_cache_observations("entries")], unit="{entry}")
+        meter.create_observable_gauge("amo.auth.identity_cache.hit_ratio", callbacks=[lambda _options: identity_cache_observations("hit_ratio")], unit="1")
+        meter.create_observable_counter("amo.auth.identity_cache.hits.total", callbacks=[lambda _options: identity_cache_observations("hits")], unit="{lookup}")
+        meter.create_observable_counter("amo.auth.identity_cache.misses.total", callbacks=[lambda _options: identity_cache_observations("misses")], unit="{lookup}")
+        meter.create_observable_counter("amo.auth.identity_cache.invalidations.total", callbacks=[lambda _options: identity_cache_observations("invalidations")], unit="{invalidation}")
+
+        def api_usage_observations(field: str):
+            try:
+                from amodb.apps.platform.saas_usage import api_usage_aggregator
+
+                value = api_usage_aggregator.stats().get(field)
+            except Exception:
+                return []
+            return [Observation(float(value or 0), {})]
+
+        meter.create_observable_gauge("amo.api_usage.pending", callbacks=[lambda _options: api_usage_observations("pending_units")], unit="{call}")
+        meter.create_observable_gauge("amo.api_usage.flush_lag.seconds", callbacks=[lambda _options: api_usage_observations("flush_lag_seconds")], unit="s")
+        meter.create_observable_gauge("amo.api_usage.flush.duration.ms", callbacks=[lambda _options: api_usage_observations("last_flush_ms")], unit="ms")
+        meter.create_observable_counter("amo.api_usage.flush_failures.total", callbacks=[lambda _options: api_usage_observations("flush_failures")], unit="{flush}")
+
+        def storage_cache_observations(field: str):
+            try:
+                from amodb.storage import cache_stats
+
+                stats = cache_stats()
+            except Exception:
+                return []
+            if field == "bytes_served":
+                return [
+                    Observation(float(stats.get(f"bytes_served_{source}") or 0), {"storage.source": source})
+                    for source in ("cache", "fill", "origin")
+                ]
+            return [Observation(float(stats.get(field) or 0), {})]
+
+        meter.create_observable_gauge("amo.storage.cache.hit_ratio", callbacks=[lambda _options: storage_cache_observations("hit_ratio")], unit="1")
+        meter.create_observable_counter("amo.storage.cache.hits.total", callbacks=[lambda _options: storage_cache_observations("hits")], unit="{lookup}")
+        meter.create_observable_counter("amo.storage.cache.misses.total", callbacks=[lambda _options: storage_cache_observations("misses")], unit="{lookup}")
+        meter.create_observable_counter("amo.storage.cache.fill_failures.total", callbacks=[lambda _options: storage_cache_observations("fill_failures")], unit="{fill}")
+        meter.create_observable_counter("amo.storage.cache.evictions.total", callbacks=[lambda _options: storage_cache_observations("evictions")], unit="{entry}")
+        meter.create_observable_counter("amo.storage.cache.bytes_served.total", callbacks=[lambda _options: storage_cache_observations("bytes_served")], unit="By")
+
+        def pdfium_pool_observations(field: str):
+            try:
+                from amodb.apps.doc_control.pdfium_service import worker_pool_stats
+
+                stats = worker_pool_stats()
+            except Exception:
+                return []
+            if field == "workers":
+                return [Observation(float(stats.get(state) or 0), {"pdfium.worker.state": state}) for state in ("idle", "busy")]
+            if field == "queue_wait_ms":
+                wait = stats.get("queue_wait_ms") or {}
+                return [Observation(float(wait[quantile]), {"quantile": quantile}) for quantile in ("p50", "p99") if wait.get(quantile) is not None]
+            if field == "latency_ms":
+                return [
+                    Observation(float(values[quantile]), {"pdfium.action": action, "quantile": quantile})
+                    for action, values in (stats.get("latency_ms") or {}).items()
+                    for quantile in ("p50", "p99")
+                    if values.get(quantile) is not None
+                ]
+            return [Observation(float(stats.get(field) or 0), {})]
+
+        meter.create_observable_gauge("amo.pdfium.pool.size", callbacks=[lambda _options: pdfium_pool_observations("size")], unit="{worker}")
+        meter.create_observable_gauge("amo.pdfium.pool.workers", callbacks=[lambda _options: pdfium_pool_observations("workers")], unit="{worker}")
+        meter.create_observable_gauge("amo.pdfium.pool.waiting", callbacks=[lambda _options: pdfium_pool_observations("waiting")], unit="{job}")
+        meter.create_observable_gauge("amo.pdfium.pool.queue_wait_ms", callbacks=[lambda _options: pdfium_pool_observations("queue_wait_ms")], unit="ms")
+        meter.create_observable_gauge("amo.pdfium.job.latency_ms", callbacks=[lambda _options: pdfium_pool_observations("latency_ms")], unit="ms")
+        meter.create_observable_counter("amo.pdfium.pool.recycled.total", callbacks=[lambda _options: pdfium_pool_observations("recycled")], unit="{worker}")
+        meter.create_observable_counter("amo.pdfium.pool.crashes.total", callbacks=[lambda _options: pdfium_pool_observations("crashes")], unit="{worker}")
+        meter.create_observable_counter("amo.pdfium.pool.timeouts.total", callbacks=[lambda _options: pdfium_pool_observations("timeouts")], unit="{job}")
+
+        def tenant_cache_observations(field: str):
+            try:
+                from amodb.tenant_cache import cache_stats
+
+                stats = cache_stats()
+            except Exception:
+                return []
+            return [Observation(float(row.get(field) or 0), {"cache.namespace": name}) for name, row in stats.items()]
+
+        meter.create_observable_gauge("amo.cache.entries", callbacks=[lambda _options: tenant_cache_observations("entries")], unit="{entry}")
+        meter.create_observable_gauge("amo.cache.hit_ratio", callbacks=[lambda _options: tenant_cache_observations("hit_ratio")], unit="1")
+        meter.create_observable_counter("amo.cache.loads.total", callbacks=[lambda _options: tenant_cache_observations("loads")], unit="{load}")
+        meter.create_observable_counter("amo.cache.coalesced.total", callbacks=[lambda _options: tenant_cache_observations("coalesced")], unit="{lookup}")
+        meter.create_observable_counter("amo.cache.evictions.total", callbacks=[lambda _options: tenant_cache_observations("evictions")], unit="{entry}")
+
         _JOB_DURATION = meter.create_histogram("amo.job.duration.seconds", unit="s", description="Background job execution duration.")
         _JOB_RESULT = meter.create_counter("amo.job.result.total", unit="{job}", description="Background job outcomes.")
         _JOB_RETRY = meter.create_counter("amo.job.retry.total", unit="{retry}", description="Background job retry attempts.")
@@ -46,6 +46,8 @@ from .apps.notifications.router import router as notifications_router
 from .apps.tasks.router import router as tasks_router
 from .apps.integrations.router import router as integrations_router
 from .apps.events.router import router as events_router
+from .apps.events.broker import start_event_broker, stop_event_broker
+from .identity_cache import start_identity_cache, stop_identity_cache
 from .apps.manuals.router import router as manuals_router
 from .apps.manuals.router_branding import router as manuals_branding_router
 from .apps.doc_control.router import router as doc_control_router
@@ -206,6 +208,8 @@ async def enforce_quality_request_limits(request: Request, call_next):
 def quality_schema_preflight() -> None:
     app.state.is_shutting_down = False
     _enforce_schema_head_sync()
+    start_event_broker()
+    start_identity_cache()
     start_quality_planner_scheduler()
 
 
@@ -213,6 +217,8 @@ def quality_schema_preflight() -> None:
 def quality_shutdown() -> None:
     app.state.is_shutting_down = True
     stop_quality_planner_scheduler()
+    stop_event_broker()
+    stop_identity_cache()
     dispose_engines()
 
 
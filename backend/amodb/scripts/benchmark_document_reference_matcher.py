@@ -0,0 +1,147 @@
+"""Per-alias regex scan versus the compiled reference matcher.
+
+Builds a synthetic alias set (600 manuals by default, each with its code and
+two node aliases) and a corpus of page-sized texts that cite a handful of
+them with mixed separators and casing. Reference detection then runs two
+ways:
+
+* ``regex_loop``: one compiled regex per alias over every text with a linear
+  overlap scan, as ``_reference_occurrences`` did before the matcher.
+* ``matcher``: ``knowledge_service._reference_occurrences`` with a
+  ``ReferenceMatcher`` (Aho-Corasick prefilter plus bisect overlap checks).
+
+Both must report identical occurrences; the report gives build and scan times.
+
+Usage:
+    python -m amodb.scripts.benchmark_document_reference_matcher --manuals 600 --pages 500
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import random
+import re
+import sys
+from time import perf_counter
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from amodb.apps.doc_control.knowledge_service import CODE_CANDIDATE, _reference_occurrences, normalize_code
+from amodb.apps.doc_control.reference_matcher import ReferenceMatcher
+
+EVIDENCE_PATH = Path("test-results/document-reference-matcher.json")
+PREFIXES = ["MOE", "QAM", "QWI", "AMM", "CAME", "SMS", "ENG/FRM", "QP", "TRM", "MEL", "WBM", "CMM"]
+TITLES = ["Exposition", "Procedure", "Work Instruction", "Form", "Checklist", "Register", "Manual", "Policy"]
+FILLER = (
+    "The certifying staff shall verify the aircraft status before release and record the task in the work pack. "
+    "Deferred defects are controlled under the applicable limitations and reviewed at each daily check. "
+).split()
+
+
+def _alias_set(manuals: int, rng: random.Random) -> tuple[dict, list[tuple[str, str, str]]]:
+    normalized_map: dict[str, list] = {}
+    entries: list[tuple[str, str, str]] = []
+    for index in range(manuals):
+        prefix = PREFIXES[index % len(PREFIXES)]
+        manual = SimpleNamespace(id=f"manual-{index:04d}")
+        code = f"{prefix}-{index:03d}"
+        aliases = [code, f"{prefix} {index}", f"{prefix.split('/')[0]} {rng.choice(TITLES)} {index}"]
+        for alias in aliases:
+            normalized = normalize_code(alias)
+            targets = normalized_map.setdefault(normalized, [])
+            if manual not in targets:
+                targets.append(manual)
+            entries.append((manual.id, alias, normalized))
+    return normalized_map, entries
+
+
+def _pages(entries: list[tuple[str, str, str]], count: int, rng: random.Random) -> list[str]:
+    pages = []
+    for _ in range(count):
+        words = [rng.choice(FILLER) for _ in range(450)]
+        for _ in range(rng.randint(2, 8)):
+            alias = rng.choice(entries)[1]
+            variant = re.sub(r"[\s./_-]+", lambda _match: rng.choice([" ", "-", ".", " / ", "_"]), alias)
+            words.insert(rng.randrange(len(words)), variant.lower() if rng.random() < 0.3 else variant)
+        pages.append(" ".join(words))
+    return pages
+
+
+def _regex_patterns(entries: list[tuple[str, str, str]]) -> list:
+    patterns = []
+    for _manual_id, alias, normalized in entries:
+        parts = re.split(r"([\s./_-]+)", alias)
+        expression = "".join(r"[\s./_-]+" if re.fullmatch(r"[\s./_-]+", part or "") else re.escape(part) for part in parts if part)
+        patterns.append((re.compile(rf"(?<![A-Za-z0-9])({expression})(?![A-Za-z0-9])", re.IGNORECASE), alias, normalized))
+    patterns.sort(key=lambda item: len(item[1]), reverse=True)
+    return patterns
+
+
+def _regex_loop(text: str, *, alias_patterns, normalized_map, source_manual_id: str) -> list:
+    matched_spans: list[tuple[int, int]] = []
+    occurrences = []
+    for pattern, _alias, normalized in alias_patterns:
+        targets = normalized_map.get(normalized, [])
+        for match in pattern.finditer(text):
+            if any(match.start() < end and match.end() > start for start, end in matched_spans):
+                continue
+            if len(targets) == 1 and targets[0].id == source_manual_id:
+                continue
+            matched_spans.append((match.start(), match.end()))
+            occurrences.append((match.start(), match.end(), match.group(1), normalized, targets, "TEXT_ALIAS"))
+    for match in CODE_CANDIDATE.finditer(text):
+        if any(match.start() < end and match.end() > start for start, end in matched_spans):
+            continue
+        normalized = normalize_code(match.group(1))
+        targets = normalized_map.get(normalized, [])
+        if len(targets) == 1 and targets[0].id == source_manual_id:
+            continue
+        matched_spans.append((match.start(), match.end()))
+        occurrences.append((match.start(), match.end(), match.group(1), normalized, targets, "CODE_CANDIDATE"))
+    return occurrences
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--manuals", type=int, default=600)
+    parser.add_argument("--pages", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(20261016)
+    normalized_map, entries = _alias_set(args.manuals, rng)
+    pages = _pages(entries, args.pages, rng)
+    source_manual_id = entries[0][0]
+    report: dict = {"manuals": args.manuals, "aliases": len(entries), "pages": len(pages)}
+
+    started = perf_counter()
+    alias_patterns = _regex_patterns(entries)
+    report["regex_build_ms"] = round((perf_counter() - started) * 1000.0, 1)
+    started = perf_counter()
+    matcher = ReferenceMatcher((alias, normalized) for _manual_id, alias, normalized in entries)
+    report["matcher_build_ms"] = round((perf_counter() - started) * 1000.0, 1)
+
+    results = {}
+    for name, scan in (
+        ("regex_loop", lambda text: _regex_loop(text, alias_patterns=alias_patterns, normalized_map=normalized_map, source_manual_id=source_manual_id)),
+        ("matcher", lambda text: _reference_occurrences(text, matcher=matcher, normalized_map=normalized_map, source_manual_id=source_manual_id)),
+    ):
+        started = perf_counter()
+        results[name] = [scan(text) for text in pages]
+        report[name] = {"ms": round((perf_counter() - started) * 1000.0, 1)}
+
+    mismatched = [index for index, (left, right) in enumerate(zip(results["regex_loop"], results["matcher"])) if left != right]
+    report["occurrences"] = sum(len(items) for items in results["matcher"])
+    report["mismatched_pages"] = mismatched[:20]
+    report["speedup"] = round(report["regex_loop"]["ms"] / max(report["matcher"]["ms"], 0.001), 1)
+    EVIDENCE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EVIDENCE_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
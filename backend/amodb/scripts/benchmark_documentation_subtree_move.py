@@ -0,0 +1,159 @@
+"""Hierarchy move latency for a 10k-node subtree: per-row ORM rewrite versus one UPDATE.
+
+Needs a PostgreSQL database migrated to at least
+``document_control_261016_hierarchy_path_prefix``. Nothing is written to the
+real tables: the script creates session-local ``TEMP`` copies of
+``documentation_nodes`` and ``documentation_hierarchy_versions``, which shadow
+the real ones for this connection, seeds a synthetic tree and rolls
+everything back at the end. Every timed move runs in a savepoint that is
+rolled back, so each repeat moves the same subtree.
+
+* ``orm``: the previous ``update_subtree_paths``, which loaded every
+  descendant and rewrote ``path``/``depth`` in Python before flushing;
+* ``set_based``: ``knowledge_service.update_subtree_paths``.
+
+Usage:
+    python -m amodb.scripts.benchmark_documentation_subtree_move \\
+        --database-url postgresql+psycopg2://... --nodes 10000 --repeat 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+from time import perf_counter
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from amodb.apps.doc_control import knowledge_models as km
+from amodb.apps.doc_control.knowledge_service import _node_path, update_subtree_paths
+
+EVIDENCE_PATH = Path("test-results/documentation-subtree-move.json")
+TENANT_ID = "bench-hierarchy-tenant"
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round((percentile / 100.0) * (len(ordered) - 1)))))
+    return round(ordered[index], 2)
+
+
+def _node(node_id: str, parent: dict | None, code: str, node_type: str, order_index: int) -> dict:
+    path, depth = _node_path(km.DocumentationNode(path=parent["path"], depth=parent["depth"]) if parent else None, node_id, code)
+    return {
+        "id": node_id,
+        "tenant_id": TENANT_ID,
+        "parent_id": parent["id"] if parent else None,
+        "node_type": node_type,
+        "code": code,
+        "normalized_code": f"{code}-{node_id}".upper(),
+        "title": code,
+        "path": path,
+        "depth": depth,
+        "order_index": order_index,
+        "status": "ACTIVE",
+        "metadata_json": {},
+    }
+
+
+def _seed(db, *, nodes: int, fanout: int) -> tuple[str, str]:
+    for table in ("documentation_nodes", "documentation_hierarchy_versions"):
+        db.execute(text(f"CREATE TEMP TABLE {table} (LIKE public.{table} INCLUDING DEFAULTS)"))
+    db.execute(text("CREATE INDEX ON documentation_nodes (tenant_id, path varchar_pattern_ops)"))
+    db.execute(text("CREATE UNIQUE INDEX ON documentation_hierarchy_versions (tenant_id)"))
+    root = _node("bench-root-0000", None, "ROOT", "ROOT", 0)
+    moving = _node("bench-move-0000", root, "QMS", "MANAGEMENT_SYSTEM", 1)
+    target = _node("bench-dest-0000", root, "ARCHIVE", "MANAGEMENT_SYSTEM", 2)
+    rows = [root, moving, target]
+    frontier = [moving]
+    while len(rows) - 3 < nodes:
+        next_frontier = []
+        for parent in frontier:
+            for index in range(fanout):
+                if len(rows) - 3 >= nodes:
+                    break
+                child = _node(f"bench-node-{len(rows):06d}", parent, f"DOC-{len(rows)}", "PROCEDURE", index)
+                rows.append(child)
+                next_frontier.append(child)
+        frontier = next_frontier
+    for start in range(0, len(rows), 5000):
+        db.execute(km.DocumentationNode.__table__.insert(), rows[start : start + 5000])
+    db.execute(text("ANALYZE documentation_nodes"))
+    return moving["id"], target["id"]
+
+
+def _orm_move(db, node: km.DocumentationNode, parent: km.DocumentationNode) -> int:
+    old_path = node.path
+    new_path, depth = _node_path(parent, node.id, node.code)
+    depth_delta = depth - int(node.depth or 0)
+    node.path = new_path
+    node.depth = depth
+    descendants = (
+        db.query(km.DocumentationNode)
+        .filter(km.DocumentationNode.tenant_id == node.tenant_id, km.DocumentationNode.path.like(f"{old_path.rstrip('/')}%"), km.DocumentationNode.id != node.id)
+        .all()
+    )
+    for child in descendants:
+        child.path = f"{new_path}{child.path[len(old_path):]}"
+        child.depth = max(0, int(child.depth or 0) + depth_delta)
+    db.flush()
+    return len(descendants)
+
+
+def _set_based_move(db, node: km.DocumentationNode, parent: km.DocumentationNode) -> int:
+    moved = update_subtree_paths(db, node, parent)
+    db.flush()
+    return moved
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--nodes", type=int, default=10000)
+    parser.add_argument("--fanout", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("The hierarchy move benchmark is PostgreSQL-only; pass a postgresql:// URL")
+    db = sessionmaker(bind=engine, autoflush=False)()
+    report: dict = {"nodes": args.nodes, "fanout": args.fanout, "repeat": args.repeat, "strategies": {}}
+    try:
+        started = perf_counter()
+        moving_id, target_id = _seed(db, nodes=args.nodes, fanout=args.fanout)
+        report["seed_ms"] = round((perf_counter() - started) * 1000.0, 1)
+        for name, move in (("orm", _orm_move), ("set_based", _set_based_move)):
+            latencies = []
+            moved = 0
+            for _ in range(args.repeat):
+                savepoint = db.begin_nested()
+                db.expunge_all()
+                node = db.get(km.DocumentationNode, moving_id)
+                parent = db.get(km.DocumentationNode, target_id)
+                started = perf_counter()
+                moved = move(db, node, parent)
+                latencies.append((perf_counter() - started) * 1000.0)
+                savepoint.rollback()
+            report["strategies"][name] = {"descendants": moved, "p50_ms": _percentile(latencies, 50), "p99_ms": _percentile(latencies, 99)}
+        report["p50_speedup"] = round(
+            report["strategies"]["orm"]["p50_ms"] / max(report["strategies"]["set_based"]["p50_ms"], 0.001), 1
+        )
+    finally:
+        db.rollback()
+        db.close()
+
+    EVIDENCE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EVIDENCE_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
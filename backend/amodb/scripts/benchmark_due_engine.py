@@ -0,0 +1,168 @@
+"""Fleet due-state computation: per-item calculation versus the batch engine.
+
+Seeds a disposable database with ``--aircraft`` aircraft each carrying
+``--items`` programme items (drawn from a shared template of ``--items``
+tasks), loads them once with ``due_engine.load_due_items`` and evaluates
+every item two ways:
+
+* ``per_item``: ``service._calculate_due_state`` called for each item, as
+  the fleet overview and the due projections did before;
+* ``engine``: ``due_engine.compute_due_states`` over the whole batch.
+
+``load`` reports the statements and time of the batch load itself. Both
+computations must produce identical states.
+
+Usage:
+    python -m amodb.scripts.benchmark_due_engine --aircraft 200 --items 400
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date, datetime, timedelta, timezone
+import json
+from pathlib import Path
+import random
+import sys
+from time import perf_counter
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.fleet import models as fleet_models
+from amodb.apps.maintenance_program import due_engine, service
+from amodb.apps.maintenance_program import models as program_models
+from amodb.database import Base
+
+EVIDENCE_PATH = Path("test-results/due-engine.json")
+
+
+def _seed(db, *, aircraft_count: int, item_count: int, today: date) -> tuple[str, list[str]]:
+    rng = random.Random(20261016)
+    amo = account_models.AMO(amo_code="BENCH-DUE", name="Due engine benchmark", login_slug="bench-due")
+    db.add(amo)
+    db.flush()
+    serials = [f"BD-{index:03d}" for index in range(aircraft_count)]
+    for index, serial in enumerate(serials):
+        db.add(
+            fleet_models.Aircraft(
+                serial_number=serial,
+                registration=f"5Y-D{index:03d}",
+                amo_id=amo.id,
+                total_hours=rng.uniform(5_000.0, 30_000.0),
+                total_cycles=float(rng.randint(3_000, 40_000)),
+            )
+        )
+    program_rows = [
+        {
+            "template_code": "BENCH",
+            "title": f"Task {index}",
+            "task_code": f"T-{index:04d}",
+            "interval_hours": rng.choice((None, 100.0, 500.0, 1_200.0)),
+            "interval_cycles": rng.choice((None, None, 400.0, 2_000.0)),
+            "interval_days": rng.choice((None, 30, 180, 365, 730)),
+            "threshold_hours": rng.choice((None, None, 2_000.0)),
+            "threshold_days": rng.choice((None, None, 90)),
+            "status": program_models.ProgramItemStatusEnum.ACTIVE,
+        }
+        for index in range(item_count)
+    ]
+    db.execute(program_models.AmpProgramItem.__table__.insert(), program_rows)
+    program_ids = [row.id for row in db.query(program_models.AmpProgramItem.id).order_by(program_models.AmpProgramItem.id)]
+    created_at = datetime.now(timezone.utc) - timedelta(days=400)
+    for serial in serials:
+        db.execute(
+            program_models.AmpAircraftProgramItem.__table__.insert(),
+            [
+                {
+                    "aircraft_serial_number": serial,
+                    "program_item_id": program_id,
+                    "last_done_hours": rng.choice((None, rng.uniform(1_000.0, 29_000.0))),
+                    "last_done_cycles": rng.choice((None, float(rng.randint(1_000, 39_000)))),
+                    "last_done_date": rng.choice((None, today - timedelta(days=rng.randint(0, 900)))),
+                    "status": program_models.AircraftProgramStatusEnum.PLANNED,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+                for program_id in program_ids
+            ],
+        )
+    db.commit()
+    return amo.id, serials
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default="sqlite+pysqlite:///:memory:")
+    parser.add_argument("--aircraft", type=int, default=200)
+    parser.add_argument("--items", type=int, default=400)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            fleet_models.Aircraft.__table__,
+            fleet_models.AircraftUsage.__table__,
+            fleet_models.AircraftUsageRollup.__table__,
+            program_models.AmpProgramItem.__table__,
+            program_models.AmpAircraftProgramItem.__table__,
+        ],
+    )
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_args):
+        statements["count"] += 1
+
+    today = date.today()
+    db = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    amo_id, serials = _seed(db, aircraft_count=args.aircraft, item_count=args.items, today=today)
+    counters = {
+        aircraft.serial_number: (float(aircraft.total_hours), float(aircraft.total_cycles))
+        for aircraft in db.query(fleet_models.Aircraft.serial_number, fleet_models.Aircraft.total_hours, fleet_models.Aircraft.total_cycles)
+    }
+    report: dict = {"aircraft": args.aircraft, "program_items": args.items, "dialect": engine.dialect.name}
+
+    db.expunge_all()
+    statements["count"] = 0
+    started = perf_counter()
+    items = due_engine.load_due_items(db, amo_id=amo_id, aircraft_serial_numbers=serials)
+    report["load"] = {"rows": len(items), "statements": statements["count"], "ms": round((perf_counter() - started) * 1000.0, 1)}
+
+    started = perf_counter()
+    per_item = []
+    for api in items:
+        hours, cycles = counters[api.aircraft_serial_number]
+        per_item.append(
+            service._calculate_due_state(
+                program_item=api.program_item,
+                api=api,
+                current_hours=hours,
+                current_cycles=cycles,
+                today=today,
+            )
+        )
+    report["per_item"] = {"ms": round((perf_counter() - started) * 1000.0, 1)}
+
+    started = perf_counter()
+    batched = due_engine.compute_due_states(items, counters=counters, today=today)
+    report["engine"] = {"ms": round((perf_counter() - started) * 1000.0, 1)}
+    db.close()
+
+    mismatched = [index for index, (left, right) in enumerate(zip(per_item, batched)) if left != right]
+    report["mismatched_items"] = mismatched[:20]
+    report["speedup"] = round(report["per_item"]["ms"] / max(report["engine"]["ms"], 0.001), 1)
+    EVIDENCE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EVIDENCE_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
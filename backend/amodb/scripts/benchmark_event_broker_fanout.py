@@ -0,0 +1,81 @@
+"""Micro-benchmark for EventBroker.publish fan-out cost.
+
+Publishes into 10,000 subscribers spread across 1,000 tenants twice: once with
+wildcard subscriptions (every queue receives every event, as the broker did
+before tenant partitioning) and once with tenant-keyed subscriptions. Also
+times ``replay_since`` lookups against a full replay deque. Pure in-process;
+no database required.
+
+Usage:
+    python -m amodb.scripts.benchmark_event_broker_fanout --events 500
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+from time import perf_counter
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from amodb.apps.events.broker import EventBroker, EventEnvelope  # noqa: E402
+
+
+def _event(index: int, tenants: int) -> EventEnvelope:
+    return EventEnvelope(
+        id=f"evt-{index}",
+        type="tasks.task.updated",
+        entityType="tasks.task",
+        entityId=str(index),
+        action="UPDATED",
+        timestamp="2026-10-16T00:00:00+00:00",
+        actor=None,
+        metadata={"amoId": f"tenant-{index % tenants}"},
+    )
+
+
+def _run(*, partitioned: bool, subscribers: int, tenants: int, events: int) -> dict:
+    broker = EventBroker()
+    queues = [
+        broker.subscribe(amo_id=f"tenant-{index % tenants}" if partitioned else None)
+        for index in range(subscribers)
+    ]
+    payload = [_event(index, tenants) for index in range(events)]
+    started = perf_counter()
+    for event in payload:
+        broker.publish(event)
+    elapsed = perf_counter() - started
+    enqueued = sum(q.qsize() for q in queues)
+
+    started = perf_counter()
+    for index in range(0, events, max(1, events // 200)):
+        broker.replay_since(last_event_id=f"evt-{index}", amo_id=f"tenant-{index % tenants}")
+    replay_elapsed = perf_counter() - started
+    return {
+        "mode": "tenant-partitioned" if partitioned else "broadcast",
+        "publish_total_ms": round(elapsed * 1000, 2),
+        "publish_per_event_us": round(elapsed / events * 1_000_000, 2),
+        "queue_wakeups": enqueued,
+        "replay_lookups_ms": round(replay_elapsed * 1000, 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--tenants", type=int, default=1_000)
+    parser.add_argument("--events", type=int, default=500)
+    args = parser.parse_args()
+    results = [
+        _run(partitioned=False, subscribers=args.subscribers, tenants=args.tenants, events=args.events),
+        _run(partitioned=True, subscribers=args.subscribers, tenants=args.tenants, events=args.events),
+    ]
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+"""Cross-worker SSE fan-out latency gate for the PostgreSQL event broker.
+
+Runs against a disposable PostgreSQL database (the ``event_broker_payloads``
+migration must be applied). Starts several listener processes that behave like
+separate Uvicorn workers, publishes events from this process the same way
+``audit.services.log_event`` does and reports publish-to-delivery latency per
+worker. A small share of events exceed the NOTIFY limit to exercise the
+overflow table path.
+
+Usage:
+    DATABASE_WRITE_URL=postgresql+psycopg2://... \\
+        python -m amodb.scripts.benchmark_event_broker_latency --workers 4 --events 500
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import queue
+import statistics
+import sys
+import time
+import uuid
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+MAX_P99_MS = 50.0
+EVIDENCE_PATH = Path("test-results/event-broker-latency.json")
+
+
+def _listener(run_id: str, expected: int, ready, results) -> None:
+    os.environ["EVENTS_BROKER_BACKEND"] = "postgres"
+    from amodb.apps.events.pg_broker import PostgresNotifyEventBroker
+
+    broker = PostgresNotifyEventBroker()
+    q = broker.subscribe()
+    broker.start()
+    deadline = time.monotonic() + 10
+    while not broker.stats()["listener_connected"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    ready.put(os.getpid())
+    latencies: list[float] = []
+    deadline = time.monotonic() + 60
+    while len(latencies) < expected and time.monotonic() < deadline:
+        try:
+            event = q.get(timeout=1)
+        except queue.Empty:
+            continue
+        if event.metadata.get("runId") != run_id:
+            continue
+        latencies.append((time.time() - float(event.metadata["publishedAt"])) * 1000.0)
+    broker.stop()
+    results.put(latencies)
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percentile / 100.0 * (len(ordered) - 1))))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--interval-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    os.environ["EVENTS_BROKER_BACKEND"] = "postgres"
+    from amodb.apps.events.broker import EventEnvelope
+    from amodb.apps.events.pg_broker import PostgresNotifyEventBroker
+
+    run_id = uuid.uuid4().hex
+    ctx = multiprocessing.get_context("spawn")
+    ready, results = ctx.Queue(), ctx.Queue()
+    workers = [ctx.Process(target=_listener, args=(run_id, args.events, ready, results)) for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        ready.get(timeout=30)
+
+    publisher = PostgresNotifyEventBroker()
+    for index in range(args.events):
+        note = "x" * 9000 if index % 50 == 0 else ""
+        publisher.publish(
+            EventEnvelope(
+                id=str(uuid.uuid4()),
+                type="benchmark.event.published",
+                entityType="benchmark.event",
+                entityId=str(index),
+                action="PUBLISHED",
+                timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                actor=None,
+                metadata={"amoId": "benchmark", "runId": run_id, "publishedAt": time.time(), "note": note},
+            )
+        )
+        time.sleep(args.interval_ms / 1000.0)
+
+    per_worker = [results.get(timeout=90) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=10)
+    publisher.stop()
+
+    merged = [value for rows in per_worker for value in rows]
+    evidence = {
+        "workers": args.workers,
+        "events": args.events,
+        "delivered": len(merged),
+        "expected": args.events * args.workers,
+        "p50_ms": round(statistics.median(merged), 3) if merged else None,
+        "p99_ms": round(_percentile(merged, 99), 3) if merged else None,
+        "max_ms": round(max(merged), 3) if merged else None,
+        "publisher": publisher.stats(),
+    }
+    EVIDENCE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EVIDENCE_PATH.write_text(json.dumps(evidence, indent=2, default=str), encoding="utf-8")
+    print(json.dumps(evidence, indent=2, default=str))
+    if evidence["delivered"] != evidence["expected"]:
+        return 1
+    return 0 if (evidence["p99_ms"] or 0.0) <= MAX_P99_MS else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
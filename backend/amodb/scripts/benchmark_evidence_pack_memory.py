@@ -0,0 +1,103 @@
+"""Peak Python memory while building an evidence pack: in-memory ZIP versus spooled streaming.
+
+Writes ``--attachments`` incompressible files of ``--attachment-mb`` each
+(photo-like ``.jpg`` and ``.pdf``) to a temp directory and builds the same
+pack two ways, tracking the ``tracemalloc`` peak and wall time:
+
+* ``in_memory``: every attachment read with ``read_bytes()`` and the archive
+  built in an ``io.BytesIO``, as ``exports.evidence_pack`` did before;
+* ``spooled``: ``_load_attachment`` plus ``_spooled_pack``, then reading the
+  pack back through ``_iter_spool`` as the HTTP response does.
+
+Run it with the API's environment (it imports the exports module, which
+needs a configured database URL; no queries are issued).
+
+Usage:
+    python -m amodb.scripts.benchmark_evidence_pack_memory --attachments 40 --attachment-mb 8
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+from time import perf_counter
+import tracemalloc
+import zipfile
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from amodb.apps.exports import evidence_pack
+
+EVIDENCE_PATH = Path("test-results/evidence-pack-memory.json")
+
+
+def _attachments(directory: Path, *, count: int, size_mb: int) -> list[tuple[str, Path]]:
+    files = []
+    for index in range(count):
+        path = directory / (f"photo-{index:03d}.jpg" if index % 2 else f"report-{index:03d}.pdf")
+        with path.open("wb") as handle:
+            for _ in range(size_mb):
+                handle.write(os.urandom(1024 * 1024))
+        files.append((f"attachments/{path.name}", path))
+    return files
+
+
+def _in_memory(files: list[tuple[str, Path]]) -> int:
+    entries = [("summary.json", evidence_pack._to_json_bytes({"pack": "benchmark"}))]
+    entries.extend((name, path.read_bytes()) for name, path in files)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            info = zipfile.ZipInfo(name, date_time=evidence_pack.ZIP_TIMESTAMP)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, data)
+    buffer.seek(0)
+    return len(buffer.read())
+
+
+def _spooled(files: list[tuple[str, Path]]) -> int:
+    entries: list = []
+    omitted: list = []
+    size = evidence_pack._add_entry(entries, "summary.json", {"pack": "benchmark"})
+    for name, path in files:
+        size += evidence_pack._load_attachment(entries, name=name, path=path, current_size=size, max_size=0, omitted=omitted)
+    spool, _pack_size = evidence_pack._spooled_pack(entries, {"omitted": omitted})
+    return sum(len(chunk) for chunk in evidence_pack._iter_spool(spool))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--attachments", type=int, default=40)
+    parser.add_argument("--attachment-mb", type=int, default=8)
+    args = parser.parse_args()
+
+    report: dict = {"attachments": args.attachments, "attachment_mb": args.attachment_mb, "modes": {}}
+    with tempfile.TemporaryDirectory(prefix="evidence-pack-bench-") as raw:
+        files = _attachments(Path(raw), count=args.attachments, size_mb=args.attachment_mb)
+        for name, build in (("in_memory", _in_memory), ("spooled", _spooled)):
+            tracemalloc.start()
+            started = perf_counter()
+            pack_bytes = build(files)
+            elapsed = perf_counter() - started
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            report["modes"][name] = {
+                "pack_mb": round(pack_bytes / (1024 * 1024), 1),
+                "peak_mb": round(peak / (1024 * 1024), 1),
+                "seconds": round(elapsed, 2),
+            }
+
+    EVIDENCE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EVIDENCE_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,176 @@
+"""Fleet planning utilisation: full usage-history scan versus the usage rollup.
+
+Seeds a disposable database with ``--aircraft`` aircraft and ``--years`` of
+daily ``aircraft_usage`` entries each (200 x 5 years is about 365k rows),
+builds ``aircraft_usage_rollups`` once with ``refresh_usage_rollups`` and then
+reads each aircraft's latest totals and 7-day hours two ways:
+
+* ``history_scan``: every usage row for the tenant, walked in Python, as
+  ``get_fleet_planning_overview`` did before (with eager relationship loads
+  switched off, so the baseline is if anything flattered);
+* ``rollup``: ``usage_rollup.load_usage_rollups`` (fresh rows, one read).
+
+``overview`` times the whole ``get_fleet_planning_overview`` call on top of
+the rollup. Results of both reads must agree.
+
+Usage:
+    python -m amodb.scripts.benchmark_fleet_usage_rollup --aircraft 200 --years 5
+    python -m amodb.scripts.benchmark_fleet_usage_rollup \\
+        --database-url postgresql+psycopg2://... --aircraft 200 --years 5
+"""
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from datetime import date, timedelta
+import json
+from pathlib import Path
+import sys
+from time import perf_counter
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import noload, sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.fleet import models as fleet_models
+from amodb.apps.fleet.usage_rollup import load_usage_rollups, refresh_usage_rollups
+from amodb.apps.maintenance_program import models as program_models
+from amodb.apps.maintenance_program import service as program_service
+from amodb.database import Base
+
+EVIDENCE_PATH = Path("test-results/fleet-usage-rollup.json")
+
+
+def _seed(db, *, aircraft_count: int, years: int, today: date) -> tuple[str, list[str]]:
+    amo = account_models.AMO(amo_code="BENCH-FLT", name="Fleet rollup benchmark", login_slug="bench-flt")
+    db.add(amo)
+    db.flush()
+    serials = [f"BF-{index:03d}" for index in range(aircraft_count)]
+    for index, serial in enumerate(serials):
+        db.add(fleet_models.Aircraft(serial_number=serial, registration=f"5Y-F{index:03d}", amo_id=amo.id))
+    db.flush()
+    days = years * 365
+    first_day = today - timedelta(days=days - 1)
+    for serial_index, serial in enumerate(serials):
+        rows = []
+        hours_total = 0.0
+        cycles_total = 0
+        for day in range(days):
+            hours = 2.0 + ((serial_index + day) % 7) * 0.5
+            hours_total += hours
+            cycles_total += 2
+            rows.append(
+                {
+                    "amo_id": amo.id,
+                    "aircraft_serial_number": serial,
+                    "date": first_day + timedelta(days=day),
+                    "techlog_no": f"TL-{serial}-{day:05d}",
+                    "block_hours": hours,
+                    "cycles": 2,
+                    "ttaf_after": round(hours_total, 2),
+                    "tca_after": float(cycles_total),
+                    "verification_status": "VERIFIED",
+                }
+            )
+        # Core inserts bypass the flush listener, so the rollup is built once below.
+        db.execute(fleet_models.AircraftUsage.__table__.insert(), rows)
+    db.commit()
+    return amo.id, serials
+
+
+def _history_scan(db, *, amo_id: str, serials: list[str], today: date) -> dict[str, tuple]:
+    rows = (
+        db.query(fleet_models.AircraftUsage)
+        .options(noload("*"))
+        .filter(fleet_models.AircraftUsage.amo_id == amo_id, fleet_models.AircraftUsage.aircraft_serial_number.in_(serials))
+        .order_by(
+            fleet_models.AircraftUsage.aircraft_serial_number.asc(),
+            fleet_models.AircraftUsage.date.desc(),
+            fleet_models.AircraftUsage.techlog_no.desc(),
+        )
+        .all()
+    )
+    latest: dict[str, fleet_models.AircraftUsage] = {}
+    seven_day: dict[str, float] = defaultdict(float)
+    cutoff = today - timedelta(days=6)
+    for usage in rows:
+        latest.setdefault(usage.aircraft_serial_number, usage)
+        if usage.date >= cutoff:
+            seven_day[usage.aircraft_serial_number] += float(usage.block_hours or 0.0)
+    return {serial: (latest[serial].ttaf_after, round(seven_day[serial], 2)) for serial in latest}
+
+
+def _rollup(db, *, amo_id: str, serials: list[str], today: date) -> dict[str, tuple]:
+    rollups = load_usage_rollups(db, amo_id=amo_id, serials=serials, as_of=today)
+    return {serial: (row.latest_ttaf_after, round(row.hours_7d, 2)) for serial, row in rollups.items()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default="sqlite+pysqlite:///:memory:")
+    parser.add_argument("--aircraft", type=int, default=200)
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            fleet_models.Aircraft.__table__,
+            fleet_models.AircraftUsage.__table__,
+            fleet_models.AircraftUsageRollup.__table__,
+            program_models.AmpProgramItem.__table__,
+            program_models.AmpAircraftProgramItem.__table__,
+        ],
+    )
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_args):
+        statements["count"] += 1
+
+    today = date.today()
+    db = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    started = perf_counter()
+    amo_id, serials = _seed(db, aircraft_count=args.aircraft, years=args.years, today=today)
+    report: dict = {
+        "aircraft": args.aircraft,
+        "usage_rows": args.aircraft * args.years * 365,
+        "dialect": engine.dialect.name,
+        "seed_ms": round((perf_counter() - started) * 1000.0, 1),
+    }
+    started = perf_counter()
+    refresh_usage_rollups(db.connection(), amo_id=amo_id, serials=serials, as_of=today)
+    db.commit()
+    report["rollup_build_ms"] = round((perf_counter() - started) * 1000.0, 1)
+
+    results = {}
+    for name, read in (("history_scan", _history_scan), ("rollup", _rollup)):
+        db.expunge_all()
+        statements["count"] = 0
+        started = perf_counter()
+        results[name] = read(db, amo_id=amo_id, serials=serials, today=today)
+        report[name] = {"statements": statements["count"], "ms": round((perf_counter() - started) * 1000.0, 2)}
+    db.expunge_all()
+    statements["count"] = 0
+    started = perf_counter()
+    program_service.get_fleet_planning_overview(db, amo_id=amo_id)
+    report["overview"] = {"statements": statements["count"], "ms": round((perf_counter() - started) * 1000.0, 2)}
+    db.close()
+
+    mismatched = [serial for serial in serials if results["history_scan"].get(serial) != results["rollup"].get(serial)]
+    report["mismatched_aircraft"] = mismatched[:20]
+    report["speedup"] = round(report["history_scan"]["ms"] / max(report["rollup"]["ms"], 0.001), 1)
+    EVIDENCE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EVIDENCE_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
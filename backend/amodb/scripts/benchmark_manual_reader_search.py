@@ -0,0 +1,164 @@
+"""Reader search latency on a 50k-block manual: substring scan versus ranked index.
+
+Needs a PostgreSQL database migrated to at least
+``document_control_261016_reader_search`` (for ``manual_search_vector``).
+Nothing is written to the real tables: the script creates session-local
+``TEMP`` copies of ``manual_sections`` and ``manual_blocks``, which shadow the
+real ones for this connection, indexes them like the migration does, seeds a
+synthetic maintenance manual and rolls everything back at the end.
+
+Each query is run two ways:
+
+* ``substring``: the ``ILIKE '%q%'`` section/block join the reader search used
+  before the index, fetching ``limit * 4`` rows;
+* ``ranked``: ``reader_search.search_sections``, including snippets.
+
+Usage:
+    python -m amodb.scripts.benchmark_manual_reader_search \\
+        --database-url postgresql+psycopg2://... --blocks 50000 --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import random
+import sys
+from time import perf_counter
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from amodb.apps.manuals import models
+from amodb.apps.manuals import reader_search
+
+EVIDENCE_PATH = Path("test-results/manual-reader-search.json")
+REVISION_ID = "bench-reader-search-revision"
+QUERIES = ["hydraulic", "hydr", '"landing gear"', "torque wrench", "AN960-10L", "an96010", "MS28775-228"]
+VOCABULARY = (
+    "inspect remove install torque wrench hydraulic pump actuator landing gear brake assembly seal "
+    "washer bolt nut cotter pin safety wire lubricate grease servicing panel access door fuel line "
+    "clamp bracket check operational test leak fitting reservoir pressure filter element replace"
+).split()
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round((percentile / 100.0) * (len(ordered) - 1)))))
+    return round(ordered[index], 2)
+
+
+def _seed(db, *, blocks: int, blocks_per_section: int) -> None:
+    for table in ("manual_sections", "manual_blocks"):
+        db.execute(text(f"CREATE TEMP TABLE {table} (LIKE public.{table} INCLUDING DEFAULTS)"))
+    db.execute(text("CREATE INDEX ON manual_sections (revision_id)"))
+    db.execute(text("CREATE INDEX ON manual_blocks (section_id)"))
+    db.execute(text("CREATE INDEX ON manual_blocks USING GIN (manual_search_vector(text_plain))"))
+    db.execute(text("CREATE INDEX ON manual_sections USING GIN (manual_search_vector(heading))"))
+    rng = random.Random(20261016)
+    part_numbers = [f"AN960-{size}{suffix}" for size in range(4, 20) for suffix in ("", "L")] + [
+        f"MS28775-{dash:03d}" for dash in range(100, 260)
+    ]
+    sections = []
+    rows = []
+    for section_index in range(max(1, blocks // blocks_per_section)):
+        section_id = f"bench-section-{section_index:06d}"
+        heading = " ".join(rng.sample(VOCABULARY, 3)).title()
+        sections.append(
+            {
+                "id": section_id,
+                "revision_id": REVISION_ID,
+                "order_index": section_index,
+                "heading": heading,
+                "anchor_slug": f"section-{section_index}",
+                "level": 2,
+                "metadata_json": {"page_start": section_index // 2 + 1},
+            }
+        )
+        for block_index in range(blocks_per_section):
+            words = rng.choices(VOCABULARY, k=rng.randint(25, 70))
+            if rng.random() < 0.2:
+                words.insert(rng.randrange(len(words)), rng.choice(part_numbers))
+            body = " ".join(words).capitalize() + "."
+            rows.append(
+                {
+                    "id": f"bench-block-{len(rows):07d}",
+                    "section_id": section_id,
+                    "order_index": block_index,
+                    "block_type": "paragraph",
+                    "html_sanitized": body,
+                    "text_plain": body,
+                    "change_hash": f"{len(rows):07d}",
+                }
+            )
+    db.execute(models.ManualSection.__table__.insert(), sections)
+    for start in range(0, len(rows), 5000):
+        db.execute(models.ManualBlock.__table__.insert(), rows[start : start + 5000])
+    db.execute(text("ANALYZE manual_sections"))
+    db.execute(text("ANALYZE manual_blocks"))
+
+
+def _substring(db, q: str, limit: int) -> int:
+    needle = f"%{q}%"
+    rows = (
+        db.query(models.ManualSection, models.ManualBlock)
+        .outerjoin(models.ManualBlock, models.ManualBlock.section_id == models.ManualSection.id)
+        .filter(
+            models.ManualSection.revision_id == REVISION_ID,
+            models.ManualSection.heading.ilike(needle) | models.ManualBlock.text_plain.ilike(needle),
+        )
+        .order_by(models.ManualSection.order_index.asc(), models.ManualBlock.order_index.asc())
+        .limit(limit * 4)
+        .all()
+    )
+    return len({section.id for section, _block in rows})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--blocks", type=int, default=50000)
+    parser.add_argument("--blocks-per-section", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=80)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("The reader search index is PostgreSQL-only; pass a postgresql:// URL")
+    db = sessionmaker(bind=engine, autoflush=False)()
+    report: dict = {"blocks": args.blocks, "repeat": args.repeat, "limit": args.limit, "queries": {}}
+    try:
+        started = perf_counter()
+        _seed(db, blocks=args.blocks, blocks_per_section=args.blocks_per_section)
+        report["seed_ms"] = round((perf_counter() - started) * 1000.0, 1)
+        for q in QUERIES:
+            entry: dict = {}
+            for name, run in (
+                ("substring", lambda: _substring(db, q, args.limit)),
+                ("ranked", lambda: len(reader_search.search_sections(db, [REVISION_ID], q, limit=args.limit))),
+            ):
+                latencies = []
+                for _ in range(args.repeat):
+                    started = perf_counter()
+                    count = run()
+                    latencies.append((perf_counter() - started) * 1000.0)
+                entry[name] = {"results": count, "p50_ms": _percentile(latencies, 50), "p99_ms": _percentile(latencies, 99)}
+            entry["p50_speedup"] = round(entry["substring"]["p50_ms"] / max(entry["ranked"]["p50_ms"], 0.001), 1)
+            report["queries"][q] = entry
+    finally:
+        db.rollback()
+        db.close()
+
+    EVIDENCE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EVIDENCE_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+"""Inspect latency for a small form: one-shot PDFium subprocess versus the warm pool.
+
+Builds a one-page AcroForm (two text fields and a checkbox) and inspects it
+repeatedly in two ways:
+
+* ``one_shot``: ``pdfium_service._run_worker_once``, which starts a fresh
+  interpreter and exchanges temp files for every call, as every call did
+  before the pool.
+* ``pool``: ``pdfium_service._run_worker`` through the warm worker pool. The
+  pool is warmed before timing, so the numbers describe steady state.
+
+Both must return identical inspection metadata; the report gives p50/p99 per
+mode plus the pool's own queue-wait statistics.
+
+Usage:
+    python -m amodb.scripts.benchmark_pdfium_worker_pool --calls 200 --pool-size 2
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+from time import perf_counter
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from amodb.apps.doc_control import pdfium_service
+
+EVIDENCE_PATH = Path("test-results/pdfium-worker-pool.json")
+
+
+def _small_form() -> bytes:
+    import pymupdf
+
+    document = pymupdf.open()
+    page = document.new_page(width=595, height=842)
+    page.insert_text((72, 72), "Release certificate", fontsize=14)
+    for index, (name, field_type) in enumerate(
+        (
+            ("work_order", pymupdf.PDF_WIDGET_TYPE_TEXT),
+            ("certifying_staff", pymupdf.PDF_WIDGET_TYPE_TEXT),
+            ("released", pymupdf.PDF_WIDGET_TYPE_CHECKBOX),
+        )
+    ):
+        widget = pymupdf.Widget()
+        widget.field_name = name
+        widget.field_type = field_type
+        widget.rect = pymupdf.Rect(72, 110 + index * 40, 260, 134 + index * 40)
+        page.add_widget(widget)
+    try:
+        return document.tobytes()
+    finally:
+        document.close()
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round((percentile / 100.0) * (len(ordered) - 1)))))
+    return round(ordered[index], 2)
+
+
+def _timed(run, content: bytes, calls: int) -> tuple[list[float], dict]:
+    latencies: list[float] = []
+    metadata: dict = {}
+    for _ in range(calls):
+        started = perf_counter()
+        metadata, _output = run("inspect", content)
+        latencies.append((perf_counter() - started) * 1000.0)
+    return latencies, metadata
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--one-shot-calls", type=int, default=30)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    content = _small_form()
+    report: dict = {"form_bytes": len(content), "pool_size": args.pool_size}
+
+    one_shot, one_shot_metadata = _timed(pdfium_service._run_worker_once, content, args.one_shot_calls)
+    report["one_shot"] = {"calls": len(one_shot), "p50_ms": _percentile(one_shot, 50), "p99_ms": _percentile(one_shot, 99)}
+
+    pdfium_service.WORKER_POOL_SIZE = max(1, args.pool_size)
+    pdfium_service._worker_pool().warm()
+    try:
+        pooled, pooled_metadata = _timed(pdfium_service._run_worker, content, args.calls)
+        report["pool"] = {"calls": len(pooled), "p50_ms": _percentile(pooled, 50), "p99_ms": _percentile(pooled, 99)}
+        report["pool_stats"] = pdfium_service.worker_pool_stats()
+    finally:
+        pdfium_service.stop_worker_pool()
+
+    report["identical_metadata"] = one_shot_metadata == pooled_metadata
+    report["p50_speedup"] = round(report["one_shot"]["p50_ms"] / max(report["pool"]["p50_ms"], 0.001), 1)
+    EVIDENCE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EVIDENCE_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    return 0 if report["identical_metadata"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
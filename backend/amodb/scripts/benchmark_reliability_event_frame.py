@@ -0,0 +1,189 @@
+"""ORM row lists versus the columnar event frame for the reliability dashboard.
+
+Seeds a disposable database with reliability events (500,000 by default) and
+builds the event-driven dashboard charts two ways:
+
+* ``orm``: load full ``ReliabilityEvent`` objects, as ``_load_events`` did,
+  and group them with per-event Python loops (totals, ATA Pareto, aircraft
+  and station groupings).
+* ``frame``: ``_load_event_frame`` followed by the frame-based chart
+  builders used by ``build_dashboard``.
+
+The report gives wall time and tracemalloc peak per path and fails when the
+shared groupings disagree.
+
+Usage:
+    python -m amodb.scripts.benchmark_reliability_event_frame --events 500000
+    python -m amodb.scripts.benchmark_reliability_event_frame \\
+        --database-url postgresql+psycopg2://... --events 500000
+"""
+from __future__ import annotations
+
+import argparse
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+import json
+from pathlib import Path
+import random
+import sys
+from time import perf_counter
+import tracemalloc
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.fleet import models as fleet_models
+from amodb.apps.reliability import models
+from amodb.apps.reliability.analytics_common import DISPATCH_EVENT_TYPES, _enum_value, _event_query, _event_totals
+from amodb.apps.reliability.analytics_component_charts import _component_reliability
+from amodb.apps.reliability.analytics_event_charts import (
+    _aircraft_performance,
+    _ata_pareto,
+    _event_mix,
+    _route_delay,
+    _station_delay,
+    _time_series,
+)
+from amodb.apps.reliability.analytics_frame import _load_event_frame
+from amodb.database import Base
+
+EVIDENCE_PATH = Path("test-results/reliability-event-frame.json")
+PERIOD_END = date(2026, 9, 30)
+PERIOD_DAYS = 365
+EVENT_TYPES = [
+    "TECHNICAL_DELAY", "TECHNICAL_CANCELLATION", "REPEAT_DEFECT", "UNSCHEDULED_REMOVAL",
+    "SCHEDULED_REMOVAL", "SHOP_FINDING", "NO_FAULT_FOUND", "PILOT_REPORT",
+]
+STATIONS = ["NBO", "MBA", "KIS", "EBB", "DAR", "ADD", "JNB", None]
+
+
+def _seed(db, *, events: int) -> str:
+    rng = random.Random(20261016)
+    amo = account_models.AMO(amo_code="BENCH-FRAME", name="Event frame benchmark", login_slug="bench-frame")
+    db.add(amo)
+    db.flush()
+    serials = [f"EF-{index:03d}" for index in range(40)]
+    for index, serial in enumerate(serials):
+        db.add(fleet_models.Aircraft(serial_number=serial, registration=f"5Y-F{index:03d}", amo_id=amo.id))
+    db.flush()
+    period_start = PERIOD_END - timedelta(days=PERIOD_DAYS - 1)
+    batch: list[dict] = []
+    for index in range(events):
+        event_type = rng.choice(EVENT_TYPES)
+        batch.append(
+            {
+                "amo_id": amo.id,
+                "aircraft_serial_number": rng.choice(serials + [None]),
+                "ata_chapter": rng.choice([None, *(f"{chapter:02d}" for chapter in range(21, 80))]),
+                "event_type": models.ReliabilityEventTypeEnum(event_type),
+                "occurred_at": datetime.combine(period_start + timedelta(days=rng.randrange(PERIOD_DAYS)), time(rng.randrange(24)), tzinfo=timezone.utc),
+                "origin_station": rng.choice(STATIONS),
+                "destination_station": rng.choice(STATIONS),
+                "delay_minutes": rng.randint(5, 240) if event_type == "TECHNICAL_DELAY" else None,
+                "part_number": f"PN-{rng.randrange(600):04d}" if "REMOVAL" in event_type or event_type in {"SHOP_FINDING", "NO_FAULT_FOUND"} else None,
+                "confirmed_failure": rng.random() < 0.3 if event_type == "SHOP_FINDING" else None,
+            }
+        )
+        if len(batch) == 20_000:
+            db.bulk_insert_mappings(models.ReliabilityEvent, batch)
+            batch = []
+    if batch:
+        db.bulk_insert_mappings(models.ReliabilityEvent, batch)
+    db.commit()
+    return amo.id
+
+
+def _filters(amo_id: str) -> dict:
+    return {
+        "amo_id": amo_id,
+        "period_start": PERIOD_END - timedelta(days=PERIOD_DAYS - 1),
+        "period_end": PERIOD_END,
+        "aircraft": set(),
+        "ata_chapters": set(),
+        "stations": set(),
+        "event_types": set(),
+        "severities": set(),
+        "source_systems": set(),
+    }
+
+
+def _orm_path(db, amo_id: str) -> dict:
+    """Uncapped ``_load_events`` plus the per-event loops the charts used to run."""
+    rows = _event_query(db, **_filters(amo_id)).order_by(models.ReliabilityEvent.occurred_at.asc()).all()
+    types = [_enum_value(row.event_type) for row in rows]
+    ata = Counter(row.ata_chapter or "UNALLOCATED" for row in rows)
+    aircraft: dict[str, int] = defaultdict(int)
+    station_delay: dict[str, int] = defaultdict(int)
+    for row, event_type in zip(rows, types):
+        aircraft[row.aircraft_serial_number or "FLEET/UNALLOCATED"] += 1
+        if event_type in DISPATCH_EVENT_TYPES:
+            station_delay[row.origin_station or "UNALLOCATED"] += max(int(row.delay_minutes or 0), 0)
+    return {
+        "events": len(rows),
+        "delay_minutes": sum(max(int(row.delay_minutes or 0), 0) for row in rows),
+        "ata_top": [list(item) for item in ata.most_common(20)],
+        "aircraft": dict(aircraft),
+        "station_delay": dict(sorted(station_delay.items(), key=lambda item: item[1], reverse=True)[:20]),
+    }
+
+
+def _frame_path(db, amo_id: str) -> dict:
+    frame = _load_event_frame(db, **_filters(amo_id))
+    totals = _event_totals(frame)
+    _time_series(frame, [], "MONTH")
+    _event_mix(frame)
+    _route_delay(frame)
+    _component_reliability(frame, 1.0, 1.0)
+    return {
+        "events": int(totals["events"]),
+        "delay_minutes": int(totals["delay_minutes"]),
+        "ata_top": [[point.key, point.metrics["count"]] for point in _ata_pareto(frame)],
+        "aircraft": {point.key: point.metrics["events"] for point in _aircraft_performance(frame, [])},
+        "station_delay": {point.key: point.metrics["delay_minutes"] for point in _station_delay(frame)},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default="sqlite+pysqlite:///:memory:")
+    parser.add_argument("--events", type=int, default=500_000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[account_models.AMO.__table__, fleet_models.Aircraft.__table__, models.ReliabilityEvent.__table__],
+    )
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    with SessionLocal() as db:
+        amo_id = _seed(db, events=args.events)
+
+    report: dict = {"events": args.events, "dialect": engine.dialect.name}
+    results = {}
+    for name, build in (("orm", _orm_path), ("frame", _frame_path)):
+        with SessionLocal() as db:
+            tracemalloc.start()
+            started = perf_counter()
+            results[name] = build(db, amo_id)
+            elapsed = perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        report[name] = {"ms": round(elapsed * 1000.0, 1), "peak_mib": round(peak / 2**20, 1)}
+
+    mismatched = [key for key in results["orm"] if results["orm"][key] != results["frame"][key]]
+    report["mismatched"] = mismatched
+    report["speedup"] = round(report["orm"]["ms"] / max(report["frame"]["ms"], 0.001), 1)
+    report["memory_ratio"] = round(report["orm"]["peak_mib"] / max(report["frame"]["peak_mib"], 0.001), 1)
+    EVIDENCE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EVIDENCE_PATH.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    print(json.dumps(report, indent=2, default=str))
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+"""Per-scope versus grouped reliability analytics on a seeded dataset.
+
+Seeds a disposable database with a fleet, daily utilisation and reliability
+events spread across many part numbers, then computes COMPONENT analytics two
+ways: the historical loop (one event count, one exposure sum and two filtered
+counts per scope) and ``advanced_services._scope_counts`` (one GROUP BY per
+table). Both results must agree; the report compares statement counts and
+wall time.
+
+Usage:
+    python -m amodb.scripts.benchmark_reliability_scope_analytics --part-numbers 400
+    python -m amodb.scripts.benchmark_reliability_scope_analytics \\
+        --database-url postgresql+psycopg2://... --part-numbers 400 --events 40000
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date, datetime, time, timedelta, timezone
+import json
+from pathlib import Path
+import random
+import sys
+from time import perf_counter
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.fleet import models as fleet_models
+from amodb.apps.reliability import advanced_services as services
+from amodb.apps.reliability import models as legacy
+from amodb.database import Base
+
+EVIDENCE_PATH = Path("test-results/reliability-scope-analytics.json")
+PERIOD_END = date(2026, 9, 30)
+PERIOD_DAYS = 90
+EVENT_TYPES = ["UNSCHEDULED_REMOVAL", "NO_FAULT_FOUND", "TECHNICAL_DELAY"]
+
+
+def _seed(db, *, aircraft_count: int, part_numbers: int, events: int) -> str:
+    rng = random.Random(20261016)
+    amo = account_models.AMO(amo_code="BENCH-REL", name="Reliability benchmark", login_slug="bench-rel")
+    db.add(amo)
+    db.flush()
+    serials = [f"BR-{index:03d}" for index in range(aircraft_count)]
+    for index, serial in enumerate(serials):
+        db.add(fleet_models.Aircraft(serial_number=serial, registration=f"5Y-B{index:03d}", amo_id=amo.id))
+    db.flush()
+    period_start = PERIOD_END - timedelta(days=PERIOD_DAYS - 1)
+    usage_rows = [
+        {
+            "amo_id": amo.id,
+            "aircraft_serial_number": serial,
+            "date": period_start + timedelta(days=day),
+            "techlog_no": f"TL-{serial}-{day}",
+            "block_hours": round(rng.uniform(4, 12), 1),
+            "cycles": rng.randint(2, 6),
+        }
+        for serial in serials
+        for day in range(PERIOD_DAYS)
+    ]
+    db.bulk_insert_mappings(fleet_models.AircraftUsage, usage_rows)
+    event_rows = [
+        {
+            "amo_id": amo.id,
+            "aircraft_serial_number": rng.choice(serials),
+            "part_number": f"PN-{rng.randrange(part_numbers):05d}",
+            "event_type": legacy.ReliabilityEventTypeEnum(rng.choice(EVENT_TYPES)),
+            "occurred_at": datetime.combine(period_start + timedelta(days=rng.randrange(PERIOD_DAYS)), time(12), tzinfo=timezone.utc),
+        }
+        for _ in range(events)
+    ]
+    db.bulk_insert_mappings(legacy.ReliabilityEvent, event_rows)
+    db.commit()
+    return amo.id
+
+
+def _per_scope(db, *, amo_id: str, scope_ids, period_start: date, period_end: date) -> dict:
+    """The loop ``analytics`` ran before the grouped engine, kept here as the baseline."""
+    event = legacy.ReliabilityEvent
+    usage = fleet_models.AircraftUsage
+    results = {}
+    for scope_id in scope_ids:
+        query = db.query(event).filter(
+            event.amo_id == amo_id,
+            event.occurred_at >= datetime.combine(period_start, time.min, tzinfo=timezone.utc),
+            event.occurred_at <= datetime.combine(period_end, time.max, tzinfo=timezone.utc),
+            event.part_number == scope_id,
+        )
+        exposure = (
+            db.query(func.coalesce(func.sum(usage.block_hours), 0))
+            .filter(usage.amo_id == amo_id, usage.date >= period_start, usage.date <= period_end)
+            .scalar()
+        )
+        results[scope_id] = services.ScopeCounts(
+            events=query.count(),
+            exposure=services.decimal_value(exposure),
+            removals=query.filter(event.event_type == legacy.ReliabilityEventTypeEnum.UNSCHEDULED_REMOVAL).count(),
+            no_fault_found=query.filter(event.event_type == legacy.ReliabilityEventTypeEnum.NO_FAULT_FOUND).count(),
+        )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default="sqlite+pysqlite:///:memory:")
+    parser.add_argument("--aircraft", type=int, default=20)
+    parser.add_argument("--part-numbers", type=int, default=400)
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            account_models.AMO.__table__,
+            fleet_models.Aircraft.__table__,
+            fleet_models.AircraftUsage.__table__,
+            fleet_models.AircraftUsageRollup.__table__,
+            legacy.ReliabilityEvent.__table__,
+        ],
+    )
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_args):
+        statements["count"] += 1
+
+    db = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    amo_id = _seed(db, aircraft_count=args.aircraft, part_numbers=args.part_numbers, events=args.events)
+    period_start = PERIOD_END - timedelta(days=PERIOD_DAYS - 1)
+    scope_ids = services._scope_ids(db, amo_id=amo_id, scope_type="COMPONENT")
+
+    report = {"scopes": len(scope_ids), "events": args.events, "dialect": engine.dialect.name}
+    timings = {}
+    for name, compute in (
+        ("per_scope", lambda: _per_scope(db, amo_id=amo_id, scope_ids=scope_ids, period_start=period_start, period_end=PERIOD_END)),
+        (
+            "grouped",
+            lambda: services._scope_counts(
+                db,
+                amo_id=amo_id,
+                period_start=period_start,
+                period_end=PERIOD_END,
+                scope_type="COMPONENT",
+                scope_ids=scope_ids,
+                event_types=[],
+                denominator_type="FH",
+                component_breakdown=True,
+            ),
+        ),
+    ):
+        statements["count"] = 0
+        started = perf_counter()
+        timings[name] = compute()
+        report[name] = {"statements": statements["count"], "ms": round((perf_counter() - started) * 1000.0, 2)}
+    db.close()
+
+    mismatched = [scope_id for scope_id in scope_ids if timings["per_scope"][scope_id] != timings["grouped"][scope_id]]
+    report["mismatched_scopes"] = mismatched[:20]
+    report["speedup"] = round(report["per_scope"]["ms"] / max(report["grouped"]["ms"], 0.001), 1)
+    EVIDENCE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EVIDENCE_PATH.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    print(json.dumps(report, indent=2, default=str))
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
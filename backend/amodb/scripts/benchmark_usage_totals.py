@@ -0,0 +1,164 @@
+"""Usage running totals after a back-dated correction: row replay versus one UPDATE.
+
+Seeds a disposable database with ``--entries`` daily techlog entries for one
+aircraft, corrects the block hours of the entry ``--position`` entries in,
+and brings every later total back in line two ways:
+
+* ``replay``: walk the later entries in order through the ORM, adding each
+  entry's block hours and cycles to its predecessor's totals, and flush;
+* ``windowed``: ``services.recalculate_usage_totals``, a single
+  ``UPDATE ... FROM`` driven by ``SUM() OVER``.
+
+Both runs start from the same seed and must leave identical totals.
+
+Usage:
+    python -m amodb.scripts.benchmark_usage_totals --entries 20000 --position 100
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date, timedelta
+from decimal import Decimal
+import json
+from pathlib import Path
+import sys
+from time import perf_counter
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import noload, sessionmaker
+
+from amodb.apps.accounts import models as account_models
+from amodb.apps.fleet import models as fleet_models
+from amodb.apps.fleet import services
+from amodb.database import Base
+
+EVIDENCE_PATH = Path("test-results/usage-totals.json")
+FIRST_DAY = date(2010, 1, 1)
+TOTAL_FIELDS = ("ttaf_after", "tca_after", "ttesn_after")
+
+
+def _session(database_url: str, entries: int):
+    engine = create_engine(database_url)
+    tables = [
+        account_models.AMO.__table__,
+        fleet_models.Aircraft.__table__,
+        fleet_models.AircraftUsage.__table__,
+        fleet_models.AircraftUsageRollup.__table__,
+    ]
+    Base.metadata.drop_all(bind=engine, tables=tables)
+    Base.metadata.create_all(bind=engine, tables=tables)
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_args):
+        statements["count"] += 1
+
+    db = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    amo = account_models.AMO(amo_code="BENCH-UT", name="Usage totals benchmark", login_slug="bench-ut")
+    db.add(amo)
+    db.flush()
+    db.add(fleet_models.Aircraft(serial_number="BU-1", registration="5Y-BUT", amo_id=amo.id))
+    db.flush()
+    rows = []
+    ttaf, tca = 5_000.0, 2_000.0
+    for day in range(entries):
+        hours = 1.0 + (day % 4) * 0.25
+        ttaf += hours
+        tca += 2
+        rows.append(
+            {
+                "amo_id": amo.id,
+                "aircraft_serial_number": "BU-1",
+                "date": FIRST_DAY + timedelta(days=day),
+                "techlog_no": f"TL-{day:06d}",
+                "block_hours": hours,
+                "cycles": 2.0,
+                "ttaf_after": ttaf,
+                "tca_after": tca,
+                "ttesn_after": ttaf - 3_800.0,
+                "verification_status": "VERIFIED",
+            }
+        )
+    db.execute(fleet_models.AircraftUsage.__table__.insert(), rows)
+    db.commit()
+    return db, amo.id, statements
+
+
+def _correct(db, position: int) -> fleet_models.AircraftUsage:
+    entry = (
+        db.query(fleet_models.AircraftUsage)
+        .options(noload("*"))
+        .filter(fleet_models.AircraftUsage.techlog_no == f"TL-{position:06d}")
+        .one()
+    )
+    entry.block_hours = entry.block_hours + Decimal("1.5")
+    for field in ("ttaf_after", "ttesn_after"):
+        setattr(entry, field, getattr(entry, field) + Decimal("1.5"))
+    return entry
+
+
+def _replay(db, entry: fleet_models.AircraftUsage) -> None:
+    later = (
+        db.query(fleet_models.AircraftUsage)
+        .options(noload("*"))
+        .filter(
+            fleet_models.AircraftUsage.aircraft_serial_number == entry.aircraft_serial_number,
+            fleet_models.AircraftUsage.date > entry.date,
+        )
+        .order_by(fleet_models.AircraftUsage.date, fleet_models.AircraftUsage.techlog_no)
+        .all()
+    )
+    previous = entry
+    for current in later:
+        current.ttaf_after = previous.ttaf_after + current.block_hours
+        current.tca_after = previous.tca_after + current.cycles
+        current.ttesn_after = previous.ttesn_after + current.block_hours
+        previous = current
+    db.flush()
+
+
+def _totals(db) -> list[tuple]:
+    usage = fleet_models.AircraftUsage
+    columns = [getattr(usage, field) for field in TOTAL_FIELDS]
+    return [tuple(row) for row in db.execute(select(usage.techlog_no, *columns).order_by(usage.date, usage.techlog_no))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default="sqlite+pysqlite:///:memory:")
+    parser.add_argument("--entries", type=int, default=20_000)
+    parser.add_argument("--position", type=int, default=100)
+    args = parser.parse_args()
+
+    report: dict = {"entries": args.entries, "corrected_position": args.position}
+    results = {}
+    for mode in ("replay", "windowed"):
+        db, amo_id, statements = _session(args.database_url, args.entries)
+        entry = _correct(db, args.position)
+        statements["count"] = 0
+        started = perf_counter()
+        if mode == "replay":
+            _replay(db, entry)
+        else:
+            services.recalculate_usage_totals(db, "BU-1", entry.date, entry.techlog_no, amo_id=amo_id)
+        db.commit()
+        report[mode] = {"statements": statements["count"], "ms": round((perf_counter() - started) * 1000.0, 1)}
+        results[mode] = _totals(db)
+        report["dialect"] = db.get_bind().dialect.name
+        db.close()
+
+    mismatched = [left[0] for left, right in zip(results["replay"], results["windowed"]) if left != right]
+    report["mismatched_entries"] = mismatched[:20]
+    report["speedup"] = round(report["replay"]["ms"] / max(report["windowed"]["ms"], 0.001), 1)
+    EVIDENCE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EVIDENCE_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
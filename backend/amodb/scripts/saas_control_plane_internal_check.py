@@ -120,9 +120,9 @@ REQUIRED: dict[Path, tuple[str, ...]] = {
     BACKEND_ROOT / "amodb/apps/platform/saas_usage.py": (
         "ON CONFLICT (amo_id, meter_key)",
         "usage_meters.used_units + EXCLUDED.used_units",
-        "def flush_with_requeue",
-        "application._api_usage_pending.get(pending_amo_id, 0) + quantity",
-        "application._flush_api_usage_metrics = flush_with_requeue",
+        "def record_usage_batch",
+        "class ApiUsageAggregator",
+        "self._requeue(batch, oldest)",
     ),
     BACKEND_ROOT / "amodb/apps/realtime/broker_auth.py": (
         'GATEWAY_SHARED_SUBSCRIPTION = "$share/amo-portal-gateway/amo/+/user/+/outbox"',
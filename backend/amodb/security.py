@@ -34,6 +34,7 @@ from argon2.exceptions import VerifyMismatchError, VerificationError, InvalidHas
 import bcrypt
 
 from .database import get_db
+from .identity_cache import CachedIdentity, detached_snapshot, identity_cache
 from amodb.apps.accounts import models as account_models
 from amodb.apps.accounts.models import AccountRole
 
@@ -79,6 +80,13 @@ CURRENT_AUTH_SESSION_ID: ContextVar[Optional[str]] = ContextVar(
     default=None,
 )
 
+# Request-scoped memo of the last verified access token, so middleware and the
+# auth dependency decode a bearer token once per request.
+_DECODED_ACCESS_TOKEN: ContextVar[Optional[tuple[str, dict]]] = ContextVar(
+    "decoded_access_token",
+    default=None,
+)
+
 
 # ---------------------------------------------------------------------------
 # PASSWORD HASHING
@@ -174,6 +182,20 @@ def get_current_auth_session_id() -> Optional[str]:
     return CURRENT_AUTH_SESSION_ID.get()
 
 
+def decode_access_token(token: str) -> dict:
+    """Verify and decode a bearer token, reusing this request's earlier decode.
+
+    Raises ``JWTError`` exactly like ``jwt.decode``. Only successful decodes are
+    memoised, and only for the identical token string.
+    """
+    memo = _DECODED_ACCESS_TOKEN.get()
+    if memo is not None and memo[0] == token:
+        return memo[1]
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    _DECODED_ACCESS_TOKEN.set((token, payload))
+    return payload
+
+
 def create_access_token(
     *,
     data: dict,
@@ -265,7 +287,7 @@ def get_current_user(
     only after this writer-side identity has authorized the requested operation.
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        payload = decode_access_token(token)
         user_id: Optional[Union[str, int]] = payload.get("sub")
         if user_id is None:
             raise _credentials_exception()
@@ -273,23 +295,38 @@ def get_current_user(
     except JWTError:
         raise _credentials_exception()
 
-    user = get_user_by_id(db, user_id)
-    if user is None:
-        raise _credentials_exception()
+    # A cache hit is an identity that passed every check below within the
+    # cache TTL and has not been invalidated since (see amodb.identity_cache).
+    # Expiry and token_revoked_at are still re-evaluated on every request.
+    cached = identity_cache.get(auth_session_id, user_id=str(user_id).strip())
+    if cached is not None:
+        user = cached.attach_user(db)
+        session_row_exists = cached.session_row_exists
+        session_user_id = cached.session_user_id
+        session_revoked_at = None
+        session_expiry = cached.session_expires_at
+    else:
+        cache_generation = identity_cache.generation()
+        user = get_user_by_id(db, user_id)
+        if user is None:
+            raise _credentials_exception()
+        auth_session = db.get(account_models.PortalAuthSession, auth_session_id)
+        session_row_exists = auth_session is not None
+        session_user_id = str(auth_session.user_id) if auth_session is not None else None
+        session_revoked_at = auth_session.revoked_at if auth_session is not None else None
+        session_expiry = auth_session.expires_at if auth_session is not None else None
+        if session_expiry is not None and session_expiry.tzinfo is None:
+            session_expiry = session_expiry.replace(tzinfo=timezone.utc)
 
     # New sessions are independently revocable. Tokens issued before this
     # migration remain valid through the legacy user-level revocation check
     # below, which permits a zero-downtime deployment after migrations run.
-    auth_session = db.get(account_models.PortalAuthSession, auth_session_id)
-    if payload.get("auth_session_managed") is True and auth_session is None:
+    if payload.get("auth_session_managed") is True and not session_row_exists:
         raise _credentials_exception()
-    if auth_session is not None:
-        session_expiry = auth_session.expires_at
-        if session_expiry is not None and session_expiry.tzinfo is None:
-            session_expiry = session_expiry.replace(tzinfo=timezone.utc)
+    if session_row_exists:
         if (
-            str(auth_session.user_id) != str(user.id)
-            or auth_session.revoked_at is not None
+            session_user_id != str(user.id)
+            or session_revoked_at is not None
             or session_expiry is None
             or session_expiry <= datetime.now(timezone.utc)
         ):
@@ -314,8 +351,20 @@ def get_current_user(
         if issued_at_dt is None or issued_at_dt + timedelta(seconds=2) <= revoked_dt:
             raise _credentials_exception()
 
+    if cached is None:
+        cached = CachedIdentity(
+            auth_session_id=auth_session_id,
+            user_id=str(user.id),
+            user=detached_snapshot(user),
+            session_row_exists=session_row_exists,
+            session_user_id=session_user_id,
+            session_expires_at=session_expiry,
+            expires_at=0.0,
+        )
+        identity_cache.put(cached, generation=cache_generation)
     setattr(user, "auth_session_id", auth_session_id)
     setattr(user, "_auth_session_id", auth_session_id)
+    setattr(user, "_identity_cache_entry", cached)
     return user
 
 
@@ -341,25 +390,37 @@ def get_current_active_user(
     if getattr(current_user, "is_superuser", False):
         active_amo_id = None
         effective_amo_id = None
+        cached = getattr(current_user, "_identity_cache_entry", None)
         try:
-            context = (
-                db.query(account_models.UserActiveContext)
-                .filter(account_models.UserActiveContext.user_id == str(current_user.id))
-                .first()
-            )
-            if context and context.active_amo_id:
-                amo = (
-                    db.query(account_models.AMO)
-                    .filter(
-                        account_models.AMO.id == context.active_amo_id,
-                        account_models.AMO.is_active.is_(True),
-                    )
+            if cached is not None and cached.context_loaded:
+                amo = cached.attach_active_amo(db)
+            else:
+                cache_generation = identity_cache.generation()
+                amo = None
+                context = (
+                    db.query(account_models.UserActiveContext)
+                    .filter(account_models.UserActiveContext.user_id == str(current_user.id))
                     .first()
                 )
-                if amo:
-                    active_amo_id = str(amo.id)
-                    effective_amo_id = str(amo.id)
-                    set_committed_value(current_user, "amo", amo)
+                if context and context.active_amo_id:
+                    amo = (
+                        db.query(account_models.AMO)
+                        .filter(
+                            account_models.AMO.id == context.active_amo_id,
+                            account_models.AMO.is_active.is_(True),
+                        )
+                        .first()
+                    )
+                if cached is not None:
+                    identity_cache.store_context(
+                        cached,
+                        active_amo=detached_snapshot(amo) if amo is not None else None,
+                        generation=cache_generation,
+                    )
+            if amo:
+                active_amo_id = str(amo.id)
+                effective_amo_id = str(amo.id)
+                set_committed_value(current_user, "amo", amo)
         except Exception:
             active_amo_id = None
             effective_amo_id = None
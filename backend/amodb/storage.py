@@ -5,6 +5,7 @@ import logging
 import os
 import re
 import shutil
+import sqlite3
 import tempfile
 import threading
 import time
@@ -133,12 +134,190 @@ def _cache_limits() -> tuple[int, int, float]:
     return max_bytes, max_age, interval
 
 
+_INDEX_NAME = ".amo-cache-index.sqlite3"
+_INDEX_LOCK = threading.Lock()
+_INDEXES: dict[str, sqlite3.Connection] = {}
+# Cache hits are buffered here (root -> name -> (size, last access)) and
+# written to the index in batches rather than on every read.
+_TOUCH_LOCK = threading.Lock()
+_PENDING_TOUCHES: dict[str, dict[str, tuple[int, float]]] = {}
+_LAST_TOUCH_FLUSH = 0.0
+_STATS_LOCK = threading.Lock()
+_STATS = {
+    "hits": 0,
+    "misses": 0,
+    "fills": 0,
+    "fill_failures": 0,
+    "evictions": 0,
+    "bytes_served_cache": 0,
+    "bytes_served_fill": 0,
+    "bytes_served_origin": 0,
+}
+
+
+def _count(field: str, amount: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[field] += amount
+
+
+def cache_stats() -> dict[str, float]:
+    with _STATS_LOCK:
+        stats: dict[str, float] = dict(_STATS)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def _is_cache_entry(name: str) -> bool:
+    return not (name.startswith("amo-upload-") or name.endswith(".downloading") or name.startswith(_INDEX_NAME))
+
+
+def _cache_rescan_interval() -> float:
+    return max(0.0, float(os.getenv("AMO_STORAGE_CACHE_RESCAN_SEC", "3600") or "0"))
+
+
+def _rescan_cache_index(connection: sqlite3.Connection, root: Path, now: float) -> None:
+    # Files that bypass the index (staging files other routes leave behind
+    # in the cache root, entries from older releases) join it with their
+    # mtime as last access; rows whose file has gone are dropped.
+    present: dict[str, tuple[int, float]] = {}
+    for item in root.iterdir():
+        if not _is_cache_entry(item.name):
+            continue
+        try:
+            stat = item.stat()
+        except OSError:
+            continue
+        if item.is_file():
+            present[item.name] = (stat.st_size, stat.st_mtime)
+    indexed = {name for (name,) in connection.execute("SELECT name FROM entries")}
+    connection.executemany(
+        "INSERT INTO entries VALUES (?, ?, ?)",
+        [(name, size, mtime) for name, (size, mtime) in present.items() if name not in indexed],
+    )
+    connection.executemany("DELETE FROM entries WHERE name = ?", [(name,) for name in indexed - present.keys()])
+    connection.execute("INSERT OR REPLACE INTO meta VALUES ('scanned_at', ?)", (str(now),))
+
+
+def _cache_index(root: Path) -> sqlite3.Connection:
+    """LRU index of the object cache, shared by every process using ``root``.
+
+    Entries are recorded as they are filled and touched, so eviction reads
+    the index instead of walking the directory. The directory is scanned
+    only when the index is created and then every
+    ``AMO_STORAGE_CACHE_RESCAN_SEC`` from ``cleanup_cache``. Callers hold
+    ``_INDEX_LOCK``.
+    """
+
+    key = str(root)
+    connection = _INDEXES.get(key)
+    if connection is not None:
+        return connection
+    root.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(str(root / _INDEX_NAME), timeout=5.0, isolation_level=None, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS entries (name TEXT PRIMARY KEY, size_bytes INTEGER NOT NULL, last_access REAL NOT NULL)"
+    )
+    connection.execute("CREATE INDEX IF NOT EXISTS ix_entries_last_access ON entries (last_access)")
+    connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        if connection.execute("SELECT 1 FROM meta WHERE key = 'scanned_at'").fetchone() is None:
+            _rescan_cache_index(connection, root, time.time())
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        connection.close()
+        raise
+    _INDEXES[key] = connection
+    return connection
+
+
+def _touch_flush_interval() -> float:
+    return max(0.0, float(os.getenv("AMO_STORAGE_CACHE_TOUCH_FLUSH_SEC", "30") or "0"))
+
+
+# Index maintenance is best-effort: the index only orders eviction, so a
+# locked or damaged index must never fail a read the cache could serve. The
+# next rescan reconciles whatever was missed.
+
+
+def _record_cache_entry(path: Path) -> None:
+    try:
+        size = path.stat().st_size
+        with _INDEX_LOCK:
+            _cache_index(path.parent).execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (path.name, size, time.time())
+            )
+    except (OSError, sqlite3.Error):
+        logger.warning("Unable to record %s in the object cache index", path.name, exc_info=True)
+
+
+def _take_cache_touches(root: str | None = None) -> dict[str, dict[str, tuple[int, float]]]:
+    global _LAST_TOUCH_FLUSH
+    with _TOUCH_LOCK:
+        if root is None:
+            touches = dict(_PENDING_TOUCHES)
+            _PENDING_TOUCHES.clear()
+            _LAST_TOUCH_FLUSH = time.time()
+            return touches
+        pending = _PENDING_TOUCHES.pop(root, None)
+        return {root: pending} if pending else {}
+
+
+def _write_cache_touches(connection: sqlite3.Connection, touches: dict[str, tuple[int, float]]) -> None:
+    connection.executemany(
+        "INSERT INTO entries VALUES (?, ?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET last_access = MAX(last_access, excluded.last_access)",
+        [(name, size, last_access) for name, (size, last_access) in touches.items()],
+    )
+
+
+def _flush_cache_touches() -> None:
+    """Write buffered cache hits to the index; dropped if it is unavailable."""
+    for root, touches in _take_cache_touches().items():
+        try:
+            with _INDEX_LOCK:
+                _write_cache_touches(_cache_index(Path(root)), touches)
+        except sqlite3.Error:
+            logger.warning("Unable to update the object cache index; %s access times dropped", len(touches), exc_info=True)
+
+
+def _touch_cache_entry(path: Path) -> None:
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return
+    now = time.time()
+    with _TOUCH_LOCK:
+        _PENDING_TOUCHES.setdefault(str(path.parent), {})[path.name] = (size, now)
+        due = now - _LAST_TOUCH_FLUSH >= _touch_flush_interval()
+    if due:
+        _flush_cache_touches()
+
+
+def _forget_cache_entry(path: Path) -> None:
+    with _TOUCH_LOCK:
+        _PENDING_TOUCHES.get(str(path.parent), {}).pop(path.name, None)
+    try:
+        with _INDEX_LOCK:
+            _cache_index(path.parent).execute("DELETE FROM entries WHERE name = ?", (path.name,))
+    except sqlite3.Error:
+        logger.warning("Unable to drop %s from the object cache index", path.name, exc_info=True)
+
+
 def cleanup_cache(*, force: bool = False, reserve_bytes: int = 0, protected: Path | None = None) -> dict[str, int]:
     """Bound the ephemeral object cache by age and total bytes.
 
-    Files named ``amo-upload-*`` or ``*.downloading`` are active staging files
-    and are never selected for eviction. Cleanup is rate-limited by default so
-    request paths do not repeatedly scan the cache directory.
+    Candidates come from the cache index in least-recently-used order, so
+    cleanup costs an indexed query rather than a directory walk; buffered
+    cache hits are written first. If the index is unavailable, nothing is
+    evicted this round. Active
+    staging files (``amo-upload-*``, ``*.downloading``) are never indexed and
+    so never evicted. Cleanup is rate-limited by default so request paths do
+    not repeatedly evict.
     """
 
     global _LAST_CACHE_CLEANUP
@@ -149,45 +328,58 @@ def cleanup_cache(*, force: bool = False, reserve_bytes: int = 0, protected: Pat
     if not force and interval and now - _LAST_CACHE_CLEANUP < interval:
         return {"removed": 0, "bytes_removed": 0}
 
-    removed = 0
-    bytes_removed = 0
-    protected_resolved = protected.resolve() if protected is not None else None
+    protected_name = protected.name if protected is not None and protected.parent.resolve() == root else None
+    victims: list[tuple[str, int]] = []
     with _CACHE_CLEANUP_LOCK:
         now = time.time()
         if not force and interval and now - _LAST_CACHE_CLEANUP < interval:
             return {"removed": 0, "bytes_removed": 0}
         _LAST_CACHE_CLEANUP = now
-        files: list[tuple[Path, os.stat_result]] = []
-        for item in root.iterdir():
-            if not item.is_file() or item.name.startswith("amo-upload-") or item.name.endswith(".downloading"):
-                continue
-            try:
-                resolved = item.resolve()
-                stat = item.stat()
-            except OSError:
-                continue
-            if protected_resolved is not None and resolved == protected_resolved:
-                files.append((item, stat))
-                continue
-            if max_age and now - stat.st_mtime > max_age:
-                item.unlink(missing_ok=True)
-                removed += 1
-                bytes_removed += stat.st_size
-                continue
-            files.append((item, stat))
-
-        if max_bytes:
-            target = max(0, max_bytes - max(0, reserve_bytes))
-            candidates = [(item, stat) for item, stat in files if protected_resolved is None or item.resolve() != protected_resolved]
-            total = sum(stat.st_size for _, stat in candidates)
-            for item, stat in sorted(candidates, key=lambda pair: pair[1].st_mtime):
-                if total <= target:
-                    break
-                item.unlink(missing_ok=True)
-                total -= stat.st_size
-                removed += 1
-                bytes_removed += stat.st_size
-    return {"removed": removed, "bytes_removed": bytes_removed}
+        try:
+            with _INDEX_LOCK:
+                index = _cache_index(root)
+                index.execute("BEGIN IMMEDIATE")
+                try:
+                    for touches in _take_cache_touches(str(root)).values():
+                        _write_cache_touches(index, touches)
+                    scanned = index.execute("SELECT value FROM meta WHERE key = 'scanned_at'").fetchone()
+                    rescan = _cache_rescan_interval()
+                    if rescan and (scanned is None or now - float(scanned[0]) >= rescan):
+                        _rescan_cache_index(index, root, now)
+                    if max_age:
+                        victims.extend(
+                            index.execute(
+                                "SELECT name, size_bytes FROM entries WHERE last_access < ? AND name IS NOT ?",
+                                (now - max_age, protected_name),
+                            ).fetchall()
+                        )
+                    if max_bytes:
+                        target = max(0, max_bytes - max(0, reserve_bytes))
+                        aged = {name for name, _size in victims}
+                        total = int(index.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()[0])
+                        total -= sum(size for _name, size in victims)
+                        for name, size in index.execute(
+                            "SELECT name, size_bytes FROM entries WHERE name IS NOT ? ORDER BY last_access", (protected_name,)
+                        ):
+                            if total <= target:
+                                break
+                            if name in aged:
+                                continue
+                            victims.append((name, size))
+                            total -= size
+                    index.executemany("DELETE FROM entries WHERE name = ?", [(name,) for name, _size in victims])
+                    index.execute("COMMIT")
+                except Exception:
+                    index.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error:
+            logger.warning("Object cache index unavailable; skipping cache cleanup", exc_info=True)
+            return {"removed": 0, "bytes_removed": 0}
+    for name, _size in victims:
+        (root / name).unlink(missing_ok=True)
+    if victims:
+        _count("evictions", len(victims))
+    return {"removed": len(victims), "bytes_removed": sum(size for _name, size in victims)}
 
 
 @dataclass(frozen=True)
@@ -253,6 +445,134 @@ def _parse_s3(uri: str) -> tuple[str, str]:
     return parsed.netloc, parsed.path.lstrip("/")
 
 
+def _cache_name(uri: str, key: str, expected_sha256: str | None) -> str:
+    # With a known checksum the entry is content-addressed: every URI holding
+    # the same bytes shares one cache file, and a hit needs no re-hash
+    # because the name is only ever assigned after verification.
+    suffix = Path(key).suffix[:16]
+    checksum = str(expected_sha256 or "").strip().lower()
+    if re.fullmatch(r"[0-9a-f]{64}", checksum):
+        return f"sha256-{checksum}{suffix}"
+    return f"{hashlib.sha256(uri.encode()).hexdigest()}{suffix}"
+
+
+class _Fill:
+    """One in-flight download into the cache that readers can follow."""
+
+    def __init__(self, target: Path) -> None:
+        self.target = target
+        self.temporary = target.with_name(f".{target.name}.{uuid4().hex}.downloading")
+        self.size: int | None = None
+        self.written = 0
+        self.done = False
+        self.error: BaseException | None = None
+        self.cond = threading.Condition()
+
+    def wait(self) -> Path:
+        with self.cond:
+            while not self.done:
+                self.cond.wait()
+        if self.error is not None:
+            raise self.error
+        return self.target
+
+    def wait_for_size(self) -> int:
+        with self.cond:
+            while self.size is None and not self.done:
+                self.cond.wait()
+            if self.size is None:
+                raise self.error or IOError("Object download failed")
+            return self.size
+
+
+_FILLS: dict[str, _Fill] = {}
+_FILLS_LOCK = threading.Lock()
+_FILL_CHUNK_BYTES = 1024 * 1024
+
+
+def _fill_ahead_bytes() -> int:
+    # A range starting further than this past the downloaded bytes is
+    # fetched from the origin directly instead of waiting for the fill.
+    return max(0, int(os.getenv("AMO_STORAGE_FILL_AHEAD_BYTES", str(4 * 1024 * 1024)) or "0"))
+
+
+def _run_fill(fill: _Fill, bucket: str, key: str, expected_sha256: str | None) -> None:
+    digest = hashlib.sha256()
+    try:
+        response = _client().get_object(Bucket=bucket, Key=key)
+        with fill.temporary.open("xb") as handle:
+            # Readers open the temporary file once the size is known.
+            with fill.cond:
+                fill.size = int(response.get("ContentLength") or 0)
+                fill.cond.notify_all()
+            for chunk in response["Body"].iter_chunks(_FILL_CHUNK_BYTES):
+                handle.write(chunk)
+                handle.flush()
+                digest.update(chunk)
+                with fill.cond:
+                    fill.written += len(chunk)
+                    fill.cond.notify_all()
+        if fill.written != fill.size:
+            raise IOError("Object download ended early")
+        if expected_sha256 and digest.hexdigest() != expected_sha256.strip().lower():
+            raise IOError("Object checksum verification failed")
+        cleanup_cache(force=True, reserve_bytes=fill.written, protected=fill.temporary)
+        with fill.cond:
+            # Readers open the temporary file under this lock, so none can
+            # miss the rename.
+            os.replace(fill.temporary, fill.target)
+            fill.done = True
+            fill.cond.notify_all()
+        _record_cache_entry(fill.target)
+        _count("fills")
+    except BaseException as exc:
+        fill.temporary.unlink(missing_ok=True)
+        _count("fill_failures")
+        with fill.cond:
+            fill.error = exc
+            fill.done = True
+            fill.cond.notify_all()
+    finally:
+        with _FILLS_LOCK:
+            if _FILLS.get(str(fill.target)) is fill:
+                del _FILLS[str(fill.target)]
+
+
+def _cached_or_fill(uri: str, expected_sha256: str | None, *, background: bool) -> Path | _Fill:
+    """The cache file for ``uri`` if present, else the (possibly shared) fill producing it."""
+    bucket, key = _parse_s3(uri)
+    root = cache_root()
+    root.mkdir(parents=True, exist_ok=True)
+    target = root / _cache_name(uri, key, expected_sha256)
+    if target.is_file():
+        # URI-named entries predate the checksum being known, so re-verify.
+        if not expected_sha256 or target.name.startswith("sha256-") or _sha256(target) == expected_sha256:
+            _count("hits")
+            _touch_cache_entry(target)
+            return target
+        target.unlink(missing_ok=True)
+        _forget_cache_entry(target)
+    with _FILLS_LOCK:
+        fill = _FILLS.get(str(target))
+        starter = None
+        if fill is None and not target.is_file():
+            fill = _FILLS[str(target)] = _Fill(target)
+            starter = threading.Thread(target=_run_fill, args=(fill, bucket, key, expected_sha256), name="storage-fill", daemon=True)
+    if fill is None:
+        # Another fill finished between the first check and the lock.
+        _count("hits")
+        _touch_cache_entry(target)
+        return target
+    _count("misses")
+    if starter is not None:
+        cleanup_cache()
+        if background:
+            starter.start()
+        else:
+            starter.run()
+    return fill
+
+
 def materialize(uri: str, *, expected_sha256: str | None = None) -> Path:
     if not str(uri or "").startswith("s3://"):
         path = Path(uri).resolve()
@@ -265,32 +585,102 @@ def materialize(uri: str, *, expected_sha256: str | None = None) -> Path:
             raise FileNotFoundError(str(path))
         return path
 
+    cached = _cached_or_fill(uri, expected_sha256, background=False)
+    return cached if isinstance(cached, Path) else cached.wait()
+
+
+def object_size(uri: str, *, expected_sha256: str | None = None) -> int:
+    """Size of the object behind ``uri`` without downloading it."""
+    if not str(uri or "").startswith("s3://"):
+        return materialize(uri).stat().st_size
     bucket, key = _parse_s3(uri)
-    root = cache_root()
-    root.mkdir(parents=True, exist_ok=True)
-    cleanup_cache()
-    suffix = Path(key).suffix[:16]
-    digest = hashlib.sha256(uri.encode()).hexdigest()
-    target = root / f"{digest}{suffix}"
+    target = cache_root() / _cache_name(uri, key, expected_sha256)
+    with _FILLS_LOCK:
+        fill = _FILLS.get(str(target))
+    if fill is not None:
+        return fill.wait_for_size()
     if target.is_file():
-        if not expected_sha256 or _sha256(target) == expected_sha256:
-            try:
-                os.utime(target, None)
-            except OSError:
-                pass
-            return target
-        target.unlink(missing_ok=True)
-    temporary = target.with_name(f".{target.name}.downloading")
-    try:
-        _client().download_file(bucket, key, str(temporary))
-        if expected_sha256 and _sha256(temporary) != expected_sha256:
-            raise IOError("Object checksum verification failed")
-        cleanup_cache(force=True, reserve_bytes=temporary.stat().st_size, protected=temporary)
-        os.replace(temporary, target)
-        return target
-    except Exception:
-        temporary.unlink(missing_ok=True)
-        raise
+        return target.stat().st_size
+    return int(_client().head_object(Bucket=bucket, Key=key)["ContentLength"])
+
+
+def _iter_path(path: Path, start: int, end: int, *, counter: str):
+    with path.open("rb") as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(_FILL_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            _count(counter, len(chunk))
+            yield chunk
+
+
+def _iter_fill(fill: _Fill, start: int, end: int):
+    with fill.cond:
+        while fill.size is None and not fill.done:
+            fill.cond.wait()
+        if fill.error is not None:
+            raise IOError("Object download failed verification while it was being served") from fill.error
+        handle = (fill.target if fill.done else fill.temporary).open("rb")
+    with handle:
+        position = start
+        while position <= end:
+            with fill.cond:
+                while fill.written <= position and not fill.done:
+                    fill.cond.wait()
+                if fill.error is not None:
+                    raise IOError("Object download failed verification while it was being served") from fill.error
+                available = fill.written if not fill.done else (fill.size or 0)
+            handle.seek(position)
+            chunk = handle.read(min(_FILL_CHUNK_BYTES, end - position + 1, max(0, available - position)))
+            if not chunk:
+                break
+            position += len(chunk)
+            _count("bytes_served_fill", len(chunk))
+            yield chunk
+    if position >= (fill.size or 0):
+        # A read that reaches the end waits for the checksum, so a corrupt
+        # object aborts the response instead of completing it.
+        try:
+            fill.wait()
+        except BaseException as exc:
+            raise IOError("Object download failed verification while it was being served") from exc
+
+
+def _iter_origin(bucket: str, key: str, start: int, end: int):
+    response = _client().get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")
+    for chunk in response["Body"].iter_chunks(_FILL_CHUNK_BYTES):
+        _count("bytes_served_origin", len(chunk))
+        yield chunk
+
+
+def iter_range(uri: str, start: int, end: int, *, expected_sha256: str | None = None):
+    """Yield bytes ``start``..``end`` (inclusive) of ``uri``.
+
+    S3 objects are served from the cache when present. Otherwise a
+    background fill is started (or joined) and the range is served from the
+    growing cache file as soon as its bytes land; a range far beyond the
+    fill's progress, such as a PDF reader fetching the trailer first, is read
+    from S3 directly. Bytes served during a fill precede the checksum check,
+    which still decides whether the download enters the cache.
+    """
+
+    if not str(uri or "").startswith("s3://"):
+        yield from _iter_path(materialize(uri), start, end, counter="bytes_served_cache")
+        return
+    cached = _cached_or_fill(uri, expected_sha256, background=True)
+    if isinstance(cached, Path):
+        yield from _iter_path(cached, start, end, counter="bytes_served_cache")
+        return
+    with cached.cond:
+        ahead = start - cached.written
+    if ahead > _fill_ahead_bytes():
+        bucket, key = _parse_s3(uri)
+        yield from _iter_origin(bucket, key, start, end)
+        return
+    yield from _iter_fill(cached, start, end)
 
 
 def delete(uri: str) -> None:
@@ -299,8 +689,10 @@ def delete(uri: str) -> None:
     if uri.startswith("s3://"):
         bucket, key = _parse_s3(uri)
         _client().delete_object(Bucket=bucket, Key=key)
-        cached = cache_root() / f"{hashlib.sha256(uri.encode()).hexdigest()}{Path(key).suffix[:16]}"
+        # Content-addressed entries may back other URIs and age out via LRU.
+        cached = cache_root() / _cache_name(uri, key, None)
         cached.unlink(missing_ok=True)
+        _forget_cache_entry(cached)
         return
     path = Path(uri).resolve()
     root = local_root()
@@ -0,0 +1,381 @@
+"""Bounded, tenant-scoped in-process caches for read models.
+
+Modules that memoise expensive read payloads (dashboards, live summaries,
+provider quotes, platform settings) create one named namespace here instead of
+a private module dict:
+
+    _DASHBOARD_CACHE = tenant_cache.namespace("quality.dashboard", ttl_seconds=5, max_entries=2048)
+    payload = _DASHBOARD_CACHE.get_or_load(key, loader, tenant_id=amo_id)
+
+Every namespace is an LRU with a TTL and a hard entry bound. Concurrent misses
+for the same key are single-flighted so one caller runs the loader while the
+others wait for its result. Values are frozen on store (dicts and lists become
+read-only subclasses), so hits are returned without copying and a caller that
+needs to mutate must ``thaw()`` first.
+
+Entries are indexed by tenant. ``clear_tenant`` drops one tenant from every
+namespace in this process and, given a PostgreSQL session, emits ``pg_notify``
+so every API process does the same once the transaction commits. That is the
+runtime behind the ``CLEAR_TENANT_CACHE`` platform command.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "amodb_tenant_cache"
+GLOBAL_TENANT = ""
+
+T = TypeVar("T")
+
+
+class FrozenDict(dict):
+    """A ``dict`` that refuses mutation; serialises and compares like a dict."""
+
+    __slots__ = ()
+
+    def _readonly(self, *_args, **_kwargs):
+        raise TypeError("Cached values are read-only; thaw() the value before modifying it.")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo) -> dict:
+        return thaw(self)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class FrozenList(list):
+    """A ``list`` that refuses mutation; serialises and compares like a list."""
+
+    __slots__ = ()
+
+    def _readonly(self, *_args, **_kwargs):
+        raise TypeError("Cached values are read-only; thaw() the value before modifying it.")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo) -> list:
+        return thaw(self)
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Return a read-only deep copy of JSON-like containers; other values pass through."""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    if isinstance(value, tuple):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Return a mutable deep copy of a frozen value."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(thaw(item) for item in value)
+    return value
+
+
+class _Flight:
+    __slots__ = ("done", "value", "failed")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.failed = False
+
+
+_MISSING = object()
+
+
+class CacheNamespace:
+    def __init__(
+        self,
+        name: str,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        freeze_values: bool = True,
+        load_wait_seconds: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = max(1, int(max_entries))
+        self.freeze_values = freeze_values
+        self.load_wait_seconds = load_wait_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple[str, Hashable], tuple[float, Any]]" = OrderedDict()
+        self._by_tenant: dict[str, set[Hashable]] = {}
+        self._generations: dict[str, int] = {}
+        self._global_generation = 0
+        self._inflight: dict[tuple[str, Hashable], _Flight] = {}
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "load_failures": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "stale_fills": 0,
+        }
+
+    @staticmethod
+    def _tenant(tenant_id: Optional[str]) -> str:
+        return str(tenant_id) if tenant_id else GLOBAL_TENANT
+
+    def _generation_locked(self, tenant: str) -> tuple[int, int]:
+        return self._global_generation, self._generations.get(tenant, 0)
+
+    def _drop_locked(self, full_key: tuple[str, Hashable]) -> None:
+        if self._entries.pop(full_key, None) is None:
+            return
+        keys = self._by_tenant.get(full_key[0])
+        if keys is not None:
+            keys.discard(full_key[1])
+            if not keys:
+                del self._by_tenant[full_key[0]]
+
+    def _lookup_locked(self, full_key: tuple[str, Hashable], now: float) -> Any:
+        entry = self._entries.get(full_key)
+        if entry is None:
+            return _MISSING
+        if entry[0] <= now:
+            self._drop_locked(full_key)
+            self._counters["expirations"] += 1
+            return _MISSING
+        self._entries.move_to_end(full_key)
+        return entry[1]
+
+    def get(self, key: Hashable, *, tenant_id: Optional[str] = None, default: Any = None) -> Any:
+        full_key = (self._tenant(tenant_id), key)
+        with self._lock:
+            value = self._lookup_locked(full_key, time.monotonic())
+            self._counters["hits" if value is not _MISSING else "misses"] += 1
+        return default if value is _MISSING else value
+
+    def _store(
+        self,
+        full_key: tuple[str, Hashable],
+        value: Any,
+        *,
+        ttl_seconds: Optional[float],
+        generation: Optional[tuple[int, int]] = None,
+    ) -> Any:
+        stored = freeze(value) if self.freeze_values else value
+        ttl = self.ttl_seconds if ttl_seconds is None else float(ttl_seconds)
+        with self._lock:
+            if generation is not None and generation != self._generation_locked(full_key[0]):
+                # The tenant was cleared while this value was being computed.
+                self._counters["stale_fills"] += 1
+                return stored
+            self._drop_locked(full_key)
+            self._entries[full_key] = (time.monotonic() + ttl, stored)
+            self._by_tenant.setdefault(full_key[0], set()).add(full_key[1])
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop_locked(oldest)
+                self._counters["evictions"] += 1
+        return stored
+
+    def set(self, key: Hashable, value: T, *, tenant_id: Optional[str] = None, ttl_seconds: Optional[float] = None) -> T:
+        """Store ``value`` and return the (frozen) instance now held by the cache."""
+        return self._store((self._tenant(tenant_id), key), value, ttl_seconds=ttl_seconds)
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], T],
+        *,
+        tenant_id: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> T:
+        """Return the cached value or run ``loader`` once for all concurrent callers.
+
+        Loader exceptions propagate to the caller that ran it and are never
+        cached; callers that were waiting on a failed load run the loader
+        themselves.
+        """
+        full_key = (self._tenant(tenant_id), key)
+        with self._lock:
+            value = self._lookup_locked(full_key, time.monotonic())
+            if value is not _MISSING:
+                self._counters["hits"] += 1
+                return value
+            self._counters["misses"] += 1
+            flight = self._inflight.get(full_key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[full_key] = flight
+                generation = self._generation_locked(full_key[0])
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            if flight.done.wait(self.load_wait_seconds) and not flight.failed:
+                return flight.value
+            return loader()
+
+        try:
+            with self._lock:
+                self._counters["loads"] += 1
+            flight.value = self._store(full_key, loader(), ttl_seconds=ttl_seconds, generation=generation)
+            return flight.value
+        except BaseException:
+            flight.failed = True
+            with self._lock:
+                self._counters["load_failures"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(full_key, None)
+            flight.done.set()
+
+    def invalidate(self, key: Hashable, *, tenant_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._drop_locked((self._tenant(tenant_id), key))
+
+    def clear_tenant(self, tenant_id: Optional[str]) -> int:
+        tenant = self._tenant(tenant_id)
+        with self._lock:
+            self._generations[tenant] = self._generations.get(tenant, 0) + 1
+            keys = list(self._by_tenant.get(tenant, ()))
+            for key in keys:
+                self._drop_locked((tenant, key))
+            return len(keys)
+
+    def clear(self) -> int:
+        with self._lock:
+            self._global_generation += 1
+            removed = len(self._entries)
+            self._entries.clear()
+            self._by_tenant.clear()
+            return removed
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "entries": len(self._entries),
+                "tenants": len(self._by_tenant),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "in_flight": len(self._inflight),
+                "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else None,
+                **self._counters,
+            }
+
+
+_REGISTRY: dict[str, CacheNamespace] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def namespace(
+    name: str,
+    *,
+    ttl_seconds: float,
+    max_entries: int,
+    freeze_values: bool = True,
+    load_wait_seconds: float = 30.0,
+) -> CacheNamespace:
+    """Return the process-wide namespace called ``name``, creating it on first use."""
+    with _REGISTRY_LOCK:
+        existing = _REGISTRY.get(name)
+        if existing is not None:
+            return existing
+        created = CacheNamespace(
+            name,
+            ttl_seconds=ttl_seconds,
+            max_entries=max_entries,
+            freeze_values=freeze_values,
+            load_wait_seconds=load_wait_seconds,
+        )
+        _REGISTRY[name] = created
+        return created
+
+
+def namespaces() -> list[CacheNamespace]:
+    with _REGISTRY_LOCK:
+        return list(_REGISTRY.values())
+
+
+def clear_tenant_local(tenant_id: str) -> dict[str, int]:
+    return {ns.name: ns.clear_tenant(tenant_id) for ns in namespaces()}
+
+
+def clear_tenant(tenant_id: str, *, db: Optional[Session] = None) -> dict[str, Any]:
+    """Drop ``tenant_id`` from every namespace here and, via ``db``, in every API process.
+
+    The notification is sent inside ``db``'s transaction, so other processes
+    only clear once the caller commits.
+    """
+    if not tenant_id:
+        raise ValueError("tenant_id is required")
+    cleared = clear_tenant_local(str(tenant_id))
+    broadcast = False
+    if db is not None and db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CHANNEL, "payload": json.dumps({"tenant": str(tenant_id)})},
+        )
+        broadcast = True
+    return {
+        "tenant_id": str(tenant_id),
+        "cleared_entries": sum(cleared.values()),
+        "namespaces": cleared,
+        "broadcast": broadcast,
+    }
+
+
+def apply_message(payload: str) -> None:
+    try:
+        tenant_id = json.loads(payload).get("tenant")
+    except (ValueError, AttributeError):
+        logger.warning("Ignoring malformed tenant cache notification")
+        return
+    if tenant_id:
+        clear_tenant_local(str(tenant_id))
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    return {ns.name: ns.stats() for ns in namespaces()}
+
+
+def _register_listener() -> None:
+    from amodb.identity_cache import register_invalidation_channel
+
+    register_invalidation_channel(CHANNEL, apply_message)
+
+
+_register_listener()
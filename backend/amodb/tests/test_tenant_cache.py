@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from amodb import tenant_cache
+
+
+def _namespace(**kwargs) -> tenant_cache.CacheNamespace:
+    options = {"ttl_seconds": 60.0, "max_entries": 8}
+    options.update(kwargs)
+    return tenant_cache.CacheNamespace("test", **options)
+
+
+def test_lru_bound_and_ttl_expiry():
+    cache = _namespace(max_entries=2)
+    cache.set("a", 1, tenant_id="t1")
+    cache.set("b", 2, tenant_id="t1")
+    assert cache.get("a", tenant_id="t1") == 1
+    cache.set("c", 3, tenant_id="t1")
+
+    assert cache.get("b", tenant_id="t1") is None
+    assert cache.get("a", tenant_id="t1") == 1
+    assert cache.stats()["evictions"] == 1
+
+    cache.set("short", 4, tenant_id="t1", ttl_seconds=0.01)
+    time.sleep(0.02)
+    assert cache.get("short", tenant_id="t1", default="gone") == "gone"
+    assert cache.stats()["expirations"] == 1
+
+
+def test_hits_are_frozen_and_not_copied():
+    cache = _namespace()
+    stored = cache.get_or_load("dashboard", lambda: {"rows": [{"id": 1}]}, tenant_id="t1")
+
+    assert cache.get("dashboard", tenant_id="t1") is stored
+    with pytest.raises(TypeError):
+        stored["rows"].append({"id": 2})
+    with pytest.raises(TypeError):
+        stored["rows"][0]["id"] = 3
+    editable = tenant_cache.thaw(stored)
+    editable["rows"].append({"id": 2})
+    assert stored == {"rows": [{"id": 1}]}
+
+
+def test_concurrent_misses_run_the_loader_once():
+    cache = _namespace()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(2)
+        return {"value": 42}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader, tenant_id="t1")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for _ in range(200):
+        if cache.stats()["coalesced"] == 7:
+            break
+        time.sleep(0.005)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * 8
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_failed_load_is_not_cached():
+    cache = _namespace()
+
+    def failing():
+        raise RuntimeError("provider down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("k", failing)
+    assert cache.get_or_load("k", lambda: "ok") == "ok"
+    assert cache.stats()["load_failures"] == 1
+
+
+def test_clear_tenant_spans_namespaces_and_discards_racing_fill():
+    first = tenant_cache.namespace("test.clear.first", ttl_seconds=60, max_entries=8)
+    second = tenant_cache.namespace("test.clear.second", ttl_seconds=60, max_entries=8)
+    first.set("a", 1, tenant_id="t1")
+    first.set("a", 1, tenant_id="t2")
+    second.set("b", 2, tenant_id="t1")
+
+    def racing_loader():
+        tenant_cache.clear_tenant("t1")
+        return "stale"
+
+    assert second.get_or_load("c", racing_loader, tenant_id="t1") == "stale"
+    assert second.get("c", tenant_id="t1") is None
+    assert second.stats()["stale_fills"] == 1
+    assert first.get("a", tenant_id="t1") is None
+    assert first.get("a", tenant_id="t2") == 1
+
+    first.set("a", 1, tenant_id="t1")
+    tenant_cache.apply_message('{"tenant": "t1"}')
+    assert first.get("a", tenant_id="t1") is None
+
+
+def test_clear_tenant_only_broadcasts_on_postgres():
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    db = sessionmaker(bind=engine)()
+    try:
+        result = tenant_cache.clear_tenant("t1", db=db)
+    finally:
+        db.close()
+    assert result["broadcast"] is False
+    assert result["tenant_id"] == "t1"
+    with pytest.raises(ValueError):
+        tenant_cache.clear_tenant("")
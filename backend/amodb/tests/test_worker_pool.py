@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from amodb import worker_pool
+
+
+def test_worker_errors_carry_the_pool_name_and_stderr_reaches_the_log(caplog: pytest.LogCaptureFixture) -> None:
+    # The interpreter cannot import the module, reports it on stderr and exits.
+    pool = worker_pool.SandboxWorkerPool("amodb.no_such_worker_module", size=1, max_jobs=1, name="Import")
+    caplog.set_level(logging.WARNING, logger=worker_pool.__name__)
+    try:
+        with pytest.raises(worker_pool.SandboxWorkerError) as raised:
+            pool.run("parse", b"", timeout=30)
+    finally:
+        pool.close()
+
+    assert str(raised.value).startswith("Import worker exited unexpectedly")
+    assert not raised.value.timed_out
+    assert any(
+        "Import worker" in record.getMessage() and "amodb.no_such_worker_module" in record.getMessage()
+        for record in caplog.records
+    )
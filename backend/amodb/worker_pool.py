@@ -0,0 +1,353 @@
+"""Supervised pool of long-lived, isolated worker processes.
+
+Workers are started once (``python -m <module> --serve``) and handle jobs
+over their stdin/stdout pipes:
+
+    frame = struct(">II", header_length, body_length) + header_json + body
+
+The request header names the action and carries the caller's per-job limits;
+the body carries the job's input bytes. Limits travel with each job because a
+warm worker's environment is fixed when it starts. The response header is the
+job's metadata (or ``{"error": ...}``) and the body is the output, if any.
+
+Isolation is kept per process rather than per job. A worker runs under an
+address-space limit, is killed when a job exceeds its timeout, and is
+replaced after ``max_jobs`` jobs, after an unexpected (5xx) job failure, or as
+soon as it crashes. Replacements are started in the background so that the
+pool stays warm. Whatever a worker writes to stderr (logging, tracebacks) is
+forwarded to this process's log.
+
+``name`` labels a pool's errors, log lines and threads (``"PDF"`` for
+``doc_control.pdfium_worker_pool``, ``"Import"`` for fleet import previews).
+"""
+from __future__ import annotations
+
+from collections import deque
+import json
+import logging
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, BinaryIO, Callable, Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+_FRAME = struct.Struct(">II")
+
+
+def write_frame(stream: BinaryIO, header: dict[str, Any], body: bytes = b"") -> None:
+    encoded = json.dumps(header, sort_keys=True).encode("utf-8")
+    stream.write(_FRAME.pack(len(encoded), len(body)))
+    stream.write(encoded)
+    if body:
+        stream.write(body)
+    stream.flush()
+
+
+def _read_exact(stream: BinaryIO, size: int) -> Optional[bytes]:
+    chunks: list[bytes] = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(stream: BinaryIO) -> Optional[tuple[dict[str, Any], bytes]]:
+    """Next ``(header, body)`` frame, or ``None`` at end of stream."""
+    prefix = _read_exact(stream, _FRAME.size)
+    if prefix is None:
+        return None
+    header_length, body_length = _FRAME.unpack(prefix)
+    header = _read_exact(stream, header_length)
+    body = _read_exact(stream, body_length) if body_length else b""
+    if header is None or body is None:
+        return None
+    return json.loads(header.decode("utf-8")), body
+
+
+def _percentile(values: list[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round((percentile / 100.0) * (len(ordered) - 1)))))
+    return round(ordered[index], 3)
+
+
+def _slug(name: str) -> str:
+    return "-".join(name.lower().split()) or "sandbox"
+
+
+def _apply_resource_limits(memory_mb: int, name: str) -> None:
+    if memory_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - non-POSIX hosts
+        return
+    limit = memory_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        logger.warning("Unable to apply the %s MB %s worker memory limit", memory_mb, name)
+
+
+def serve(
+    handler: Callable[[dict[str, Any], bytes], tuple[dict[str, Any], bytes | None]],
+    *,
+    warm: Callable[[], None] | None = None,
+    memory_mb: int = 0,
+    name: str = "Sandbox",
+) -> int:
+    """Worker side: answer framed jobs on stdin until the pool closes the pipe.
+
+    ``handler`` must not raise for input errors; it returns an
+    ``{"error": ...}`` header instead. Anything it prints goes to stderr, so
+    stdout carries only frames. ``memory_mb`` of 0 applies no limit.
+    """
+    requests = sys.stdin.buffer
+    responses = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    _apply_resource_limits(memory_mb, name)
+    if warm is not None:
+        warm()
+    while True:
+        request = read_frame(requests)
+        if request is None:
+            return 0
+        header, body = request
+        metadata, output = handler(header, body)
+        write_frame(responses, metadata, output or b"")
+
+
+class SandboxWorkerError(RuntimeError):
+    def __init__(self, message: str, *, timed_out: bool = False) -> None:
+        super().__init__(message)
+        self.timed_out = timed_out
+
+
+class SandboxWorker:
+    """One ``--serve`` process; used by a single job at a time."""
+
+    def __init__(self, module: str, *, name: str = "Sandbox") -> None:
+        env = dict(os.environ)
+        env["PYTHONNOUSERSITE"] = "1"
+        self.name = name
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", module, "--serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            close_fds=True,
+        )
+        self.jobs = 0
+        self._timed_out = False
+        self._stderr = threading.Thread(
+            target=self._forward_stderr, name=f"{_slug(name)}-worker-stderr", daemon=True
+        )
+        self._stderr.start()
+
+    def _forward_stderr(self) -> None:
+        # Drained continuously so a chatty worker never blocks on a full pipe.
+        stream = self.process.stderr
+        try:
+            for line in iter(stream.readline, b""):
+                text = line.decode("utf-8", errors="replace").rstrip()
+                if text:
+                    logger.warning("%s worker %s: %s", self.name, self.process.pid, text)
+        except (OSError, ValueError):
+            pass
+        finally:
+            stream.close()
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _kill(self) -> None:
+        self._timed_out = True
+        self.process.kill()
+
+    def call(self, header: dict[str, Any], body: bytes, *, timeout: float) -> tuple[dict[str, Any], bytes]:
+        # The timer kills the process, which unblocks the pipe write or read.
+        timer = threading.Timer(timeout, self._kill)
+        timer.daemon = True
+        timer.start()
+        result = None
+        try:
+            write_frame(self.process.stdin, header, body)
+            result = read_frame(self.process.stdout)
+        except (OSError, ValueError):
+            result = None
+        finally:
+            timer.cancel()
+        if self._timed_out:
+            raise SandboxWorkerError(f"{self.name} processing exceeded {timeout:g} seconds", timed_out=True)
+        if result is None:
+            returncode = self.process.poll()
+            raise SandboxWorkerError(f"{self.name} worker exited unexpectedly (exit code {returncode})")
+        self.jobs += 1
+        return result
+
+    def close(self) -> None:
+        try:
+            if self.process.stdin:
+                self.process.stdin.close()
+            self.process.wait(timeout=1.0)
+        except Exception:
+            self.process.kill()
+            try:
+                self.process.wait(timeout=1.0)
+            except Exception:
+                pass
+        finally:
+            if self.process.stdout:
+                self.process.stdout.close()
+            self._stderr.join(timeout=1.0)
+
+
+class SandboxWorkerPool:
+    def __init__(self, module: str, *, size: int, max_jobs: int, name: str = "Sandbox") -> None:
+        self.module = module
+        self.name = name
+        self.size = max(1, size)
+        self.max_jobs = max(1, max_jobs)
+        self._cond = threading.Condition()
+        self._idle: list[SandboxWorker] = []
+        self._live = 0
+        self._waiting = 0
+        self._closed = False
+        self._queue_wait_ms: Deque[float] = deque(maxlen=2048)
+        self._latency_ms: dict[str, Deque[float]] = {}
+        self._counters = {"jobs": 0, "spawned": 0, "recycled": 0, "crashes": 0, "timeouts": 0}
+
+    def _spawn(self) -> SandboxWorker:
+        worker = SandboxWorker(self.module, name=self.name)
+        with self._cond:
+            self._counters["spawned"] += 1
+        return worker
+
+    def warm(self) -> None:
+        """Start workers until the pool is at ``size``; they are parked idle."""
+        while True:
+            with self._cond:
+                if self._closed or self._live >= self.size:
+                    return
+                self._live += 1
+            try:
+                worker = self._spawn()
+            except Exception:
+                with self._cond:
+                    self._live -= 1
+                    self._cond.notify()
+                logger.warning("Unable to start a %s worker", self.module, exc_info=True)
+                return
+            with self._cond:
+                self._idle.append(worker)
+                self._cond.notify()
+
+    def _warm_in_background(self) -> None:
+        threading.Thread(target=self.warm, name=f"{_slug(self.name)}-pool-warm", daemon=True).start()
+
+    def _acquire(self) -> SandboxWorker:
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._closed:
+                        raise SandboxWorkerError(f"The {self.name} worker pool is shut down")
+                    while self._idle:
+                        worker = self._idle.pop()
+                        if worker.alive():
+                            return worker
+                        self._live -= 1
+                        self._counters["crashes"] += 1
+                        worker.close()
+                    if self._live < self.size:
+                        self._live += 1
+                        break
+                    self._cond.wait()
+            finally:
+                self._waiting -= 1
+        try:
+            return self._spawn()
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+
+    def _retire(self, worker: SandboxWorker, counter: str) -> None:
+        worker.close()
+        with self._cond:
+            self._live -= 1
+            self._counters[counter] += 1
+            self._cond.notify()
+            closed = self._closed
+        if not closed:
+            self._warm_in_background()
+
+    def run(self, action: str, body: bytes, *, timeout: float, limits: dict[str, Any] | None = None) -> tuple[dict[str, Any], bytes]:
+        queued = time.perf_counter()
+        worker = self._acquire()
+        started = time.perf_counter()
+        try:
+            result = worker.call({"action": action, "limits": dict(limits or {})}, body, timeout=timeout)
+        except SandboxWorkerError as exc:
+            self._retire(worker, "timeouts" if exc.timed_out else "crashes")
+            raise
+        finished = time.perf_counter()
+        # An unexpected (5xx) failure may leave native state behind; start clean.
+        error = result[0].get("error") if isinstance(result[0], dict) else None
+        failed = isinstance(error, dict) and int(error.get("status_code") or 500) >= 500
+        if failed or worker.jobs >= self.max_jobs or not worker.alive():
+            self._retire(worker, "recycled")
+        else:
+            with self._cond:
+                if self._closed:
+                    self._live -= 1
+                    worker.close()
+                else:
+                    self._idle.append(worker)
+                    self._cond.notify()
+        with self._cond:
+            self._counters["jobs"] += 1
+            self._queue_wait_ms.append((started - queued) * 1000.0)
+            self._latency_ms.setdefault(action, deque(maxlen=2048)).append((finished - queued) * 1000.0)
+        return result
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+            self._cond.notify_all()
+        for worker in idle:
+            worker.close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            counters = dict(self._counters)
+            queue_wait = list(self._queue_wait_ms)
+            latency = {action: list(values) for action, values in self._latency_ms.items()}
+            live, idle, waiting = self._live, len(self._idle), self._waiting
+        return {
+            **counters,
+            "size": self.size,
+            "max_jobs": self.max_jobs,
+            "live": live,
+            "idle": idle,
+            "busy": max(0, live - idle),
+            "waiting": waiting,
+            "queue_wait_ms": {"p50": _percentile(queue_wait, 50), "p99": _percentile(queue_wait, 99), "samples": len(queue_wait)},
+            "latency_ms": {
+                action: {"p50": _percentile(values, 50), "p99": _percentile(values, 99), "samples": len(values)}
+                for action, values in latency.items()
+            },
+        }
@@ -0,0 +1,106 @@
+"""Hold thousands of idle /api/events streams against one API worker.
+
+Run against an isolated performance environment with a single Uvicorn worker
+on the same host so its thread count can be sampled from /proc:
+
+    python tests/load/sse_idle_clients.py --base-url http://127.0.0.1:8080 \\
+        --token-file tokens.json --clients 3000 --hold-seconds 60 --server-pid <pid>
+
+Tokens come from the identity manifest produced by generate_identity_manifest.py.
+The run fails if the worker's thread count grows by more than --max-thread-growth
+while the streams are open, or if any stream fails to connect.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+
+
+def _thread_count(pid: int | None) -> int | None:
+    if not pid:
+        return None
+    for line in Path(f"/proc/{pid}/status").read_text(encoding="utf-8").splitlines():
+        if line.startswith("Threads:"):
+            return int(line.split()[1])
+    return None
+
+
+async def _hold_stream(client: httpx.AsyncClient, token: str, stop: asyncio.Event, stats: dict) -> None:
+    try:
+        async with client.stream("GET", "/api/events", params={"token": token}, timeout=None) as response:
+            if response.status_code != 200:
+                stats["failed"] += 1
+                return
+            stats["open"] += 1
+            iterator = response.aiter_lines()
+            while not stop.is_set():
+                try:
+                    line = await asyncio.wait_for(anext(iterator), timeout=1.0)
+                except asyncio.TimeoutError:
+                    continue
+                except StopAsyncIteration:
+                    break
+                if line.startswith("event: heartbeat"):
+                    stats["heartbeats"] += 1
+            stats["open"] -= 1
+    except httpx.HTTPError:
+        stats["failed"] += 1
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", required=True)
+    parser.add_argument("--token-file", required=True)
+    parser.add_argument("--clients", type=int, default=3000)
+    parser.add_argument("--hold-seconds", type=float, default=60.0)
+    parser.add_argument("--server-pid", type=int, default=None)
+    parser.add_argument("--max-thread-growth", type=int, default=8)
+    args = parser.parse_args()
+
+    identities = json.loads(Path(args.token_file).read_text(encoding="utf-8"))
+    tokens = [row["token"] for row in identities][: args.clients]
+    if len(tokens) < args.clients:
+        tokens = (tokens * (args.clients // max(1, len(tokens)) + 1))[: args.clients]
+
+    threads_before = _thread_count(args.server_pid)
+    stats = {"open": 0, "failed": 0, "heartbeats": 0}
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=args.clients + 10, max_keepalive_connections=0)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits) as client:
+        tasks = [asyncio.create_task(_hold_stream(client, token, stop, stats)) for token in tokens]
+        peak_threads = threads_before
+        elapsed = 0.0
+        while elapsed < args.hold_seconds:
+            await asyncio.sleep(1.0)
+            elapsed += 1.0
+            current = _thread_count(args.server_pid)
+            if current is not None:
+                peak_threads = max(peak_threads or 0, current)
+        open_streams = stats["open"]
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    growth = None if threads_before is None or peak_threads is None else peak_threads - threads_before
+    report = {
+        "clients": args.clients,
+        "open_streams_at_end": open_streams,
+        "failed": stats["failed"],
+        "heartbeats": stats["heartbeats"],
+        "server_threads_before": threads_before,
+        "server_threads_peak": peak_threads,
+        "server_thread_growth": growth,
+    }
+    print(json.dumps(report, indent=2))
+    if stats["failed"] or open_streams < args.clients:
+        return 1
+    if growth is not None and growth > args.max_thread_growth:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -75,6 +75,24 @@ class ConnectionBudgetTests(unittest.TestCase):
         self.assertEqual(budget.projected, 45)
         self.assertEqual(budget.usable, 85)
 
+    def test_auto_event_broker_on_postgres_counts_session_connections(self) -> None:
+        values = {
+            "DB_EXTERNAL_POOLER": "false",
+            "DB_MAX_CONNECTIONS": "100",
+            "DB_POOL_SIZE": "10",
+            "DB_MAX_OVERFLOW": "5",
+            "PORTAL_API_PROCESS_COUNT": "3",
+            "DATABASE_URL": "postgresql+psycopg2://amo@db:5432/amo",
+        }
+        with patch.dict(os.environ, values, clear=False):
+            os.environ.pop("EVENTS_BROKER_BACKEND", None)
+            os.environ.pop("EVENTS_BROKER_DATABASE_URL", None)
+            os.environ.pop("DATABASE_WRITE_URL", None)
+            budget = connection_budget()
+            self.assertEqual(budget.roles["event_broker"], 6)
+            os.environ["EVENTS_BROKER_BACKEND"] = "memory"
+            self.assertNotIn("event_broker", connection_budget().roles)
+
 
 if __name__ == "__main__":
     unittest.main()
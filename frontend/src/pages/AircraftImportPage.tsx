@@ -190,6 +190,29 @@ type ImportSnapshot = {
 };
 
 const MAX_CLIENT_PREVIEW_ROWS = 1500;
+const PREVIEW_POLL_INTERVAL_MS = 1000;
+// About ten minutes; the API fails a stalled preview before then.
+const PREVIEW_POLL_MAX_ATTEMPTS = 600;
+
+// Previews are prepared by a background job; the API answers 202 until the
+// staged rows are ready, so keep polling the preview until it settles.
+const awaitImportPreview = async (
+  res: Response,
+  pollUrl: (previewId: string) => string
+): Promise<{ res: Response; data: any }> => {
+  let data = await res.json();
+  let attempts = 0;
+  while (res.status === 202 && data.preview_id) {
+    if (attempts >= PREVIEW_POLL_MAX_ATTEMPTS) {
+      throw new Error("The preview is taking too long. Upload the files again.");
+    }
+    attempts += 1;
+    await new Promise((resolve) => setTimeout(resolve, PREVIEW_POLL_INTERVAL_MS));
+    res = await fetch(pollUrl(data.preview_id), { headers: authHeaders() });
+    data = await res.json();
+  }
+  return { res, data };
+};
 
 const AIRCRAFT_DIFF_FIELDS: AircraftRowField[] = [
   "serial_number",
@@ -820,8 +843,12 @@ const AircraftImportPage: React.FC<AircraftImportPageProps> = ({
         body: formData,
       });
 
-      const data = await res.json();
-      if (!res.ok) {
+      const { res: previewRes, data } = await awaitImportPreview(
+        res,
+        (id) =>
+          `${getApiBaseUrl()}/aircraft/import/preview/${encodeURIComponent(id)}`
+      );
+      if (!previewRes.ok) {
         throw new Error(data.detail ?? "Preview failed");
       }
       const rows: PreviewRow[] = (data.rows ?? []).map((row: PreviewRow) =>
@@ -999,8 +1026,14 @@ const AircraftImportPage: React.FC<AircraftImportPageProps> = ({
         }
       );
 
-      const data = await res.json();
-      if (!res.ok) {
+      const { res: previewRes, data } = await awaitImportPreview(
+        res,
+        (id) =>
+          `${getApiBaseUrl()}/aircraft/${encodeURIComponent(
+            componentAircraftSerial.trim()
+          )}/components/import/preview/${encodeURIComponent(id)}`
+      );
+      if (!previewRes.ok) {
         throw new Error(data.detail ?? "Component preview failed");
       }
       const rows: ComponentPreviewRow[] = (data.rows ?? []).map(
@@ -127,6 +127,8 @@ export type DocumentationIndexState = {
   resolved_count?: number;
   unresolved_count?: number;
   broken_count?: number;
+  pages_total?: number | null;
+  pages_indexed?: number;
   error_summary?: string | null;
   started_at?: string | null;
   completed_at?: string | null;
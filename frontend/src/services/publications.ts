@@ -132,6 +132,18 @@ export type PublicationSearchResult = {
   level: number;
   page_start?: number | null;
   snippet: string;
+  highlights?: Array<[number, number]>;
+  heading_highlights?: Array<[number, number]>;
+  score?: number | null;
+};
+
+export type PublicationLibrarySearchResult = PublicationSearchResult & {
+  revision_id: string;
+  manual_id: string;
+  manual_code: string;
+  manual_title: string;
+  rev_number: string;
+  revision_status: string;
 };
 
 export type ApprovedPublicationIntakePayload = {
@@ -253,6 +265,13 @@ export async function searchPublicationReader(tenantSlug: string, manualId: stri
   return payload.items || [];
 }
 
+export async function searchPublicationLibrary(tenantSlug: string, query: string, scope: "current" | "all" = "current"): Promise<PublicationLibrarySearchResult[]> {
+  const path = `/manuals/t/${encodeURIComponent(tenantSlug)}/library-search?q=${encodeURIComponent(query)}&scope=${scope}`;
+  const response = await authenticatedFetch(path);
+  const payload = await response.json() as { items: PublicationLibrarySearchResult[] };
+  return payload.items || [];
+}
+
 export function updatePublicationReaderPosition(tenantSlug: string, manualId: string, revisionId: string, payload: { page_number?: number | null; anchor_slug?: string | null; section_id?: string | null; scroll_percent?: number; zoom_percent?: number }): Promise<void> {
   const path = `/manuals/t/${encodeURIComponent(tenantSlug)}/${encodeURIComponent(manualId)}/rev/${encodeURIComponent(revisionId)}/reader-position`;
   return authenticatedFetch(path, { method: "POST", body: JSON.stringify(payload), keepalive: true }).then(() => undefined);
@@ -4,6 +4,9 @@ import { SharedArray } from "k6/data";
 
 const baseUrl = (__ENV.BASE_URL || "http://localhost:8000").replace(/\/$/, "");
 const fixturePath = __ENV.TENANT_FIXTURES || "./tenant-fixtures.json";
+// QMS dashboard/cockpit reads are opt-in because fixture tenants need the
+// quality module entitlement.
+const includeQuality = __ENV.QUALITY_SURFACE === "1";
 const tenants = new SharedArray("tenant-auth-fixtures", () => JSON.parse(open(fixturePath)));
 
 if (tenants.length < 1000) {
@@ -34,6 +37,12 @@ export const options = {
     http_req_failed: ["rate<0.01"],
     http_req_duration: ["p(95)<750", "p(99)<1500"],
     checks: ["rate>0.99"],
+    ...(includeQuality
+      ? {
+          "http_req_duration{endpoint:quality_dashboard}": ["p(95)<750"],
+          "http_req_duration{endpoint:quality_cockpit}": ["p(95)<750"],
+        }
+      : {}),
   },
 };
 
@@ -55,13 +64,24 @@ export default function () {
     tags: { tenant_id: String(fixture.tenant_id) },
     timeout: "10s",
   };
-  const responses = http.batch([
+  const requests = [
     ["GET", `${baseUrl}/auth/me`, null, { ...params, tags: { ...params.tags, endpoint: "auth_me" } }],
     ["GET", `${baseUrl}/billing/access-status`, null, { ...params, tags: { ...params.tags, endpoint: "billing_access" } }],
     ["GET", `${baseUrl}/billing/entitlements`, null, { ...params, tags: { ...params.tags, endpoint: "billing_entitlements" } }],
-  ]);
+  ];
+  if (includeQuality) {
+    requests.push(
+      ["GET", `${baseUrl}/quality/qms/dashboard`, null, { ...params, tags: { ...params.tags, endpoint: "quality_dashboard" } }],
+      ["GET", `${baseUrl}/quality/qms/cockpit-snapshot`, null, { ...params, tags: { ...params.tags, endpoint: "quality_cockpit" } }],
+    );
+  }
+  const responses = http.batch(requests);
   check(responses[0], { "auth/me succeeds": (r) => r.status === 200 });
   check(responses[1], { "billing access succeeds": (r) => r.status === 200 });
   check(responses[2], { "entitlements succeeds": (r) => r.status === 200 });
+  if (includeQuality) {
+    check(responses[3], { "quality dashboard succeeds": (r) => r.status === 200 });
+    check(responses[4], { "quality cockpit succeeds": (r) => r.status === 200 });
+  }
   sleep(1);
 }